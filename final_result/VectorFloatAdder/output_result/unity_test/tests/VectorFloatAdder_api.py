@@ -2,14 +2,19 @@
 
 import pytest
 from VectorFloatAdder_function_coverage_def import get_coverage_groups
+from coverage_sampler import CoverageSampler
+from VectorFloatAdder_waveform import WAVEFORM_MODE, WAVEFORM_RERUN_PASS, PinWindowRecorder, waveform_enabled
+from VectorFloatAdder_probe import PROBE_DEPTH, VectorFloatAdderSignalProbe
 from toffee_test.reporter import set_func_coverage, set_line_coverage, get_file_in_tmp_dir
 from toffee_test.reporter import set_user_info, set_title_info
 from toffee import Bundle, Signals, Signal
+from line_cov_index import write_owner
 
 # import your dut module here
 from VectorFloatAdder import DUTVectorFloatAdder  # Replace with the actual DUT class import
 
 import os
+from collections import deque
 
 
 def current_path_file(file_name):
@@ -30,6 +35,12 @@ def get_waveform_path(request, new_path:bool):
     return get_file_in_tmp_dir(request, current_path_file("data/"), f"{tc_name}.fst",  new_path=new_path)
 
 
+def get_window_waveform_path(request):
+    # DUT_WAVEFORM=window时，用例失败后写出的滚动窗口VCD
+    tc_name = request.node.name if request is not None else "VectorFloatAdder"
+    return get_file_in_tmp_dir(request, current_path_file("data/"), f"{tc_name}.window.vcd",  new_path=True)
+
+
 def create_dut(request):
     """
     创建VectorFloatAdder的DUT实例
@@ -43,8 +54,11 @@ def create_dut(request):
     # 设置覆盖率生成文件(必须设置覆盖率文件，否则无法统计覆盖率，导致测试失败)
     dut.SetCoverage(get_coverage_data_path(request, new_path=True))
 
-    # 设置波形生成文件
-    dut.SetWaveform(get_waveform_path(request, new_path=True))
+    # 设置波形生成文件（按DUT_WAVEFORM策略，off/window模式及rerun的首次运行不生成FST）
+    if waveform_enabled(request):
+        dut.SetWaveform(get_waveform_path(request, new_path=True))
+    elif hasattr(dut, "CloseWaveform"):
+        dut.CloseWaveform()  # 以-w编译的DUT构造后即开始写波形
 
     # VectorFloatAdder是时序电路，需要初始化时钟
     # 注意：时钟初始化在dut fixture中进行，这里不进行时钟绑定
@@ -53,26 +67,46 @@ def create_dut(request):
 
 
 @pytest.fixture(scope="function") # 用scope="function"确保每个测试用例都创建了一个全新的DUT
-def dut(request):
-    # 创建DUT实例
-    dut = create_dut(request)
+def dut(request, dut_pool):
+    # 创建DUT实例：DUT_POOL=1时dut_pool为VectorFloatAdderDUTPool，从实例池取出已复位并通过
+    # 状态卫生检查的DUT，用例结束后归还（按DUT_POOL_LINE_COV轮换代码行覆盖率），详见VectorFloatAdder_pool.py
+    # rerun模式的失败重跑需要带波形的新实例，不使用实例池
+    rerun = WAVEFORM_MODE == "rerun" and WAVEFORM_RERUN_PASS
+    slot = dut_pool.acquire(request) if dut_pool is not None and not rerun else None
+    dut = create_dut(request) if slot is None else slot.dut
     
     # 获取功能覆盖组
     func_coverage_group = get_coverage_groups(dut)
     
     # VectorFloatAdder是时序电路，需要初始化时钟
-    # 根据DUT定义，时钟引脚名称为"clock"
-    dut.InitClock("clock")
+    # 根据DUT定义，时钟引脚名称为"clock"（池中的实例在新建时已初始化）
+    if slot is None:
+        dut.InitClock("clock")
 
     # 上升沿采样，StepRis也适用于组合电路用dut.Step推进时采样
     # 必须要有g.sample()采样覆盖组，如不在StepRis/StepFail中采样，则需要在test function中手动调用，否则无法统计覆盖率导致失败
-    dut.StepRis(lambda _: [g.sample()
-                           for g in
-                           func_coverage_group])
+    # 仅在fire有效或fire翻转的周期评估检查点，引脚每周期只读一次
+    sampler = CoverageSampler(dut, func_coverage_group,
+                              trigger=lambda s: s.io_fire.value == 1,
+                              edge_pins=["io_fire"])
+    if slot is None:
+        dut.StepRis(sampler)
+    else:
+        slot.sampler = sampler  # 池中实例的StepRis回调转发给本用例的采样器
+
+    # DUT_WAVEFORM=window时在内存中滚动记录顶层引脚，用例失败时写出VCD
+    recorder = PinWindowRecorder(dut) if WAVEFORM_MODE == "window" else None
+    if recorder is not None:
+        if slot is None:
+            dut.StepRis(recorder)
+        else:
+            slot.recorder = recorder
 
     # 以属性名称fc_cover保存覆盖组到DUT
     setattr(dut, "fc_cover",
             {g.name:g for g in func_coverage_group})
+    # 采样器同样挂到DUT上，便于查看采样周期统计
+    setattr(dut, "fc_sampler", sampler)
 
     # 返回DUT实例给测试函数
     yield dut
@@ -81,9 +115,19 @@ def dut(request):
     # 需要在测试结束的时候，通过set_func_coverage把覆盖组传递给toffee_test
     set_func_coverage(request, func_coverage_group)
 
+    # rep_call由conftest中的pytest_runtest_makereport记录
+    report = getattr(request.node, "rep_call", None)
+    if recorder is not None and report is not None and report.failed:
+        recorder.dump_vcd(get_window_waveform_path(request))
+
     # 设置需要收集的代码行覆盖率文件(获取已有路径new_path=False) 向toffee_test传代码行覆盖率数据
     # 代码行覆盖率 ignore 文件的固定路径为当前文件所在目录下的：VectorFloatAdder.ignore，请不要改变
-    set_line_coverage(request, get_coverage_data_path(request, new_path=False), ignore=current_path_file("VectorFloatAdder.ignore"))
+    # 池中的实例在退役时才写出.dat：DUT_POOL_LINE_COV=test时每个用例归还即退役，.dat只属于本用例；
+    # summary时.dat累计了实例服务的全部用例，只由首个使用它的用例登记一次以计入汇总行覆盖率（见VectorFloatAdder_pool.py）
+    if slot is None:
+        set_line_coverage(request, get_coverage_data_path(request, new_path=False), ignore=current_path_file("VectorFloatAdder.ignore"))
+    elif dut_pool.line_cov == "test" or slot.uses == 1:
+        set_line_coverage(request, slot.datfile, ignore=current_path_file("VectorFloatAdder.ignore"))
 
     # 设置用户信息到报告
     set_user_info("UCAgent-0.9.1.source-code", "unitychip@bosc.ac.cn")
@@ -93,8 +137,13 @@ def dut(request):
     for g in func_coverage_group:
         g.clear()                                        # 清空统计
     
-    # 清理DUT资源，每个DUT class 都有 Finish 方法
-    dut.Finish()
+    # 清理DUT资源，每个DUT class 都有 Finish 方法；池中的实例归还实例池，下次取出前复位
+    if slot is None:
+        dut.Finish()
+        # 在.dat旁记录写出它的用例，供line_cov_index按nodeid归属
+        write_owner(get_coverage_data_path(request, new_path=False), [request.node.nodeid])
+    else:
+        dut_pool.release(slot)
 
 
 # 定义VectorFloatAdder的引脚封装Bundle
@@ -135,6 +184,7 @@ class VectorFloatAdderEnv:
 
     def __init__(self, dut):
         self.dut = dut
+        self.probes = []  # 内部信号探针，由Step逐周期采样
         
         # 创建主要引脚封装，使用from_prefix方法处理io_前缀的引脚
         self.io = VectorFloatAdderBundle.from_prefix("io_")
@@ -152,11 +202,38 @@ class VectorFloatAdderEnv:
         # 设置向量模式为1（根据文档要求）
         self.io.is_vec.value = 1
 
+        # 各格式(1=f16, 2=f32, 3=f64)的流水线延迟：从发射所在的Step算起，经过多少次Step后结果出现在输出端
+        # 默认值来自RTL分析（所有流水级寄存器都由io_fire使能，单级寄存器），可用calibrate_latency重新标定
+        self.latency = {0b01: 1, 0b10: 1, 0b11: 1}
+
     # 添加清空Env注册的回调函数
     def clear_cbs(self):
-        """清空所有注册的回调函数"""
-        # 如果有注册的回调函数，在这里清理
-        pass
+        """清空所有注册的回调函数（含内部信号探针）"""
+        self.probes.clear()
+
+    def probe(self, signals, depth=PROBE_DEPTH, strict=False):
+        """按层次名绑定内部信号，之后Step每推进一个周期采样一次
+
+        Args:
+            signals (list | dict): 相对DUT顶层的层次名列表，或{别名: 层次名}，见VectorFloatAdder_probe
+            depth (int, optional): 环形缓冲区保留的采样数，默认为PROBE_DEPTH
+            strict (bool, optional): 为True时有信号未绑定即抛出KeyError，默认为False
+
+        Returns:
+            VectorFloatAdderSignalProbe: 探针，按名字读取按时间顺序的NumPy取值数组
+
+        Example:
+            >>> probe = env.probe(["U_F16_1.io_fflags", "U_F16_1.U_far_path.io_fflags"])
+            >>> api_VectorFloatAdder_add(env, fp_a, fp_b, fp_format=0b01)
+            >>> probe["U_F16_1.io_fflags"]
+        """
+        probe = VectorFloatAdderSignalProbe(self.dut, signals, depth, strict)
+        self.probes.append(probe)
+        return probe
+
+    def remove_probe(self, probe):
+        """停止探针采样"""
+        self.probes.remove(probe)
 
     # 定义常用的操作方法
     def reset(self):
@@ -226,10 +303,152 @@ class VectorFloatAdderEnv:
         # 返回结果
         return self.io.fp_result.value, self.io.fflags.value
 
+    def calibrate_latency(self, fp_format, max_cycles=16):
+        """标定指定格式的流水线延迟
+
+        连续发射加法操作Y，中间只插入一次操作X（X、Y的结果在每个通道都不同），
+        观察X的结果在发射后第几个Step出现在输出端，结果记录到self.latency。
+
+        Args:
+            fp_format: 浮点格式，1=f16, 2=f32, 3=f64
+            max_cycles: 最大观察周期数
+
+        Returns:
+            int: 标定得到的延迟（Step数，至少为1）
+
+        Raises:
+            RuntimeError: 在max_cycles内没有观察到X的结果
+        """
+        # 每个通道：X = 1.0 + 1.0 = 2.0，Y = 1.0 + 2.0 = 3.0
+        one, two, lanes, width = {
+            0b01: (0x3C00, 0x4000, 4, 16),
+            0b10: (0x3F800000, 0x40000000, 2, 32),
+            0b11: (0x3FF0000000000000, 0x4000000000000000, 1, 64),
+        }[fp_format]
+        splat = lambda v: sum(v << (i * width) for i in range(lanes))
+        expect_x = splat(two)
+
+        self.set_operation(0b00000, fp_format, 0)
+        self.io.mask.value = 0xF
+        self.io.fire.value = 1
+        self.set_operands(splat(one), splat(two))
+        self.Step(max_cycles)  # 用Y填满流水线
+        self.set_operands(splat(one), splat(one))
+        self.Step(1)
+        self.set_operands(splat(one), splat(two))
+        for cycle in range(1, max_cycles + 1):
+            if self.io.fp_result.value == expect_x:
+                self.io.fire.value = 0
+                self.latency[fp_format] = cycle
+                return cycle
+            self.Step(1)
+        self.io.fire.value = 0
+        raise RuntimeError(f"格式{fp_format}在{max_cycles}个周期内未观察到标定结果")
+
     # 直接导出DUT的通用操作Step
     def Step(self, i: int = 1):
         """推进电路i个时钟周期"""
-        return self.dut.Step(i)
+        if not self.probes:
+            return self.dut.Step(i)
+        # 有探针时逐周期推进并采样
+        ret = None
+        for _ in range(i):
+            ret = self.dut.Step(1)
+            for probe in self.probes:
+                probe.sample()
+        return ret
+
+
+class VectorFloatAdderStream:
+    """VectorFloatAdder流水线流式发射引擎
+
+    驱动端每个周期保持fire=1发射一个操作并为其分配递增的tag；监视端按
+    env.latency中各格式的延迟，在结果到达输出端的周期读取fp_result/fflags，
+    并与发射时记录的输入匹配。DUT的流水寄存器都由io_fire使能，
+    因此排空流水线时需要继续发射气泡（重复上一次输入）而不是拉低fire。
+
+    使用示例：
+        stream = VectorFloatAdderStream(env)
+        for op_code, fp_a, fp_b in ops:
+            stream.issue(op_code, fp_a, fp_b, fp_format=0b10)
+        records = stream.drain()
+    """
+
+    def __init__(self, env):
+        self.env = env
+        self.cycle = 0              # 流式模式下已推进的周期数
+        self.next_tag = 0
+        self.inflight = deque()     # 按到期周期排序的在途事务
+        self.completed = []         # 已完成事务，按完成顺序
+        self.env.io.mask.value = 0xF
+        self.env.io.is_vec.value = 1
+
+    def issue(self, op_code, fp_a, fp_b, fp_format=0b10, round_mode=0):
+        """在当前周期发射一个操作
+
+        Args:
+            op_code: 操作码
+            fp_a: 第一个操作数（64位）
+            fp_b: 第二个操作数（64位）
+            fp_format: 浮点格式，1=f16, 2=f32, 3=f64
+            round_mode: 舍入模式
+
+        Returns:
+            int: 该事务的tag
+        """
+        io = self.env.io
+        io.op_code.value = op_code
+        io.fp_format.value = fp_format
+        io.round_mode.value = round_mode
+        io.fp_a.value = fp_a
+        io.fp_b.value = fp_b
+        io.fire.value = 1
+
+        tag = self.next_tag
+        self.next_tag += 1
+        due = self.cycle + self.env.latency[fp_format]
+        if self.inflight and due <= self.inflight[-1]['due']:
+            raise RuntimeError(f"格式切换导致事务{tag}与前一事务的完成周期冲突，请先调用drain")
+        self.inflight.append({
+            'tag': tag,
+            'op_code': op_code,
+            'fp_a': fp_a,
+            'fp_b': fp_b,
+            'fp_format': fp_format,
+            'round_mode': round_mode,
+            'issue_cycle': self.cycle,
+            'due': due,
+        })
+        self._step()
+        return tag
+
+    def _step(self):
+        """推进一个周期，并收集到期的结果"""
+        self.env.Step(1)
+        self.cycle += 1
+        inflight = self.inflight
+        while inflight and inflight[0]['due'] <= self.cycle:
+            rec = inflight.popleft()
+            del rec['due']
+            rec['fp_result'] = self.env.io.fp_result.value
+            rec['fflags'] = self.env.io.fflags.value
+            rec['complete_cycle'] = self.cycle
+            self.completed.append(rec)
+
+    def drain(self):
+        """发射气泡直到所有在途事务完成，然后拉低fire
+
+        Returns:
+            list: 全部已完成事务记录（按tag排序），每条记录包含输入、
+                  fp_result、fflags、issue_cycle和complete_cycle
+        """
+        while self.inflight:
+            # 保持上一次的输入不变继续发射，推动流水线前进
+            self._step()
+        self.env.io.fire.value = 0
+        done, self.completed = self.completed, []
+        done.sort(key=lambda rec: rec['tag'])
+        return done
 
 
 # 定义env fixture
@@ -881,4 +1100,41 @@ def api_VectorFloatAdder_f64_operation(env, fp_a, fp_b, op_code, round_mode=0):
     )
 
 
+def api_VectorFloatAdder_stream_operations(env, operations, fp_format=0b10, round_mode=0):
+    """以流水线方式每周期发射一个操作，返回与输入一一对应的结果
+
+    与api_VectorFloatAdder_basic_operation每次操作约11个周期不同，本API保持fire=1
+    连续发射，监视端按env.latency中标定的延迟收集结果，整体开销约为
+    len(operations) + latency 个周期。
+
+    Args:
+        env: VectorFloatAdderEnv实例，必须是已初始化的Env实例
+        operations (iterable): 操作序列，每个元素为
+            (op_code, fp_a, fp_b) 或 (op_code, fp_a, fp_b, fp_format, round_mode)
+        fp_format (int, optional): 三元组操作使用的浮点格式，1=f16, 2=f32, 3=f64，默认0b10
+        round_mode (int, optional): 三元组操作使用的舍入模式，默认为0(RNE)
+
+    Returns:
+        list: 按发射顺序排列的事务记录(dict)，包含tag、op_code、fp_a、fp_b、fp_format、
+              round_mode、fp_result、fflags、issue_cycle、complete_cycle
+
+    Example:
+        >>> ops = [(0b00000, 0x4000000000000000, 0x4008000000000000, 0b11, 0)] * 1000
+        >>> records = api_VectorFloatAdder_stream_operations(env, ops)
+        >>> records[0]['fp_result']
+        4617315517961601024
+
+    Note:
+        - 相邻操作的格式延迟不同时，如出现完成周期冲突会抛出RuntimeError
+        - 首次使用新格式前可调用env.calibrate_latency(fp_format)重新标定延迟
+    """
+    stream = VectorFloatAdderStream(env)
+    for op in operations:
+        if len(op) == 3:
+            stream.issue(op[0], op[1], op[2], fp_format, round_mode)
+        else:
+            stream.issue(*op)
+    return stream.drain()
+
+
 # 本文件为模板，请根据需要修改，删除不需要的代码和注释
\ No newline at end of file
@@ -507,4 +507,4 @@ def get_coverage_groups(dut):
     if dut is not None:
         init_function_coverage(dut, coverage_groups)
     
-    return coverage_groups
\ No newline at end of file
+    return coverage_groups
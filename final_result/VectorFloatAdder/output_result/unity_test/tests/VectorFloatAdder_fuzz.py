@@ -0,0 +1,407 @@
+#coding=utf-8
+"""
+VectorFloatAdder覆盖率引导的模糊测试
+
+加权随机激励（VectorFloatAdder_stimulus）按声明的分布抽样，不看DUT的反馈，远/近路径切换处的舍入、
+归约与fclass的边界类别这类稀有组合只能靠概率撞上。VectorFloatAdderFuzzer以“操作序列”为一个输入，
+每轮从语料中挑一个输入做按字段的变异，执行后读回本轮的覆盖，产生新覆盖的输入加入语料并写入磁盘，
+下次运行继续使用：
+
+    make fuzz DUT=VectorFloatAdder FUZZ_ITERS=5000     # 语料保存在reports/VectorFloatAdder_corpus
+
+    result = api_VectorFloatAdder_fuzz(env, iterations=2000, corpus_dir="reports/VectorFloatAdder_corpus")
+    assert not result['mismatches']
+
+- 输入：操作列表，每个操作包含op_code/fp_a/fp_b/fp_format/round_mode以及gap（发射前拉低io_fire
+  的气泡周期数，流水寄存器由io_fire使能，气泡周期内流水线保持不动）
+- 变异：按字段进行，op_code（ALL_OPS）/fp_format/round_mode重新选取，fp_a/fp_b按当前格式选一个通道
+  改为某个数值类别（float_lanes）、翻转一位、指数加减、符号取反或尾数置为边界值，整向量复制同一
+  通道，gap重新选取，以及插入（由VectorFloatAdderStimulus生成）、删除、复制、交换操作和与另一语料拼接
+- 反馈：Verilator的行/翻转覆盖计数只在Finish时写出，无法逐个输入读回，因此每个周期直接读回
+  观测信号：io_fp_result/io_fflags的逐位翻转（0->1、1->0）、各子加法器io_fflags的取值，以及功能
+  覆盖组中新命中的bin；每个操作完成时再记录(op_code, fp_format, round_mode, 逐通道fflags)，fclass
+  操作另记录逐通道的分类结果。内部信号按层次名经GetInternalSignal绑定（picker以--rw导出，
+  build_cache默认如此），当前构建中不存在的信号自动跳过
+- 每个输入执行前恢复复位后快照（VectorFloatAdder_snapshot），不支持快照时退化为env.reset()
+- 每个输入的结果都与参考模型比对，不一致的输入写入语料目录下的crashes/
+"""
+
+import glob
+import hashlib
+import json
+import os
+import random
+
+import numpy as np
+
+from VectorFloatAdder_api import VectorFloatAdderStream
+from VectorFloatAdder_bulk import unpack_fflags, unpack_lanes
+from VectorFloatAdder_probe import bind_signal
+from VectorFloatAdder_ref import FORMAT_FIELDS, ref_VectorFloatAdder_check
+from VectorFloatAdder_snapshot import VectorFloatAdderResetSnapshot
+from VectorFloatAdder_stimulus import ALL_OPS, VALUE_CLASSES, VectorFloatAdderStimulus, float_lanes
+
+
+FUZZ_CORPUS_DIR = os.environ.get("DUT_FUZZ_CORPUS") or None
+FUZZ_ITERATIONS = int(os.environ.get("DUT_FUZZ_ITERS", "200"))
+
+# 逐位统计翻转的引脚
+TOGGLE_PINS = ["io_fp_result", "io_fflags"]
+
+# 按取值统计的内部信号分组（层次名相对DUT顶层，由VectorFloatAdder_probe.bind_signal绑定），
+# 每组各信号的取值合成一个特征
+INTERNAL_SIGNALS = {
+    inst: [f"{inst}.io_fflags"]
+    for inst in ("U_F32_Mixed_0", "U_F32_Mixed_1", "U_F64_Widen_0", "U_F16_1", "U_F16_3")
+}
+
+# 单个输入的操作数上限与气泡周期的取值范围
+MAX_OPS = 16
+MAX_GAP = 4
+
+FORMATS = (0b01, 0b10, 0b11)
+ROUND_MODES = tuple(range(5))
+
+# fclass操作码，其结果按通道记录分类
+OP_FCLASS = 0b01111
+
+
+class VectorFloatAdderFuzzStream(VectorFloatAdderStream):
+    """带气泡的流式发射引擎
+
+    在VectorFloatAdderStream之上，每个操作发射前可拉低io_fire若干周期。流水寄存器都由io_fire使能，
+    气泡周期内流水线保持不动，因此气泡不计入cycle，在途事务的到期周期不变；格式切换导致完成周期冲突时
+    先发射重复气泡排空在途事务，而不是抛出异常。每个周期结束时调用observer。
+    """
+
+    def __init__(self, env, observer=None):
+        super().__init__(env)
+        self.observer = observer
+
+    def issue(self, op_code, fp_a, fp_b, fp_format=0b10, round_mode=0, gap=0):
+        """先发射gap个气泡周期，再在当前周期发射一个操作
+
+        Returns:
+            int: 该事务的tag
+        """
+        io = self.env.io
+        if self.inflight and self.cycle + self.env.latency[fp_format] <= self.inflight[-1]['due']:
+            io.fire.value = 1
+            while self.inflight:
+                self._step()
+        io.fire.value = 0
+        for _ in range(gap):
+            self.env.Step(1)
+            if self.observer is not None:
+                self.observer()
+        return super().issue(op_code, fp_a, fp_b, fp_format, round_mode)
+
+    def _step(self):
+        super()._step()
+        if self.observer is not None:
+            self.observer()
+
+
+class VectorFloatAdderCoverageObserver:
+    """逐周期读回观测信号，汇总为一个输入的覆盖特征
+
+    Attributes:
+        internal (dict): 成功绑定的内部信号{分组: [(名字, XData)]}
+    """
+
+    def __init__(self, env, internal_signals=None):
+        self.env = env
+        dut = env.dut
+        self.toggle = {name: getattr(dut, name) for name in TOGGLE_PINS}
+        self.internal = {}
+        for group, names in (INTERNAL_SIGNALS if internal_signals is None else internal_signals).items():
+            bound = [(name, bind_signal(dut, name)) for name in names]
+            bound = [(name, signal) for name, signal in bound if signal is not None]
+            if bound:
+                self.internal[group] = bound
+        self.groups = getattr(dut, "fc_cover", {})
+        self.begin()
+
+    def begin(self):
+        """开始记录一个新输入"""
+        self.prev = {name: pin.value for name, pin in self.toggle.items()}
+        self.rise = dict.fromkeys(self.toggle, 0)
+        self.fall = dict.fromkeys(self.toggle, 0)
+        self.values = set()
+        self.hints = self._hints()
+
+    def _hints(self):
+        return {(group_name, point_name, b): hints
+                for group_name, group in self.groups.items()
+                for point_name, point in group.cov_points.items()
+                for b, hints in point["hints"].items()}
+
+    def __call__(self):
+        """采样一个周期"""
+        for name, pin in self.toggle.items():
+            value, prev = pin.value, self.prev[name]
+            self.rise[name] |= value & ~prev
+            self.fall[name] |= prev & ~value
+            self.prev[name] = value
+        for group, signals in self.internal.items():
+            self.values.add(("V", group) + tuple(signal.value for _, signal in signals))
+
+    def features(self):
+        """本输入的覆盖特征集合，功能覆盖组中本输入期间命中次数增加的bin也计入"""
+        result = set(self.values)
+        for name in self.toggle:
+            result.update(("T", name, bit, 1) for bit in _set_bits(self.rise[name]))
+            result.update(("T", name, bit, 0) for bit in _set_bits(self.fall[name]))
+        result.update(("F",) + key for key, hints in self._hints().items() if hints > self.hints.get(key, 0))
+        return result
+
+
+def _set_bits(value):
+    bit = 0
+    while value:
+        if value & 1:
+            yield bit
+        value >>= 1
+        bit += 1
+
+
+class VectorFloatAdderMutator:
+    """按字段变异操作序列
+
+    Args:
+        seed (int, optional): 随机种子，默认为0
+    """
+
+    def __init__(self, seed=0):
+        self.rng = random.Random(seed)
+        self.np_rng = np.random.default_rng(seed)
+        self.stimulus = VectorFloatAdderStimulus(seed=seed)
+
+    def fresh_ops(self, count):
+        """由激励库生成count个操作（默认分布，无气泡）"""
+        return [{'op_code': op, 'fp_a': a, 'fp_b': b, 'fp_format': fmt, 'round_mode': rm, 'gap': 0}
+                for op, a, b, fmt, rm in self.stimulus.generate(count)]
+
+    def lane_value(self, fp_format, old):
+        """fp_format格式通道的变异值"""
+        rng = self.rng
+        width, exp_bits, man_bits = FORMAT_FIELDS[fp_format]
+        kind = rng.randrange(6)
+        if kind <= 1:
+            bits, _ = float_lanes(self.np_rng, {rng.choice(VALUE_CLASSES): 1}, 1, fp_format)
+            return int(bits[0])
+        if kind == 2:
+            return old ^ (1 << rng.randrange(width))
+        if kind == 3:
+            exp_max = (1 << exp_bits) - 1
+            exponent = min(max(((old >> man_bits) & exp_max) + rng.choice([-3, -2, -1, 1, 2, 3]), 0), exp_max)
+            return (old & ~(exp_max << man_bits)) | (exponent << man_bits)
+        if kind == 4:
+            return old ^ (1 << (width - 1))
+        man_mask = (1 << man_bits) - 1
+        return (old & ~man_mask) | rng.choice([0, 1, man_mask, 1 << (man_bits - 1), man_mask >> 1])
+
+    def mutate_lane(self, op, field):
+        width = FORMAT_FIELDS[op['fp_format']][0]
+        shift = self.rng.randrange(64 // width) * width
+        old = (op[field] >> shift) & ((1 << width) - 1)
+        new = self.lane_value(op['fp_format'], old)
+        op[field] = (op[field] & ~(((1 << width) - 1) << shift)) | (new << shift)
+
+    def splat_lane(self, op, field):
+        width = FORMAT_FIELDS[op['fp_format']][0]
+        lanes = 64 // width
+        value = (op[field] >> (self.rng.randrange(lanes) * width)) & ((1 << width) - 1)
+        op[field] = sum(value << (i * width) for i in range(lanes))
+
+    def mutate(self, ops, corpus=()):
+        """对ops做1~4次随机变异，返回新的操作列表（不修改ops）
+
+        Args:
+            ops (list): 操作序列
+            corpus (list, optional): 供拼接的其他语料
+
+        Returns:
+            list: 变异后的操作序列
+        """
+        rng = self.rng
+        ops = [dict(op) for op in ops] or self.fresh_ops(1)
+        for _ in range(rng.randint(1, 4)):
+            op = rng.choice(ops)
+            kind = rng.randrange(11)
+            if kind == 0:
+                op['op_code'] = rng.choice(ALL_OPS)
+            elif kind == 1:
+                op['fp_format'] = rng.choice(FORMATS)
+            elif kind == 2:
+                op['round_mode'] = rng.choice(ROUND_MODES)
+            elif kind in (3, 4):
+                self.mutate_lane(op, rng.choice(['fp_a', 'fp_b']))
+            elif kind == 5:
+                self.splat_lane(op, rng.choice(['fp_a', 'fp_b']))
+            elif kind == 6:
+                op['gap'] = rng.randint(0, MAX_GAP)
+            elif kind == 7 and len(ops) < MAX_OPS:
+                ops.insert(rng.randrange(len(ops) + 1), rng.choice([self.fresh_ops(1)[0], dict(op)]))
+            elif kind == 8 and len(ops) > 1:
+                i, j = rng.randrange(len(ops)), rng.randrange(len(ops))
+                if rng.random() < 0.5:
+                    del ops[i]
+                else:
+                    ops[i], ops[j] = ops[j], ops[i]
+            elif kind == 9 and corpus:
+                other = rng.choice(corpus)
+                ops = ops[:rng.randint(1, len(ops))] + [dict(o) for o in other[rng.randrange(len(other)):]]
+            elif kind == 10:
+                # 两个操作数取相同或仅符号相反的值，制造相消与比较相等
+                op['fp_b'] = op['fp_a'] ^ (rng.getrandbits(1) << (FORMAT_FIELDS[op['fp_format']][0] - 1))
+        return ops[:MAX_OPS]
+
+
+class VectorFloatAdderFuzzer:
+    """覆盖率引导的模糊测试
+
+    Args:
+        env: VectorFloatAdderEnv实例
+        corpus_dir (str, optional): 语料目录，已有语料在构造时载入并重新执行，默认只保存在内存中
+        seed (int, optional): 随机种子，默认为0
+
+    Attributes:
+        corpus (list): 语料中的操作序列
+        seen (set): 已覆盖的特征
+        mismatches (list): 与参考模型不一致的记录
+        executions (int): 已执行的输入数
+    """
+
+    def __init__(self, env, corpus_dir=None, seed=0):
+        self.env = env
+        self.corpus_dir = corpus_dir
+        self.mutator = VectorFloatAdderMutator(seed)
+        self.snapshot = VectorFloatAdderResetSnapshot(env)
+        self.observer = VectorFloatAdderCoverageObserver(env)
+        self.corpus = []
+        self.favored = {}   # 特征 -> 覆盖它的最短语料下标
+        self.seen = set()
+        self.mismatches = []
+        self.executions = 0
+        if corpus_dir:
+            os.makedirs(os.path.join(corpus_dir, "crashes"), exist_ok=True)
+            for path in sorted(glob.glob(os.path.join(corpus_dir, "*.json"))):
+                with open(path, encoding="utf-8") as f:
+                    self.add(json.load(f)["ops"], save=False)
+
+    def execute(self, ops):
+        """从快照开始执行一个输入
+
+        Returns:
+            tuple: (覆盖特征集合, 不一致记录列表)
+        """
+        self.snapshot.restore()
+        self.observer.begin()
+        stream = VectorFloatAdderFuzzStream(self.env, observer=self.observer)
+        for op in ops:
+            stream.issue(op['op_code'], op['fp_a'], op['fp_b'], op['fp_format'], op['round_mode'], gap=op.get('gap', 0))
+        records = stream.drain()
+        self.executions += 1
+        features = self.observer.features()
+        for rec in records:
+            flags = unpack_fflags([rec['fflags']], rec['fp_format']).tolist()
+            features.add(("X", rec['op_code'], rec['fp_format'], rec['round_mode'], tuple(flags)))
+            if rec['op_code'] == OP_FCLASS:
+                features.add(("C", rec['fp_format'], tuple(unpack_lanes([rec['fp_result']], rec['fp_format']).tolist())))
+        return features, ref_VectorFloatAdder_check(records)
+
+    def add(self, ops, save=True):
+        """执行ops，产生新覆盖时加入语料
+
+        Returns:
+            int: 新覆盖的特征数
+        """
+        features, mismatches = self.execute(ops)
+        if mismatches:
+            self.mismatches.extend(mismatches)
+            self._save(ops, os.path.join("crashes", _digest(ops)), len(mismatches))
+        new = features - self.seen
+        if not new:
+            return 0
+        self.seen |= new
+        index = len(self.corpus)
+        self.corpus.append(ops)
+        for feature in features:
+            best = self.favored.get(feature)
+            if best is None or len(ops) < len(self.corpus[best]):
+                self.favored[feature] = index
+        if save:
+            self._save(ops, _digest(ops), len(new))
+        return len(new)
+
+    def _save(self, ops, name, count):
+        if not self.corpus_dir:
+            return
+        with open(os.path.join(self.corpus_dir, name + ".json"), "w", encoding="utf-8") as f:
+            json.dump({"ops": ops, "new": count}, f)
+
+    def pick(self):
+        """挑选待变异的语料：九成取某个特征的最短覆盖输入"""
+        rng = self.mutator.rng
+        if self.favored and rng.random() < 0.9:
+            return self.corpus[rng.choice(sorted(set(self.favored.values())))]
+        return rng.choice(self.corpus)
+
+    def fuzz(self, iterations):
+        """运行iterations轮变异
+
+        Returns:
+            list: 每轮结束时的特征总数
+        """
+        if not self.corpus:
+            self.add(self.mutator.fresh_ops(4))
+        history = []
+        for _ in range(iterations):
+            self.add(self.mutator.mutate(self.pick(), self.corpus))
+            history.append(len(self.seen))
+        return history
+
+    def close(self):
+        self.snapshot.close()
+
+
+def _digest(ops):
+    return hashlib.sha1(json.dumps(ops, sort_keys=True).encode()).hexdigest()[:16]
+
+
+def api_VectorFloatAdder_fuzz(env, iterations=FUZZ_ITERATIONS, corpus_dir=FUZZ_CORPUS_DIR, seed=0):
+    """运行一次覆盖率引导的模糊测试
+
+    Args:
+        env: VectorFloatAdderEnv实例，必须是已初始化的Env实例
+        iterations (int, optional): 变异轮数，默认取环境变量DUT_FUZZ_ITERS（200）
+        corpus_dir (str, optional): 语料目录，默认取环境变量DUT_FUZZ_CORPUS，未设置时不落盘
+        seed (int, optional): 随机种子，默认为0
+
+    Returns:
+        dict: 模糊测试结果
+            - executions (int): 执行的输入数（含载入语料时的重新执行）
+            - corpus (int): 语料大小
+            - features (int): 覆盖的特征数
+            - internal (list): 成功绑定的内部信号
+            - history (list): 每轮结束时的特征总数
+            - mismatches (list): 与参考模型不一致的记录
+
+    Example:
+        >>> res = api_VectorFloatAdder_fuzz(env, iterations=500, corpus_dir="reports/VectorFloatAdder_corpus")
+        >>> print(res['corpus'], res['features'])
+    """
+    fuzzer = VectorFloatAdderFuzzer(env, corpus_dir, seed)
+    try:
+        history = fuzzer.fuzz(iterations)
+    finally:
+        fuzzer.close()
+    return {
+        'executions': fuzzer.executions,
+        'corpus': len(fuzzer.corpus),
+        'features': len(fuzzer.seen),
+        'internal': [name for signals in fuzzer.observer.internal.values() for name, _ in signals],
+        'history': history,
+        'mismatches': fuzzer.mismatches,
+    }
@@ -0,0 +1,192 @@
+#coding=utf-8
+"""
+VectorFloatAdder DUT实例池
+
+dut fixture默认为每个用例新建DUT（DUTVectorFloatAdder()、SetCoverage、SetWaveform、InitClock，结束时Finish），
+构造一次约2秒，远超大多数短用例本身的仿真时间。设置环境变量DUT_POOL=1后，dut fixture改为从实例池
+（每个进程/xdist worker一个）取出已构造好的DUT：
+
+    DUT_POOL=1 pytest -n 8
+    make unity_test DUT=VectorFloatAdder POOL=1
+
+- 取出前清零全部输入并复位，再以全零操作数拉高io_fire冲刷流水线（流水级寄存器由io_fire使能，
+  复位不会清除；DUT以--savable编译时改为恢复冲刷后的快照，见VectorFloatAdder_snapshot），
+  然后检查输出是否与新建实例冲刷后一致（状态卫生检查），不一致的实例立即退役，改为新建
+- 功能覆盖组和采样器仍按用例新建，经实例上常驻的StepRis回调转发，覆盖率按用例提交
+- 代码行覆盖率只在Finish时写出，累计实例新建以来的全部命中（Picker不提供在运行中导出或清零覆盖计数
+  的接口），因此由DUT_POOL_LINE_COV决定归还时如何轮换覆盖率文件：
+  - test（默认）：用例归还时实例即退役，写出只属于该用例的.dat并登记归属，下一个用例取出新建的实例。
+    代码行覆盖率按用例归属，line_cov_index/regress_min/impact_select照常可用，但实例不跨用例复用
+  - summary：实例跨用例复用，一个.dat累计它服务的全部用例，只由首个用例登记一次，计入报告的汇总行
+    覆盖率；归属文件列出全部用例，line_cov_index拒绝导入，regress_min的--coverage-hits也拒绝记录
+- 实例服务DUT_POOL_MAX_USES个用例后退役，限制单个.dat和波形文件的规模
+- 波形按实例而非按用例生成，需要逐用例波形时不要开启池模式
+"""
+
+import os
+
+from line_cov_index import write_owner
+from VectorFloatAdder_api import create_dut, get_coverage_data_path
+from VectorFloatAdder_snapshot import VectorFloatAdderResetSnapshot
+
+
+POOL_ENABLED = os.environ.get("DUT_POOL", "0") not in ("", "0")
+POOL_MAX_USES = int(os.environ.get("DUT_POOL_MAX_USES", "100"))
+POOL_LINE_COV = os.environ.get("DUT_POOL_LINE_COV", "test")
+
+# 复位前清零的输入引脚
+INPUT_PINS = ["io_fire", "io_fp_a", "io_fp_b", "io_widen_a", "io_widen_b", "io_frs1", "io_is_frs1",
+              "io_mask", "io_uop_idx", "io_is_vec", "io_round_mode", "io_fp_format",
+              "io_opb_widening", "io_res_widening", "io_op_code", "io_fp_aIsFpCanonicalNAN",
+              "io_fp_bIsFpCanonicalNAN", "io_maskForReduction", "io_is_vfwredosum", "io_is_fold",
+              "io_vs2_fold"]
+
+# 流水线冲刷周期数，大于流水线延迟
+FLUSH_CYCLES = 5
+
+# 状态卫生检查的引脚：冲刷后全部输出应与新建实例一致
+HYGIENE_PINS = ["io_fp_result", "io_fflags"]
+
+
+def scrub(dut):
+    """清零全部输入、复位并冲刷流水线，使DUT回到与新建实例相同的状态"""
+    for name in INPUT_PINS:
+        getattr(dut, name).value = 0
+    dut.reset.value = 1
+    dut.Step(2)
+    dut.reset.value = 0
+    dut.io_fire.value = 1
+    dut.Step(FLUSH_CYCLES)
+    dut.io_fire.value = 0
+    dut.Step(1)
+
+
+def hygiene_signature(dut):
+    """状态卫生检查所比较的引脚取值"""
+    return tuple(getattr(dut, name).value for name in HYGIENE_PINS)
+
+
+class PooledDUT:
+    """池中的一个DUT实例
+
+    Attributes:
+        dut: DUT实例（已InitClock）
+        datfile (str): 代码行覆盖率文件，以新建实例时的用例命名，退役时写出
+        uses (int): 已服务的用例数
+        tests (list): 已服务用例的nodeid，退役时写入.dat的归属文件
+        sampler (callable): 当前用例的覆盖率采样器，空闲时为None
+        recorder (callable): 当前用例的波形窗口记录器（DUT_WAVEFORM=window），空闲时为None
+        signature (tuple): 新建并复位后的HYGIENE_PINS取值
+        snapshot (VectorFloatAdderResetSnapshot): 新建并冲刷后的状态快照，DUT不支持快照时restore()执行scrub
+    """
+
+    def __init__(self, dut, datfile):
+        self.dut = dut
+        self.datfile = datfile
+        self.uses = 0
+        self.tests = []
+        self.sampler = None
+        self.recorder = None
+        scrub(dut)
+        self.signature = hygiene_signature(dut)
+        self.snapshot = VectorFloatAdderResetSnapshot(self)
+        # StepRis回调只能追加，因此只注册一次，由它转发给当前用例的采样器和记录器
+        dut.StepRis(self._sample)
+
+    def reset(self):
+        """快照不可用时的复位方式"""
+        scrub(self.dut)
+
+    def _sample(self, cycle=None):
+        if self.sampler is not None:
+            self.sampler(cycle)
+        if self.recorder is not None:
+            self.recorder(cycle)
+
+
+class VectorFloatAdderDUTPool:
+    """VectorFloatAdder DUT实例池，dut fixture在DUT_POOL=1时通过conftest中的dut_pool fixture使用
+
+    Attributes:
+        max_uses (int): 单个实例最多服务的用例数
+        line_cov (str): 代码行覆盖率的轮换方式，test为每个用例归还时退役，summary为跨用例累计
+        idle (list): 空闲的PooledDUT
+        stats (dict): created新建数、reused复用数、dirty卫生检查失败退役数、recycled用满退役数、
+            rotated按用例轮换覆盖率退役数
+
+    Example:
+        >>> pool = VectorFloatAdderDUTPool()
+        >>> slot = pool.acquire(request)
+        >>> env = VectorFloatAdderEnv(slot.dut)
+        >>> env.reset()
+        >>> pool.release(slot)
+        >>> pool.close()
+    """
+
+    def __init__(self, max_uses=POOL_MAX_USES, line_cov=POOL_LINE_COV):
+        if line_cov not in ("test", "summary"):
+            raise ValueError(f"DUT_POOL_LINE_COV应为test或summary: {line_cov}")
+        self.max_uses = max_uses
+        self.line_cov = line_cov
+        self.idle = []
+        self.stats = {"created": 0, "reused": 0, "dirty": 0, "recycled": 0, "rotated": 0}
+
+    def _create(self, request):
+        dut = create_dut(request)
+        dut.InitClock("clock")
+        self.stats["created"] += 1
+        return PooledDUT(dut, get_coverage_data_path(request, new_path=False))
+
+    def acquire(self, request):
+        """取出一个已复位并通过状态卫生检查的实例，没有可用实例时新建
+
+        Args:
+            request: pytest request，新建实例时用于生成覆盖率和波形文件名
+
+        Returns:
+            PooledDUT: 实例，uses已加1
+        """
+        while self.idle:
+            slot = self.idle.pop()
+            slot.snapshot.restore()
+            if hygiene_signature(slot.dut) == slot.signature:
+                self.stats["reused"] += 1
+                break
+            self.stats["dirty"] += 1
+            self._retire(slot)
+        else:
+            slot = self._create(request)
+        slot.uses += 1
+        if request is not None:
+            slot.tests.append(request.node.nodeid)
+        return slot
+
+    def release(self, slot):
+        """用例结束后归还实例
+
+        line_cov为test时实例退役，写出只属于该用例的代码行覆盖率；否则服务满max_uses个用例的实例退役，
+        其余放回空闲列表
+        """
+        slot.sampler = None
+        slot.recorder = None
+        if self.line_cov == "test":
+            self.stats["rotated"] += 1
+            self._retire(slot)
+        elif slot.uses >= self.max_uses:
+            self.stats["recycled"] += 1
+            self._retire(slot)
+        else:
+            self.idle.append(slot)
+
+    def _retire(self, slot):
+        slot.sampler = None
+        slot.recorder = None
+        slot.snapshot.close()
+        slot.dut.Finish()  # 写出代码行覆盖率和波形
+        if slot.tests:
+            write_owner(slot.datfile, slot.tests)
+
+    def close(self):
+        """退役全部空闲实例"""
+        while self.idle:
+            self._retire(self.idle.pop())
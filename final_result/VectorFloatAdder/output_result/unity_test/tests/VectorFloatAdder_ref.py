@@ -0,0 +1,444 @@
+#coding=utf-8
+"""
+VectorFloatAdder位精确NumPy参考模型
+
+以64位向量字为单位复现VectorFloatAdder的fp_result和20位fflags：每个字按fp_format
+拆为4×f16、2×f32或1×f64通道，逐通道计算后再按DUT的通道布局拼回（通道i的结果位于
+[w*i+w-1 : w*i]，fflags位于[5*i+4 : 5*i]，依次为NV、DZ、OF、UF、NX）。
+
+全部运算都用NumPy整型数组完成，不经过主机浮点单元，因此5种舍入模式、非规格化数、
+sNaN/qNaN和标志位都与RTL逐位一致，一次调用可以比对数百万个向量字。各操作码的语义以
+origin_file中的RTL为准：
+    - fadd/fsub及非屏蔽的fsum_ure/fsum_ore按IEEE-754单次舍入，UF采用舍入后检测
+      （加减法的非规格化结果必然精确，因此UF恒为0）
+    - NaN参与的加减法、inf-inf返回规范NaN，sNaN或inf-inf置NV
+    - fmin/fmax中-0 < +0，单个NaN返回另一操作数，仅sNaN置NV
+    - feq/fne仅sNaN置NV，flt/fle/fgt/fge任意NaN置NV，结果位于通道bit0
+    - fclass返回RISC-V 10位分类掩码；fmerge/fmove/fmv与符号注入不修改标志
+    - fltq/fleq/fminm/fmaxm与未定义操作码在RTL中没有实现，结果和标志均为0
+"""
+
+import numpy as np
+
+
+# fp_format编码 -> (元素位宽, 指数位数, 尾数位数)
+FORMAT_FIELDS = {0b01: (16, 5, 10), 0b10: (32, 8, 23), 0b11: (64, 11, 52)}
+
+# 各格式的规范NaN
+CANONICAL_NAN = {0b01: 0x7E00, 0b10: 0x7FC00000, 0b11: 0x7FF8000000000000}
+
+# 舍入模式编码
+RNE, RTZ, RDN, RUP, RMM = 0, 1, 2, 3, 4
+
+# 单个通道fflags的位定义
+NV, DZ, OF, UF, NX = 0x10, 0x08, 0x04, 0x02, 0x01
+
+# 归约类操作码
+_FSUM_URE, _FSUM_ORE = 0b11010, 0b10110
+_FMIN_RE, _FMAX_RE = 0b10100, 0b10101
+
+
+def _bit_length(x):
+    """非负int64数组的逐元素位长"""
+    x = x.copy()
+    length = np.zeros(x.shape, dtype=np.int64)
+    for shift in (32, 16, 8, 4, 2, 1):
+        big = x >= (np.int64(1) << shift)
+        length += big * shift
+        x = np.where(big, x >> shift, x)
+    return length + (x > 0)
+
+
+def _round_increment(sign, lsb, guard, sticky, round_mode):
+    """按舍入模式计算是否需要进位
+
+    Args:
+        sign (np.ndarray): 符号位（bool）
+        lsb (np.ndarray): 保留部分的最低位（bool）
+        guard (np.ndarray): 舍入位（bool）
+        sticky (np.ndarray): 舍入位以下是否非零（bool）
+        round_mode (np.ndarray): 逐元素舍入模式
+
+    Returns:
+        np.ndarray: bool数组，True表示保留部分加1
+    """
+    inexact = guard | sticky
+    return np.select(
+        [round_mode == RNE, round_mode == RTZ, round_mode == RDN, round_mode == RUP, round_mode == RMM],
+        [guard & (sticky | lsb), np.zeros_like(guard), inexact & sign, inexact & ~sign, guard],
+    )
+
+
+def round_pack(sign, exponent, sig, round_mode, fp_format):
+    """将带3位舍入扩展的有效数舍入并打包为目标格式
+
+    有效数sig的最高位应位于bit M+3（M为尾数位数，低3位为guard/round/sticky），
+    exponent为对应的偏置指数；非规格化结果以exponent == 1且sig最高位低于bit M+3表示。
+
+    Args:
+        sign (np.ndarray): 符号位（bool）
+        exponent (np.ndarray): int64偏置指数，至少为1
+        sig (np.ndarray): int64有效数（已规格化或非规格化）
+        round_mode (np.ndarray): 逐元素舍入模式
+        fp_format (int): 1=f16, 2=f32, 3=f64
+
+    Returns:
+        tuple: (bits, fflags)
+            - bits (np.ndarray): uint64结果位模式
+            - fflags (np.ndarray): uint8标志（OF/UF/NX）
+    """
+    width, exp_bits, man_bits = FORMAT_FIELDS[fp_format]
+    exp_max = (1 << exp_bits) - 1
+    hidden = np.int64(1) << man_bits
+
+    mant = sig >> 3
+    guard = ((sig >> 2) & 1).astype(bool)
+    sticky = (sig & 3) != 0
+    inexact = guard | sticky
+    mant = mant + _round_increment(sign, (mant & 1).astype(bool), guard, sticky, round_mode)
+    carry = mant >> (man_bits + 1)
+    mant = mant >> carry
+    exponent = exponent + carry
+    exp_field = np.where(mant >= hidden, exponent, 0)
+
+    # 舍入后检测下溢：按无界指数在精度M+1处舍入，结果仍小于最小规格化数才算tiny
+    subnormal = sig < (hidden << 3)
+    near_normal = subnormal & (sig >= (hidden << 2))
+    unbounded = (sig >> 2) + _round_increment(sign, ((sig >> 2) & 1).astype(bool), ((sig >> 1) & 1).astype(bool),
+                                              (sig & 1) != 0, round_mode)
+    tiny = subnormal & ~(near_normal & (unbounded >= (hidden << 1)))
+
+    overflow = exp_field >= exp_max
+    # 上溢时向零方向的舍入得到最大有限数，否则得到无穷大
+    to_max = (round_mode == RTZ) | ((round_mode == RDN) & ~sign) | ((round_mode == RUP) & sign)
+    max_finite = (np.uint64(exp_max - 1) << np.uint64(man_bits)) | np.uint64(hidden - 1)
+    infinity = np.uint64(exp_max) << np.uint64(man_bits)
+    bits = (exp_field.astype(np.uint64) << np.uint64(man_bits)) | (mant & (hidden - 1)).astype(np.uint64)
+    bits = np.where(overflow, np.where(to_max, max_finite, infinity), bits)
+    bits |= sign.astype(np.uint64) << np.uint64(width - 1)
+
+    fflags = (np.where(overflow, OF | NX, 0) | np.where(inexact, NX, 0) | np.where(tiny & inexact, UF, 0))
+    return bits, fflags.astype(np.uint8)
+
+
+class _Lanes:
+    """一组同格式通道位模式的字段分解"""
+
+    def __init__(self, bits, fp_format):
+        width, exp_bits, man_bits = FORMAT_FIELDS[fp_format]
+        self.bits = bits
+        self.sign = ((bits >> np.uint64(width - 1)) & np.uint64(1)).astype(bool)
+        self.exp = ((bits >> np.uint64(man_bits)) & np.uint64((1 << exp_bits) - 1)).astype(np.int64)
+        self.frac = (bits & np.uint64((1 << man_bits) - 1)).astype(np.int64)
+        self.mag = (bits & np.uint64((1 << (width - 1)) - 1)).astype(np.int64)
+        exp_ones = self.exp == (1 << exp_bits) - 1
+        self.is_nan = exp_ones & (self.frac != 0)
+        self.is_snan = self.is_nan & ((self.frac >> (man_bits - 1)) & 1 == 0)
+        self.is_inf = exp_ones & (self.frac == 0)
+        self.is_zero = self.mag == 0
+        self.is_subnormal = (self.exp == 0) & (self.frac != 0)
+        self.is_normal = (self.exp != 0) & ~exp_ones
+        # 全序比较键：+0与-0相等，负数按幅值取反
+        self.key = np.where(self.sign, -self.mag, self.mag)
+
+
+def _add_lanes(a, b, is_sub, round_mode, fp_format):
+    """加减法通道，返回(bits, fflags)"""
+    width, exp_bits, man_bits = FORMAT_FIELDS[fp_format]
+    b_sign = b.sign ^ is_sub
+    eff_sub = a.sign ^ b_sign
+
+    # 幅值大的操作数记为x，小的记为y
+    swap = b.mag > a.mag
+    x_sign = np.where(swap, b_sign, a.sign)
+    x_exp = np.where(swap, b.exp, a.exp)
+    y_exp = np.where(swap, a.exp, b.exp)
+    x_sig = np.where(swap, b.frac, a.frac) | ((x_exp != 0).astype(np.int64) << man_bits)
+    y_sig = np.where(swap, a.frac, b.frac) | ((y_exp != 0).astype(np.int64) << man_bits)
+    x_exp = np.maximum(x_exp, 1)
+    y_exp = np.maximum(y_exp, 1)
+
+    # 对阶：y右移，移出的位并入sticky
+    shift = np.minimum(x_exp - y_exp, man_bits + 5)
+    y_sig = y_sig << 3
+    sticky = (y_sig & ((np.int64(1) << shift) - 1)) != 0
+    y_sig = (y_sig >> shift) | sticky
+    x_sig = x_sig << 3
+    sig = np.where(eff_sub, x_sig - y_sig, x_sig + y_sig)
+
+    # 进位右移一位，借位左移规格化（不低于最小指数）
+    carry = sig >> (man_bits + 4)
+    sig = (sig >> carry) | (sig & carry)
+    exponent = x_exp + carry
+    lead = (man_bits + 4) - _bit_length(sig)
+    lshift = np.clip(np.minimum(lead, exponent - 1), 0, None)
+    sig = sig << lshift
+    exponent = exponent - lshift
+
+    bits, fflags = round_pack(x_sign, exponent, sig, round_mode, fp_format)
+
+    # 精确零：异号相消时RDN得-0、其余得+0；同号零保持符号
+    zero_sign = np.where(eff_sub, round_mode == RDN, x_sign)
+    bits = np.where(sig == 0, zero_sign.astype(np.uint64) << np.uint64(width - 1), bits)
+
+    # 特殊值覆盖普通路径
+    inf_sub = a.is_inf & b.is_inf & eff_sub
+    invalid = a.is_nan | b.is_nan | inf_sub
+    inf_sign = np.where(a.is_inf, a.sign, b_sign)
+    infinity = (inf_sign.astype(np.uint64) << np.uint64(width - 1)) | (np.uint64((1 << exp_bits) - 1) << np.uint64(man_bits))
+    special = invalid | a.is_inf | b.is_inf
+    bits = np.where(invalid, np.uint64(CANONICAL_NAN[fp_format]), np.where(special, infinity, bits))
+    fflags = np.where(a.is_snan | b.is_snan | inf_sub, NV, np.where(special, 0, fflags))
+    return bits, fflags.astype(np.uint8)
+
+
+def _minmax_lanes(a, b, is_max, fp_format):
+    """fmin/fmax通道结果，单个NaN返回另一操作数，两者均为NaN时返回规范NaN"""
+    both_zero = a.is_zero & b.is_zero
+    if is_max:
+        pick_b = (b.key > a.key) | (both_zero & ~b.sign)
+    else:
+        pick_b = (b.key < a.key) | (both_zero & b.sign)
+    result = np.where(pick_b, b.bits, a.bits)
+    result = np.where(a.is_nan, b.bits, np.where(b.is_nan, a.bits, result))
+    return np.where(a.is_nan & b.is_nan, np.uint64(CANONICAL_NAN[fp_format]), result)
+
+
+def _fclass_lanes(a):
+    """RISC-V fclass 10位分类掩码"""
+    classes = [
+        a.sign & a.is_inf, a.sign & a.is_normal, a.sign & a.is_subnormal, a.sign & a.is_zero,
+        ~a.sign & a.is_zero, ~a.sign & a.is_subnormal, ~a.sign & a.is_normal, ~a.sign & a.is_inf,
+        a.is_snan, a.is_nan & ~a.is_snan,
+    ]
+    result = np.zeros(a.bits.shape, dtype=np.uint64)
+    for bit, hit in enumerate(classes):
+        result |= hit.astype(np.uint64) << np.uint64(bit)
+    return result
+
+
+def _flags(nv):
+    """由NV条件生成通道标志"""
+    return np.where(nv, NV, 0).astype(np.uint8)
+
+
+def _sign_bit(fp_format):
+    return np.uint64(1) << np.uint64(FORMAT_FIELDS[fp_format][0] - 1)
+
+
+def _op_add(a, b, op, rm, mask, mfr, fp_format):
+    return _add_lanes(a, b, (op & 1).astype(bool), rm, fp_format)
+
+
+def _op_min(a, b, op, rm, mask, mfr, fp_format):
+    return _minmax_lanes(a, b, False, fp_format), _flags(a.is_snan | b.is_snan)
+
+
+def _op_max(a, b, op, rm, mask, mfr, fp_format):
+    return _minmax_lanes(a, b, True, fp_format), _flags(a.is_snan | b.is_snan)
+
+
+def _op_merge(a, b, op, rm, mask, mfr, fp_format):
+    return np.where(mask == 1, b.bits, a.bits), _flags(False)
+
+
+def _op_move(a, b, op, rm, mask, mfr, fp_format):
+    return b.bits, _flags(False)
+
+
+def _op_sign_inject(a, b, op, rm, mask, mfr, fp_format):
+    sign_bit = _sign_bit(fp_format)
+    sign = np.select([op == 0b00110, op == 0b00111], [b.bits, ~b.bits], a.bits ^ b.bits) & sign_bit
+    return sign | (a.bits & ~sign_bit), _flags(False)
+
+
+def _op_compare(a, b, op, rm, mask, mfr, fp_format):
+    ordered = ~(a.is_nan | b.is_nan)
+    equal = ordered & (a.key == b.key)
+    result = np.select(
+        [op == 0b01001, op == 0b01010, op == 0b01011, op == 0b01100, op == 0b01101],
+        [equal, ~equal, a.key < b.key, a.key <= b.key, a.key > b.key],
+        a.key >= b.key,
+    )
+    # feq/fne为安静比较，仅sNaN置NV；其余为信号比较，任意NaN置NV
+    quiet = op <= 0b01010
+    result = np.where(quiet, result, ordered & result)
+    nv = np.where(quiet, a.is_snan | b.is_snan, ~ordered)
+    return result.astype(np.uint64), _flags(nv)
+
+
+def _op_fclass(a, b, op, rm, mask, mfr, fp_format):
+    return _fclass_lanes(a), _flags(False)
+
+
+def _op_fsum_ure(a, b, op, rm, mask, mfr, fp_format):
+    bits, fflags = _add_lanes(a, b, np.zeros(a.bits.shape, dtype=bool), rm, fp_format)
+    # 两侧都被屏蔽时返回带符号零（RDN为+0，其余为-0），只屏蔽一侧时返回未屏蔽的操作数
+    zero = np.where(rm != RDN, _sign_bit(fp_format), np.uint64(0))
+    one = np.where(mfr & 1 == 1, a.bits, b.bits)
+    bits = np.select([mfr == 3, mfr == 0], [bits, zero], one)
+    return bits, np.where(mfr == 3, fflags, 0).astype(np.uint8)
+
+
+def _op_fsum_ore(a, b, op, rm, mask, mfr, fp_format):
+    bits, fflags = _add_lanes(a, b, np.zeros(a.bits.shape, dtype=bool), rm, fp_format)
+    enabled = mfr & 1 == 1
+    return np.where(enabled, bits, b.bits), np.where(enabled, fflags, 0).astype(np.uint8)
+
+
+def _reduce_minmax(a, b, mfr, is_max, fp_format):
+    """fmin_re/fmax_re：两侧都被屏蔽时返回规范NaN，只屏蔽一侧时返回未屏蔽的操作数"""
+    one = np.where(mfr & 1 == 1, a.bits, b.bits)
+    value = _minmax_lanes(a, b, is_max, fp_format)
+    bits = np.select([mfr == 0, mfr == 3], [np.uint64(CANONICAL_NAN[fp_format]), value], one)
+    return bits, _flags(((mfr & 1 == 1) & a.is_snan) | ((mfr >> 1 == 1) & b.is_snan))
+
+
+def _op_fmin_re(a, b, op, rm, mask, mfr, fp_format):
+    return _reduce_minmax(a, b, mfr, False, fp_format)
+
+
+def _op_fmax_re(a, b, op, rm, mask, mfr, fp_format):
+    return _reduce_minmax(a, b, mfr, True, fp_format)
+
+
+# 操作码 -> 通道计算函数；未列出的操作码（含fltq/fleq/fminm/fmaxm/dummy）结果与标志均为0
+_LANE_OPS = {
+    0b00000: _op_add, 0b00001: _op_add,
+    0b00010: _op_min, 0b00011: _op_max,
+    0b00100: _op_merge,
+    0b00101: _op_move, 0b10001: _op_move, 0b10010: _op_move,
+    0b00110: _op_sign_inject, 0b00111: _op_sign_inject, 0b01000: _op_sign_inject,
+    0b01001: _op_compare, 0b01010: _op_compare, 0b01011: _op_compare,
+    0b01100: _op_compare, 0b01101: _op_compare, 0b01110: _op_compare,
+    0b01111: _op_fclass,
+    _FSUM_URE: _op_fsum_ure, _FSUM_ORE: _op_fsum_ore,
+    _FMIN_RE: _op_fmin_re, _FMAX_RE: _op_fmax_re,
+}
+
+
+def ref_VectorFloatAdder_lanes(op_code, fp_a, fp_b, fp_format, round_mode=0, mask=1, mask_for_reduction=0):
+    """逐通道参考模型
+
+    按操作码把通道分组，每组只计算本操作需要的字段，避免对全部通道求所有操作的结果。
+
+    Args:
+        op_code (array_like): 逐通道操作码
+        fp_a (array_like): 通道A的位模式（uint64，仅低w位有效）
+        fp_b (array_like): 通道B的位模式
+        fp_format (int): 1=f16, 2=f32, 3=f64，所有通道必须同格式
+        round_mode (array_like, optional): 逐通道舍入模式，默认为0(RNE)
+        mask (array_like, optional): 逐通道mask位，fmerge据此选择B，默认为1
+        mask_for_reduction (array_like, optional): 逐通道2位归约掩码{mfr[i+4], mfr[i]}，默认为0
+
+    Returns:
+        tuple: (bits, fflags)，uint64通道结果与uint8通道标志
+
+    Raises:
+        ValueError: 格式或舍入模式无效时抛出
+    """
+    if fp_format not in FORMAT_FIELDS:
+        raise ValueError(f"无效的fp_format: {fp_format}，应为1(f16)、2(f32)或3(f64)")
+    lane_mask = np.uint64((1 << FORMAT_FIELDS[fp_format][0]) - 1)
+    fp_a = np.asarray(fp_a, dtype=np.uint64) & lane_mask
+    fp_b = np.asarray(fp_b, dtype=np.uint64) & lane_mask
+    shape = np.broadcast_shapes(fp_a.shape, fp_b.shape, np.shape(op_code), np.shape(round_mode),
+                                np.shape(mask), np.shape(mask_for_reduction))
+    flat = lambda v, dtype: np.broadcast_to(np.asarray(v, dtype=dtype), shape).reshape(-1)
+    fp_a, fp_b = flat(fp_a, np.uint64), flat(fp_b, np.uint64)
+    op = flat(op_code, np.int64) & 0x1F
+    rm = flat(round_mode, np.int64)
+    mask = flat(mask, np.int64) & 1
+    mfr = flat(mask_for_reduction, np.int64) & 3
+    if ((rm < 0) | (rm > RMM)).any():
+        raise ValueError(f"无效的round_mode: {np.unique(rm[(rm < 0) | (rm > RMM)]).tolist()}，应为0~4")
+
+    bits = np.zeros(op.size, dtype=np.uint64)
+    fflags = np.zeros(op.size, dtype=np.uint8)
+    present = np.flatnonzero(np.bincount(op, minlength=32))
+    for code in present.tolist():
+        handler = _LANE_OPS.get(code)
+        if handler is None:
+            continue
+        index = np.flatnonzero(op == code) if present.size > 1 else slice(None)
+        a, b = _Lanes(fp_a[index], fp_format), _Lanes(fp_b[index], fp_format)
+        bits[index], fflags[index] = handler(a, b, op[index], rm[index], mask[index], mfr[index], fp_format)
+    return (bits & lane_mask).reshape(shape), fflags.reshape(shape)
+
+
+def ref_VectorFloatAdder_operations(op_code, fp_a, fp_b, fp_format=0b10, round_mode=0, mask=0xF, mask_for_reduction=0):
+    """向量字级参考模型，输入输出与DUT引脚一一对应
+
+    所有参数都可以是标量或等长数组；env驱动的mask=0xF、maskForReduction=0为默认值。
+    通道i使用mask[i]和{maskForReduction[i+4], maskForReduction[i]}。
+
+    Args:
+        op_code (int | array_like): 操作码
+        fp_a (int | array_like): 64位操作数A
+        fp_b (int | array_like): 64位操作数B
+        fp_format (int | array_like, optional): 1=f16, 2=f32, 3=f64，默认为2
+        round_mode (int | array_like, optional): 舍入模式，默认为0(RNE)
+        mask (int | array_like, optional): 4位通道掩码，默认为0xF
+        mask_for_reduction (int | array_like, optional): 8位归约掩码，默认为0
+
+    Returns:
+        tuple: (fp_result, fflags)，均为uint64数组
+
+    Raises:
+        ValueError: 格式或舍入模式无效时抛出
+
+    Example:
+        >>> res, flags = ref_VectorFloatAdder_operations(0b00000, 0x3C003C003C003C00, 0x4000400040004000, fp_format=1)
+        >>> hex(int(res[0]))
+        '0x4200420042004200'
+    """
+    arrays = [np.asarray(v).reshape(-1) for v in (op_code, fp_a, fp_b, fp_format, round_mode, mask, mask_for_reduction)]
+    count = max(v.size for v in arrays)
+    op_code, fp_a, fp_b, fp_format, round_mode, mask, mask_for_reduction = [
+        np.broadcast_to(v.astype(np.uint64 if i in (1, 2) else np.int64), (count,)) for i, v in enumerate(arrays)
+    ]
+    invalid = ~np.isin(fp_format, list(FORMAT_FIELDS))
+    if invalid.any():
+        raise ValueError(f"无效的fp_format: {np.unique(fp_format[invalid]).tolist()}，应为1(f16)、2(f32)或3(f64)")
+
+    fp_result = np.zeros(count, dtype=np.uint64)
+    fflags = np.zeros(count, dtype=np.uint64)
+    formats = np.unique(fp_format).tolist()
+    for fmt in formats:
+        index = np.flatnonzero(fp_format == fmt) if len(formats) > 1 else slice(None)
+        width = FORMAT_FIELDS[fmt][0]
+        lanes = 64 // width
+        lane_id = np.arange(lanes, dtype=np.int64)
+        shifts = lane_id.astype(np.uint64) * np.uint64(width)
+        lane_a = (fp_a[index, None] >> shifts) & np.uint64((1 << width) - 1)
+        lane_b = (fp_b[index, None] >> shifts) & np.uint64((1 << width) - 1)
+        lane_mask = (mask[index, None] >> lane_id) & 1
+        lane_mfr = ((mask_for_reduction[index, None] >> lane_id) & 1) | (((mask_for_reduction[index, None] >> (lane_id + 4)) & 1) << 1)
+        bits, flags = ref_VectorFloatAdder_lanes(op_code[index, None], lane_a, lane_b, fmt, round_mode[index, None],
+                                                 lane_mask, lane_mfr)
+        fp_result[index] = np.bitwise_or.reduce(bits << shifts, axis=1)
+        fflags[index] = np.bitwise_or.reduce(flags.astype(np.uint64) << (lane_id.astype(np.uint64) * np.uint64(5)), axis=1)
+    return fp_result, fflags
+
+
+def ref_VectorFloatAdder_check(records, mask=0xF, mask_for_reduction=0):
+    """用参考模型批量比对流式发射的记录
+
+    Args:
+        records (list): api_VectorFloatAdder_stream_operations返回的记录列表
+        mask (int, optional): 发射时的通道掩码，默认为0xF
+        mask_for_reduction (int, optional): 发射时的归约掩码，默认为0
+
+    Returns:
+        list: 不一致记录列表，每项在原记录上附加expect_result和expect_fflags
+    """
+    if not records:
+        return []
+    columns = {key: np.array([rec[key] for rec in records], dtype=np.uint64 if key.startswith("fp_") or key == "fflags" else np.int64)
+               for key in ("op_code", "fp_a", "fp_b", "fp_format", "round_mode", "fp_result", "fflags")}
+    expect_result, expect_fflags = ref_VectorFloatAdder_operations(
+        columns["op_code"], columns["fp_a"], columns["fp_b"], columns["fp_format"], columns["round_mode"],
+        mask, mask_for_reduction
+    )
+    bad = np.flatnonzero((expect_result != columns["fp_result"]) | (expect_fflags != columns["fflags"]))
+    return [dict(records[i], expect_result=int(expect_result[i]), expect_fflags=int(expect_fflags[i])) for i in bad.tolist()]
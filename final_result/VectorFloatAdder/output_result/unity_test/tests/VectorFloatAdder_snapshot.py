@@ -0,0 +1,99 @@
+#coding=utf-8
+"""
+VectorFloatAdder复位后状态快照
+
+VectorFloatAdderEnv.reset每次都要推进复位周期，而流水级寄存器由io_fire使能、复位不会清除，实例池还需要
+额外以io_fire冲刷流水线；模糊测试每轮输入也需要一个干净的初始状态。VectorFloatAdderResetSnapshot在复位
+（或冲刷）完成后把完整的仿真状态保存一次，之后每次restore()直接恢复（Verilator VerilatedRestore），
+连同流水级寄存器一起回到快照时刻，不推进任何周期，也不重建DUT：
+
+    make build_dut_cache SAVABLE=1    # 以Verilator --savable编译，DUT才支持CheckPoint/Restore
+
+    snapshot = VectorFloatAdderResetSnapshot(env)
+    for ops in corpus:
+        snapshot.restore()
+        api_VectorFloatAdder_stream_operations(env, ops)
+    snapshot.close()
+
+构造时先CheckPoint再Restore一次，由DUT自身的返回码判断是否支持快照：picker导出的CheckPoint/Restore
+成功时返回0，未以--savable编译时返回非0。DUT没有这两个方法、任一返回非0或抛出异常时supported为False，
+restore()退化为把输入引脚恢复为快照时的取值后执行env.reset()。恢复的是RTL状态：输入引脚重写为快照时的取值；
+Env的latency等标定结果、功能覆盖率计数、波形与StepRis回调不受影响。快照文件默认放在/dev/shm
+（不存在时为系统临时目录），可用环境变量DUT_SNAPSHOT_DIR覆盖。
+
+DUT_POOL=1时实例池同样使用快照：实例新建并冲刷后保存一次，之后每次取出时恢复快照而不是重新复位和冲刷。
+"""
+
+import os
+import tempfile
+
+
+SNAPSHOT_DIR = os.environ.get("DUT_SNAPSHOT_DIR", "/dev/shm" if os.path.isdir("/dev/shm") else None)
+
+# 恢复后重写的输入引脚
+INPUT_PINS = ["reset", "io_fire", "io_fp_a", "io_fp_b", "io_widen_a", "io_widen_b", "io_frs1", "io_is_frs1",
+              "io_mask", "io_uop_idx", "io_is_vec", "io_round_mode", "io_fp_format",
+              "io_opb_widening", "io_res_widening", "io_op_code", "io_fp_aIsFpCanonicalNAN",
+              "io_fp_bIsFpCanonicalNAN", "io_maskForReduction", "io_is_vfwredosum", "io_is_fold",
+              "io_vs2_fold"]
+
+
+class VectorFloatAdderResetSnapshot:
+    """复位后的仿真状态快照
+
+    Args:
+        env: 已复位的VectorFloatAdderEnv，或任何带dut属性与reset()方法的对象（如实例池中的PooledDUT）
+        directory (str, optional): 快照文件目录，默认为SNAPSHOT_DIR
+
+    Attributes:
+        supported (bool): DUT是否支持快照，False时restore()执行env.reset()
+        restores (int): 通过快照恢复的次数
+
+    Example:
+        >>> snapshot = VectorFloatAdderResetSnapshot(env)
+        >>> snapshot.restore()
+        True
+    """
+
+    def __init__(self, env, directory=None):
+        self.env = env
+        self.dut = env.dut
+        fd, self.path = tempfile.mkstemp(prefix="VectorFloatAdder-", suffix=".snapshot", dir=directory or SNAPSHOT_DIR)
+        os.close(fd)
+        self.inputs = {name: getattr(self.dut, name).value for name in INPUT_PINS}
+        self.restores = 0
+        self.supported = self._checkpoint()
+
+    def _checkpoint(self):
+        """保存快照并立即恢复一次，CheckPoint与Restore都返回0时DUT支持快照"""
+        checkpoint, restore = getattr(self.dut, "CheckPoint", None), getattr(self.dut, "Restore", None)
+        if checkpoint is None or restore is None:
+            return False
+        try:
+            return checkpoint(self.path) == 0 and restore(self.path) == 0
+        except Exception:
+            return False
+
+    def restore(self):
+        """恢复到快照时的状态
+
+        Returns:
+            bool: True表示从快照恢复，False表示DUT不支持快照、已执行env.reset()
+        """
+        if self.supported:
+            try:
+                self.supported = self.dut.Restore(self.path) == 0
+            except Exception:
+                self.supported = False
+        for name, value in self.inputs.items():
+            getattr(self.dut, name).value = value
+        if not self.supported:
+            self.env.reset()  # 先撤销输入，避免复位释放后接收残留的有效请求
+            return False
+        self.restores += 1
+        return True
+
+    def close(self):
+        """删除快照文件"""
+        if os.path.exists(self.path):
+            os.remove(self.path)
@@ -0,0 +1,229 @@
+#coding=utf-8
+"""
+VectorFloatAdder加权约束随机激励库
+
+随机回归以“数据”声明：每个字段给出{取值: 权重}分布，由VectorFloatAdderStimulus按种子
+向量化生成(op_code, fp_a, fp_b, fp_format, round_mode)五元组，可一次生成，也可按批次
+流式产出，直接交给api_VectorFloatAdder_stream_operations流水线发射。
+
+支持的字段（未给出的字段使用DEFAULT_SPEC）：
+    - op_code / fp_format / round_mode: {取值: 权重}
+    - fp_a / fp_b: 逐通道数值类别分布，类别见VALUE_CLASSES
+    - exp_diff: {d: 权重}，两个操作数都是规格化数时令fp_b指数 = fp_a指数 - d，
+      d取0/1可覆盖近路径相消，取大于尾数位宽的值可覆盖对阶移出
+    - lane_pattern: {'independent': 各通道独立, 'splat': 各通道相同, 'single': 只有一个通道
+      按分布取值、其余通道为规格化数}
+    - sign: 负数比例，默认为0.5
+
+Example:
+    >>> spec = {'op_code': {0b00000: 1, 0b00001: 1}, 'exp_diff': {0: 4, 1: 2, 30: 1}}
+    >>> result = api_VectorFloatAdder_run_campaign(env, spec, count=20000, seed=1)
+    >>> assert not result['mismatches']
+"""
+
+import numpy as np
+
+from VectorFloatAdder_api import api_VectorFloatAdder_stream_operations
+from VectorFloatAdder_ref import FORMAT_FIELDS, ref_VectorFloatAdder_check
+
+
+# 逐通道数值类别
+VALUE_CLASSES = ('zero', 'subnormal', 'min_normal', 'normal', 'near_one', 'huge', 'max_finite',
+                 'inf', 'qnan', 'snan')
+
+# 类别中属于有限规格化数、可以被exp_diff调整指数的部分
+_NORMAL_CLASSES = ('normal', 'near_one', 'huge')
+
+# 参考模型实现的全部操作码
+ALL_OPS = (0b00000, 0b00001, 0b00010, 0b00011, 0b00100, 0b00101, 0b00110, 0b00111, 0b01000,
+           0b01001, 0b01010, 0b01011, 0b01100, 0b01101, 0b01110, 0b01111, 0b10001, 0b10010,
+           0b10100, 0b10101, 0b10110, 0b11010)
+
+DEFAULT_SPEC = {
+    'op_code': {op: 1 for op in ALL_OPS},
+    'fp_format': {0b01: 1, 0b10: 1, 0b11: 1},
+    'round_mode': {0: 1, 1: 1, 2: 1, 3: 1, 4: 1},
+    'fp_a': {'normal': 6, 'near_one': 2, 'subnormal': 1, 'zero': 1, 'huge': 1, 'inf': 0.2, 'qnan': 0.2, 'snan': 0.2},
+    'fp_b': {'normal': 6, 'near_one': 2, 'subnormal': 1, 'zero': 1, 'huge': 1, 'inf': 0.2, 'qnan': 0.2, 'snan': 0.2},
+    'exp_diff': None,
+    'lane_pattern': {'independent': 8, 'splat': 1, 'single': 1},
+    'sign': 0.5,
+}
+
+
+def weighted_choice(rng, weights, size):
+    """按{取值: 权重}独立抽样
+
+    Args:
+        rng (np.random.Generator): 随机数发生器
+        weights (dict): {取值: 权重}，权重非负且和大于0
+        size (int): 抽样个数
+
+    Returns:
+        np.ndarray: 取值数组
+
+    Raises:
+        ValueError: 权重无效时抛出
+    """
+    keys = list(weights)
+    p = np.array([weights[k] for k in keys], dtype=float)
+    if not keys or (p < 0).any() or p.sum() <= 0:
+        raise ValueError(f"无效的权重分布: {weights}")
+    return np.asarray(keys)[rng.choice(len(keys), size=size, p=p / p.sum())]
+
+
+def float_lanes(rng, classes, count, fp_format, negative=0.5):
+    """按数值类别分布生成浮点通道位模式
+
+    Args:
+        rng (np.random.Generator): 随机数发生器
+        classes (dict): {类别: 权重}，类别见VALUE_CLASSES
+        count (int): 通道个数
+        fp_format (int): 0b01=f16, 0b10=f32, 0b11=f64
+        negative (float, optional): 负数比例，默认为0.5
+
+    Returns:
+        tuple: (位模式uint64数组, 类别数组)
+    """
+    unknown = set(classes) - set(VALUE_CLASSES)
+    if unknown:
+        raise ValueError(f"未知的数值类别: {sorted(unknown)}，可选: {VALUE_CLASSES}")
+    width, exp_bits, man_bits = FORMAT_FIELDS[fp_format]
+    exp_max = (1 << exp_bits) - 1
+    bias = exp_max >> 1
+    quiet = np.uint64(1 << (man_bits - 1))
+
+    kind = weighted_choice(rng, classes, count)
+    frac = rng.integers(0, 1 << man_bits, count, dtype=np.uint64)
+    exponent = np.select(
+        [kind == 'zero', kind == 'subnormal', kind == 'min_normal', kind == 'near_one', kind == 'huge',
+         kind == 'max_finite', np.isin(kind, ('inf', 'qnan', 'snan'))],
+        [0, 0, 1, rng.integers(bias - 2, bias + 3, count), rng.integers(exp_max - 3, exp_max, count),
+         exp_max - 1, exp_max],
+        rng.integers(1, exp_max, count),
+    ).astype(np.uint64)
+    frac = np.select(
+        [np.isin(kind, ('zero', 'min_normal', 'inf')), kind == 'subnormal', kind == 'max_finite',
+         kind == 'qnan', kind == 'snan'],
+        [np.uint64(0), np.maximum(frac, np.uint64(1)), np.uint64((1 << man_bits) - 1),
+         frac | quiet, np.maximum(frac & ~quiet, np.uint64(1))],
+        frac,
+    ).astype(np.uint64)
+    sign = (rng.random(count) < negative).astype(np.uint64)
+    return (sign << np.uint64(width - 1)) | (exponent << np.uint64(man_bits)) | frac, kind
+
+
+class VectorFloatAdderStimulus:
+    """可设定种子的加权约束随机激励发生器
+
+    Attributes:
+        spec (dict): 合并默认值后的分布声明
+        rng (np.random.Generator): 随机数发生器，连续调用generate/stream会继续同一随机序列
+    """
+
+    def __init__(self, spec=None, seed=0):
+        """
+        Args:
+            spec (dict, optional): 分布声明，未给出的字段取DEFAULT_SPEC
+            seed (int, optional): 随机种子，默认为0
+        """
+        unknown = set(spec or {}) - set(DEFAULT_SPEC)
+        if unknown:
+            raise ValueError(f"未知的激励字段: {sorted(unknown)}")
+        self.spec = dict(DEFAULT_SPEC, **(spec or {}))
+        self.rng = np.random.default_rng(seed)
+
+    def _operands(self, count, fp_format):
+        """为同一格式的count个操作生成两个操作数的64位向量字"""
+        spec, rng = self.spec, self.rng
+        width, exp_bits, man_bits = FORMAT_FIELDS[fp_format]
+        lanes = 64 // width
+        values, kinds = {}, {}
+        for name in ('fp_a', 'fp_b'):
+            values[name], kinds[name] = float_lanes(rng, spec[name], count * lanes, fp_format, spec['sign'])
+
+        if spec['exp_diff']:
+            exp_max = (1 << exp_bits) - 1
+            field = np.uint64(exp_max << man_bits)
+            exp_a = ((values['fp_a'] & field) >> np.uint64(man_bits)).astype(np.int64)
+            target = np.clip(exp_a - weighted_choice(rng, spec['exp_diff'], count * lanes), 1, exp_max - 1)
+            normal = np.isin(kinds['fp_a'], _NORMAL_CLASSES) & np.isin(kinds['fp_b'], _NORMAL_CLASSES)
+            adjusted = (values['fp_b'] & ~field) | (target.astype(np.uint64) << np.uint64(man_bits))
+            values['fp_b'] = np.where(normal, adjusted, values['fp_b'])
+
+        pattern = weighted_choice(rng, spec['lane_pattern'], count)
+        shifts = np.arange(lanes, dtype=np.uint64) * np.uint64(width)
+        keep = rng.integers(0, lanes, count)
+        words = []
+        for name in ('fp_a', 'fp_b'):
+            grid = values[name].reshape(-1, lanes)
+            splat = pattern == 'splat'
+            grid[splat] = grid[splat, :1]
+            single = np.flatnonzero(pattern == 'single')
+            if single.size:
+                background, _ = float_lanes(rng, {'normal': 1}, single.size * lanes, fp_format, spec['sign'])
+                background = background.reshape(-1, lanes)
+                background[np.arange(single.size), keep[single]] = grid[single, keep[single]]
+                grid[single] = background
+            words.append(np.bitwise_or.reduce(grid << shifts, axis=1))
+        return words
+
+    def generate(self, count):
+        """生成count个操作
+
+        Returns:
+            list: (op_code, fp_a, fp_b, fp_format, round_mode)五元组列表
+        """
+        spec, rng = self.spec, self.rng
+        ops = weighted_choice(rng, spec['op_code'], count).astype(np.int64)
+        formats = weighted_choice(rng, spec['fp_format'], count).astype(np.int64)
+        rounds = weighted_choice(rng, spec['round_mode'], count).astype(np.int64)
+        columns = np.zeros((2, count), dtype=np.uint64)
+        for fp_format in np.unique(formats).tolist():
+            index = np.flatnonzero(formats == fp_format)
+            columns[:, index] = self._operands(len(index), fp_format)
+        return list(zip(ops.tolist(), *(c.tolist() for c in columns), formats.tolist(), rounds.tolist()))
+
+    def stream(self, count, batch=1024):
+        """按批次流式产出共count个操作，每批为generate(batch)的结果
+
+        相同的种子和批大小产生相同的操作序列。
+        """
+        while count > 0:
+            size = min(batch, count)
+            count -= size
+            yield self.generate(size)
+
+
+def api_VectorFloatAdder_run_campaign(env, spec=None, count=10000, seed=0, batch=1024):
+    """按分布声明运行一次定向随机回归，并用参考模型逐批比对
+
+    Args:
+        env: VectorFloatAdderEnv实例，必须是已初始化的Env实例
+        spec (dict, optional): 分布声明，见模块说明
+        count (int, optional): 操作总数，默认为10000
+        seed (int, optional): 随机种子，默认为0
+        batch (int, optional): 每批发射的操作数，默认为1024
+
+    Returns:
+        dict: 回归结果
+            - count (int): 已发射的操作数
+            - mismatches (list): 与参考模型不一致的记录，index为全局序号
+
+    Example:
+        >>> res = api_VectorFloatAdder_run_campaign(env, {'fp_format': {0b11: 1}}, count=4096)
+        >>> res['mismatches'][:1]
+    """
+    stimulus = VectorFloatAdderStimulus(spec, seed)
+    issued = 0
+    mismatches = []
+    for operations in stimulus.stream(count, batch):
+        records = api_VectorFloatAdder_stream_operations(env, operations)
+        for offset, rec in enumerate(records):
+            rec['index'] = issued + offset
+        mismatches.extend(ref_VectorFloatAdder_check(records))
+        issued += len(operations)
+    return {
+        'count': issued,
+        'mismatches': mismatches,
+    }
@@ -0,0 +1,55 @@
+#coding=utf-8
+
+from VectorFloatAdder_api import *  # 重要，必须用 import *， 而不是 import env，不然会出现 dut 没定义错误
+from VectorFloatAdder_bulk import *
+import pytest
+import numpy as np
+
+
+def test_api_VectorFloatAdder_bulk_exact_add(env):
+    """测试批量加法：小整数在三种格式下均可精确表示，结果应与NumPy一致且无异常标志
+
+    Args:
+        env: Env fixture实例，由pytest自动注入
+    """
+    env.dut.fc_cover["FG-FORMAT-PRECISION"].mark_function("FC-MULTI-PRECISION", test_api_VectorFloatAdder_bulk_exact_add,
+                                                           ["CK-F16", "CK-F32", "CK-F64"])
+
+    rng = np.random.default_rng(2512)
+    for dtype, fp_format in ((np.float16, 0b01), (np.float32, 0b10), (np.float64, 0b11)):
+        # 元素数不是通道数的整数倍，覆盖末尾补0
+        a = rng.integers(0, 1000, 101).astype(dtype)
+        b = rng.integers(0, 1000, 101).astype(dtype)
+        bits, fflags = api_VectorFloatAdder_bulk_operations(env, 0b00000, a, b)
+        assert np.array_equal(from_bits(bits, fp_format), a + b), f"格式{fp_format}批量加法结果错误"
+        assert not fflags.any(), f"格式{fp_format}精确加法不应产生异常标志"
+
+
+def test_api_VectorFloatAdder_bulk_matches_single(env):
+    """测试逐元素op/格式/舍入列混合时，批量结果与逐个执行的对应通道一致
+
+    Args:
+        env: Env fixture实例，由pytest自动注入
+    """
+    env.dut.fc_cover["FG-API"].mark_function("FC-OPERATION", test_api_VectorFloatAdder_bulk_matches_single,
+                                              ["CK-FADD", "CK-FSUB"])
+
+    rng = np.random.default_rng(2512)
+    count = 48
+    formats = rng.choice([0b01, 0b10, 0b11], count)
+    ops = rng.choice([0b00000, 0b00001, 0b00010, 0b00011], count)
+    rounds = rng.integers(0, 5, count)
+    masks = np.array([0, 0xFFFF, 0xFFFFFFFF, 0xFFFFFFFFFFFFFFFF], dtype=np.uint64)[formats]
+    a = rng.integers(0, 1 << 64, count, dtype=np.uint64) & masks
+    b = rng.integers(0, 1 << 64, count, dtype=np.uint64) & masks
+
+    bits, fflags = api_VectorFloatAdder_bulk_operations(env, ops, a, b, fp_format=formats, round_mode=rounds)
+    decoded = decode_fflags(fflags)
+    assert set(decoded) == {"NV", "DZ", "OF", "UF", "NX"}
+
+    for i in range(count):
+        width = FORMAT_WIDTH[int(formats[i])]
+        # 单个元素放在通道0，其余通道为0
+        result, flags = env.execute_operation(int(ops[i]), int(a[i]), int(b[i]), int(formats[i]), int(rounds[i]))
+        assert int(bits[i]) == result & ((1 << width) - 1), f"第{i}个元素结果不一致"
+        assert int(fflags[i]) == flags & 0x1F, f"第{i}个元素fflags不一致"
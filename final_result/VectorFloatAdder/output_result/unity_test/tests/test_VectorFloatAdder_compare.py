@@ -0,0 +1,84 @@
+#coding=utf-8
+"""
+VectorFloatAdder逐通道比对测试：通道拆分、标志差异定位与不一致表格式
+"""
+
+import numpy as np
+
+from VectorFloatAdder_api import *  # 重要，必须用 import *， 而不是 import env，不然会出现 dut 没定义错误
+from VectorFloatAdder_compare import *
+from VectorFloatAdder_ref import ref_VectorFloatAdder_operations
+
+
+# 逐通道运算的操作码：加减、最小/最大与符号注入
+LANE_OPS = np.array([0b00000, 0b00001, 0b00010, 0b00011, 0b00110, 0b00111, 0b01000])
+
+
+def _random_operations(rng, count):
+    """三种格式各count个随机向量字操作，返回(operations, 期望结果, 期望fflags)"""
+    words = rng.integers(0, 1 << 64, (2, 3 * count), dtype=np.uint64)
+    ops = rng.choice(LANE_OPS, 3 * count)
+    formats = np.repeat([1, 2, 3], count)
+    rounds = rng.integers(0, 5, 3 * count)
+    expect_result, expect_fflags = ref_VectorFloatAdder_operations(ops, words[0], words[1], formats, rounds)
+    operations = list(zip(ops.tolist(), *(w.tolist() for w in words), formats.tolist(), rounds.tolist()))
+    return operations, expect_result, expect_fflags
+
+
+def test_api_VectorFloatAdder_compare_lanes_injected():
+    """测试注入到指定通道的结果/标志错误被定位到正确的事务、通道和标志位"""
+    rng = np.random.default_rng(25)
+    operations, expect_result, expect_fflags = _random_operations(rng, 200)
+    formats = np.array([op[3] for op in operations])
+    result, fflags = expect_result.copy(), expect_fflags.copy()
+    f16, f32, f64 = (np.flatnonzero(formats == fmt) for fmt in (1, 2, 3))
+    result[f16[:5]] ^= np.uint64(1)                     # f16通道0的最低位
+    fflags[f32[3]] ^= np.uint64(1 << 5)                 # f32通道1的NX
+    fflags[f64[7]] ^= np.uint64((1 << 4) | (1 << 2))    # f64通道0的NV、OF
+    fflags[f64[8]] ^= np.uint64(1 << 12)                # f64通道之外的fflags位
+
+    table = compare_lanes(result, fflags, expect_result, expect_fflags, formats)
+    expect_rows = [(i, 0) for i in f16[:5].tolist()] + [(f32[3], 1), (f64[7], 0), (f64[8], -1)]
+    assert table[["index", "lane"]].tolist() == sorted(expect_rows), "应只报告被注入的事务和通道"
+    assert lane_histogram(table)[("f16", 0)] == 5
+    by_index = {int(row["index"]): row for row in table}
+    assert flag_names(by_index[f32[3]]["flag_diff"]) == "NX"
+    assert flag_names(by_index[f64[7]]["flag_diff"]) == "NV|OF"
+    assert by_index[f64[8]]["flag_diff"] == 1 << 7
+
+    text = format_mismatches(table, limit=4)
+    assert text.splitlines()[0].startswith("8个通道不一致（f16/0: 5"), text
+    assert "另有4个通道未列出" in text and len(text.splitlines()) == 7
+    assert format_mismatches(compare_lanes(expect_result, expect_fflags, expect_result, expect_fflags, formats)) == "全部通道一致"
+
+
+def test_api_VectorFloatAdder_compare_lanes_bulk():
+    """测试百万级事务只含少量不一致时，一次比对给出全部不一致通道"""
+    rng = np.random.default_rng(2512)
+    count = 1 << 20
+    expect_result = rng.integers(0, 1 << 64, count, dtype=np.uint64)
+    expect_fflags = rng.integers(0, 1 << 20, count, dtype=np.uint64)
+    formats = rng.integers(1, 4, count)
+    bad = np.sort(rng.choice(count, 100, replace=False))
+    result = expect_result.copy()
+    result[bad] ^= np.uint64(1 << 63)                   # 最高通道的符号位
+    table = compare_lanes(result, expect_fflags, expect_result, expect_fflags, formats)
+    assert table["index"].tolist() == bad.tolist()
+    assert table["lane"].tolist() == (64 // np.array([16, 32, 64])[formats[bad] - 1] - 1).tolist(), "应定位到最高通道"
+    with pytest.raises(ValueError):
+        compare_lanes(result[:-1], expect_fflags, expect_result, expect_fflags, formats)
+
+
+def test_api_VectorFloatAdder_compare_lanes_dut(env):
+    """测试三种格式随机操作的DUT输出与参考模型逐通道一致
+
+    Args:
+        env: Env fixture实例，由pytest自动注入
+    """
+    env.dut.fc_cover["FG-API"].mark_function("FC-OPERATION", test_api_VectorFloatAdder_compare_lanes_dut,
+                                              ["CK-FADD", "CK-FSUB", "CK-FMIN", "CK-FMAX", "CK-FSGNJ", "CK-FSGNJN", "CK-FSGNJX"])
+
+    operations, _, _ = _random_operations(np.random.default_rng(7), 100)
+    records = api_VectorFloatAdder_stream_operations(env, operations)
+    table = ref_VectorFloatAdder_lane_check(records)
+    assert not len(table), format_mismatches(table)
@@ -178,4 +178,25 @@ def test_api_VectorFloatAdder_env_clock_reset_interaction(env):
     env.Step(1)  # 推进一个时钟周期
     
     # 验证复位释放
-    assert env.reset_pin.value == 0, "复位信号应该被释放"
\ No newline at end of file
+    assert env.reset_pin.value == 0, "复位信号应该被释放"
+
+def test_api_VectorFloatAdder_env_coverage_sampler(env):
+    """测试边沿触发采样器：空闲周期不评估检查点，fire周期正常命中
+
+    Args:
+        env: Env fixture实例，由pytest自动注入
+    """
+    env.dut.fc_cover["FG-API"].mark_function("FC-OPERATION", test_api_VectorFloatAdder_env_coverage_sampler, ["CK-FADD"])
+
+    sampler = env.dut.fc_sampler
+    env.io.fire.value = 0
+    env.Step(2)
+    idle_start = sampler.sampled_cycles
+    env.Step(100)
+    assert sampler.sampled_cycles == idle_start, "fire保持为0时不应评估检查点"
+
+    env.execute_operation(0b00000, 0x4000000000000000, 0x4008000000000000, fp_format=0b11)
+    point = env.dut.fc_cover["FG-API"].cover_point("FC-OPERATION")
+    assert point["hints"]["CK-FADD"] > 0, "fire周期应命中CK-FADD"
+    assert point["hints"]["CK-DUMMY"] == 1, "常量检查点命中一次后不应再评估"
+    assert sampler.sampled_cycles < sampler.cycles
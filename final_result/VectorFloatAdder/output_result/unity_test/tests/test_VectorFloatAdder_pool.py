@@ -0,0 +1,94 @@
+#coding=utf-8
+"""
+VectorFloatAdder DUT实例池测试：复用前的复位、流水线冲刷与状态卫生检查
+
+池中的实例以request=None新建，覆盖率/波形文件使用默认文件名，不影响env fixture自身DUT的文件登记
+"""
+
+from VectorFloatAdder_api import *
+from VectorFloatAdder_pool import VectorFloatAdderDUTPool, hygiene_signature
+
+
+def _operate(dut):
+    """在池中的实例上执行一次f64加法，返回(result, fflags)"""
+    env = VectorFloatAdderEnv(dut)
+    env.reset()
+    return api_VectorFloatAdder_add(env, fp_a=0x3FF8000000000000, fp_b=0x4004000000000000, fp_format=0b10)
+
+
+def test_api_VectorFloatAdder_pool_reuse_after_scrub(env):
+    """测试实例归还时流水线中留有运算，再次取出时输出已冲刷干净且运算结果与首次一致
+
+    Args:
+        env: Env fixture实例，由pytest自动注入
+    """
+    env.dut.fc_cover["FG-API"].mark_function("FC-OPERATION", test_api_VectorFloatAdder_pool_reuse_after_scrub, ["CK-FADD"])
+
+    pool = VectorFloatAdderDUTPool(max_uses=3, line_cov="summary")
+    try:
+        slot = pool.acquire(None)
+        first = slot.dut
+        expected = _operate(first)
+        # 不等结果就归还，模拟用例中途失败留下的在途运算
+        first.io_fp_a.value = 0x7FF0000000000001
+        first.io_fp_b.value = 0x4004000000000000
+        first.io_op_code.value = 1
+        first.io_fire.value = 1
+        first.Step(1)
+        pool.release(slot)
+
+        slot = pool.acquire(None)
+        assert slot.dut is first, "空闲实例应被复用"
+        assert pool.stats == {"created": 1, "reused": 1, "dirty": 0, "recycled": 0, "rotated": 0}, pool.stats
+        assert hygiene_signature(slot.dut) == slot.signature, "冲刷后输出应与新建实例一致"
+        assert _operate(slot.dut) == expected, "复用实例的运算结果应与首次一致"
+        pool.release(slot)
+    finally:
+        pool.close()
+
+
+def test_api_VectorFloatAdder_pool_dirty_and_recycled_instances(env):
+    """测试卫生检查失败的实例与服务满max_uses的实例都会退役
+
+    Args:
+        env: Env fixture实例，由pytest自动注入
+    """
+    env.dut.fc_cover["FG-API"].mark_function("FC-OPERATION", test_api_VectorFloatAdder_pool_dirty_and_recycled_instances, ["CK-FADD"])
+
+    pool = VectorFloatAdderDUTPool(max_uses=2, line_cov="summary")
+    try:
+        slot = pool.acquire(None)
+        dirty = slot.dut
+        pool.release(slot)
+        slot.signature = tuple(v + 1 for v in slot.signature)  # 使冲刷后的状态与记录不一致
+        slot = pool.acquire(None)
+        assert slot.dut is not dirty, "未通过卫生检查的实例不应被复用"
+        assert pool.stats["dirty"] == 1 and pool.stats["created"] == 2, pool.stats
+
+        pool.release(slot)
+        slot = pool.acquire(None)
+        pool.release(slot)
+        assert pool.stats["recycled"] == 1 and not pool.idle, f"服务满max_uses的实例应退役: {pool.stats}"
+    finally:
+        pool.close()
+
+
+def test_api_VectorFloatAdder_pool_rotates_line_coverage(env):
+    """测试DUT_POOL_LINE_COV=test时实例归还即退役，每个用例的代码行覆盖率写入各自的.dat
+
+    Args:
+        env: Env fixture实例，由pytest自动注入
+    """
+    env.dut.fc_cover["FG-API"].mark_function("FC-OPERATION", test_api_VectorFloatAdder_pool_rotates_line_coverage, ["CK-FADD"])
+
+    pool = VectorFloatAdderDUTPool(line_cov="test")
+    try:
+        slot = pool.acquire(None)
+        first = slot.dut
+        pool.release(slot)
+        assert pool.stats["rotated"] == 1 and not pool.idle, f"归还的实例应退役并写出.dat: {pool.stats}"
+        slot = pool.acquire(None)
+        assert slot.dut is not first and pool.stats["created"] == 2, "下一个用例应取得新建的实例"
+        pool.release(slot)
+    finally:
+        pool.close()
@@ -0,0 +1,62 @@
+#coding=utf-8
+"""
+VectorFloatAdder内部信号探针测试：按层次名绑定FloatAdderF16Pipeline异常标志路径并逐周期采样
+"""
+
+import numpy as np
+
+from VectorFloatAdder_api import *  # 重要，必须用 import *， 而不是 import env，不然会出现 dut 没定义错误
+from VectorFloatAdder_probe import f16_exception_probe_names
+
+
+def _exception_probe(env, inst="U_F16_1", depth=PROBE_DEPTH):
+    probe = env.probe(f16_exception_probe_names(inst), depth=depth)
+    if probe.missing:
+        env.remove_probe(probe)
+        pytest.skip(f"DUT未以--rw导出内部信号: {probe.missing[0]}")
+    return probe
+
+
+def test_api_VectorFloatAdder_probe_ring_buffer(env):
+    """测试每次Step采样一次，环形缓冲区只保留最近depth个周期，移除后停止采样
+
+    Args:
+        env: Env fixture实例，由pytest自动注入
+    """
+    env.dut.fc_cover["FG-API"].mark_function("FC-OPERATION", test_api_VectorFloatAdder_probe_ring_buffer, ["CK-FADD"])
+
+    probe = _exception_probe(env, depth=8)
+    env.Step(5)
+    env.Step(15)
+    assert probe.count == 20 and len(probe) == 8, "每个周期应采样一次，缓冲区只保留最近8个"
+    assert probe.cycles.tolist() == list(range(13, 21)), "应按时间顺序返回最近8个周期"
+    assert probe["U_F16_1.io_fflags"].dtype == np.uint64
+    assert set(probe.to_dict()) == {"cycle"} | set(probe.names)
+
+    env.remove_probe(probe)
+    env.Step(3)
+    assert probe.count == 20, "移除后不应再采样"
+
+    alias = env.probe({"flags": "U_F16_1.io_fflags"}, strict=True)
+    env.Step(1)
+    assert alias.names == ["flags"] and alias.last("flags") == alias["flags"][-1], "应按别名读取"
+    with pytest.raises(KeyError):
+        env.probe(["U_F16_1.no_such_reg"], strict=True)
+
+
+def test_api_VectorFloatAdder_probe_f16_invalid(env):
+    """测试f16无穷减无穷时，异常标志路径上出现NV位
+
+    Args:
+        env: Env fixture实例，由pytest自动注入
+    """
+    env.dut.fc_cover["FG-ROUNDING-EXCEPTION"].mark_function("FC-EXCEPTION-HANDLE", test_api_VectorFloatAdder_probe_f16_invalid,
+                                                            ["CK-INVALID-OP"])
+
+    probe = _exception_probe(env)
+    inf = 0x7C007C007C007C00  # 4个f16通道均为+inf
+    _, fflags = api_VectorFloatAdder_subtract(env, inf, inf, fp_format=0b01)
+    assert fflags & 0x10, f"inf-inf应置位NV，fflags={fflags:#x}"
+    assert int(probe["U_F16_1.io_fflags"].max()) & 0x10, "U_F16_1的输出标志应出现NV"
+    assert any(int(probe[name].max()) & 0x10 for name in ("U_F16_1.U_far_path.io_fflags", "U_F16_1.U_close_path.io_fflags")), \
+        "far/close路径之一应产生NV"
@@ -0,0 +1,122 @@
+#coding=utf-8
+
+from VectorFloatAdder_api import *  # 重要，必须用 import *， 而不是 import env，不然会出现 dut 没定义错误
+from VectorFloatAdder_ref import *
+import pytest
+import numpy as np
+
+
+# 参考模型覆盖的全部操作码
+ALL_OPS = [0b00000, 0b00001, 0b00010, 0b00011, 0b00100, 0b00101, 0b00110, 0b00111, 0b01000,
+           0b01001, 0b01010, 0b01011, 0b01100, 0b01101, 0b01110, 0b01111, 0b10001, 0b10010,
+           0b10100, 0b10101, 0b10110, 0b11010]
+
+# 各格式的特殊值：±0、最小/最大非规格化数、最小/最大规格化数、1.0、±inf、qNaN、sNaN
+SPECIAL_VALUES = {
+    0b01: [0x0000, 0x0001, 0x03FF, 0x0400, 0x7BFF, 0x3C00, 0x7C00, 0x7E00, 0x7C01],
+    0b10: [0x00000000, 0x00000001, 0x007FFFFF, 0x00800000, 0x7F7FFFFF, 0x3F800000,
+           0x7F800000, 0x7FC00000, 0x7F800001],
+    0b11: [0x0000000000000000, 0x0000000000000001, 0x000FFFFFFFFFFFFF, 0x0010000000000000,
+           0x7FEFFFFFFFFFFFFF, 0x3FF0000000000000, 0x7FF0000000000000, 0x7FF8000000000000,
+           0x7FF0000000000001],
+}
+
+
+def _special_words(fp_format):
+    """将特殊值及其负值两两组合，按通道打包为(fp_a, fp_b)向量字"""
+    width = FORMAT_FIELDS[fp_format][0]
+    values = SPECIAL_VALUES[fp_format]
+    values = values + [v | (1 << (width - 1)) for v in values]
+    pairs = [(a, b) for a in values for b in values]
+    lanes = 64 // width
+    pairs += [(0, 0)] * ((-len(pairs)) % lanes)
+    words = []
+    for i in range(0, len(pairs), lanes):
+        chunk = pairs[i:i + lanes]
+        words.append((sum(a << (k * width) for k, (a, _) in enumerate(chunk)),
+                      sum(b << (k * width) for k, (_, b) in enumerate(chunk))))
+    return words
+
+
+def test_api_VectorFloatAdder_ref_random_all_ops(env):
+    """测试随机向量字在全部操作码、格式和舍入模式下与参考模型逐位一致
+
+    Args:
+        env: Env fixture实例，由pytest自动注入
+    """
+    env.dut.fc_cover["FG-API"].mark_function("FC-OPERATION", test_api_VectorFloatAdder_ref_random_all_ops,
+                                              ["CK-FADD", "CK-FSUB", "CK-FEQ", "CK-FLT", "CK-FCLASS", "CK-FMIN",
+                                               "CK-FMAX", "CK-FSGNJ", "CK-FSUM-URE", "CK-FSUM-ORE"])
+
+    rng = np.random.default_rng(2512)
+    count = 2000
+    ops = rng.choice(ALL_OPS, count)
+    formats = rng.choice([0b01, 0b10, 0b11], count)
+    rounds = rng.integers(0, 5, count)
+    fp_a = rng.integers(0, 1 << 64, count, dtype=np.uint64)
+    # 一半操作数B只翻转A的低位，使指数接近、覆盖相消与舍入进位
+    fp_b = rng.integers(0, 1 << 64, count, dtype=np.uint64)
+    fp_b[::2] = fp_a[::2] ^ rng.integers(0, 1 << 12, count // 2, dtype=np.uint64)
+    operations = list(zip(ops.tolist(), fp_a.tolist(), fp_b.tolist(), formats.tolist(), rounds.tolist()))
+
+    records = api_VectorFloatAdder_stream_operations(env, operations)
+    mismatches = ref_VectorFloatAdder_check(records)
+    assert not mismatches, \
+        f"{len(mismatches)}个向量字与参考模型不一致，首个: " + \
+        ", ".join(f"{k}={v:#x}" if isinstance(v, int) else f"{k}={v}" for k, v in mismatches[0].items())
+
+
+def test_api_VectorFloatAdder_ref_special_values(env):
+    """测试特殊值两两组合在各操作码下的结果和fflags与参考模型一致
+
+    Args:
+        env: Env fixture实例，由pytest自动注入
+    """
+    env.dut.fc_cover["FG-SPECIAL-VALUES"].mark_function("FC-NAN-HANDLE", test_api_VectorFloatAdder_ref_special_values,
+                                                         ["CK-NAN-INPUT", "CK-NAN-PROPAGATION", "CK-CANONICAL-NAN"])
+    env.dut.fc_cover["FG-SPECIAL-VALUES"].mark_function("FC-INF-HANDLE", test_api_VectorFloatAdder_ref_special_values,
+                                                         ["CK-INF-INPUT", "CK-INF-ARITHMETIC", "CK-INF-SIGN"])
+
+    for fp_format in (0b01, 0b10, 0b11):
+        words = _special_words(fp_format)
+        operations = [(op, a, b, fp_format, 0) for op in ALL_OPS for a, b in words]
+        records = api_VectorFloatAdder_stream_operations(env, operations)
+        mismatches = ref_VectorFloatAdder_check(records)
+        assert not mismatches, \
+            f"格式{fp_format}有{len(mismatches)}个特殊值向量与参考模型不一致，首个: op={mismatches[0]['op_code']:#x} " \
+            f"a={mismatches[0]['fp_a']:#x} b={mismatches[0]['fp_b']:#x} " \
+            f"DUT=({mismatches[0]['fp_result']:#x}, {mismatches[0]['fflags']:#x}) " \
+            f"参考=({mismatches[0]['expect_result']:#x}, {mismatches[0]['expect_fflags']:#x})"
+
+
+def test_api_VectorFloatAdder_ref_rounding_boundaries(env):
+    """测试上溢与非规格化边界在5种舍入模式下的结果和OF/UF/NX与参考模型一致
+
+    Args:
+        env: Env fixture实例，由pytest自动注入
+    """
+    env.dut.fc_cover["FG-ROUNDING-EXCEPTION"].mark_function("FC-ROUNDING-MODE", test_api_VectorFloatAdder_ref_rounding_boundaries,
+                                                             ["CK-RNE", "CK-RTZ", "CK-RDN", "CK-RUP", "CK-RMM"])
+    env.dut.fc_cover["FG-ROUNDING-EXCEPTION"].mark_function("FC-EXCEPTION-HANDLE", test_api_VectorFloatAdder_ref_rounding_boundaries,
+                                                             ["CK-OVERFLOW", "CK-UNDERFLOW", "CK-INEXACT"])
+
+    # 最大有限数 + 半个ulp附近的值触发上溢；最小规格化数 - 最小非规格化数落入非规格化区间
+    operations = []
+    for fp_format, (max_finite, half_ulp, min_normal, min_sub) in {
+        0b01: (0x7BFF, 0x5000, 0x0400, 0x0001),
+        0b10: (0x7F7FFFFF, 0x73000000, 0x00800000, 0x00000001),
+        0b11: (0x7FEFFFFFFFFFFFFF, 0x7CA0000000000000, 0x0010000000000000, 0x0000000000000001),
+    }.items():
+        width = FORMAT_FIELDS[fp_format][0]
+        splat = lambda v: sum(v << (i * width) for i in range(64 // width))
+        sign = 1 << (width - 1)
+        for round_mode in range(5):
+            for a, b, op in ((max_finite, half_ulp, 0), (max_finite, max_finite, 0), (max_finite | sign, half_ulp, 1),
+                             (min_normal, min_sub, 1), (min_sub, min_sub | sign, 0), (max_finite, 1, 0)):
+                operations.append((op, splat(a), splat(b), fp_format, round_mode))
+
+    records = api_VectorFloatAdder_stream_operations(env, operations)
+    assert not ref_VectorFloatAdder_check(records), "舍入边界结果与参考模型不一致"
+    assert any(rec['fflags'] & OF for rec in records), "边界用例应触发OF"
+    assert not any(rec['fflags'] & (UF | (UF << 5) | (UF << 10) | (UF << 15)) for rec in records), \
+        "加减法的非规格化结果是精确的，不应触发UF"
@@ -0,0 +1,86 @@
+#coding=utf-8
+"""
+VectorFloatAdder复位后状态快照测试
+
+DUT未以--savable编译时快照不可用，restore()退化为env.reset()，以下用例在两种构建下都应通过
+"""
+
+from VectorFloatAdder_api import *
+from VectorFloatAdder_snapshot import VectorFloatAdderResetSnapshot
+
+
+def _coverage_hits(dut):
+    """全部功能覆盖组中各bin的累计命中次数之和"""
+    return sum(bin_["hints"] for group in dut.fc_cover.values()
+               for point in group.as_dict()["points"] for bin_ in point["bins"])
+
+
+def test_api_VectorFloatAdder_snapshot_restore_pipeline(env):
+    """测试流水线中留有运算时恢复快照，输出回到快照时刻且之后的运算结果与首次一致
+
+    Args:
+        env: Env fixture实例，由pytest自动注入
+    """
+    env.dut.fc_cover["FG-API"].mark_function("FC-OPERATION", test_api_VectorFloatAdder_snapshot_restore_pipeline, ["CK-FADD"])
+
+    snapshot = VectorFloatAdderResetSnapshot(env)
+    try:
+        outputs = (env.io.fp_result.value, env.io.fflags.value)
+        expected = api_VectorFloatAdder_add(env, fp_a=0x3FF8000000000000, fp_b=0x4004000000000000, fp_format=0b11)
+        # 不等结果就恢复，模拟模糊测试中途放弃的一轮输入
+        env.io.fp_a.value = 0x7FF0000000000001
+        env.io.fp_b.value = 0x4004000000000000
+        env.io.op_code.value = 1
+        env.io.fire.value = 1
+        env.Step(1)
+
+        assert snapshot.restore() == snapshot.supported
+        if snapshot.supported:
+            # 流水级寄存器复位不会清除，只有快照恢复能保证输出回到快照时刻
+            assert (env.io.fp_result.value, env.io.fflags.value) == outputs, "恢复后输出应与快照时刻一致"
+        assert env.io.fire.value == 0 and env.io.is_vec.value == 1, "输入引脚应恢复为快照时的取值"
+        assert api_VectorFloatAdder_add(env, fp_a=0x3FF8000000000000, fp_b=0x4004000000000000,
+                                        fp_format=0b11) == expected, "恢复后的运算结果应与首次一致"
+    finally:
+        snapshot.close()
+
+
+def test_api_VectorFloatAdder_snapshot_repeated_restore(env):
+    """测试多次恢复快照后同一输入得到相同结果
+
+    Args:
+        env: Env fixture实例，由pytest自动注入
+    """
+    env.dut.fc_cover["FG-API"].mark_function("FC-OPERATION", test_api_VectorFloatAdder_snapshot_repeated_restore, ["CK-FADD"])
+
+    snapshot = VectorFloatAdderResetSnapshot(env)
+    try:
+        results = []
+        for _ in range(3):
+            snapshot.restore()
+            results.append(api_VectorFloatAdder_add(env, fp_a=0x4000, fp_b=0x3C00, fp_format=0b01))
+        assert results == [results[0]] * 3, f"多次恢复后结果不一致: {results}"
+        assert snapshot.restores == (3 if snapshot.supported else 0)
+    finally:
+        snapshot.close()
+
+
+def test_api_VectorFloatAdder_snapshot_coverage_accumulates(env):
+    """测试恢复快照不回退功能覆盖率计数，每次恢复后的运算继续累加命中次数
+
+    Args:
+        env: Env fixture实例，由pytest自动注入
+    """
+    env.dut.fc_cover["FG-API"].mark_function("FC-OPERATION", test_api_VectorFloatAdder_snapshot_coverage_accumulates, ["CK-FADD"])
+
+    snapshot = VectorFloatAdderResetSnapshot(env)
+    try:
+        counts = [_coverage_hits(env.dut)]
+        for _ in range(3):
+            api_VectorFloatAdder_add(env, fp_a=0x4000, fp_b=0x3C00, fp_format=0b01)
+            counts.append(_coverage_hits(env.dut))
+            snapshot.restore()
+            assert _coverage_hits(env.dut) >= counts[-1], "恢复快照不应回退功能覆盖率计数"
+        assert all(a < b for a, b in zip(counts, counts[1:])), f"每次恢复后的运算都应继续累加命中次数: {counts}"
+    finally:
+        snapshot.close()
@@ -0,0 +1,62 @@
+#coding=utf-8
+
+from VectorFloatAdder_api import *  # 重要，必须用 import *， 而不是 import env，不然会出现 dut 没定义错误
+from VectorFloatAdder_stimulus import *
+import pytest
+import numpy as np
+
+
+# 近路径：同号相减/异号相加且指数相差0或1，结果大量相消
+NEAR_PATH_SPEC = {
+    'op_code': {0b00000: 1, 0b00001: 1},
+    'fp_a': {'normal': 3, 'near_one': 1},
+    'fp_b': {'normal': 3, 'near_one': 1},
+    'exp_diff': {0: 3, 1: 2, -1: 1},
+    'lane_pattern': {'independent': 1},
+}
+
+
+def test_api_VectorFloatAdder_stimulus_constraints():
+    """测试激励按种子可复现，且exp_diff约束两个操作数的指数差"""
+    spec = dict(NEAR_PATH_SPEC, fp_format={0b01: 1})
+    ops = VectorFloatAdderStimulus(spec, seed=7).generate(200)
+    assert ops == VectorFloatAdderStimulus(spec, seed=7).generate(200), "相同种子应生成相同的激励"
+
+    exp = lambda v, i: (v >> (16 * i + 10)) & 0x1F
+    for op_code, fp_a, fp_b, fp_format, round_mode in ops:
+        assert op_code in NEAR_PATH_SPEC['op_code'] and fp_format == 0b01, "操作码和格式应只取分布中的值"
+        for i in range(4):
+            diff = exp(fp_a, i) - exp(fp_b, i)
+            assert diff in (0, 1, -1) or exp(fp_b, i) in (1, 30), f"通道{i}的指数差{diff}不在分布中"
+
+
+def test_api_VectorFloatAdder_stimulus_near_path_campaign(env):
+    """测试以数据声明的近路径定向随机回归与参考模型一致
+
+    Args:
+        env: Env fixture实例，由pytest自动注入
+    """
+    env.dut.fc_cover["FG-ROUNDING-EXCEPTION"].mark_function("FC-ROUNDING-MODE", test_api_VectorFloatAdder_stimulus_near_path_campaign,
+                                                             ["CK-RNE", "CK-RTZ", "CK-RDN", "CK-RUP", "CK-RMM"])
+
+    result = api_VectorFloatAdder_run_campaign(env, NEAR_PATH_SPEC, count=2000, seed=2, batch=500)
+    assert result['count'] == 2000, "应发射全部操作"
+    assert not result['mismatches'], \
+        f"{len(result['mismatches'])}个操作与参考模型不一致，首个: index={result['mismatches'][0]['index']} " \
+        f"op={result['mismatches'][0]['op_code']:#x} a={result['mismatches'][0]['fp_a']:#x} b={result['mismatches'][0]['fp_b']:#x}"
+
+
+def test_api_VectorFloatAdder_stimulus_default_campaign(env):
+    """测试默认分布（全部操作码、格式、舍入模式和特殊值类别）的回归与参考模型一致
+
+    Args:
+        env: Env fixture实例，由pytest自动注入
+    """
+    env.dut.fc_cover["FG-SPECIAL-VALUES"].mark_function("FC-NAN-HANDLE", test_api_VectorFloatAdder_stimulus_default_campaign,
+                                                         ["CK-NAN-INPUT", "CK-NAN-PROPAGATION"])
+    env.dut.fc_cover["FG-SPECIAL-VALUES"].mark_function("FC-INF-HANDLE", test_api_VectorFloatAdder_stimulus_default_campaign,
+                                                         ["CK-INF-INPUT"])
+
+    result = api_VectorFloatAdder_run_campaign(env, count=2000, seed=3, batch=500)
+    assert not result['mismatches'], \
+        f"{len(result['mismatches'])}个操作与参考模型不一致，首个: index={result['mismatches'][0]['index']}"
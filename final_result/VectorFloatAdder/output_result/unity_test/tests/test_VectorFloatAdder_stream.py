@@ -0,0 +1,63 @@
+#coding=utf-8
+
+from VectorFloatAdder_api import *  # 重要，必须用 import *， 而不是 import env，不然会出现 dut 没定义错误
+import pytest
+import random
+
+
+def test_api_VectorFloatAdder_calibrate_latency(env):
+    """测试各格式流水线延迟标定
+
+    Args:
+        env: Env fixture实例，由pytest自动注入
+    """
+    env.dut.fc_cover["FG-FORMAT-PRECISION"].mark_function("FC-MULTI-PRECISION", test_api_VectorFloatAdder_calibrate_latency,
+                                                           ["CK-F16", "CK-F32", "CK-F64"])
+
+    for fp_format in (0b01, 0b10, 0b11):
+        latency = env.calibrate_latency(fp_format)
+        assert latency >= 1, f"格式{fp_format}的延迟应至少为1个周期"
+        assert env.latency[fp_format] == latency, "标定结果应记录到env.latency"
+
+
+def test_api_VectorFloatAdder_stream_matches_single(env):
+    """测试流式发射结果与逐个执行结果一致，且tag与输入一一对应
+
+    Args:
+        env: Env fixture实例，由pytest自动注入
+    """
+    env.dut.fc_cover["FG-API"].mark_function("FC-OPERATION", test_api_VectorFloatAdder_stream_matches_single,
+                                              ["CK-FADD", "CK-FEQ"])
+
+    rng = random.Random(2512)
+    ops = []
+    for _ in range(64):
+        op_code = rng.choice([0b00000, 0b00001, 0b00010, 0b00011, 0b01001, 0b01011])
+        fp_format = rng.choice([0b01, 0b10, 0b11])
+        ops.append((op_code, rng.getrandbits(64), rng.getrandbits(64), fp_format, rng.randrange(5)))
+
+    records = api_VectorFloatAdder_stream_operations(env, ops)
+    assert [rec['tag'] for rec in records] == list(range(len(ops))), "结果应按tag顺序返回"
+
+    for op, rec in zip(ops, records):
+        assert (rec['op_code'], rec['fp_a'], rec['fp_b'], rec['fp_format'], rec['round_mode']) == op, "记录的输入应与发射的输入一致"
+        expect = env.execute_operation(*op)
+        assert (rec['fp_result'], rec['fflags']) == expect, \
+            f"流式结果与单次执行不一致: tag={rec['tag']} 流式=({rec['fp_result']:#x}, {rec['fflags']:#x}) 单次=({expect[0]:#x}, {expect[1]:#x})"
+
+
+def test_api_VectorFloatAdder_stream_throughput(env):
+    """测试流式模式下每周期完成一个操作
+
+    Args:
+        env: Env fixture实例，由pytest自动注入
+    """
+    env.dut.fc_cover["FG-API"].mark_function("FC-OPERATION", test_api_VectorFloatAdder_stream_throughput, ["CK-FADD"])
+
+    count = 1000
+    ops = [(0b00000, 0x4000000000000000, 0x4008000000000000)] * count
+    records = api_VectorFloatAdder_stream_operations(env, ops, fp_format=0b11)
+
+    assert len(records) == count
+    assert all(rec['fp_result'] == 0x4014000000000000 for rec in records), "2.0 + 3.0 应为 5.0"
+    assert records[-1]['complete_cycle'] <= count + env.latency[0b11], "流式模式应接近每周期一个操作"
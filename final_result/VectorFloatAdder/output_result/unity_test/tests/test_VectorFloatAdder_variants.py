@@ -0,0 +1,74 @@
+#coding=utf-8
+"""
+VectorFloatAdder多变体广播测试（需要先以--tname导出origin与bug版本，未导出时跳过）
+"""
+
+import pytest
+
+from VectorFloatAdder_api import *
+from VectorFloatAdder_ref import ref_VectorFloatAdder_check
+from VectorFloatAdder_stimulus import VectorFloatAdderStimulus
+from VectorFloatAdder_variants import *
+
+
+@pytest.fixture(scope="function")
+def runner():
+    try:
+        runner = VectorFloatAdderVariantRunner()
+    except FileNotFoundError as e:
+        pytest.skip(str(e))
+    yield runner
+    runner.finish()
+
+
+# 各bug版本的定向触发操作(op_code, fp_a, fp_b, fp_format, round_mode)，取自test_VectorFloatAdder_bug.py，
+# 保证随机激励之外每个bug都有确定的分歧点
+BUG_TRIGGERS = [
+    (3, 0x3C003C00, 0x40004000, 1, 0),                      # Bug 1: FMAX(1.0, 2.0)
+    (0, 0x3F800000, 0x7F800000, 2, 0),                      # Bug 2: 1.0 + Inf
+    (15, 0x7FF0000000000001, 0, 3, 0),                      # Bug 3: FCLASS(sNaN)
+    (0, 0x7C017C017C017C01, 0x3C003C003C003C00, 1, 0),      # Bug 4: sNaN + 1.0的NV标志
+    (26, 0x4004000000000000, 0xBFF8000000000000, 3, 0),     # Bug 5: 掩码为0的归约求和
+]
+
+
+def test_api_VectorFloatAdder_variants_namespaced_classes(env, runner):
+    """测试各变体以独立的命名空间类加载，并各自拥有DUT实例
+
+    Args:
+        env: Env fixture实例，由pytest自动注入
+        runner: 多变体广播器fixture
+    """
+    env.dut.fc_cover["FG-API"].mark_function("FC-OPERATION", test_api_VectorFloatAdder_variants_namespaced_classes, ["CK-FADD"])
+
+    classes = [type(e.dut).__name__ for e in runner.envs.values()]
+    assert classes == ["DUTVectorFloatAdder_origin"] + [f"DUTVectorFloatAdder_bug_{b}" for b in range(1, 6)], \
+        f"变体类名应带命名空间: {classes}"
+    assert len({id(e.dut) for e in runner.envs.values()}) == len(classes), "每个变体应有独立的DUT实例"
+
+
+def test_api_VectorFloatAdder_variants_broadcast_screen(env, runner):
+    """测试同一份激励广播到全部变体：origin与参考模型一致且重复运行结果不变，每个bug版本都与origin分歧
+
+    Args:
+        env: Env fixture实例，由pytest自动注入
+        runner: 多变体广播器fixture
+    """
+    env.dut.fc_cover["FG-API"].mark_function("FC-OPERATION", test_api_VectorFloatAdder_variants_broadcast_screen,
+                                              ["CK-FADD", "CK-FSUB"])
+
+    ops = VectorFloatAdderStimulus(seed=11).generate(1000) + BUG_TRIGGERS
+    results = runner.broadcast(api_VectorFloatAdder_stream_operations, ops)
+    assert set(results) == set(runner.envs), "每个变体都应返回结果"
+    origin = results[runner.reference]
+    assert not isinstance(origin, Exception), f"origin版本执行失败: {origin!r}"
+    assert not ref_VectorFloatAdder_check(origin), "origin版本应与参考模型一致"
+
+    # origin与自身比较：同一份激励再运行一次，结果不变
+    again = api_VectorFloatAdder_stream_operations(runner.envs[runner.reference], ops)
+    assert result_key(again) == result_key(origin), "origin版本重复运行的结果应不变"
+
+    diverged = runner.screen(api_VectorFloatAdder_stream_operations, ops)
+    assert runner.reference not in diverged, "参考变体不应出现在分歧列表中"
+    missing = [name for name in runner.variants if name not in diverged]
+    assert not missing, f"以下bug版本未与origin分歧: {missing}"
@@ -0,0 +1,34 @@
+#coding=utf-8
+"""
+VectorFloatAdder波形策略测试：滚动窗口引脚记录与VCD写出
+"""
+
+from VectorFloatAdder_api import *
+from VectorFloatAdder_waveform import PIN_WIDTHS, PinWindowRecorder
+
+
+def test_api_VectorFloatAdder_waveform_window_recorder(env, tmp_path):
+    """测试窗口只保留最近N个周期，并写出包含全部顶层引脚的VCD
+
+    Args:
+        env: Env fixture实例，由pytest自动注入
+        tmp_path: pytest临时目录
+    """
+    env.dut.fc_cover["FG-API"].mark_function("FC-OPERATION", test_api_VectorFloatAdder_waveform_window_recorder, ["CK-FADD"])
+
+    recorder = PinWindowRecorder(env.dut, window=8)
+    env.dut.io_fp_a.value = 0x3F800000
+    env.dut.io_fp_b.value = 0x3F800000
+    env.dut.io_fire.value = 1
+    for _ in range(20):
+        env.Step(1)
+        recorder()
+    env.dut.io_fire.value = 0
+    assert recorder.cycles == 20 and len(recorder.window) == 8, "窗口应只保留最近8个周期"
+    assert [c for c, _ in recorder.window] == list(range(13, 21))
+
+    path = recorder.dump_vcd(str(tmp_path / "window.vcd"))
+    text = open(path).read()
+    for name, width in PIN_WIDTHS.items():
+        assert f"$var wire {width} " in text and f" {name} $end" in text, f"VCD缺少引脚{name}"
+    assert "#26\n" in text and "#41\n" in text and "#24\n" not in text, "VCD时间应对应窗口内的周期"
@@ -2,9 +2,13 @@
 
 import pytest
 from VectorFloatFMA_function_coverage_def import get_coverage_groups
+from coverage_sampler import CoverageSampler
+from VectorFloatFMA_waveform import WAVEFORM_MODE, WAVEFORM_RERUN_PASS, PinWindowRecorder, waveform_enabled
+from VectorFloatFMA_probe import PROBE_DEPTH, VectorFloatFMASignalProbe
 from toffee_test.reporter import set_func_coverage, set_line_coverage, get_file_in_tmp_dir
 from toffee_test.reporter import set_user_info, set_title_info
 from toffee import Bundle, Signals, Signal
+from line_cov_index import write_owner
 
 # import your dut module here
 from VectorFloatFMA import DUTVectorFloatFMA  # Replace with the actual DUT class import
@@ -30,6 +34,12 @@ def get_waveform_path(request, new_path:bool):
     return get_file_in_tmp_dir(request, current_path_file("data/"), f"{tc_name}.fst",  new_path=new_path)
 
 
+def get_window_waveform_path(request):
+    # DUT_WAVEFORM=window时，用例失败后写出的滚动窗口VCD
+    tc_name = request.node.name if request is not None else "VectorFloatFMA"
+    return get_file_in_tmp_dir(request, current_path_file("data/"), f"{tc_name}.window.vcd",  new_path=True)
+
+
 def create_dut(request):
     """创建VectorFloatFMA DUT实例
     
@@ -48,8 +58,11 @@ def create_dut(request):
     # 设置覆盖率生成文件(必须设置覆盖率文件，否则无法统计覆盖率，导致测试失败)
     dut.SetCoverage(get_coverage_data_path(request, new_path=True))
 
-    # 设置波形生成文件
-    dut.SetWaveform(get_waveform_path(request, new_path=True))
+    # 设置波形生成文件（按DUT_WAVEFORM策略，off/window模式及rerun的首次运行不生成FST）
+    if waveform_enabled(request):
+        dut.SetWaveform(get_waveform_path(request, new_path=True))
+    elif hasattr(dut, "CloseWaveform"):
+        dut.CloseWaveform()  # 以-w编译的DUT构造后即开始写波形
     
     # VectorFloatFMA是时序电路，需要初始化时钟
     # 根据__init__.py的定义，时钟引脚名称为"clock"
@@ -59,20 +72,41 @@ def create_dut(request):
 
 
 @pytest.fixture(scope="function") # 用scope="function"确保每个测试用例都创建了一个全新的DUT
-def dut(request):
-    # 创建DUT实例（时钟已在create_dut中初始化）
-    dut = create_dut(request)
+def dut(request, dut_pool):
+    # 创建DUT实例（时钟已在create_dut中初始化）：DUT_POOL=1时dut_pool为VectorFloatFMADUTPool，
+    # 从实例池取出已复位并通过状态卫生检查的DUT，用例结束后归还（按DUT_POOL_LINE_COV轮换代码行覆盖率），详见VectorFloatFMA_pool.py
+    # rerun模式的失败重跑需要带波形的新实例，不使用实例池
+    rerun = WAVEFORM_MODE == "rerun" and WAVEFORM_RERUN_PASS
+    slot = dut_pool.acquire(request) if dut_pool is not None and not rerun else None
+    dut = create_dut(request) if slot is None else slot.dut
     
     # 获取功能覆盖组
     func_coverage_group = get_coverage_groups(dut)
 
     # 上升沿采样，在每个时钟周期自动采样功能覆盖率
     # 必须要有g.sample()采样覆盖组，否则无法统计覆盖率导致测试失败
-    dut.StepRis(lambda _: [g.sample() for g in func_coverage_group])
+    # 仅在fire有效、fire翻转或复位变化的周期评估检查点，引脚每周期只读一次
+    sampler = CoverageSampler(dut, func_coverage_group,
+                              trigger=lambda s: s.io_fire.value == 1,
+                              edge_pins=["io_fire", "reset"])
+    if slot is None:
+        dut.StepRis(sampler)
+    else:
+        slot.sampler = sampler  # 池中实例的StepRis回调转发给本用例的采样器
+
+    # DUT_WAVEFORM=window时在内存中滚动记录顶层引脚，用例失败时写出VCD
+    recorder = PinWindowRecorder(dut) if WAVEFORM_MODE == "window" else None
+    if recorder is not None:
+        if slot is None:
+            dut.StepRis(recorder)
+        else:
+            slot.recorder = recorder
 
     # 以属性名称fc_cover保存覆盖组到DUT
     setattr(dut, "fc_cover",
             {g.name:g for g in func_coverage_group})
+    # 采样器同样挂到DUT上，便于查看采样周期统计
+    setattr(dut, "fc_sampler", sampler)
 
     # 返回DUT实例
     yield dut
@@ -81,9 +115,19 @@ def dut(request):
     # 需要在测试结束的时候，通过set_func_coverage把覆盖组传递给toffee_test*
     set_func_coverage(request, func_coverage_group)
 
+    # rep_call由conftest中的pytest_runtest_makereport记录
+    report = getattr(request.node, "rep_call", None)
+    if recorder is not None and report is not None and report.failed:
+        recorder.dump_vcd(get_window_waveform_path(request))
+
     # 设置需要收集的代码行覆盖率文件(获取已有路径new_path=False) 向toffee_test传代码行递覆盖率数据
     # 代码行覆盖率 ignore 文件的固定路径为当前文件所在目录下的：VectorFloatFMA.ignore，请不要改变
-    set_line_coverage(request, get_coverage_data_path(request, new_path=False), ignore=current_path_file("VectorFloatFMA.ignore"))
+    # 池中的实例在退役时才写出.dat：DUT_POOL_LINE_COV=test时每个用例归还即退役，.dat只属于本用例；
+    # summary时.dat累计了实例服务的全部用例，只由首个使用它的用例登记一次以计入汇总行覆盖率（见VectorFloatFMA_pool.py）
+    if slot is None:
+        set_line_coverage(request, get_coverage_data_path(request, new_path=False), ignore=current_path_file("VectorFloatFMA.ignore"))
+    elif dut_pool.line_cov == "test" or slot.uses == 1:
+        set_line_coverage(request, slot.datfile, ignore=current_path_file("VectorFloatFMA.ignore"))
 
     # 设置用户信息到报告
     set_user_info("UCAgent-25.11.22.dev23+ge8e206f05", "unitychip@bosc.ac.cn")
@@ -91,7 +135,12 @@ def dut(request):
 
     for g in func_coverage_group:                        # 采样覆盖组
         g.clear()                                        # 清空统计
-    dut.Finish()                                         # 清理DUT，每个DUT class 都有 Finish 方法
+    if slot is None:
+        dut.Finish()                                     # 清理DUT，每个DUT class 都有 Finish 方法
+        # 在.dat旁记录写出它的用例，供line_cov_index按nodeid归属
+        write_owner(get_coverage_data_path(request, new_path=False), [request.node.nodeid])
+    else:
+        dut_pool.release(slot)                           # 归还实例池，下次取出前复位
 
 
 # ============================================================================
@@ -163,6 +212,7 @@ class VectorFloatFMAEnv:
             dut: VectorFloatFMA DUT实例
         """
         self.dut = dut
+        self.probes = []  # 内部信号探针，由Step逐周期采样
         
         # 引脚封装：使用from_prefix方法绑定io_前缀的信号
         self.inputs = VectorFloatFMAInputBundle.from_prefix("io_")
@@ -173,6 +223,10 @@ class VectorFloatFMAEnv:
         
         # 初始化所有输入引脚为0
         self._initialize_inputs()
+
+        # 流水线延迟：从发射所在的Step算起，经过多少次Step后结果出现在输出端
+        # RTL中结果由第三级寄存器(fire_reg1_last_r使能)组合输出，各格式共用同一流水线，可用calibrate_latency重新标定
+        self.latency = 3
     
     def _initialize_inputs(self):
         """初始化所有输入信号为默认值
@@ -260,6 +314,74 @@ class VectorFloatFMAEnv:
         """
         return self.outputs.fp_result.value, self.outputs.fflags.value
     
+    def calibrate_latency(self, fp_format=3, max_cycles=16):
+        """标定流水线延迟
+
+        连续发射乘法Y，中间只插入一次乘法X（X、Y结果在每个通道都不同），
+        观察X的结果在发射后第几个Step出现在输出端，结果记录到self.latency。
+
+        Args:
+            fp_format: 用于标定的浮点格式（1=FP16, 2=FP32, 3=FP64），默认FP64
+            max_cycles: 最大观察周期数
+
+        Returns:
+            int: 标定得到的延迟（Step数）
+
+        Raises:
+            RuntimeError: 在max_cycles内没有观察到X的结果
+        """
+        # 每个通道：X = 1.0 × 1.0 = 1.0，Y = 1.0 × 2.0 = 2.0
+        one, two, lanes, width = {
+            1: (0x3C00, 0x4000, 4, 16),
+            2: (0x3F800000, 0x40000000, 2, 32),
+            3: (0x3FF0000000000000, 0x4000000000000000, 1, 64),
+        }[fp_format]
+        splat = lambda v: sum(v << (i * width) for i in range(lanes))
+
+        self.configure_operation(0, fp_format, 0)
+        self.fire_operation()
+        self.set_operands(splat(one), splat(two), 0)
+        self.Step(max_cycles)  # 用Y填满流水线
+        self.set_operands(splat(one), splat(one), 0)
+        self.Step(1)
+        self.set_operands(splat(one), splat(two), 0)
+        for cycle in range(1, max_cycles + 1):
+            if self.outputs.fp_result.value == splat(one):
+                self.clear_fire()
+                self.latency = cycle
+                return cycle
+            self.Step(1)
+        self.clear_fire()
+        raise RuntimeError(f"在{max_cycles}个周期内未观察到标定结果")
+
+    def clear_cbs(self):
+        """清空所有注册的回调函数（含内部信号探针）"""
+        self.probes.clear()
+
+    def probe(self, signals, depth=PROBE_DEPTH, strict=False):
+        """按层次名绑定内部信号，之后Step每推进一个周期采样一次
+
+        Args:
+            signals (list | dict): 相对DUT顶层的层次名列表，或{别名: 层次名}，见VectorFloatFMA_probe
+            depth (int, optional): 环形缓冲区保留的采样数，默认为PROBE_DEPTH
+            strict (bool, optional): 为True时有信号未绑定即抛出KeyError，默认为False
+
+        Returns:
+            VectorFloatFMASignalProbe: 探针，按名字读取按时间顺序的NumPy取值数组
+
+        Example:
+            >>> probe = env.probe(["sticky_f64_reg2", "has_nan_f64_reg2"])
+            >>> api_VectorFloatFMA_fmacc(env, fp_a, fp_b, fp_c, fp_format=0b11)
+            >>> probe["sticky_f64_reg2"]
+        """
+        probe = VectorFloatFMASignalProbe(self.dut, signals, depth, strict)
+        self.probes.append(probe)
+        return probe
+
+    def remove_probe(self, probe):
+        """停止探针采样"""
+        self.probes.remove(probe)
+
     # 直接导出DUT的Step操作
     def Step(self, i: int = 1):
         """推进时钟周期
@@ -270,7 +392,80 @@ class VectorFloatFMAEnv:
         Returns:
             DUT的Step返回值
         """
-        return self.dut.Step(i)
+        if not self.probes:
+            return self.dut.Step(i)
+        # 有探针时逐周期推进并采样
+        ret = None
+        for _ in range(i):
+            ret = self.dut.Step(1)
+            for probe in self.probes:
+                probe.sample()
+        return ret
+
+
+class VectorFloatFMABatchEngine:
+    """VectorFloatFMA流水线批量执行引擎
+
+    每个周期保持io_fire=1发射一个操作，每个操作可以有各自的op_code、fp_format和
+    round_mode（格式和舍入模式随数据一起流过流水线）。发射第latency个操作起，
+    每个周期的输出就是latency-1个周期前发射的操作的结果，因此结果按延迟对齐后
+    与输入一一对应。流水线第1、2级由fire_reg*_last_r自行推进，排空时拉低fire即可。
+
+    使用示例：
+        engine = VectorFloatFMABatchEngine(env)
+        for fp_a, fp_b, fp_c, op_code in ops:
+            engine.issue(fp_a, fp_b, fp_c, op_code, fp_format=2)
+        results = engine.drain()   # [(result, fflags), ...]，与ops顺序一致
+    """
+
+    def __init__(self, env):
+        self.env = env
+        self.latency = env.latency
+        self.issued = 0
+        self.cycles = 0             # 引擎推进的周期数
+        self.results = []
+
+    def issue(self, fp_a, fp_b, fp_c, op_code, fp_format=1, round_mode=0):
+        """在当前周期发射一个操作
+
+        为了保证吞吐率，这里不做参数检查，参数含义同api_VectorFloatFMA_fma_operation。
+
+        Returns:
+            int: 该操作的tag（即发射序号，也是结果在results中的下标）
+        """
+        inputs = self.env.inputs
+        inputs.fp_a.value = fp_a
+        inputs.fp_b.value = fp_b
+        inputs.fp_c.value = fp_c
+        inputs.op_code.value = op_code
+        inputs.fp_format.value = fp_format
+        inputs.round_mode.value = round_mode
+        inputs.fire.value = 1
+        self.env.Step(1)
+        self.cycles += 1
+        tag = self.issued
+        self.issued += 1
+        if self.issued >= self.latency:
+            self._collect()
+        return tag
+
+    def _collect(self):
+        """读取当前输出端的结果，它属于最早的一个未完成操作"""
+        outputs = self.env.outputs
+        self.results.append((outputs.fp_result.value, outputs.fflags.value))
+
+    def drain(self):
+        """拉低fire并推进流水线直到所有已发射操作的结果都被收集
+
+        Returns:
+            list: 结果列表，每个元素为(result, fflags)，下标即发射tag
+        """
+        self.env.clear_fire()
+        while len(self.results) < self.issued:
+            self.env.Step(1)
+            self.cycles += 1
+            self._collect()
+        return self.results
 
 
 # 定义env fixture, 请取消下面的注释，并根据需要修改名称
@@ -462,52 +657,35 @@ def api_VectorFloatFMA_fmsac(env, fp_a, fp_b, fp_c, fp_format=1, round_mode=0):
 def api_VectorFloatFMA_batch_operations(env, operations, fp_format=1, round_mode=0):
     """批量执行多个FMA操作
     
-    支持流水线化的批量操作，连续输入多个操作并收集所有结果。
-    适用于性能测试和覆盖率提升。
+    使用VectorFloatFMABatchEngine每周期发射一个操作（io_fire保持为1），
+    按流水线延迟对齐收集结果，N个操作约需 N + latency - 1 个周期。
+    适用于性能测试、覆盖率提升以及大规模随机回归。
     
     Args:
         env: VectorFloatFMAEnv实例
-        operations (list): 操作列表，每个元素为(fp_a, fp_b, fp_c, op_code)的元组
-        fp_format (int, optional): 浮点格式，默认FP32
-        round_mode (int, optional): 舍入模式，默认RNE
+        operations (iterable): 操作序列，每个元素为(fp_a, fp_b, fp_c, op_code)，
+            或(fp_a, fp_b, fp_c, op_code, fp_format, round_mode)以逐个指定格式和舍入模式
+        fp_format (int, optional): 四元组操作使用的浮点格式（1=FP16, 2=FP32, 3=FP64），默认1
+        round_mode (int, optional): 四元组操作使用的舍入模式，默认RNE
     
     Returns:
-        list: 结果列表，每个元素为(result, fflags)的元组
+        list: 结果列表，每个元素为(result, fflags)的元组，与operations一一对应
     
     Example:
         >>> operations = [
-        ...     (0x40000000, 0x40400000, 0, 0),  # 2.0 × 3.0
-        ...     (0x40800000, 0x40A00000, 0, 0),  # 4.0 × 5.0
+        ...     (0x40000000, 0x40400000, 0, 0, 2, 0),  # 2.0 × 3.0 (FP32)
+        ...     (0x40800000, 0x40A00000, 0, 0, 2, 1),  # 4.0 × 5.0 (FP32, RTZ)
         ... ]
         >>> results = api_VectorFloatFMA_batch_operations(env, operations)
     
     Note:
-        - 该API会连续输入所有操作，然后等待流水线排空
-        - 适合测试流水线的连续操作能力
+        - 操作之间没有气泡，格式、操作码和舍入模式可以逐周期变化
+        - 首次使用前可调用env.calibrate_latency()重新标定延迟
     """
-    results = []
-    
-    # 连续输入所有操作
-    for fp_a, fp_b, fp_c, op_code in operations:
-        env.set_operands(fp_a, fp_b, fp_c)
-        env.configure_operation(op_code, fp_format, round_mode)
-        env.fire_operation()
-        env.Step(1)
-        
-        # 在第4个操作开始后，第1个结果就会输出
-        if len(results) < len(operations):
-            if len(results) >= 4:  # 流水线延迟4周期
-                result, fflags = env.get_result()
-                results.append((result, fflags))
-    
-    # 停止输入
-    env.clear_fire()
-    
-    # 收集剩余结果
-    remaining = len(operations) - len(results)
-    for _ in range(remaining):
-        env.Step(1)
-        result, fflags = env.get_result()
-        results.append((result, fflags))
-    
-    return results
\ No newline at end of file
+    engine = VectorFloatFMABatchEngine(env)
+    for op in operations:
+        if len(op) == 4:
+            engine.issue(op[0], op[1], op[2], op[3], fp_format, round_mode)
+        else:
+            engine.issue(*op)
+    return engine.drain()
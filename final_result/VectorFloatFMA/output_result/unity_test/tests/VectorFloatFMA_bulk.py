@@ -0,0 +1,174 @@
+#coding=utf-8
+"""
+VectorFloatFMA批量NumPy接口
+
+以NumPy数组为输入输出：按元素给出三个操作数和op/格式/舍入列，自动打包为64位向量
+（4×f16、2×f32或1×f64），经VectorFloatFMABatchEngine流水线连续发射后，再拆回
+逐元素的结果位模式和5位fflags。打包与拆包均为向量化运算，Python逐条开销只剩
+每周期一次的Step。
+"""
+
+import numpy as np
+
+from VectorFloatFMA_api import api_VectorFloatFMA_batch_operations
+
+
+# 硬件fp_format编码对应的元素位宽
+FORMAT_WIDTH = {0b01: 16, 0b10: 32, 0b11: 64}
+
+# 浮点dtype对应的fp_format编码
+DTYPE_FORMAT = {np.dtype(np.float16): 0b01, np.dtype(np.float32): 0b10, np.dtype(np.float64): 0b11}
+
+# 单个元素fflags的位定义（bit4..bit0依次为NV、DZ、OF、UF、NX）
+FFLAG_BITS = {"NV": 4, "DZ": 3, "OF": 2, "UF": 1, "NX": 0}
+
+
+def to_bits(values, fp_format=None):
+    """将浮点数组或位模式数组转换为uint64位模式
+
+    Args:
+        values (array_like): float16/float32/float64数组（按dtype推断格式），或整型位模式数组
+        fp_format (int, optional): 整型位模式数组对应的格式；浮点数组时忽略
+
+    Returns:
+        tuple: (uint64位模式数组, fp_format)，整型输入且未给出格式时fp_format为None
+    """
+    arr = np.asarray(values)
+    if arr.dtype in DTYPE_FORMAT:
+        fmt = DTYPE_FORMAT[arr.dtype]
+        uint_type = np.dtype(f"uint{FORMAT_WIDTH[fmt]}")
+        return arr.view(uint_type).astype(np.uint64), fmt
+    if arr.dtype.kind not in "iu":
+        raise TypeError(f"不支持的操作数类型: {arr.dtype}，应为float16/32/64或整型位模式")
+    return arr.astype(np.uint64), fp_format
+
+
+def from_bits(bits, fp_format):
+    """将uint64位模式数组按格式还原为对应的NumPy浮点数组"""
+    width = FORMAT_WIDTH[fp_format]
+    return np.asarray(bits, dtype=np.uint64).astype(f"uint{width}").view(f"float{width}")
+
+
+def pack_lanes(elems, fp_format):
+    """按格式将元素位模式打包为64位向量字，末尾不足一个字时补0
+
+    Args:
+        elems (np.ndarray): uint64元素位模式数组
+        fp_format (int): 1=f16, 2=f32, 3=f64
+
+    Returns:
+        np.ndarray: uint64向量字数组，元素i位于字i//lanes的第i%lanes个通道（低位为通道0）
+    """
+    width = FORMAT_WIDTH[fp_format]
+    lanes = 64 // width
+    mask = np.uint64((1 << width) - 1)
+    elems = np.asarray(elems, dtype=np.uint64) & mask
+    pad = (-len(elems)) % lanes
+    if pad:
+        elems = np.concatenate([elems, np.zeros(pad, dtype=np.uint64)])
+    shifts = np.arange(lanes, dtype=np.uint64) * np.uint64(width)
+    return np.bitwise_or.reduce(elems.reshape(-1, lanes) << shifts, axis=1)
+
+
+def unpack_lanes(words, fp_format, count=None):
+    """pack_lanes的逆运算，返回前count个元素的uint64位模式"""
+    width = FORMAT_WIDTH[fp_format]
+    lanes = 64 // width
+    mask = np.uint64((1 << width) - 1)
+    shifts = np.arange(lanes, dtype=np.uint64) * np.uint64(width)
+    elems = ((np.asarray(words, dtype=np.uint64)[:, None] >> shifts) & mask).reshape(-1)
+    return elems if count is None else elems[:count]
+
+
+def unpack_fflags(fflags, fp_format, count=None):
+    """将每个向量字的20位fflags拆为逐元素的5位标志（uint8）"""
+    lanes = 64 // FORMAT_WIDTH[fp_format]
+    shifts = np.arange(lanes, dtype=np.uint64) * np.uint64(5)
+    flags = ((np.asarray(fflags, dtype=np.uint64)[:, None] >> shifts) & np.uint64(0x1F)).reshape(-1)
+    flags = flags.astype(np.uint8)
+    return flags if count is None else flags[:count]
+
+
+def decode_fflags(fflags):
+    """将逐元素5位fflags解码为各标志的布尔数组
+
+    Returns:
+        dict: {"NV", "DZ", "OF", "UF", "NX"} -> bool数组
+    """
+    fflags = np.asarray(fflags)
+    return {name: ((fflags >> bit) & 1).astype(bool) for name, bit in FFLAG_BITS.items()}
+
+
+def api_VectorFloatFMA_bulk_operations(env, op_code, fp_a, fp_b, fp_c, fp_format=None, round_mode=0):
+    """VectorFloatFMA批量运算API，数组进、数组出
+
+    op_code、fp_format、round_mode可以是标量或与操作数等长的逐元素列。op/格式/舍入相同的
+    元素按原顺序打包进同一组向量字，不同组的向量字依次进入同一条流水线，结果再散回原位置。
+
+    Args:
+        env: VectorFloatFMAEnv实例，必须是已初始化的Env实例
+        op_code (int | array_like): 操作码(0-8)或逐元素操作码列
+        fp_a (array_like): 操作数A，浮点数组或整型位模式数组
+        fp_b (array_like): 操作数B，类型与fp_a一致
+        fp_c (array_like): 操作数C，类型与fp_a一致
+        fp_format (int | array_like, optional): 格式或逐元素格式列，浮点输入时可省略
+        round_mode (int | array_like, optional): 舍入模式或逐元素舍入模式列，默认为0(RNE)
+
+    Returns:
+        tuple: (results, fflags)
+            - results (np.ndarray): uint64逐元素结果位模式，可用from_bits还原为浮点
+            - fflags (np.ndarray): uint8逐元素5位异常标志，可用decode_fflags解码
+
+    Raises:
+        ValueError: 操作数长度不一致或格式无效时抛出
+
+    Example:
+        >>> a, b, c = (np.random.rand(3, 1 << 20) + 1).astype(np.float64)
+        >>> bits, flags = api_VectorFloatFMA_bulk_operations(env, 1, a, b, c)  # vfmacc: a*b+c
+        >>> from_bits(bits, 3)[:4]
+    """
+    scalar_format = fp_format if np.isscalar(fp_format) else None
+    a_bits, fmt_a = to_bits(fp_a, scalar_format)
+    b_bits, _ = to_bits(fp_b, scalar_format)
+    c_bits, _ = to_bits(fp_c, scalar_format)
+    count = a_bits.size
+    if b_bits.size != count or c_bits.size != count:
+        raise ValueError(f"操作数长度不一致: {a_bits.size}, {b_bits.size}, {c_bits.size}")
+    a_bits, b_bits, c_bits = a_bits.reshape(-1), b_bits.reshape(-1), c_bits.reshape(-1)
+
+    if fp_format is None:
+        fp_format = fmt_a
+        if fp_format is None:
+            raise ValueError("整型位模式输入必须给出fp_format")
+    formats = np.broadcast_to(np.asarray(fp_format, dtype=np.int64), (count,))
+    ops = np.broadcast_to(np.asarray(op_code, dtype=np.int64), (count,))
+    rounds = np.broadcast_to(np.asarray(round_mode, dtype=np.int64), (count,))
+    invalid = ~np.isin(formats, list(FORMAT_WIDTH))
+    if invalid.any():
+        raise ValueError(f"无效的fp_format: {np.unique(formats[invalid]).tolist()}，应为1(f16)、2(f32)或3(f64)")
+
+    # 按(格式, 操作码, 舍入模式)分组，组内保持原顺序打包
+    keys = np.stack([formats, ops, rounds], axis=1)
+    groups, inverse = np.unique(keys, axis=0, return_inverse=True)
+    inverse = inverse.reshape(-1)
+    plan = []
+    operations = []
+    for gid, (fmt, op, rm) in enumerate(groups.tolist()):
+        index = np.flatnonzero(inverse == gid)
+        words_a = pack_lanes(a_bits[index], fmt)
+        words_b = pack_lanes(b_bits[index], fmt)
+        words_c = pack_lanes(c_bits[index], fmt)
+        plan.append((fmt, index, len(operations), len(words_a)))
+        operations.extend(zip(words_a.tolist(), words_b.tolist(), words_c.tolist(),
+                              [op] * len(words_a), [fmt] * len(words_a), [rm] * len(words_a)))
+
+    word_pairs = api_VectorFloatFMA_batch_operations(env, operations)
+    word_results = np.fromiter((result for result, _ in word_pairs), dtype=np.uint64, count=len(word_pairs))
+    word_fflags = np.fromiter((flags for _, flags in word_pairs), dtype=np.uint64, count=len(word_pairs))
+
+    results = np.zeros(count, dtype=np.uint64)
+    fflags = np.zeros(count, dtype=np.uint8)
+    for fmt, index, start, length in plan:
+        results[index] = unpack_lanes(word_results[start:start + length], fmt, len(index))
+        fflags[index] = unpack_fflags(word_fflags[start:start + length], fmt, len(index))
+    return results, fflags
@@ -0,0 +1,180 @@
+#coding=utf-8
+"""
+VectorFloatFMA逐通道结果/fflags比对
+
+io_fp_result按fp_format划分为4×f16、2×f32或1×f64个通道（低位为通道0），io_fflags每个通道5位，
+通道i位于[5i+4:5i]。compare_lanes对一批DUT输出与期望值一次性向量化拆分通道，只返回不一致的
+通道，组成紧凑的结构化数组（MISMATCH_DTYPE）：事务序号、通道、DUT/期望的通道值与fflags，以及
+不一致的标志位。format_mismatches将其格式化为文本表，并按(格式, 通道)统计分布，便于识别
+只出现在某个通道上的bug：
+
+    table = compare_lanes(results, fflags, expect_results, expect_fflags, fp_format)
+    assert not len(table), format_mismatches(table)
+
+    table = ref_VectorFloatFMA_lane_check(operations, api_VectorFloatFMA_batch_operations(env, operations))
+
+- 先对整字做一次比较筛出不一致的事务，只对这些事务拆分通道，百万级事务的开销基本只剩这一次比较
+- 通道之外的fflags位（f32的[19:10]、f64的[19:5]）与期望不同时记为lane=-1，此时fflags/expect_fflags/
+  flag_diff为右移到低位的这部分位，result/expect_result为整字
+"""
+
+import numpy as np
+
+from VectorFloatFMA_bulk import FFLAG_BITS, FORMAT_WIDTH
+from VectorFloatFMA_ref import ref_VectorFloatFMA_operations
+
+
+FORMAT_NAMES = {0b01: "f16", 0b10: "f32", 0b11: "f64"}
+
+# 每个通道fflags的位数
+FFLAG_WIDTH = 5
+
+# 不一致表的字段，每行对应一个事务的一个通道
+MISMATCH_DTYPE = np.dtype([
+    ("index", np.int64),            # 事务序号
+    ("lane", np.int8),              # 通道号，-1表示通道之外的fflags位
+    ("fp_format", np.uint8),
+    ("result", np.uint64),          # DUT通道值
+    ("expect_result", np.uint64),   # 期望通道值
+    ("fflags", np.uint32),          # DUT通道fflags
+    ("expect_fflags", np.uint32),   # 期望通道fflags
+    ("flag_diff", np.uint32),       # fflags ^ expect_fflags
+])
+
+
+def flag_names(diff):
+    """将5位标志差异转换为"NV|NX"形式的名字，无差异时返回空字符串"""
+    return "|".join(name for name, bit in FFLAG_BITS.items() if int(diff) >> bit & 1)
+
+
+def compare_lanes(fp_result, fflags, expect_result, expect_fflags, fp_format):
+    """逐通道比对一批事务的结果与fflags
+
+    Args:
+        fp_result (array_like): DUT的64位结果字
+        fflags (array_like): DUT的20位fflags
+        expect_result (array_like): 期望的64位结果字
+        expect_fflags (array_like): 期望的20位fflags
+        fp_format (int | array_like): 格式(1=f16, 2=f32, 3=f64)或逐事务的格式列
+
+    Returns:
+        np.ndarray: MISMATCH_DTYPE结构化数组，按(index, lane)排序；全部一致时长度为0
+
+    Raises:
+        ValueError: 各列长度不一致或不一致的事务中出现无效格式时抛出
+
+    Example:
+        >>> table = compare_lanes([0x3C003C01], [0], [0x3C003C00], [0], 0b01)
+        >>> table[["index", "lane", "result", "expect_result"]].tolist()
+        [(0, 0, 15361, 15360)]
+    """
+    columns = [np.asarray(col, dtype=np.uint64).reshape(-1) for col in (fp_result, fflags, expect_result, expect_fflags)]
+    count = columns[0].size
+    if any(col.size != count for col in columns):
+        raise ValueError(f"各列长度不一致: {[col.size for col in columns]}")
+    got_r, got_f, exp_r, exp_f = columns
+    formats = np.broadcast_to(np.asarray(fp_format, dtype=np.int64), (count,))
+
+    bad = np.flatnonzero((got_r != exp_r) | (got_f != exp_f))
+    parts = [np.zeros(0, dtype=MISMATCH_DTYPE)]
+    bad_formats = formats[bad]
+    for fmt in np.unique(bad_formats).tolist():
+        if fmt not in FORMAT_WIDTH:
+            raise ValueError(f"无效的fp_format: {fmt}，应为1(f16)、2(f32)或3(f64)")
+        index = bad[bad_formats == fmt]
+        width = FORMAT_WIDTH[fmt]
+        lanes = 64 // width
+        lane_ids = np.arange(lanes, dtype=np.uint64)
+        value_shift, flag_shift = lane_ids * np.uint64(width), lane_ids * np.uint64(FFLAG_WIDTH)
+        value_mask, flag_mask = np.uint64((1 << width) - 1), np.uint64((1 << FFLAG_WIDTH) - 1)
+        lane_r = (got_r[index, None] >> value_shift) & value_mask
+        lane_er = (exp_r[index, None] >> value_shift) & value_mask
+        lane_f = (got_f[index, None] >> flag_shift) & flag_mask
+        lane_ef = (exp_f[index, None] >> flag_shift) & flag_mask
+        rows, cols = np.nonzero((lane_r != lane_er) | (lane_f != lane_ef))
+        part = np.zeros(rows.size, dtype=MISMATCH_DTYPE)
+        part["index"], part["lane"], part["fp_format"] = index[rows], cols, fmt
+        part["result"], part["expect_result"] = lane_r[rows, cols], lane_er[rows, cols]
+        part["fflags"], part["expect_fflags"] = lane_f[rows, cols], lane_ef[rows, cols]
+        parts.append(part)
+
+        # 通道之外的fflags位
+        high_shift = np.uint64(lanes * FFLAG_WIDTH)
+        high_f, high_ef = got_f[index] >> high_shift, exp_f[index] >> high_shift
+        rows = np.flatnonzero(high_f != high_ef)
+        if rows.size:
+            part = np.zeros(rows.size, dtype=MISMATCH_DTYPE)
+            part["index"], part["lane"], part["fp_format"] = index[rows], -1, fmt
+            part["result"], part["expect_result"] = got_r[index[rows]], exp_r[index[rows]]
+            part["fflags"], part["expect_fflags"] = high_f[rows], high_ef[rows]
+            parts.append(part)
+
+    table = np.concatenate(parts)
+    table["flag_diff"] = table["fflags"] ^ table["expect_fflags"]
+    return table[np.lexsort((table["lane"], table["index"]))]
+
+
+def lane_histogram(table):
+    """按(格式名, 通道)统计不一致的通道数
+
+    Returns:
+        dict: {("f16", 0): 次数, ...}，按次数从多到少排列
+    """
+    if not len(table):
+        return {}
+    keys = np.stack([table["fp_format"].astype(np.int64), table["lane"].astype(np.int64)], axis=1)
+    keys, counts = np.unique(keys, axis=0, return_counts=True)
+    hist = {(FORMAT_NAMES.get(fmt, str(fmt)), lane): n for (fmt, lane), n in zip(keys.tolist(), counts.tolist())}
+    return dict(sorted(hist.items(), key=lambda item: -item[1]))
+
+
+def format_mismatches(table, limit=20):
+    """将不一致表格式化为文本，首行为总数与(格式/通道)分布，之后最多limit行明细
+
+    Args:
+        table (np.ndarray): compare_lanes返回的不一致表
+        limit (int, optional): 明细行数上限，默认为20
+
+    Returns:
+        str: 文本表，全部一致时返回"全部通道一致"
+    """
+    if not len(table):
+        return "全部通道一致"
+    hist = ", ".join(f"{fmt}/{lane}: {n}" for (fmt, lane), n in lane_histogram(table).items())
+    lines = [f"{len(table)}个通道不一致（{hist}）",
+             f"{'index':>10} {'lane':>4} {'fmt':>3} {'result':>18} {'expect':>18} {'fflags':>6} {'expect':>6}  diff"]
+    for row in table[:limit].tolist():
+        index, lane, fmt, result, expect_result, fflags, expect_fflags, flag_diff = row
+        # 通道值按格式位宽补零，lane=-1的整字按64位
+        digits = FORMAT_WIDTH.get(fmt, 64) // 4 if lane >= 0 else 16
+        value, expect = f"{result:#0{digits + 2}x}", f"{expect_result:#0{digits + 2}x}"
+        diff = flag_names(flag_diff) if lane >= 0 else f"{flag_diff:#x}"
+        lines.append(f"{index:>10} {lane:>4} {FORMAT_NAMES.get(fmt, str(fmt)):>3} {value:>18} {expect:>18} "
+                     f"{fflags:#6x} {expect_fflags:#6x}  {diff}")
+    if len(table) > limit:
+        lines.append(f"... 另有{len(table) - limit}个通道未列出")
+    return "\n".join(lines)
+
+
+def ref_VectorFloatFMA_lane_check(operations, results, fp_format=1, round_mode=0):
+    """用参考模型逐通道比对api_VectorFloatFMA_batch_operations的结果
+
+    Args:
+        operations (list): 操作序列，元素为(fp_a, fp_b, fp_c, op_code)或
+            (fp_a, fp_b, fp_c, op_code, fp_format, round_mode)
+        results (list): 与operations一一对应的(result, fflags)列表
+        fp_format (int, optional): 四元组操作使用的浮点格式，默认为1
+        round_mode (int, optional): 四元组操作使用的舍入模式，默认为0(RNE)
+
+    Returns:
+        np.ndarray: compare_lanes的不一致表，index为operations中的下标
+    """
+    if not operations:
+        return np.zeros(0, dtype=MISMATCH_DTYPE)
+    rows = [op if len(op) == 6 else (*op, fp_format, round_mode) for op in operations]
+    fp_a, fp_b, fp_c = (np.array([row[i] for row in rows], dtype=np.uint64) for i in range(3))
+    op_code, formats, rounds = (np.array([row[i] for row in rows], dtype=np.int64) for i in range(3, 6))
+    expect_result, expect_fflags = ref_VectorFloatFMA_operations(op_code, fp_a, fp_b, fp_c, formats, rounds)
+    got_result = np.array([res for res, _ in results], dtype=np.uint64)
+    got_fflags = np.array([flags for _, flags in results], dtype=np.uint64)
+    return compare_lanes(got_result, got_fflags, expect_result, expect_fflags, formats)
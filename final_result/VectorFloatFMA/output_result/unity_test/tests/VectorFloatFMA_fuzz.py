@@ -0,0 +1,426 @@
+#coding=utf-8
+"""
+VectorFloatFMA覆盖率引导的模糊测试
+
+加权随机激励（VectorFloatFMA_stimulus）按声明的分布抽样，不看DUT的反馈，舍入后恰好下溢、相消后
+粘滞位为0这类稀有组合只能靠概率撞上。VectorFloatFMAFuzzer以“操作序列”为一个输入，每轮从语料中
+挑一个输入做按字段的变异，执行后读回本轮的覆盖，产生新覆盖的输入加入语料并写入磁盘，下次运行继续使用：
+
+    make fuzz DUT=VectorFloatFMA FUZZ_ITERS=5000     # 语料保存在reports/VectorFloatFMA_corpus
+
+    result = api_VectorFloatFMA_fuzz(env, iterations=2000, corpus_dir="reports/VectorFloatFMA_corpus")
+    assert not result['mismatches']
+
+- 输入：操作列表，每个操作包含fp_a/fp_b/fp_c/op_code/fp_format/round_mode以及gap（发射前
+  拉低io_fire的气泡周期数）
+- 变异：按字段进行，op_code/fp_format/round_mode重新选取，fp_a/fp_b/fp_c按当前格式选一个通道
+  改为某个数值类别（float_lanes）、翻转一位、指数加减、符号取反或尾数置为边界值，整向量复制同一
+  通道，gap重新选取，以及插入（由VectorFloatFMAStimulus生成）、删除、复制、交换操作和与另一语料拼接
+- 反馈：Verilator的行/翻转覆盖计数只在Finish时写出，无法逐个输入读回，因此每个周期直接读回
+  观测信号：io_fp_result/io_fflags的逐位翻转（0->1、1->0）、各格式舍入级寄存器（sticky/guard/
+  round/结果为零/NaN/Inf/下溢粘滞位）的取值组合，以及功能覆盖组中新命中的bin；每个操作完成时再
+  记录(op_code, fp_format, round_mode, 逐通道fflags)。内部信号按层次名经GetInternalSignal绑定
+  （picker以--rw导出，build_cache默认如此），当前构建中不存在的信号自动跳过
+- 每个输入执行前恢复复位后快照（VectorFloatFMA_snapshot），不支持快照时退化为env.reset()
+- 每个输入的结果都与参考模型比对，不一致的输入写入语料目录下的crashes/
+"""
+
+import glob
+import hashlib
+import json
+import os
+import random
+from collections import deque
+
+import numpy as np
+
+from VectorFloatFMA_api import VectorFloatFMABatchEngine
+from VectorFloatFMA_bulk import unpack_fflags
+from VectorFloatFMA_probe import ROUND_LANES, bind_signal, round_probe_names
+from VectorFloatFMA_ref import FORMAT_FIELDS, ref_VectorFloatFMA_check
+from VectorFloatFMA_snapshot import VectorFloatFMAResetSnapshot
+from VectorFloatFMA_stimulus import VALUE_CLASSES, VectorFloatFMAStimulus, float_lanes
+
+
+FUZZ_CORPUS_DIR = os.environ.get("DUT_FUZZ_CORPUS") or None
+FUZZ_ITERATIONS = int(os.environ.get("DUT_FUZZ_ITERS", "200"))
+
+# 逐位统计翻转的引脚
+TOGGLE_PINS = ["io_fp_result", "io_fflags"]
+
+# 按取值统计的内部信号分组（层次名相对DUT顶层，由VectorFloatFMA_probe.bind_signal绑定），
+# 每组各信号的取值合成一个特征
+INTERNAL_SIGNALS = {lane: round_probe_names(lane) for lane in ROUND_LANES}
+
+# 单个输入的操作数上限与气泡周期的取值范围
+MAX_OPS = 16
+MAX_GAP = 4
+
+OP_CODES = tuple(range(9))
+FORMATS = (0b01, 0b10, 0b11)
+ROUND_MODES = tuple(range(5))
+
+
+class VectorFloatFMAFuzzEngine(VectorFloatFMABatchEngine):
+    """带气泡的批量执行引擎
+
+    在VectorFloatFMABatchEngine之上，每个操作发射前可拉低io_fire若干周期；流水线第1、2级自行推进，
+    因此按发射周期加延迟计算每个操作的到期周期，在到期周期读取结果。每个周期结束时调用observer。
+    """
+
+    def __init__(self, env, observer=None):
+        super().__init__(env)
+        self.observer = observer
+        self.pending = deque()  # (到期周期, tag)
+
+    def issue(self, fp_a, fp_b, fp_c, op_code, fp_format=1, round_mode=0, gap=0):
+        """先发射gap个气泡周期，再在当前周期发射一个操作
+
+        Returns:
+            int: 该操作的tag（即results中的下标）
+        """
+        inputs = self.env.inputs
+        inputs.fire.value = 0
+        for _ in range(gap):
+            self._step()
+        inputs.fp_a.value = fp_a
+        inputs.fp_b.value = fp_b
+        inputs.fp_c.value = fp_c
+        inputs.op_code.value = op_code
+        inputs.fp_format.value = fp_format
+        inputs.round_mode.value = round_mode
+        inputs.fire.value = 1
+        tag = self.issued
+        self.issued += 1
+        self.results.append(None)
+        self.pending.append((self.cycles + self.latency, tag))
+        self._step()
+        return tag
+
+    def _step(self):
+        """推进一个周期，并收集到期的结果"""
+        self.env.Step(1)
+        self.cycles += 1
+        if self.observer is not None:
+            self.observer()
+        outputs = self.env.outputs
+        while self.pending and self.pending[0][0] <= self.cycles:
+            _, tag = self.pending.popleft()
+            self.results[tag] = (outputs.fp_result.value, outputs.fflags.value)
+
+    def drain(self):
+        """拉低fire并推进流水线直到所有已发射操作的结果都被收集
+
+        Returns:
+            list: 结果列表，每个元素为(result, fflags)，下标即发射tag
+        """
+        self.env.clear_fire()
+        while self.pending:
+            self._step()
+        return self.results
+
+
+class VectorFloatFMACoverageObserver:
+    """逐周期读回观测信号，汇总为一个输入的覆盖特征
+
+    Attributes:
+        internal (dict): 成功绑定的内部信号{分组: [(名字, XData)]}
+    """
+
+    def __init__(self, env, internal_signals=None):
+        self.env = env
+        dut = env.dut
+        self.toggle = {name: getattr(dut, name) for name in TOGGLE_PINS}
+        self.internal = {}
+        for group, names in (INTERNAL_SIGNALS if internal_signals is None else internal_signals).items():
+            bound = [(name, bind_signal(dut, name)) for name in names]
+            bound = [(name, signal) for name, signal in bound if signal is not None]
+            if bound:
+                self.internal[group] = bound
+        self.groups = getattr(dut, "fc_cover", {})
+        self.begin()
+
+    def begin(self):
+        """开始记录一个新输入"""
+        self.prev = {name: pin.value for name, pin in self.toggle.items()}
+        self.rise = dict.fromkeys(self.toggle, 0)
+        self.fall = dict.fromkeys(self.toggle, 0)
+        self.values = set()
+        self.hints = self._hints()
+
+    def _hints(self):
+        return {(group_name, point_name, b): hints
+                for group_name, group in self.groups.items()
+                for point_name, point in group.cov_points.items()
+                for b, hints in point["hints"].items()}
+
+    def __call__(self):
+        """采样一个周期"""
+        for name, pin in self.toggle.items():
+            value, prev = pin.value, self.prev[name]
+            self.rise[name] |= value & ~prev
+            self.fall[name] |= prev & ~value
+            self.prev[name] = value
+        for group, signals in self.internal.items():
+            self.values.add(("V", group) + tuple(signal.value for _, signal in signals))
+
+    def features(self):
+        """本输入的覆盖特征集合，功能覆盖组中本输入期间命中次数增加的bin也计入"""
+        result = set(self.values)
+        for name in self.toggle:
+            result.update(("T", name, bit, 1) for bit in _set_bits(self.rise[name]))
+            result.update(("T", name, bit, 0) for bit in _set_bits(self.fall[name]))
+        result.update(("F",) + key for key, hints in self._hints().items() if hints > self.hints.get(key, 0))
+        return result
+
+
+def _set_bits(value):
+    bit = 0
+    while value:
+        if value & 1:
+            yield bit
+        value >>= 1
+        bit += 1
+
+
+class VectorFloatFMAMutator:
+    """按字段变异操作序列
+
+    Args:
+        seed (int, optional): 随机种子，默认为0
+    """
+
+    def __init__(self, seed=0):
+        self.rng = random.Random(seed)
+        self.np_rng = np.random.default_rng(seed)
+        self.stimulus = VectorFloatFMAStimulus(seed=seed)
+
+    def fresh_ops(self, count):
+        """由激励库生成count个操作（默认分布，无气泡）"""
+        return [{'fp_a': a, 'fp_b': b, 'fp_c': c, 'op_code': op, 'fp_format': fmt, 'round_mode': rm, 'gap': 0}
+                for a, b, c, op, fmt, rm in self.stimulus.generate(count)]
+
+    def lane_value(self, fp_format, old):
+        """fp_format格式通道的变异值"""
+        rng = self.rng
+        width, exp_bits, man_bits = FORMAT_FIELDS[fp_format]
+        kind = rng.randrange(6)
+        if kind <= 1:
+            bits, _ = float_lanes(self.np_rng, {rng.choice(VALUE_CLASSES): 1}, 1, fp_format)
+            return int(bits[0])
+        if kind == 2:
+            return old ^ (1 << rng.randrange(width))
+        if kind == 3:
+            exp_max = (1 << exp_bits) - 1
+            exponent = min(max(((old >> man_bits) & exp_max) + rng.choice([-3, -2, -1, 1, 2, 3]), 0), exp_max)
+            return (old & ~(exp_max << man_bits)) | (exponent << man_bits)
+        if kind == 4:
+            return old ^ (1 << (width - 1))
+        man_mask = (1 << man_bits) - 1
+        return (old & ~man_mask) | rng.choice([0, 1, man_mask, 1 << (man_bits - 1), man_mask >> 1])
+
+    def mutate_lane(self, op, field):
+        width = FORMAT_FIELDS[op['fp_format']][0]
+        shift = self.rng.randrange(64 // width) * width
+        old = (op[field] >> shift) & ((1 << width) - 1)
+        new = self.lane_value(op['fp_format'], old)
+        op[field] = (op[field] & ~(((1 << width) - 1) << shift)) | (new << shift)
+
+    def splat_lane(self, op, field):
+        width = FORMAT_FIELDS[op['fp_format']][0]
+        lanes = 64 // width
+        value = (op[field] >> (self.rng.randrange(lanes) * width)) & ((1 << width) - 1)
+        op[field] = sum(value << (i * width) for i in range(lanes))
+
+    def mutate(self, ops, corpus=()):
+        """对ops做1~4次随机变异，返回新的操作列表（不修改ops）
+
+        Args:
+            ops (list): 操作序列
+            corpus (list, optional): 供拼接的其他语料
+
+        Returns:
+            list: 变异后的操作序列
+        """
+        rng = self.rng
+        ops = [dict(op) for op in ops] or self.fresh_ops(1)
+        for _ in range(rng.randint(1, 4)):
+            op = rng.choice(ops)
+            kind = rng.randrange(11)
+            if kind == 0:
+                op['op_code'] = rng.choice(OP_CODES)
+            elif kind == 1:
+                op['fp_format'] = rng.choice(FORMATS)
+            elif kind == 2:
+                op['round_mode'] = rng.choice(ROUND_MODES)
+            elif kind in (3, 4):
+                self.mutate_lane(op, rng.choice(['fp_a', 'fp_b', 'fp_c']))
+            elif kind == 5:
+                self.splat_lane(op, rng.choice(['fp_a', 'fp_b', 'fp_c']))
+            elif kind == 6:
+                op['gap'] = rng.randint(0, MAX_GAP)
+            elif kind == 7 and len(ops) < MAX_OPS:
+                ops.insert(rng.randrange(len(ops) + 1), rng.choice([self.fresh_ops(1)[0], dict(op)]))
+            elif kind == 8 and len(ops) > 1:
+                i, j = rng.randrange(len(ops)), rng.randrange(len(ops))
+                if rng.random() < 0.5:
+                    del ops[i]
+                else:
+                    ops[i], ops[j] = ops[j], ops[i]
+            elif kind == 9 and corpus:
+                other = rng.choice(corpus)
+                ops = ops[:rng.randint(1, len(ops))] + [dict(o) for o in other[rng.randrange(len(other)):]]
+            elif kind == 10:
+                # 加数取自另一操作的乘积项，制造相消
+                op['fp_c'] = rng.choice(ops)['fp_a']
+        return ops[:MAX_OPS]
+
+
+class VectorFloatFMAFuzzer:
+    """覆盖率引导的模糊测试
+
+    Args:
+        env: VectorFloatFMAEnv实例
+        corpus_dir (str, optional): 语料目录，已有语料在构造时载入并重新执行，默认只保存在内存中
+        seed (int, optional): 随机种子，默认为0
+
+    Attributes:
+        corpus (list): 语料中的操作序列
+        seen (set): 已覆盖的特征
+        mismatches (list): 与参考模型不一致的记录
+        executions (int): 已执行的输入数
+    """
+
+    def __init__(self, env, corpus_dir=None, seed=0):
+        self.env = env
+        self.corpus_dir = corpus_dir
+        self.mutator = VectorFloatFMAMutator(seed)
+        self.snapshot = VectorFloatFMAResetSnapshot(env)
+        self.observer = VectorFloatFMACoverageObserver(env)
+        self.corpus = []
+        self.favored = {}   # 特征 -> 覆盖它的最短语料下标
+        self.seen = set()
+        self.mismatches = []
+        self.executions = 0
+        if corpus_dir:
+            os.makedirs(os.path.join(corpus_dir, "crashes"), exist_ok=True)
+            for path in sorted(glob.glob(os.path.join(corpus_dir, "*.json"))):
+                with open(path, encoding="utf-8") as f:
+                    self.add(json.load(f)["ops"], save=False)
+
+    def execute(self, ops):
+        """从快照开始执行一个输入
+
+        Returns:
+            tuple: (覆盖特征集合, 不一致记录列表)
+        """
+        self.snapshot.restore()
+        self.observer.begin()
+        engine = VectorFloatFMAFuzzEngine(self.env, observer=self.observer)
+        for op in ops:
+            engine.issue(op['fp_a'], op['fp_b'], op['fp_c'], op['op_code'], op['fp_format'], op['round_mode'],
+                         gap=op.get('gap', 0))
+        results = engine.drain()
+        self.executions += 1
+        features = self.observer.features()
+        for op, (_, fflags) in zip(ops, results):
+            flags = unpack_fflags([fflags], op['fp_format']).tolist()
+            features.add(("X", op['op_code'], op['fp_format'], op['round_mode'], tuple(flags)))
+        operations = [(op['fp_a'], op['fp_b'], op['fp_c'], op['op_code'], op['fp_format'], op['round_mode'])
+                      for op in ops]
+        return features, ref_VectorFloatFMA_check(operations, results)
+
+    def add(self, ops, save=True):
+        """执行ops，产生新覆盖时加入语料
+
+        Returns:
+            int: 新覆盖的特征数
+        """
+        features, mismatches = self.execute(ops)
+        if mismatches:
+            self.mismatches.extend(mismatches)
+            self._save(ops, os.path.join("crashes", _digest(ops)), len(mismatches))
+        new = features - self.seen
+        if not new:
+            return 0
+        self.seen |= new
+        index = len(self.corpus)
+        self.corpus.append(ops)
+        for feature in features:
+            best = self.favored.get(feature)
+            if best is None or len(ops) < len(self.corpus[best]):
+                self.favored[feature] = index
+        if save:
+            self._save(ops, _digest(ops), len(new))
+        return len(new)
+
+    def _save(self, ops, name, count):
+        if not self.corpus_dir:
+            return
+        with open(os.path.join(self.corpus_dir, name + ".json"), "w", encoding="utf-8") as f:
+            json.dump({"ops": ops, "new": count}, f)
+
+    def pick(self):
+        """挑选待变异的语料：九成取某个特征的最短覆盖输入"""
+        rng = self.mutator.rng
+        if self.favored and rng.random() < 0.9:
+            return self.corpus[rng.choice(sorted(set(self.favored.values())))]
+        return rng.choice(self.corpus)
+
+    def fuzz(self, iterations):
+        """运行iterations轮变异
+
+        Returns:
+            list: 每轮结束时的特征总数
+        """
+        if not self.corpus:
+            self.add(self.mutator.fresh_ops(4))
+        history = []
+        for _ in range(iterations):
+            self.add(self.mutator.mutate(self.pick(), self.corpus))
+            history.append(len(self.seen))
+        return history
+
+    def close(self):
+        self.snapshot.close()
+
+
+def _digest(ops):
+    return hashlib.sha1(json.dumps(ops, sort_keys=True).encode()).hexdigest()[:16]
+
+
+def api_VectorFloatFMA_fuzz(env, iterations=FUZZ_ITERATIONS, corpus_dir=FUZZ_CORPUS_DIR, seed=0):
+    """运行一次覆盖率引导的模糊测试
+
+    Args:
+        env: VectorFloatFMAEnv实例，必须是已初始化的Env实例
+        iterations (int, optional): 变异轮数，默认取环境变量DUT_FUZZ_ITERS（200）
+        corpus_dir (str, optional): 语料目录，默认取环境变量DUT_FUZZ_CORPUS，未设置时不落盘
+        seed (int, optional): 随机种子，默认为0
+
+    Returns:
+        dict: 模糊测试结果
+            - executions (int): 执行的输入数（含载入语料时的重新执行）
+            - corpus (int): 语料大小
+            - features (int): 覆盖的特征数
+            - internal (list): 成功绑定的内部信号
+            - history (list): 每轮结束时的特征总数
+            - mismatches (list): 与参考模型不一致的记录
+
+    Example:
+        >>> res = api_VectorFloatFMA_fuzz(env, iterations=500, corpus_dir="reports/VectorFloatFMA_corpus")
+        >>> print(res['corpus'], res['features'])
+    """
+    fuzzer = VectorFloatFMAFuzzer(env, corpus_dir, seed)
+    try:
+        history = fuzzer.fuzz(iterations)
+    finally:
+        fuzzer.close()
+    return {
+        'executions': fuzzer.executions,
+        'corpus': len(fuzzer.corpus),
+        'features': len(fuzzer.seen),
+        'internal': [name for signals in fuzzer.observer.internal.values() for name, _ in signals],
+        'history': history,
+        'mismatches': fuzzer.mismatches,
+    }
@@ -0,0 +1,306 @@
+#coding=utf-8
+"""
+VectorFloatFMA单次舍入NumPy参考模型
+
+以64位向量字为单位复现VectorFloatFMA的fp_result和20位fflags：每个字按fp_format
+拆为4×f16、2×f32或1×f64通道（通道i位于[w*i+w-1 : w*i]，fflags位于[5*i+4 : 5*i]）。
+
+乘积与加数先以精确整数相加，只在最后舍入一次，因此5种舍入模式、非规格化数和
+NV/OF/UF/NX标志都与RTL逐位一致。精确和的位宽可能超过64位（f64乘积为106位），这一步
+用Python整数对象数组完成，其余字段分解、规格化前后的处理和舍入都是NumPy向量运算。
+
+操作数角色以origin_file中的RTL为准：
+    - op 0~4（vfmul/vfmacc/vfnmacc/vfmsac/vfnmsac）：fp_a × fp_b，加数为fp_c
+    - op 5~8（vfmadd/vfnmadd/vfmsub/vfnmsub）：fp_c × fp_b，加数为fp_a
+    - op 2/4/6/8对乘积取负，op 2/3/6/7对加数取负，vfmul的加数为+0
+    - 任一操作数为NaN时返回规范NaN；sNaN、inf×0、乘积与加数为异号无穷时置NV
+    - 溢出置OF|NX，UF按舍入后检测且仅在不精确时置位
+"""
+
+import numpy as np
+
+
+# fp_format编码 -> (元素位宽, 指数位数, 尾数位数)
+FORMAT_FIELDS = {0b01: (16, 5, 10), 0b10: (32, 8, 23), 0b11: (64, 11, 52)}
+
+# 各格式的规范NaN
+CANONICAL_NAN = {0b01: 0x7E00, 0b10: 0x7FC00000, 0b11: 0x7FF8000000000000}
+
+# 舍入模式编码
+RNE, RTZ, RDN, RUP, RMM = 0, 1, 2, 3, 4
+
+# 单个通道fflags的位定义
+NV, DZ, OF, UF, NX = 0x10, 0x08, 0x04, 0x02, 0x01
+
+# 操作码属性
+_SWAP_A_C = (5, 6, 7, 8)          # 乘数取fp_c、加数取fp_a
+_NEG_PRODUCT = (2, 4, 6, 8)       # 乘积取负
+_NEG_ADDEND = (2, 3, 6, 7)        # 加数取负
+_VFMUL = 0
+
+_bit_length = np.frompyfunc(int.bit_length, 1, 1)
+
+
+def _round_increment(sign, lsb, guard, sticky, round_mode):
+    """按舍入模式计算是否需要进位（参数均为bool数组）"""
+    inexact = guard | sticky
+    return np.select(
+        [round_mode == RNE, round_mode == RTZ, round_mode == RDN, round_mode == RUP, round_mode == RMM],
+        [guard & (sticky | lsb), np.zeros_like(guard), inexact & sign, inexact & ~sign, guard],
+    )
+
+
+def round_pack(sign, exponent, sig, round_mode, fp_format):
+    """将带3位舍入扩展的有效数舍入并打包为目标格式
+
+    有效数sig的最高位应位于bit M+3（M为尾数位数，低3位为guard/round/sticky），
+    exponent为对应的偏置指数；非规格化结果以exponent == 1且sig最高位低于bit M+3表示。
+
+    Args:
+        sign (np.ndarray): 符号位（bool）
+        exponent (np.ndarray): int64偏置指数，至少为1，可以超出格式上限
+        sig (np.ndarray): int64有效数
+        round_mode (np.ndarray): 逐元素舍入模式
+        fp_format (int): 1=f16, 2=f32, 3=f64
+
+    Returns:
+        tuple: (bits, fflags)，uint64结果位模式与uint8标志（OF/UF/NX）
+    """
+    width, exp_bits, man_bits = FORMAT_FIELDS[fp_format]
+    exp_max = (1 << exp_bits) - 1
+    hidden = np.int64(1) << man_bits
+
+    mant = sig >> 3
+    guard = ((sig >> 2) & 1).astype(bool)
+    sticky = (sig & 3) != 0
+    inexact = guard | sticky
+    mant = mant + _round_increment(sign, (mant & 1).astype(bool), guard, sticky, round_mode)
+    carry = mant >> (man_bits + 1)
+    mant = mant >> carry
+    exponent = exponent + carry
+    exp_field = np.where(mant >= hidden, exponent, 0)
+
+    # 舍入后检测下溢：按无界指数在精度M+1处舍入，结果仍小于最小规格化数才算tiny
+    subnormal = sig < (hidden << 3)
+    near_normal = subnormal & (sig >= (hidden << 2))
+    unbounded = (sig >> 2) + _round_increment(sign, ((sig >> 2) & 1).astype(bool), ((sig >> 1) & 1).astype(bool),
+                                              (sig & 1) != 0, round_mode)
+    tiny = subnormal & ~(near_normal & (unbounded >= (hidden << 1)))
+
+    overflow = exp_field >= exp_max
+    # 上溢时向零方向的舍入得到最大有限数，否则得到无穷大
+    to_max = (round_mode == RTZ) | ((round_mode == RDN) & ~sign) | ((round_mode == RUP) & sign)
+    max_finite = (np.uint64(exp_max - 1) << np.uint64(man_bits)) | np.uint64(hidden - 1)
+    infinity = np.uint64(exp_max) << np.uint64(man_bits)
+    bits = (np.minimum(exp_field, exp_max).astype(np.uint64) << np.uint64(man_bits)) | (mant & (hidden - 1)).astype(np.uint64)
+    bits = np.where(overflow, np.where(to_max, max_finite, infinity), bits)
+    bits |= sign.astype(np.uint64) << np.uint64(width - 1)
+
+    fflags = (np.where(overflow, OF | NX, 0) | np.where(inexact, NX, 0) | np.where(tiny & inexact, UF, 0))
+    return bits, fflags.astype(np.uint8)
+
+
+class _Lanes:
+    """一组同格式通道位模式的字段分解"""
+
+    def __init__(self, bits, fp_format):
+        width, exp_bits, man_bits = FORMAT_FIELDS[fp_format]
+        self.bits = bits
+        self.sign = ((bits >> np.uint64(width - 1)) & np.uint64(1)).astype(bool)
+        self.exp = ((bits >> np.uint64(man_bits)) & np.uint64((1 << exp_bits) - 1)).astype(np.int64)
+        self.frac = (bits & np.uint64((1 << man_bits) - 1)).astype(np.int64)
+        exp_ones = self.exp == (1 << exp_bits) - 1
+        self.is_nan = exp_ones & (self.frac != 0)
+        self.is_snan = self.is_nan & ((self.frac >> (man_bits - 1)) & 1 == 0)
+        self.is_inf = exp_ones & (self.frac == 0)
+        self.is_zero = (self.exp == 0) & (self.frac == 0)
+        # 带隐藏位的有效数与有效指数（非规格化数按指数1处理）
+        self.sig = self.frac | ((self.exp != 0).astype(np.int64) << man_bits)
+        self.eff_exp = np.maximum(self.exp, 1)
+
+
+def _fused_round(sign_p, x, y, z, round_mode, fp_format):
+    """精确计算±x*y±z后舍入一次，返回(bits, fflags, exact_zero)"""
+    width, exp_bits, man_bits = FORMAT_FIELDS[fp_format]
+    bias = (1 << (exp_bits - 1)) - 1
+    obj = lambda v: v.astype(object)
+
+    # 乘积与加数各自的最低位权重（以2为底的指数），对齐到较小者后精确相加
+    k_p = x.eff_exp + y.eff_exp - 2 * bias - 2 * man_bits
+    k_c = z.eff_exp - bias - man_bits
+    k = np.minimum(k_p, k_c)
+    product = (obj(x.sig) * obj(y.sig)) << obj(k_p - k)
+    addend = obj(z.sig) << obj(k_c - k)
+    total = np.where(sign_p, -product, product) + np.where(z.sign, -addend, addend)
+
+    sign = (total < 0).astype(bool)
+    mag = np.abs(total)
+    lead = k + _bit_length(mag).astype(np.int64) - 1
+    # 舍入位置：规格化数保留M+1位，非规格化数固定在最小指数处，另留3位guard/round/sticky
+    lsb = np.maximum(lead, 1 - bias) - man_bits - 3
+    shift = k - lsb
+    left = mag << obj(np.maximum(shift, 0))
+    drop = obj(np.maximum(-shift, 0))
+    right = (mag >> drop) | ((mag & ((1 << drop) - 1)) != 0)
+    sig = np.where(shift >= 0, left, right).astype(np.int64)
+    exponent = np.maximum(lead + bias, 1)
+
+    bits, fflags = round_pack(sign, exponent, sig, round_mode, fp_format)
+    return bits, fflags, (mag == 0).astype(bool)
+
+
+def ref_VectorFloatFMA_lanes(op_code, fp_a, fp_b, fp_c, fp_format, round_mode=0):
+    """逐通道参考模型
+
+    Args:
+        op_code (array_like): 逐通道操作码（0~8）
+        fp_a (array_like): 通道A（vs2）的位模式（uint64，仅低w位有效）
+        fp_b (array_like): 通道B（vs1）的位模式
+        fp_c (array_like): 通道C（vd）的位模式
+        fp_format (int): 1=f16, 2=f32, 3=f64，所有通道必须同格式
+        round_mode (array_like, optional): 逐通道舍入模式，默认为0(RNE)
+
+    Returns:
+        tuple: (bits, fflags)，uint64通道结果与uint8通道标志
+
+    Raises:
+        ValueError: 格式、操作码或舍入模式无效时抛出
+    """
+    if fp_format not in FORMAT_FIELDS:
+        raise ValueError(f"无效的fp_format: {fp_format}，应为1(f16)、2(f32)或3(f64)")
+    width = FORMAT_FIELDS[fp_format][0]
+    lane_mask = np.uint64((1 << width) - 1)
+    sign_bit = np.uint64(1) << np.uint64(width - 1)
+    shape = np.broadcast_shapes(np.shape(fp_a), np.shape(fp_b), np.shape(fp_c), np.shape(op_code), np.shape(round_mode))
+    flat = lambda v, dtype: np.broadcast_to(np.asarray(v, dtype=dtype), shape).reshape(-1)
+    fp_a, fp_b, fp_c = (flat(v, np.uint64) & lane_mask for v in (fp_a, fp_b, fp_c))
+    op = flat(op_code, np.int64)
+    rm = flat(round_mode, np.int64)
+    if ((op < 0) | (op > 8)).any():
+        raise ValueError(f"无效的op_code: {np.unique(op[(op < 0) | (op > 8)]).tolist()}，应为0~8")
+    if ((rm < 0) | (rm > RMM)).any():
+        raise ValueError(f"无效的round_mode: {np.unique(rm[(rm < 0) | (rm > RMM)]).tolist()}，应为0~4")
+
+    # 按操作码选择乘数与加数，并施加符号取反
+    swap = np.isin(op, _SWAP_A_C)
+    addend = np.where(swap, fp_a, fp_c) ^ np.where(np.isin(op, _NEG_ADDEND), sign_bit, np.uint64(0))
+    addend = np.where(op == _VFMUL, np.uint64(0), addend)
+    x = _Lanes(np.where(swap, fp_c, fp_a), fp_format)
+    y = _Lanes(fp_b, fp_format)
+    z = _Lanes(addend, fp_format)
+    sign_p = x.sign ^ y.sign ^ np.isin(op, _NEG_PRODUCT)
+
+    bits = np.zeros(op.size, dtype=np.uint64)
+    fflags = np.zeros(op.size, dtype=np.uint8)
+
+    # 常规通路只在非特殊通道上计算
+    inf_times_zero = (x.is_inf & y.is_zero) | (x.is_zero & y.is_inf)
+    has_nan = x.is_nan | y.is_nan | z.is_nan
+    product_inf = x.is_inf | y.is_inf
+    has_inf = product_inf | z.is_inf
+    product_zero = x.is_zero | y.is_zero
+    normal = ~(has_nan | has_inf | product_zero)
+    if normal.any():
+        index = np.flatnonzero(normal)
+        sub = lambda lanes: _Lanes(lanes.bits[index], fp_format)
+        fused_bits, fused_flags, exact_zero = _fused_round(sign_p[index], sub(x), sub(y), sub(z), rm[index], fp_format)
+        # 精确相消：RDN得-0，其余得+0，不置标志
+        bits[index] = np.where(exact_zero, np.where(rm[index] == RDN, sign_bit, np.uint64(0)), fused_bits)
+        fflags[index] = np.where(exact_zero, 0, fused_flags)
+
+    # 乘积为精确零：加数非零时结果即加数，否则按IEEE规则确定零的符号
+    zero_sign = np.where(op == _VFMUL, sign_p, (sign_p & z.sign) | ((rm == RDN) & (sign_p ^ z.sign)))
+    zero_result = np.where(z.is_zero, np.where(zero_sign, sign_bit, np.uint64(0)), z.bits)
+    bits = np.where(product_zero, zero_result, bits)
+    fflags = np.where(product_zero, 0, fflags)
+
+    # 无穷与NaN优先级最高
+    inf_nv = inf_times_zero | (z.is_inf & product_inf & (z.sign != sign_p))
+    inf_sign = np.where(product_inf, sign_p, z.sign)
+    exp_ones = np.uint64(((1 << FORMAT_FIELDS[fp_format][1]) - 1) << FORMAT_FIELDS[fp_format][2])
+    infinity = np.where(inf_sign, sign_bit, np.uint64(0)) | exp_ones
+    canonical = np.uint64(CANONICAL_NAN[fp_format])
+    bits = np.where(has_inf, np.where(inf_nv, canonical, infinity), bits)
+    fflags = np.where(has_inf, np.where(inf_nv, NV, 0), fflags)
+    nan_nv = x.is_snan | y.is_snan | z.is_snan | inf_times_zero
+    bits = np.where(has_nan, canonical, bits)
+    fflags = np.where(has_nan, np.where(nan_nv, NV, 0), fflags)
+    return bits.reshape(shape), fflags.astype(np.uint8).reshape(shape)
+
+
+def ref_VectorFloatFMA_operations(op_code, fp_a, fp_b, fp_c, fp_format=1, round_mode=0):
+    """向量字级参考模型，输入输出与DUT引脚一一对应
+
+    所有参数都可以是标量或等长数组。
+
+    Args:
+        op_code (int | array_like): 操作码（0~8）
+        fp_a (int | array_like): 64位操作数A（vs2）
+        fp_b (int | array_like): 64位操作数B（vs1）
+        fp_c (int | array_like): 64位操作数C（vd）
+        fp_format (int | array_like, optional): 1=f16, 2=f32, 3=f64，默认为1
+        round_mode (int | array_like, optional): 舍入模式，默认为0(RNE)
+
+    Returns:
+        tuple: (fp_result, fflags)，均为uint64数组
+
+    Raises:
+        ValueError: 格式、操作码或舍入模式无效时抛出
+
+    Example:
+        >>> res, flags = ref_VectorFloatFMA_operations(1, 0x40000000, 0x40400000, 0x40800000, fp_format=2)
+        >>> hex(int(res[0]) & 0xFFFFFFFF)
+        '0x41200000'
+    """
+    arrays = [np.asarray(v).reshape(-1) for v in (op_code, fp_a, fp_b, fp_c, fp_format, round_mode)]
+    count = max(v.size for v in arrays)
+    op_code, fp_a, fp_b, fp_c, fp_format, round_mode = [
+        np.broadcast_to(v.astype(np.uint64 if i in (1, 2, 3) else np.int64), (count,)) for i, v in enumerate(arrays)
+    ]
+    invalid = ~np.isin(fp_format, list(FORMAT_FIELDS))
+    if invalid.any():
+        raise ValueError(f"无效的fp_format: {np.unique(fp_format[invalid]).tolist()}，应为1(f16)、2(f32)或3(f64)")
+
+    fp_result = np.zeros(count, dtype=np.uint64)
+    fflags = np.zeros(count, dtype=np.uint64)
+    formats = np.unique(fp_format).tolist()
+    for fmt in formats:
+        index = np.flatnonzero(fp_format == fmt) if len(formats) > 1 else slice(None)
+        width = FORMAT_FIELDS[fmt][0]
+        lane_id = np.arange(64 // width, dtype=np.uint64)
+        shifts = lane_id * np.uint64(width)
+        lane = lambda words: (words[index, None] >> shifts) & np.uint64((1 << width) - 1)
+        bits, flags = ref_VectorFloatFMA_lanes(op_code[index, None], lane(fp_a), lane(fp_b), lane(fp_c), fmt,
+                                               round_mode[index, None])
+        fp_result[index] = np.bitwise_or.reduce(bits << shifts, axis=1)
+        fflags[index] = np.bitwise_or.reduce(flags.astype(np.uint64) << (lane_id * np.uint64(5)), axis=1)
+    return fp_result, fflags
+
+
+def ref_VectorFloatFMA_check(operations, results, fp_format=1, round_mode=0):
+    """用参考模型批量比对api_VectorFloatFMA_batch_operations的结果
+
+    Args:
+        operations (list): 操作序列，元素为(fp_a, fp_b, fp_c, op_code)或
+            (fp_a, fp_b, fp_c, op_code, fp_format, round_mode)
+        results (list): 与operations一一对应的(result, fflags)列表
+        fp_format (int, optional): 四元组操作使用的浮点格式，默认为1
+        round_mode (int, optional): 四元组操作使用的舍入模式，默认为0(RNE)
+
+    Returns:
+        list: 不一致项列表，每项为包含index、输入、DUT输出与期望输出的字典
+    """
+    if not operations:
+        return []
+    rows = [op if len(op) == 6 else (*op, fp_format, round_mode) for op in operations]
+    fp_a, fp_b, fp_c = (np.array([row[i] for row in rows], dtype=np.uint64) for i in range(3))
+    op_code, formats, rounds = (np.array([row[i] for row in rows], dtype=np.int64) for i in range(3, 6))
+    expect_result, expect_fflags = ref_VectorFloatFMA_operations(op_code, fp_a, fp_b, fp_c, formats, rounds)
+    got_result = np.array([res for res, _ in results], dtype=np.uint64)
+    got_fflags = np.array([flags for _, flags in results], dtype=np.uint64)
+    bad = np.flatnonzero((expect_result != got_result) | (expect_fflags != got_fflags))
+    return [{
+        'index': i, 'fp_a': rows[i][0], 'fp_b': rows[i][1], 'fp_c': rows[i][2], 'op_code': rows[i][3],
+        'fp_format': rows[i][4], 'round_mode': rows[i][5], 'result': int(got_result[i]), 'fflags': int(got_fflags[i]),
+        'expect_result': int(expect_result[i]), 'expect_fflags': int(expect_fflags[i]),
+    } for i in bad.tolist()]
@@ -0,0 +1,235 @@
+#coding=utf-8
+"""
+VectorFloatFMA加权约束随机激励库
+
+随机回归以“数据”声明：每个字段给出{取值: 权重}分布，由VectorFloatFMAStimulus按种子
+向量化生成(fp_a, fp_b, fp_c, op_code, fp_format, round_mode)六元组，可一次生成，也可按
+批次流式产出，直接交给api_VectorFloatFMA_batch_operations流水线发射。
+
+支持的字段（未给出的字段使用DEFAULT_SPEC）：
+    - op_code / fp_format / round_mode: {取值: 权重}
+    - fp_a / fp_b / fp_c: 逐通道数值类别分布，类别见VALUE_CLASSES
+    - exp_diff: {d: 权重}，三个操作数都是规格化数时，令加数指数 = 乘积指数 - d，
+      d取0附近可制造相消，取大值可覆盖对阶移出；加数/乘数角色按操作码区分（op 5~8加数为fp_a）
+    - lane_pattern: {'independent': 各通道独立, 'splat': 各通道相同, 'single': 只有一个通道
+      按分布取值、其余通道为规格化数}
+    - sign: 负数比例，默认为0.5
+
+Example:
+    >>> spec = {'op_code': {1: 1, 3: 1}, 'fp_format': {2: 1}, 'exp_diff': {0: 3, 1: 1}}
+    >>> result = api_VectorFloatFMA_run_campaign(env, spec, count=20000, seed=1)
+    >>> assert not result['mismatches']
+"""
+
+import numpy as np
+
+from VectorFloatFMA_api import api_VectorFloatFMA_batch_operations
+from VectorFloatFMA_ref import FORMAT_FIELDS, ref_VectorFloatFMA_check
+
+
+# 逐通道数值类别
+VALUE_CLASSES = ('zero', 'subnormal', 'min_normal', 'normal', 'near_one', 'huge', 'max_finite',
+                 'inf', 'qnan', 'snan')
+
+# 类别中属于有限规格化数、可以被exp_diff调整指数的部分
+_NORMAL_CLASSES = ('normal', 'near_one', 'huge')
+
+DEFAULT_SPEC = {
+    'op_code': {op: 1 for op in range(9)},
+    'fp_format': {1: 1, 2: 1, 3: 1},
+    'round_mode': {0: 1, 1: 1, 2: 1, 3: 1, 4: 1},
+    'fp_a': {'normal': 6, 'near_one': 2, 'subnormal': 1, 'zero': 1, 'huge': 1, 'inf': 0.2, 'qnan': 0.2, 'snan': 0.2},
+    'fp_b': {'normal': 6, 'near_one': 2, 'subnormal': 1, 'zero': 1, 'huge': 1, 'inf': 0.2, 'qnan': 0.2, 'snan': 0.2},
+    'fp_c': {'normal': 6, 'near_one': 2, 'subnormal': 1, 'zero': 1, 'huge': 1, 'inf': 0.2, 'qnan': 0.2, 'snan': 0.2},
+    'exp_diff': None,
+    'lane_pattern': {'independent': 8, 'splat': 1, 'single': 1},
+    'sign': 0.5,
+}
+
+
+def weighted_choice(rng, weights, size):
+    """按{取值: 权重}独立抽样
+
+    Args:
+        rng (np.random.Generator): 随机数发生器
+        weights (dict): {取值: 权重}，权重非负且和大于0
+        size (int): 抽样个数
+
+    Returns:
+        np.ndarray: 取值数组
+
+    Raises:
+        ValueError: 权重无效时抛出
+    """
+    keys = list(weights)
+    p = np.array([weights[k] for k in keys], dtype=float)
+    if not keys or (p < 0).any() or p.sum() <= 0:
+        raise ValueError(f"无效的权重分布: {weights}")
+    return np.asarray(keys)[rng.choice(len(keys), size=size, p=p / p.sum())]
+
+
+def float_lanes(rng, classes, count, fp_format, negative=0.5):
+    """按数值类别分布生成浮点通道位模式
+
+    Args:
+        rng (np.random.Generator): 随机数发生器
+        classes (dict): {类别: 权重}，类别见VALUE_CLASSES
+        count (int): 通道个数
+        fp_format (int): 1=f16, 2=f32, 3=f64
+        negative (float, optional): 负数比例，默认为0.5
+
+    Returns:
+        tuple: (位模式uint64数组, 类别数组)
+    """
+    unknown = set(classes) - set(VALUE_CLASSES)
+    if unknown:
+        raise ValueError(f"未知的数值类别: {sorted(unknown)}，可选: {VALUE_CLASSES}")
+    width, exp_bits, man_bits = FORMAT_FIELDS[fp_format]
+    exp_max = (1 << exp_bits) - 1
+    bias = exp_max >> 1
+    quiet = np.uint64(1 << (man_bits - 1))
+
+    kind = weighted_choice(rng, classes, count)
+    frac = rng.integers(0, 1 << man_bits, count, dtype=np.uint64)
+    exponent = np.select(
+        [kind == 'zero', kind == 'subnormal', kind == 'min_normal', kind == 'near_one', kind == 'huge',
+         kind == 'max_finite', np.isin(kind, ('inf', 'qnan', 'snan'))],
+        [0, 0, 1, rng.integers(bias - 2, bias + 3, count), rng.integers(exp_max - 3, exp_max, count),
+         exp_max - 1, exp_max],
+        rng.integers(1, exp_max, count),
+    ).astype(np.uint64)
+    frac = np.select(
+        [np.isin(kind, ('zero', 'min_normal', 'inf')), kind == 'subnormal', kind == 'max_finite',
+         kind == 'qnan', kind == 'snan'],
+        [np.uint64(0), np.maximum(frac, np.uint64(1)), np.uint64((1 << man_bits) - 1),
+         frac | quiet, np.maximum(frac & ~quiet, np.uint64(1))],
+        frac,
+    ).astype(np.uint64)
+    sign = (rng.random(count) < negative).astype(np.uint64)
+    return (sign << np.uint64(width - 1)) | (exponent << np.uint64(man_bits)) | frac, kind
+
+
+class VectorFloatFMAStimulus:
+    """可设定种子的加权约束随机激励发生器
+
+    Attributes:
+        spec (dict): 合并默认值后的分布声明
+        rng (np.random.Generator): 随机数发生器，连续调用generate/stream会继续同一随机序列
+    """
+
+    def __init__(self, spec=None, seed=0):
+        """
+        Args:
+            spec (dict, optional): 分布声明，未给出的字段取DEFAULT_SPEC
+            seed (int, optional): 随机种子，默认为0
+        """
+        unknown = set(spec or {}) - set(DEFAULT_SPEC)
+        if unknown:
+            raise ValueError(f"未知的激励字段: {sorted(unknown)}")
+        self.spec = dict(DEFAULT_SPEC, **(spec or {}))
+        self.rng = np.random.default_rng(seed)
+
+    def _operands(self, ops, fp_format):
+        """为同一格式的一组操作生成三个操作数的64位向量字"""
+        spec, rng = self.spec, self.rng
+        width, exp_bits, man_bits = FORMAT_FIELDS[fp_format]
+        lanes = 64 // width
+        count = len(ops) * lanes
+        values, kinds = {}, {}
+        for name in ('fp_a', 'fp_b', 'fp_c'):
+            values[name], kinds[name] = float_lanes(rng, spec[name], count, fp_format, spec['sign'])
+
+        if spec['exp_diff']:
+            # 加数指数 = 乘数指数之和 - bias - d，op 5~8的乘数为(fp_c, fp_b)、加数为fp_a
+            bias = (1 << (exp_bits - 1)) - 1
+            exp_max = (1 << exp_bits) - 1
+            swap = np.repeat(ops >= 5, lanes)
+            mul = np.where(swap, values['fp_c'], values['fp_a'])
+            add = np.where(swap, values['fp_a'], values['fp_c'])
+            exp_of = lambda v: ((v >> np.uint64(man_bits)) & np.uint64(exp_max)).astype(np.int64)
+            target = exp_of(mul) + exp_of(values['fp_b']) - bias - weighted_choice(rng, spec['exp_diff'], count)
+            normal = np.ones(count, dtype=bool)
+            for name in ('fp_a', 'fp_b', 'fp_c'):
+                normal &= np.isin(kinds[name], _NORMAL_CLASSES)
+            field = np.uint64(exp_max << man_bits)
+            adjusted = (add & ~field) | (np.clip(target, 1, exp_max - 1).astype(np.uint64) << np.uint64(man_bits))
+            add = np.where(normal, adjusted, add)
+            values['fp_a'] = np.where(swap, add, values['fp_a'])
+            values['fp_c'] = np.where(swap, values['fp_c'], add)
+
+        pattern = weighted_choice(rng, spec['lane_pattern'], len(ops))
+        shifts = np.arange(lanes, dtype=np.uint64) * np.uint64(width)
+        keep = rng.integers(0, lanes, len(ops))
+        words = []
+        for name in ('fp_a', 'fp_b', 'fp_c'):
+            grid = values[name].reshape(-1, lanes)
+            splat = pattern == 'splat'
+            grid[splat] = grid[splat, :1]
+            single = np.flatnonzero(pattern == 'single')
+            if single.size:
+                background, _ = float_lanes(rng, {'normal': 1}, single.size * lanes, fp_format, spec['sign'])
+                background = background.reshape(-1, lanes)
+                background[np.arange(single.size), keep[single]] = grid[single, keep[single]]
+                grid[single] = background
+            words.append(np.bitwise_or.reduce(grid << shifts, axis=1))
+        return words
+
+    def generate(self, count):
+        """生成count个操作
+
+        Returns:
+            list: (fp_a, fp_b, fp_c, op_code, fp_format, round_mode)六元组列表
+        """
+        spec, rng = self.spec, self.rng
+        ops = weighted_choice(rng, spec['op_code'], count).astype(np.int64)
+        formats = weighted_choice(rng, spec['fp_format'], count).astype(np.int64)
+        rounds = weighted_choice(rng, spec['round_mode'], count).astype(np.int64)
+        columns = np.zeros((3, count), dtype=np.uint64)
+        for fp_format in np.unique(formats).tolist():
+            index = np.flatnonzero(formats == fp_format)
+            columns[:, index] = self._operands(ops[index], fp_format)
+        return list(zip(*(c.tolist() for c in columns), ops.tolist(), formats.tolist(), rounds.tolist()))
+
+    def stream(self, count, batch=1024):
+        """按批次流式产出共count个操作，每批为generate(batch)的结果
+
+        相同的种子和批大小产生相同的操作序列。
+        """
+        while count > 0:
+            size = min(batch, count)
+            count -= size
+            yield self.generate(size)
+
+
+def api_VectorFloatFMA_run_campaign(env, spec=None, count=10000, seed=0, batch=1024):
+    """按分布声明运行一次定向随机回归，并用参考模型逐批比对
+
+    Args:
+        env: VectorFloatFMAEnv实例，必须是已初始化的Env实例
+        spec (dict, optional): 分布声明，见模块说明
+        count (int, optional): 操作总数，默认为10000
+        seed (int, optional): 随机种子，默认为0
+        batch (int, optional): 每批发射的操作数，默认为1024
+
+    Returns:
+        dict: 回归结果
+            - count (int): 已发射的操作数
+            - mismatches (list): 与参考模型不一致的项，index为全局序号
+
+    Example:
+        >>> res = api_VectorFloatFMA_run_campaign(env, {'fp_format': {3: 1}}, count=4096)
+        >>> res['mismatches'][:1]
+    """
+    stimulus = VectorFloatFMAStimulus(spec, seed)
+    issued = 0
+    mismatches = []
+    for operations in stimulus.stream(count, batch):
+        results = api_VectorFloatFMA_batch_operations(env, operations)
+        for item in ref_VectorFloatFMA_check(operations, results):
+            item['index'] += issued
+            mismatches.append(item)
+        issued += len(operations)
+    return {
+        'count': issued,
+        'mismatches': mismatches,
+    }
@@ -0,0 +1,125 @@
+#coding=utf-8
+"""
+VectorFloatFMA多变体加载与事务广播
+
+同名的Picker包无法在同一进程中共存，因此各变体以`--tname <变体名>`单独导出（类名为
+DUT<变体名>，例如DUTVectorFloatFMA_bug_2）：
+
+    make build_variants DUT=VectorFloatFMA
+
+VectorFloatFMAVariantRunner在一个Python进程中加载多个变体，为每个变体创建独立的DUT和VectorFloatFMAEnv，
+把同一个API调用（同一份激励）广播到所有变体并与origin的结果比较。筛查5个bug版本只需一次
+解释器启动、一次用例收集和一次激励生成。
+
+Example:
+    >>> runner = VectorFloatFMAVariantRunner(bugs=[1, 2, 3, 4, 5])
+    >>> ops = VectorFloatFMAStimulus(seed=1).generate(2000)
+    >>> runner.screen(api_VectorFloatFMA_batch_operations, ops)
+    {'VectorFloatFMA_bug_1': 57, ...}
+    >>> runner.finish()
+"""
+
+import os
+
+from diff_cosim import load_variant_class
+from VectorFloatFMA_api import VectorFloatFMAEnv
+
+
+# 变体Picker包的父目录，可用环境变量DUT_VARIANT_DIR覆盖
+VARIANT_DIR = os.environ.get("DUT_VARIANT_DIR", os.path.normpath(os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "..", "..", "..", "..", "..", "dutcache", "diff")))
+
+
+def create_variant_env(dut_class):
+    """创建一个变体的DUT并封装为VectorFloatFMAEnv（与dut fixture相同的时钟配置，不采样覆盖率）"""
+    dut = dut_class()
+    dut.InitClock("clock")
+    return VectorFloatFMAEnv(dut)
+
+
+def result_key(result):
+    """广播比较时使用的结果：批量API返回的(result, fflags)元组已只含功能输出，直接比较"""
+    return result
+
+
+class VectorFloatFMAVariantRunner:
+    """在同一进程中驱动多个VectorFloatFMA变体，把每个事务广播到全部变体
+
+    Attributes:
+        envs (dict): {变体名: VectorFloatFMAEnv}，origin（参考）排在第一位
+        reference (str): 参考变体名
+    """
+
+    def __init__(self, bugs=(1, 2, 3, 4, 5), variants=None, variant_dir=None):
+        """
+        Args:
+            bugs (iterable, optional): 参与广播的Bug编号，默认为1~5
+            variants (list, optional): 直接指定变体名列表（第一个为参考），给出时忽略bugs
+            variant_dir (str, optional): 变体Picker包的父目录，默认为VARIANT_DIR
+        """
+        names = list(variants) if variants else ["VectorFloatFMA_origin"] + [f"VectorFloatFMA_bug_{b}" for b in bugs]
+        self.reference = names[0]
+        self.envs = {name: create_variant_env(load_variant_class(name, variant_dir or VARIANT_DIR)) for name in names}
+
+    @property
+    def variants(self):
+        """参考变体之外的变体名列表"""
+        return [name for name in self.envs if name != self.reference]
+
+    def broadcast(self, api, *args, **kwargs):
+        """在每个变体的Env上执行同一个API调用
+
+        Args:
+            api (callable): api_VectorFloatFMA_*函数，第一个参数为env
+            *args, **kwargs: 传给api的其余参数
+
+        Returns:
+            dict: {变体名: 返回值或异常实例}
+        """
+        results = {}
+        for name, env in self.envs.items():
+            try:
+                results[name] = api(env, *args, **kwargs)
+            except Exception as e:
+                results[name] = e
+        return results
+
+    def screen(self, api, *args, key=result_key, **kwargs):
+        """广播一次API调用，返回与参考变体结果不同的变体
+
+        Args:
+            api (callable): api_VectorFloatFMA_*函数
+            key (callable, optional): 比较前对返回值的投影，默认为result_key
+
+        Returns:
+            dict: {变体名: 首个不同结果的序号（返回值为列表时）、-1（整体不同）或异常实例}
+
+        Raises:
+            Exception: 参考变体本身执行失败时抛出其异常
+        """
+        results = self.broadcast(api, *args, **kwargs)
+        expect = results[self.reference]
+        if isinstance(expect, Exception):
+            raise expect
+        expect = key(expect)
+        diverged = {}
+        for name in self.variants:
+            actual = results[name]
+            if isinstance(actual, Exception):
+                diverged[name] = actual
+                continue
+            actual = key(actual)
+            if actual == expect:
+                continue
+            if isinstance(expect, list) and isinstance(actual, list):
+                diverged[name] = next((i for i, (a, b) in enumerate(zip(actual, expect)) if a != b),
+                                      min(len(actual), len(expect)))
+            else:
+                diverged[name] = -1
+        return diverged
+
+    def finish(self):
+        """释放全部变体的DUT"""
+        for env in self.envs.values():
+            env.dut.Finish()
+        self.envs.clear()
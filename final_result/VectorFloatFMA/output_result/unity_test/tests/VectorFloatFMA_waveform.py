@@ -0,0 +1,137 @@
+#coding=utf-8
+"""
+VectorFloatFMA波形策略
+
+create_dut原先为每个用例调用SetWaveform，通过的用例也要承担完整的FST写盘开销。环境变量DUT_WAVEFORM
+选择波形策略：
+
+    on      每个用例生成FST波形（默认，与原行为一致）
+    off     不生成波形
+    window  不生成FST，在内存中滚动保留最近DUT_WAVEFORM_WINDOW个周期（默认2000）的顶层引脚取值，
+            用例失败时写出为VCD（data/<用例名>.window.vcd）
+    rerun   首次运行不生成波形；make在有用例失败时以pytest --lf（按缓存中失败用例的nodeid）再运行一遍，
+            这一遍设置DUT_WAVEFORM_RERUN=1，以相同随机种子重跑失败用例并生成FST，报告写到单独的rerun目录
+
+    DUT_WAVEFORM=window pytest -n 8
+    make unity_test DUT=VectorFloatFMA WAVE=rerun
+
+window模式只记录顶层引脚，不含内部信号。rerun模式的确定性依赖激励由种子决定：该模式下conftest在每个
+用例开始前按nodeid为random和numpy.random设置种子，重跑未复现失败的用例在终端摘要中列出。以-w编译的DUT构造后即开始写波形，
+off/window/rerun模式下由create_dut调用CloseWaveform关闭。
+"""
+
+import os
+import random
+import zlib
+from collections import deque
+
+
+WAVEFORM_MODES = ("on", "off", "window", "rerun")
+WAVEFORM_MODE = os.environ.get("DUT_WAVEFORM", "on")
+WAVEFORM_WINDOW = int(os.environ.get("DUT_WAVEFORM_WINDOW", "2000"))
+# rerun模式的第二遍（只运行上一遍失败的用例，生成FST）
+WAVEFORM_RERUN_PASS = os.environ.get("DUT_WAVEFORM_RERUN", "0") not in ("", "0")
+
+if WAVEFORM_MODE not in WAVEFORM_MODES:
+    raise ValueError(f"DUT_WAVEFORM={WAVEFORM_MODE}无效，可选: {', '.join(WAVEFORM_MODES)}")
+
+# window模式记录的顶层引脚及位宽（不含clock，VCD中的时钟按周期生成）
+PIN_WIDTHS = {
+    "reset": 1,
+    "io_fire": 1,
+    "io_fp_a": 64,
+    "io_fp_b": 64,
+    "io_fp_c": 64,
+    "io_uop_idx": 1,
+    "io_widen_a": 64,
+    "io_widen_b": 64,
+    "io_round_mode": 3,
+    "io_fp_format": 2,
+    "io_op_code": 4,
+    "io_frs1": 64,
+    "io_is_vec": 1,
+    "io_is_frs1": 1,
+    "io_res_widening": 1,
+    "io_fp_result": 64,
+    "io_fflags": 20,
+    "io_fp_aIsFpCanonicalNAN": 1,
+    "io_fp_bIsFpCanonicalNAN": 1,
+    "io_fp_cIsFpCanonicalNAN": 1,
+}
+
+
+def waveform_enabled(request):
+    """当前用例是否生成FST波形：on模式总是生成，rerun模式只在失败用例的第二遍运行中生成"""
+    if WAVEFORM_MODE == "on":
+        return True
+    return WAVEFORM_MODE == "rerun" and WAVEFORM_RERUN_PASS
+
+
+def seed_test(nodeid):
+    """按用例nodeid固定random与numpy.random的种子"""
+    seed = zlib.crc32(nodeid.encode())
+    random.seed(seed)
+    try:
+        import numpy as np
+        np.random.seed(seed)
+    except ImportError:
+        pass
+
+
+class PinWindowRecorder:
+    """滚动窗口的顶层引脚记录器，作为StepRis回调每个上升沿记录一次
+
+    Args:
+        dut: DUT实例
+        window (int, optional): 保留的周期数，默认为DUT_WAVEFORM_WINDOW
+
+    Example:
+        >>> recorder = PinWindowRecorder(dut, window=500)
+        >>> dut.StepRis(recorder)
+        >>> recorder.dump_vcd("data/test_xxx.window.vcd")
+    """
+
+    def __init__(self, dut, window=WAVEFORM_WINDOW):
+        self.pins = [getattr(dut, name) for name in PIN_WIDTHS]
+        self.cycles = 0
+        self.window = deque(maxlen=window)
+
+    def __call__(self, _cycle=None):
+        self.cycles += 1
+        self.window.append((self.cycles, tuple(pin.value for pin in self.pins)))
+
+    def dump_vcd(self, path):
+        """把窗口内的引脚取值写为VCD（时间单位为半个时钟周期）
+
+        Returns:
+            str: 写出的文件路径；窗口为空时不写文件，返回None
+        """
+        if not self.window:
+            return None
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        codes = [_vcd_code(i + 1) for i in range(len(PIN_WIDTHS))]
+        with open(path, "w") as f:
+            f.write("$timescale 1ns $end\n$scope module VectorFloatFMA $end\n")
+            f.write(f"$var wire 1 {_vcd_code(0)} clock $end\n")
+            for code, (name, width) in zip(codes, PIN_WIDTHS.items()):
+                f.write(f"$var wire {width} {code} {name} $end\n")
+            f.write("$upscope $end\n$enddefinitions $end\n")
+            last = None
+            for cycle, values in self.window:
+                f.write(f"#{cycle * 2}\n1{_vcd_code(0)}\n")
+                for i, (code, width, value) in enumerate(zip(codes, PIN_WIDTHS.values(), values)):
+                    if last is None or last[i] != value:
+                        f.write(f"{value & 1}{code}\n" if width == 1 else f"b{value:b} {code}\n")
+                f.write(f"#{cycle * 2 + 1}\n0{_vcd_code(0)}\n")
+                last = values
+        return path
+
+
+def _vcd_code(index):
+    """VCD标识符：可打印字符!~组成的短编码"""
+    code = ""
+    while True:
+        code += chr(33 + index % 94)
+        index //= 94
+        if index == 0:
+            return code
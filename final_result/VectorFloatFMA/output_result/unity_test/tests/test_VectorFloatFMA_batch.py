@@ -0,0 +1,62 @@
+#coding=utf-8
+
+from VectorFloatFMA_api import *  # 重要，必须用 import *， 而不是 import env，不然会出现 dut 没定义错误
+import pytest
+import random
+
+
+def test_api_VectorFloatFMA_calibrate_latency(env):
+    """测试流水线延迟标定"""
+    env.dut.fc_cover["FG-API"].mark_function(
+        "FC-PIPELINE",
+        test_api_VectorFloatFMA_calibrate_latency,
+        ["CK-LATENCY", "CK-CONTINUOUS"]
+    )
+
+    latencies = [env.calibrate_latency(fp_format) for fp_format in (1, 2, 3)]
+    assert latencies[0] >= 1, "延迟应至少为1个周期"
+    assert len(set(latencies)) == 1, f"各格式共用同一流水线，延迟应一致: {latencies}"
+    assert env.latency == latencies[0]
+
+
+def test_api_VectorFloatFMA_batch_matches_single(env):
+    """测试批量执行结果与逐个执行一致，且逐操作切换op_code/格式/舍入模式"""
+    env.dut.fc_cover["FG-API"].mark_function(
+        "FC-PIPELINE",
+        test_api_VectorFloatFMA_batch_matches_single,
+        ["CK-CONTINUOUS", "CK-BUBBLE"]
+    )
+
+    rng = random.Random(2512)
+    ops = [(rng.getrandbits(64), rng.getrandbits(64), rng.getrandbits(64),
+            rng.randrange(9), rng.choice([1, 2, 3]), rng.randrange(5)) for _ in range(64)]
+
+    results = api_VectorFloatFMA_batch_operations(env, ops)
+    assert len(results) == len(ops)
+
+    for idx, (op, batch_result) in enumerate(zip(ops, results)):
+        fp_a, fp_b, fp_c, op_code, fp_format, round_mode = op
+        expect = api_VectorFloatFMA_fma_operation(env, fp_a, fp_b, fp_c, op_code,
+                                                  fp_format=fp_format, round_mode=round_mode)
+        assert batch_result == expect, \
+            f"第{idx}个操作批量结果(0x{batch_result[0]:x}, 0x{batch_result[1]:x})与单次结果(0x{expect[0]:x}, 0x{expect[1]:x})不一致"
+
+
+def test_api_VectorFloatFMA_batch_throughput(env):
+    """测试批量模式每周期完成一个操作"""
+    env.dut.fc_cover["FG-API"].mark_function(
+        "FC-PIPELINE",
+        test_api_VectorFloatFMA_batch_throughput,
+        ["CK-CONTINUOUS"]
+    )
+
+    count = 1000
+    ops = [(0x40000000, 0x40400000, 0x40800000, 1)] * count  # 2.0 × 3.0 + 4.0 = 10.0
+    engine = VectorFloatFMABatchEngine(env)
+    for op in ops:
+        engine.issue(*op, fp_format=2)
+    results = engine.drain()
+
+    assert len(results) == count
+    assert all(result & 0xFFFFFFFF == 0x41200000 for result, _ in results), "2.0 × 3.0 + 4.0 应为 10.0"
+    assert engine.cycles == count + env.latency - 1, "除流水线填充外不应有额外周期"
@@ -0,0 +1,51 @@
+#coding=utf-8
+
+from VectorFloatFMA_api import *  # 重要，必须用 import *， 而不是 import env，不然会出现 dut 没定义错误
+from VectorFloatFMA_bulk import *
+import pytest
+import numpy as np
+
+
+def test_api_VectorFloatFMA_bulk_exact_macc(env):
+    """测试批量vfmacc：小整数乘加在三种格式下均精确，结果应与NumPy一致且无异常标志"""
+    for func, checks in (("FC-FP16-FULL", ["CK-FP16-ALL-OPS"]),
+                         ("FC-FP32-FULL", ["CK-FP32-ALL-OPS"]),
+                         ("FC-FP64-FULL", ["CK-FP64-ALL-OPS"])):
+        env.dut.fc_cover["FG-MULTI-PRECISION"].mark_function(func, test_api_VectorFloatFMA_bulk_exact_macc, checks)
+
+    rng = np.random.default_rng(2512)
+    for dtype, fp_format in ((np.float16, 1), (np.float32, 2), (np.float64, 3)):
+        # 元素数不是通道数的整数倍，覆盖末尾补0
+        a = rng.integers(0, 30, 101).astype(dtype)
+        b = rng.integers(0, 30, 101).astype(dtype)
+        c = rng.integers(0, 100, 101).astype(dtype)
+        bits, fflags = api_VectorFloatFMA_bulk_operations(env, 1, a, b, c)
+        assert np.array_equal(from_bits(bits, fp_format), a * b + c), f"格式{fp_format}批量乘加结果错误"
+        assert not fflags.any(), f"格式{fp_format}精确乘加不应产生异常标志"
+
+
+def test_api_VectorFloatFMA_bulk_matches_single(env):
+    """测试逐元素op/格式/舍入列混合时，批量结果与逐个执行的对应通道一致"""
+    env.dut.fc_cover["FG-API"].mark_function(
+        "FC-PIPELINE",
+        test_api_VectorFloatFMA_bulk_matches_single,
+        ["CK-CONTINUOUS"]
+    )
+
+    rng = np.random.default_rng(2512)
+    count = 48
+    formats = rng.choice([1, 2, 3], count)
+    ops = rng.integers(0, 9, count)
+    rounds = rng.integers(0, 5, count)
+    masks = np.array([0, 0xFFFF, 0xFFFFFFFF, 0xFFFFFFFFFFFFFFFF], dtype=np.uint64)[formats]
+    a, b, c = (rng.integers(0, 1 << 64, count, dtype=np.uint64) & masks for _ in range(3))
+
+    bits, fflags = api_VectorFloatFMA_bulk_operations(env, ops, a, b, c, fp_format=formats, round_mode=rounds)
+
+    for i in range(count):
+        width = FORMAT_WIDTH[int(formats[i])]
+        # 单个元素放在通道0，其余通道为0
+        result, flags = api_VectorFloatFMA_fma_operation(env, int(a[i]), int(b[i]), int(c[i]), int(ops[i]),
+                                                         fp_format=int(formats[i]), round_mode=int(rounds[i]))
+        assert int(bits[i]) == result & ((1 << width) - 1), f"第{i}个元素结果不一致"
+        assert int(fflags[i]) == flags & 0x1F, f"第{i}个元素fflags不一致"
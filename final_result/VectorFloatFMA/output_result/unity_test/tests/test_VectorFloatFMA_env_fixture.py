@@ -378,3 +378,25 @@ def test_api_VectorFloatFMA_env_bundle_set_all(env):
     
     # 其他信号应保持为0
     assert env.inputs.op_code.value == 0, "其他信号应保持不变"
+
+
+def test_api_VectorFloatFMA_env_coverage_sampler(env):
+    """测试边沿触发采样器：fire有效及翻转的周期评估检查点，空闲周期跳过"""
+    env.dut.fc_cover["FG-API"].mark_function(
+        "FC-PIPELINE",
+        test_api_VectorFloatFMA_env_coverage_sampler,
+        ["CK-CONTINUOUS", "CK-BUBBLE"]
+    )
+
+    sampler = env.dut.fc_sampler
+    env.clear_fire()
+    env.Step(2)
+    idle_start = sampler.sampled_cycles
+    env.Step(100)
+    assert sampler.sampled_cycles == idle_start, "fire保持为0时不应评估检查点"
+
+    api_VectorFloatFMA_batch_operations(env, [(0x40000000, 0x40400000, 0x40800000, 1)] * 4, fp_format=2)
+    point = env.dut.fc_cover["FG-API"].cover_point("FC-PIPELINE")
+    assert point["hints"]["CK-CONTINUOUS"] >= 4, "连续发射的每个周期都应被采样"
+    assert point["hints"]["CK-BUBBLE"] > 0, "fire拉低的边沿应被采样"
+    assert sampler.sampled_cycles < sampler.cycles
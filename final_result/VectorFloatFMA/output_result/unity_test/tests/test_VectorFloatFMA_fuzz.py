@@ -0,0 +1,51 @@
+#coding=utf-8
+"""
+VectorFloatFMA覆盖率引导的模糊测试
+
+make fuzz会设置DUT_FUZZ_CORPUS/DUT_FUZZ_ITERS，语料在多次运行间累积；未设置时语料只放在临时目录
+"""
+
+from VectorFloatFMA_api import *  # 重要，必须用 import *， 而不是 import env，不然会出现 dut 没定义错误
+from VectorFloatFMA_fuzz import *
+
+
+def test_api_VectorFloatFMA_fuzz_mutator_fields():
+    """测试变异按种子可复现，且变异后的操作字段都在合法范围内"""
+    def run(seed):
+        mutator = VectorFloatFMAMutator(seed)
+        ops, history = mutator.fresh_ops(3), []
+        for _ in range(300):
+            ops = mutator.mutate(ops, history)
+            history.append(ops)
+        return history
+
+    history = run(5)
+    assert history == run(5), "相同种子应得到相同的变异序列"
+    for ops in history:
+        assert 1 <= len(ops) <= MAX_OPS, "操作数应在1~MAX_OPS之间"
+        for op in ops:
+            assert op['op_code'] in OP_CODES and op['fp_format'] in FORMATS and op['round_mode'] in ROUND_MODES, \
+                "op_code/fp_format/round_mode应为合法取值"
+            assert all(0 <= op[name] < 1 << 64 for name in ('fp_a', 'fp_b', 'fp_c')), "操作数应为64位"
+            assert 0 <= op['gap'] <= MAX_GAP, "气泡周期应在取值范围内"
+
+
+def test_api_VectorFloatFMA_fuzz_campaign(env, tmp_path):
+    """测试带气泡的模糊测试结果与参考模型一致，语料落盘并可在下次运行时载入
+
+    Args:
+        env: Env fixture实例，由pytest自动注入
+        tmp_path: pytest临时目录，未设置DUT_FUZZ_CORPUS时存放语料
+    """
+    env.dut.fc_cover["FG-API"].mark_function("FC-PIPELINE", test_api_VectorFloatFMA_fuzz_campaign,
+                                              ["CK-CONTINUOUS", "CK-BUBBLE"])
+
+    corpus_dir = FUZZ_CORPUS_DIR or str(tmp_path / "corpus")
+    result = api_VectorFloatFMA_fuzz(env, iterations=FUZZ_ITERATIONS, corpus_dir=corpus_dir, seed=1)
+    assert not result['mismatches'], \
+        f"{len(result['mismatches'])}个操作与参考模型不一致，输入保存在{corpus_dir}/crashes，首个: {result['mismatches'][0]}"
+    assert result['history'] == sorted(result['history']), "特征总数应单调不减"
+    assert result['corpus'] > 1, "应有变异输入产生新覆盖"
+
+    again = api_VectorFloatFMA_fuzz(env, iterations=1, corpus_dir=corpus_dir, seed=2)
+    assert again['executions'] > result['corpus'], "语料应在构造时载入并重新执行"
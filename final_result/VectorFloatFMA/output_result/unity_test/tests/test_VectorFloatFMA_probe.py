@@ -0,0 +1,67 @@
+#coding=utf-8
+"""
+VectorFloatFMA内部信号探针测试：按层次名绑定舍入级寄存器并逐周期采样
+"""
+
+import numpy as np
+
+from VectorFloatFMA_api import *  # 重要，必须用 import *， 而不是 import env，不然会出现 dut 没定义错误
+from VectorFloatFMA_probe import round_probe_names
+
+
+def _round_probe(env, lane="f64", depth=PROBE_DEPTH):
+    probe = env.probe(round_probe_names(lane), depth=depth)
+    if probe.missing:
+        env.remove_probe(probe)
+        pytest.skip(f"DUT未以--rw导出内部信号: {probe.missing[0]}")
+    return probe
+
+
+def test_api_VectorFloatFMA_probe_ring_buffer(env):
+    """测试每次Step采样一次，环形缓冲区只保留最近depth个周期，移除后停止采样
+
+    Args:
+        env: Env fixture实例，由pytest自动注入
+    """
+    env.dut.fc_cover["FG-API"].mark_function("FC-PIPELINE", test_api_VectorFloatFMA_probe_ring_buffer, ["CK-CONTINUOUS"])
+
+    probe = _round_probe(env, depth=8)
+    env.Step(5)
+    env.Step(15)
+    assert probe.count == 20 and len(probe) == 8, "每个周期应采样一次，缓冲区只保留最近8个"
+    assert probe.cycles.tolist() == list(range(13, 21)), "应按时间顺序返回最近8个周期"
+    assert probe["sticky_f64_reg2"].dtype == np.uint64
+    assert set(probe.to_dict()) == {"cycle"} | set(probe.names)
+
+    env.remove_probe(probe)
+    env.Step(3)
+    assert probe.count == 20, "移除后不应再采样"
+
+    alias = env.probe({"sticky": "sticky_f64_reg2"}, strict=True)
+    env.Step(1)
+    assert alias.names == ["sticky"] and alias.last("sticky") == alias["sticky"][-1], "应按别名读取"
+    with pytest.raises(KeyError):
+        env.probe(["no_such_reg"], strict=True)
+
+
+def test_api_VectorFloatFMA_probe_round_regs(env):
+    """测试非精确结果期间f64舍入位寄存器置位，NaN操作数期间has_nan置位
+
+    Args:
+        env: Env fixture实例，由pytest自动注入
+    """
+    env.dut.fc_cover["FG-EXCEPTION-FLAGS"].mark_function("FC-FLAG-INEXACT", test_api_VectorFloatFMA_probe_round_regs,
+                                                         ["CK-NX-ROUND"])
+
+    probe = _round_probe(env)
+    third = 0x3FD5555555555555  # 1/3的f64近似
+    _, fflags = api_VectorFloatFMA_fmacc(env, third, third, 0, fp_format=0b11)
+    assert fflags & 0x1, f"1/3*1/3应为非精确结果，fflags={fflags:#x}"
+    round_bits = probe["sticky_f64_reg2"] | probe["guard_lshift_f64_reg2"] | probe["round_lshift_f64_reg2"]
+    assert round_bits.any(), "非精确结果期间sticky/guard/round应有置位"
+    assert not probe["has_nan_f64_reg2"].any(), "普通操作数不应置位has_nan"
+
+    count = probe.count
+    api_VectorFloatFMA_fmacc(env, 0x7FF8000000000000, third, 0, fp_format=0b11)
+    assert probe.count > count, "运算期间应继续采样"
+    assert probe["has_nan_f64_reg2"][-(probe.count - count):].any(), "NaN操作数期间has_nan应置位"
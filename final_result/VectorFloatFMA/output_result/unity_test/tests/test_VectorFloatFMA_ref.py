@@ -0,0 +1,138 @@
+#coding=utf-8
+
+from VectorFloatFMA_api import *  # 重要，必须用 import *， 而不是 import env，不然会出现 dut 没定义错误
+from VectorFloatFMA_ref import *
+import pytest
+import numpy as np
+
+
+# 各格式的特殊值：±0、最小/最大非规格化数、最小/最大规格化数、1.0、1.5、±inf、qNaN、sNaN
+SPECIAL_VALUES = {
+    1: [0x0000, 0x0001, 0x03FF, 0x0400, 0x7BFF, 0x3C00, 0x3E00, 0x7C00, 0x7E00, 0x7C01],
+    2: [0x00000000, 0x00000001, 0x007FFFFF, 0x00800000, 0x7F7FFFFF, 0x3F800000, 0x3FC00000,
+        0x7F800000, 0x7FC00000, 0x7F800001],
+    3: [0x0000000000000000, 0x0000000000000001, 0x000FFFFFFFFFFFFF, 0x0010000000000000,
+        0x7FEFFFFFFFFFFFFF, 0x3FF0000000000000, 0x3FF8000000000000, 0x7FF0000000000000,
+        0x7FF8000000000000, 0x7FF0000000000001],
+}
+
+
+def _random_lanes(rng, count, fp_format):
+    """生成偏向边界指数的随机通道值：非规格化、接近上溢和接近1.0的指数各占一部分"""
+    width, exp_bits, man_bits = FORMAT_FIELDS[fp_format]
+    exp_max = (1 << exp_bits) - 1
+    bias = exp_max >> 1
+    # 0: 均匀分布（不含inf/NaN） 1: 非规格化数 2: 接近上溢 3: 接近1.0，乘加容易相消
+    kind = rng.choice(4, count, p=[0.4, 0.15, 0.15, 0.3])
+    exponent = np.select(
+        [kind == 0, kind == 1, kind == 2],
+        [rng.integers(0, exp_max, count), 0, rng.integers(exp_max - 3, exp_max, count)],
+        rng.integers(bias - 3, bias + 3, count),
+    ).astype(np.uint64)
+    fraction = rng.integers(0, 1 << man_bits, count, dtype=np.uint64)
+    sign = rng.integers(0, 2, count, dtype=np.uint64)
+    return (sign << np.uint64(width - 1)) | (exponent << np.uint64(man_bits)) | fraction
+
+
+def _pack(lanes, fp_format):
+    width = FORMAT_FIELDS[fp_format][0]
+    shifts = np.arange(64 // width, dtype=np.uint64) * np.uint64(width)
+    return np.bitwise_or.reduce(lanes.reshape(-1, 64 // width) << shifts, axis=1)
+
+
+def test_api_VectorFloatFMA_ref_random_campaign(env):
+    """测试随机流水线激励下九种操作码、三种格式和五种舍入模式的结果与参考模型逐位一致
+
+    Args:
+        env: Env fixture实例，由pytest自动注入
+    """
+    for func in ("FC-VFMACC", "FC-VFNMACC", "FC-VFMSAC", "FC-VFNMSAC",
+                 "FC-VFMADD", "FC-VFNMADD", "FC-VFMSUB", "FC-VFNMSUB"):
+        env.dut.fc_cover["FG-FUSED-MULTIPLY-ADD"].mark_function(func, test_api_VectorFloatFMA_ref_random_campaign,
+                                                                ["CK-BASIC"])
+    for func, checks in (("FC-FP16-FULL", ["CK-FP16-ALL-OPS", "CK-FP16-ROUNDING"]),
+                         ("FC-FP32-FULL", ["CK-FP32-ALL-OPS", "CK-FP32-ROUNDING", "CK-FP32-PRECISION"]),
+                         ("FC-FP64-FULL", ["CK-FP64-ALL-OPS", "CK-FP64-ROUNDING", "CK-FP64-PRECISION"])):
+        env.dut.fc_cover["FG-MULTI-PRECISION"].mark_function(func, test_api_VectorFloatFMA_ref_random_campaign, checks)
+
+    rng = np.random.default_rng(2512)
+    count = 600
+    operations = []
+    for fp_format in (1, 2, 3):
+        lanes = count * (64 // FORMAT_FIELDS[fp_format][0])
+        words = [_pack(_random_lanes(rng, lanes, fp_format), fp_format) for _ in range(3)]
+        ops = rng.integers(0, 9, count)
+        rounds = rng.integers(0, 5, count)
+        operations += list(zip(*(w.tolist() for w in words), ops.tolist(), [fp_format] * count, rounds.tolist()))
+
+    results = api_VectorFloatFMA_batch_operations(env, operations)
+    mismatches = ref_VectorFloatFMA_check(operations, results)
+    assert not mismatches, \
+        f"{len(mismatches)}个操作与参考模型不一致，首个: " + \
+        ", ".join(f"{k}={v:#x}" for k, v in mismatches[0].items())
+
+
+def test_api_VectorFloatFMA_ref_special_values(env):
+    """测试特殊值三元组合在各操作码下的结果和fflags与参考模型一致
+
+    Args:
+        env: Env fixture实例，由pytest自动注入
+    """
+    env.dut.fc_cover["FG-SPECIAL-VALUES"].mark_function("FC-NAN", test_api_VectorFloatFMA_ref_special_values,
+                                                         ["CK-NAN-PROP-A", "CK-NAN-PROP-B", "CK-NAN-PROP-C",
+                                                          "CK-NAN-GEN-0INF", "CK-NAN-GEN-INFSUB", "CK-QNAN", "CK-SNAN"])
+    env.dut.fc_cover["FG-SPECIAL-VALUES"].mark_function("FC-ZERO", test_api_VectorFloatFMA_ref_special_values,
+                                                         ["CK-ZERO-MUL", "CK-ZERO-ADD", "CK-ZERO-SIGN-RULE"])
+
+    for fp_format in (1, 2, 3):
+        width = FORMAT_FIELDS[fp_format][0]
+        values = SPECIAL_VALUES[fp_format]
+        values = np.array(values + [v | (1 << (width - 1)) for v in values], dtype=np.uint64)
+        grid = np.stack(np.meshgrid(values, values, values, indexing="ij"), axis=-1).reshape(-1, 3)
+        pad = (-len(grid)) % (64 // width)
+        grid = np.concatenate([grid, np.zeros((pad, 3), dtype=np.uint64)])
+        words = [_pack(grid[:, i], fp_format) for i in range(3)]
+        for op_code in (1, 2, 5, 7):
+            operations = [(a, b, c, op_code, fp_format, 2 if op_code == 2 else 0)
+                          for a, b, c in zip(*(w.tolist() for w in words))]
+            results = api_VectorFloatFMA_batch_operations(env, operations)
+            mismatches = ref_VectorFloatFMA_check(operations, results)
+            assert not mismatches, \
+                f"格式{fp_format} op={op_code}有{len(mismatches)}个特殊值组合与参考模型不一致，首个: " + \
+                ", ".join(f"{k}={v:#x}" for k, v in mismatches[0].items())
+
+
+def test_api_VectorFloatFMA_ref_flag_boundaries(env):
+    """测试上溢、舍入后下溢和不精确边界在5种舍入模式下与参考模型一致
+
+    Args:
+        env: Env fixture实例，由pytest自动注入
+    """
+    env.dut.fc_cover["FG-EXCEPTION-FLAGS"].mark_function("FC-FLAG-OVERFLOW", test_api_VectorFloatFMA_ref_flag_boundaries,
+                                                          ["CK-OF-MUL", "CK-OF-ROUND"])
+    env.dut.fc_cover["FG-EXCEPTION-FLAGS"].mark_function("FC-FLAG-UNDERFLOW", test_api_VectorFloatFMA_ref_flag_boundaries,
+                                                          ["CK-UF-MUL", "CK-UF-DENORM"])
+    env.dut.fc_cover["FG-EXCEPTION-FLAGS"].mark_function("FC-FLAG-INEXACT", test_api_VectorFloatFMA_ref_flag_boundaries,
+                                                          ["CK-NX-ROUND", "CK-NX-OVERFLOW", "CK-NX-UNDERFLOW"])
+
+    operations = []
+    for fp_format in (1, 2, 3):
+        width, exp_bits, man_bits = FORMAT_FIELDS[fp_format]
+        bias = (1 << (exp_bits - 1)) - 1
+        one = bias << man_bits
+        min_normal = 1 << man_bits
+        # 1 - 2^-(M+1)：与最小规格化数相乘后恰好落在下溢判定的舍入边界上
+        below_one = ((bias - 1) << man_bits) | ((1 << man_bits) - 1)
+        max_finite = ((1 << exp_bits) - 2) << man_bits | ((1 << man_bits) - 1)
+        two = (bias + 1) << man_bits
+        splat = lambda v: sum(v << (i * width) for i in range(64 // width))
+        for round_mode in range(5):
+            for a, b, c, op in ((min_normal, below_one, 0, 0), (min_normal, one | 1, 0, 0), (max_finite, two, 0, 0),
+                                (max_finite, one | 1, max_finite, 1), (min_normal | 1, below_one, 1, 3), (one | 1, one | 1, one, 3)):
+                operations.append((splat(a), splat(b), splat(c), op, fp_format, round_mode))
+
+    results = api_VectorFloatFMA_batch_operations(env, operations)
+    assert not ref_VectorFloatFMA_check(operations, results), "标志边界结果与参考模型不一致"
+    flags = [flag for _, flag in results]
+    assert any(flag & OF for flag in flags), "边界用例应触发OF"
+    assert any(flag & UF for flag in flags), "边界用例应触发UF"
@@ -0,0 +1,85 @@
+#coding=utf-8
+"""
+VectorFloatFMA复位后状态快照测试
+
+DUT未以--savable编译时快照不可用，restore()退化为env.reset()，以下用例在两种构建下都应通过
+"""
+
+from VectorFloatFMA_api import *
+from VectorFloatFMA_snapshot import VectorFloatFMAResetSnapshot
+
+
+def _coverage_hits(dut):
+    """全部功能覆盖组中各bin的累计命中次数之和"""
+    return sum(bin_["hints"] for group in dut.fc_cover.values()
+               for point in group.as_dict()["points"] for bin_ in point["bins"])
+
+
+def test_api_VectorFloatFMA_snapshot_restore_pipeline(env):
+    """测试流水线中留有运算时恢复快照，输出回到快照时刻且之后的运算结果与首次一致
+
+    Args:
+        env: Env fixture实例，由pytest自动注入
+    """
+    env.dut.fc_cover["FG-API"].mark_function("FC-PIPELINE", test_api_VectorFloatFMA_snapshot_restore_pipeline, ["CK-CONTINUOUS"])
+
+    snapshot = VectorFloatFMAResetSnapshot(env)
+    try:
+        outputs = (env.outputs.fp_result.value, env.outputs.fflags.value)
+        expected = api_VectorFloatFMA_multiply(env, 0x3F000000, 0x3F000000, fp_format=2)
+        # 不等结果就恢复，模拟模糊测试中途放弃的一轮输入
+        env.configure_operation(op_code=0, fp_format=3)
+        env.set_operands(0x7FF0000000000001, 0x4000000000000000, 0)
+        env.fire_operation()
+        env.Step(1)
+
+        assert snapshot.restore() == snapshot.supported
+        if snapshot.supported:
+            # 流水级寄存器复位不会清除，只有快照恢复能保证输出回到快照时刻
+            assert (env.outputs.fp_result.value, env.outputs.fflags.value) == outputs, "恢复后输出应与快照时刻一致"
+        assert env.inputs.fire.value == 0 and env.inputs.is_vec.value == 1, "输入引脚应恢复为快照时的取值"
+        assert api_VectorFloatFMA_multiply(env, 0x3F000000, 0x3F000000, fp_format=2) == expected, \
+            "恢复后的运算结果应与首次一致"
+    finally:
+        snapshot.close()
+
+
+def test_api_VectorFloatFMA_snapshot_repeated_restore(env):
+    """测试多次恢复快照后同一输入得到相同结果
+
+    Args:
+        env: Env fixture实例，由pytest自动注入
+    """
+    env.dut.fc_cover["FG-API"].mark_function("FC-PIPELINE", test_api_VectorFloatFMA_snapshot_repeated_restore, ["CK-CONTINUOUS"])
+
+    snapshot = VectorFloatFMAResetSnapshot(env)
+    try:
+        results = []
+        for _ in range(3):
+            snapshot.restore()
+            results.append(api_VectorFloatFMA_fmacc(env, 0x4000, 0x3C00, 0x3C00, fp_format=1))
+        assert results == [results[0]] * 3, f"多次恢复后结果不一致: {results}"
+        assert snapshot.restores == (3 if snapshot.supported else 0)
+    finally:
+        snapshot.close()
+
+
+def test_api_VectorFloatFMA_snapshot_coverage_accumulates(env):
+    """测试恢复快照不回退功能覆盖率计数，每次恢复后的运算继续累加命中次数
+
+    Args:
+        env: Env fixture实例，由pytest自动注入
+    """
+    env.dut.fc_cover["FG-API"].mark_function("FC-PIPELINE", test_api_VectorFloatFMA_snapshot_coverage_accumulates, ["CK-CONTINUOUS"])
+
+    snapshot = VectorFloatFMAResetSnapshot(env)
+    try:
+        counts = [_coverage_hits(env.dut)]
+        for _ in range(3):
+            api_VectorFloatFMA_fmacc(env, 0x4000, 0x3C00, 0x3C00, fp_format=1)
+            counts.append(_coverage_hits(env.dut))
+            snapshot.restore()
+            assert _coverage_hits(env.dut) >= counts[-1], "恢复快照不应回退功能覆盖率计数"
+        assert all(a < b for a, b in zip(counts, counts[1:])), f"每次恢复后的运算都应继续累加命中次数: {counts}"
+    finally:
+        snapshot.close()
@@ -0,0 +1,70 @@
+#coding=utf-8
+
+from VectorFloatFMA_api import *  # 重要，必须用 import *， 而不是 import env，不然会出现 dut 没定义错误
+from VectorFloatFMA_stimulus import *
+import pytest
+import numpy as np
+
+
+# 乘积与加数指数相同或相差1，制造大量相消和舍入后下溢
+CANCELLATION_SPEC = {
+    'op_code': {1: 1, 3: 1, 5: 1, 7: 1},
+    'fp_a': {'normal': 2, 'near_one': 3},
+    'fp_b': {'near_one': 1},
+    'fp_c': {'normal': 2, 'near_one': 3},
+    'exp_diff': {0: 4, 1: 2, -1: 1},
+    'lane_pattern': {'independent': 1},
+}
+
+
+def test_api_VectorFloatFMA_stimulus_constraints():
+    """测试激励按种子可复现，且exp_diff按操作码角色约束加数指数"""
+    spec = dict(CANCELLATION_SPEC, fp_format={2: 1}, exp_diff={0: 1})
+    ops = VectorFloatFMAStimulus(spec, seed=7).generate(200)
+    assert ops == VectorFloatFMAStimulus(spec, seed=7).generate(200), "相同种子应生成相同的激励"
+
+    exp = lambda v, i: (v >> (32 * i + 23)) & 0xFF
+    for fp_a, fp_b, fp_c, op_code, fp_format, round_mode in ops:
+        assert op_code in CANCELLATION_SPEC['op_code'] and fp_format == 2, "操作码和格式应只取分布中的值"
+        mul, add = (fp_c, fp_a) if op_code >= 5 else (fp_a, fp_c)
+        for i in range(2):
+            target = exp(mul, i) + exp(fp_b, i) - 127
+            if 1 <= target <= 254:
+                assert exp(add, i) == target, f"op={op_code}通道{i}的加数指数应与乘积指数相同"
+
+
+def test_api_VectorFloatFMA_stimulus_cancellation_campaign(env):
+    """测试以数据声明的相消定向随机回归与参考模型一致
+
+    Args:
+        env: Env fixture实例，由pytest自动注入
+    """
+    env.dut.fc_cover["FG-EXCEPTION-FLAGS"].mark_function("FC-FLAG-UNDERFLOW", test_api_VectorFloatFMA_stimulus_cancellation_campaign,
+                                                          ["CK-UF-SUB"])
+    env.dut.fc_cover["FG-SPECIAL-VALUES"].mark_function("FC-ZERO", test_api_VectorFloatFMA_stimulus_cancellation_campaign,
+                                                         ["CK-ZERO-SIGN-RULE"])
+
+    result = api_VectorFloatFMA_run_campaign(env, CANCELLATION_SPEC, count=2000, seed=2, batch=500)
+    assert result['count'] == 2000, "应发射全部操作"
+    assert not result['mismatches'], \
+        f"{len(result['mismatches'])}个操作与参考模型不一致，首个: " + \
+        ", ".join(f"{k}={v:#x}" for k, v in result['mismatches'][0].items())
+
+
+def test_api_VectorFloatFMA_stimulus_default_campaign(env):
+    """测试默认分布（全部操作码、格式、舍入模式和特殊值类别）的回归与参考模型一致
+
+    Args:
+        env: Env fixture实例，由pytest自动注入
+    """
+    env.dut.fc_cover["FG-MULTI-PRECISION"].mark_function("FC-FP16-FULL", test_api_VectorFloatFMA_stimulus_default_campaign,
+                                                          ["CK-FP16-SPECIAL"])
+    env.dut.fc_cover["FG-MULTI-PRECISION"].mark_function("FC-FP32-FULL", test_api_VectorFloatFMA_stimulus_default_campaign,
+                                                          ["CK-FP32-SPECIAL"])
+    env.dut.fc_cover["FG-MULTI-PRECISION"].mark_function("FC-FP64-FULL", test_api_VectorFloatFMA_stimulus_default_campaign,
+                                                          ["CK-FP64-SPECIAL"])
+
+    result = api_VectorFloatFMA_run_campaign(env, count=2000, seed=3, batch=500)
+    assert not result['mismatches'], \
+        f"{len(result['mismatches'])}个操作与参考模型不一致，首个: " + \
+        ", ".join(f"{k}={v:#x}" for k, v in result['mismatches'][0].items())
@@ -2,14 +2,20 @@
 
 import pytest
 from VectorIdiv_function_coverage_def import get_coverage_groups
+from coverage_sampler import CoverageSampler
+from VectorIdiv_waveform import WAVEFORM_MODE, WAVEFORM_RERUN_PASS, PinWindowRecorder, waveform_enabled
+from VectorIdiv_probe import PROBE_DEPTH, VectorIdivSignalProbe
 from toffee_test.reporter import set_func_coverage, set_line_coverage, get_file_in_tmp_dir
 from toffee_test.reporter import set_user_info, set_title_info
 from toffee import Bundle, Signals, Signal
+from line_cov_index import write_owner
 
 # import your dut module here
 from VectorIdiv import DUTVectorIdiv  # Replace with the actual DUT class import
 
 import os
+import random
+from collections import deque
 
 
 def current_path_file(file_name):
@@ -30,6 +36,12 @@ def get_waveform_path(request, new_path:bool):
     return get_file_in_tmp_dir(request, current_path_file("data/"), f"{tc_name}.fst",  new_path=new_path)
 
 
+def get_window_waveform_path(request):
+    # DUT_WAVEFORM=window时，用例失败后写出的滚动窗口VCD
+    tc_name = request.node.name if request is not None else "VectorIdiv"
+    return get_file_in_tmp_dir(request, current_path_file("data/"), f"{tc_name}.window.vcd",  new_path=True)
+
+
 def create_dut(request):
     """
     创建VectorIdiv DUT实例的工厂函数
@@ -43,8 +55,11 @@ def create_dut(request):
     # 设置覆盖率生成文件(必须设置覆盖率文件，否则无法统计覆盖率，导致测试失败)
     dut.SetCoverage(get_coverage_data_path(request, new_path=True))
 
-    # 设置波形生成文件
-    dut.SetWaveform(get_waveform_path(request, new_path=True))
+    # 设置波形生成文件（按DUT_WAVEFORM策略，off/window模式及rerun的首次运行不生成FST）
+    if waveform_enabled(request):
+        dut.SetWaveform(get_waveform_path(request, new_path=True))
+    elif hasattr(dut, "CloseWaveform"):
+        dut.CloseWaveform()  # 以-w编译的DUT构造后即开始写波形
 
     # VectorIdiv是时序电路，需要配置时钟
     # 注意：这里不进行时钟绑定，时钟绑定在dut fixture中进行
@@ -54,27 +69,51 @@ def create_dut(request):
 
 
 @pytest.fixture(scope="function") # 用scope="function"确保每个测试用例都创建了一个全新的DUT
-def dut(request):
-    """VectorIdiv DUT fixture，管理测试的完整生命周期"""
+def dut(request, dut_pool):
+    """VectorIdiv DUT fixture，管理测试的完整生命周期
+
+    DUT_POOL=1时dut_pool为VectorIdivDUTPool，DUT从实例池取出（已复位并通过状态卫生检查），
+    用例结束后归还（按DUT_POOL_LINE_COV轮换代码行覆盖率），详见VectorIdiv_pool.py
+    """
     # 第1步：创建DUT实例
-    dut = create_dut(request)                         # 创建DUT
+    # rerun模式的失败重跑需要带波形的新实例，不使用实例池
+    rerun = WAVEFORM_MODE == "rerun" and WAVEFORM_RERUN_PASS
+    slot = dut_pool.acquire(request) if dut_pool is not None and not rerun else None
+    dut = create_dut(request) if slot is None else slot.dut  # 创建DUT
     func_coverage_group = get_coverage_groups(dut)
     
     # 第2步：配置时钟（VectorIdiv是时序电路）
-    # 根据VectorIdiv_top.sv和__init__.py，时钟信号名为"clock"
-    dut.InitClock("clock")
+    # 根据VectorIdiv_top.sv和__init__.py，时钟信号名为"clock"（池中的实例在新建时已配置）
+    if slot is None:
+        dut.InitClock("clock")
 
     # 第3步：设置覆盖率采样回调
     # 上升沿采样，StepRis也适用于组合电路用dut.Step推进时采样
     # 必须要有g.sample()采样覆盖组，如何不在StepRis/StepFail中采样，则需要在test function中手动调用，否则无法统计覆盖率导致失败
-    dut.StepRis(lambda _: [g.sample()
-                           for g in
-                           func_coverage_group])
+    # 仅在div_in/div_out握手、或复位/flush/握手信号翻转的周期评估检查点，引脚每周期只读一次
+    sampler = CoverageSampler(dut, func_coverage_group,
+                              trigger=lambda s: (s.io_div_in_valid.value == 1 and s.io_div_in_ready.value == 1)
+                                      or (s.io_div_out_valid.value == 1 and s.io_div_out_ready.value == 1),
+                              edge_pins=["reset", "io_flush", "io_div_in_ready", "io_div_out_valid"])
+    if slot is None:
+        dut.StepRis(sampler)
+    else:
+        slot.sampler = sampler  # 池中实例的StepRis回调转发给本用例的采样器
+
+    # DUT_WAVEFORM=window时在内存中滚动记录顶层引脚，用例失败时写出VCD
+    recorder = PinWindowRecorder(dut) if WAVEFORM_MODE == "window" else None
+    if recorder is not None:
+        if slot is None:
+            dut.StepRis(recorder)
+        else:
+            slot.recorder = recorder
 
     # 第4步：绑定覆盖率组到DUT实例
     # 以属性名称fc_cover保存覆盖组到DUT
     setattr(dut, "fc_cover",
             {g.name:g for g in func_coverage_group})
+    # 采样器同样挂到DUT上，便于查看采样周期统计
+    setattr(dut, "fc_sampler", sampler)
 
     # 第5步：返回DUT实例给测试函数
     yield dut
@@ -83,9 +122,19 @@ def dut(request):
     # 通过set_func_coverage把覆盖组传递给toffee_test
     set_func_coverage(request, func_coverage_group)
 
+    # rep_call由conftest中的pytest_runtest_makereport记录
+    report = getattr(request.node, "rep_call", None)
+    if recorder is not None and report is not None and report.failed:
+        recorder.dump_vcd(get_window_waveform_path(request))
+
     # 设置需要收集的代码行覆盖率文件(获取已有路径new_path=False) 向toffee_test传代码行递覆盖率数据
     # 代码行覆盖率 ignore 文件的固定路径为当前文件所在目录下的：VectorIdiv.ignore，请不要改变
-    set_line_coverage(request, get_coverage_data_path(request, new_path=False), ignore=current_path_file("VectorIdiv.ignore"))
+    # 池中的实例在退役时才写出.dat：DUT_POOL_LINE_COV=test时每个用例归还即退役，.dat只属于本用例；
+    # summary时.dat累计了实例服务的全部用例，只由首个使用它的用例登记一次以计入汇总行覆盖率（见VectorIdiv_pool.py）
+    if slot is None:
+        set_line_coverage(request, get_coverage_data_path(request, new_path=False), ignore=current_path_file("VectorIdiv.ignore"))
+    elif dut_pool.line_cov == "test" or slot.uses == 1:
+        set_line_coverage(request, slot.datfile, ignore=current_path_file("VectorIdiv.ignore"))
 
     # 设置用户信息到报告
     set_user_info("UCAgent-25.11.22.dev2+gc92ac64e0", "unitychip@bosc.ac.cn")
@@ -94,7 +143,12 @@ def dut(request):
     # 第7步：清理资源
     for g in func_coverage_group:                        # 清空覆盖组统计
         g.clear()                                        
-    dut.Finish()                                         # 清理DUT，每个DUT class 都有 Finish 方法
+    if slot is None:
+        dut.Finish()                                     # 清理DUT，每个DUT class 都有 Finish 方法
+        # 在.dat旁记录写出它的用例，供line_cov_index按nodeid归属
+        write_owner(get_coverage_data_path(request, new_path=False), [request.node.nodeid])
+    else:
+        dut_pool.release(slot)                           # 归还实例池，下次取出前复位
 
 
 # 定义VectorIdiv的基础引脚Bundle类
@@ -124,31 +178,178 @@ class VectorIdivOutputBundle(Bundle):
     div_out_q_v, div_out_rem_v = Signals(2)  # io_div_out_q_v, io_div_out_rem_v
 
 
-class _MockComponent:
-    """轻量Mock，用于满足fixture测试要求，不参与真实计算。"""
+class VectorIdivTransactionEngine:
+    """VectorIdiv事务引擎：输入/输出队列直连真实握手，驱动器+监视器+有序记分板
+
+    - 驱动器：input_queue非空时把队首操作挂到输入引脚并拉高div_in_valid，
+      在div_in_ready为1的时钟沿完成握手后立即挂上下一个操作，不插入空闲周期
+    - 监视器：div_out_ready常为1，div_out_valid为1的时钟沿读取商/余数/d_zero
+    - 记分板：VectorIdiv按接收顺序输出，完成结果与在途操作按FIFO顺序一一匹配，
+      可选的checker给出期望的商/余数/d_zero并记录不一致项
+
+    为兼容原有用例，保留input_queue/output_queue/pipeline_stalls/push_input/pop_output/reset接口。
 
-    def __init__(self):
-        self.input_queue = []
-        self.output_queue = []
+    Example:
+        >>> engine = env.engine
+        >>> for a, b in ops:
+        ...     engine.push_input(a, b, sew=2, sign=0)
+        >>> results = engine.run()
+        >>> print(engine.throughput(results))
+    """
+
+    def __init__(self, env, checker=None):
+        self.env = env
+        self.checker = checker  # checker(record) -> (quotient, remainder, d_zero) 或 None
+        self.input_queue = deque()   # 待发送的操作
+        self.output_queue = deque()  # 已完成且通过记分板匹配的结果
+        self.inflight = deque()      # 已握手、尚未输出的操作
+        self.mismatches = []
+        self.pipeline_stalls = 0     # valid=1但ready=0的周期数
+        self.next_tag = 0
+        self.cycles = 0
+        self._driving = None         # 当前挂在输入引脚上的操作
+
+    def reset(self):
+        """清空队列与统计，不驱动任何引脚"""
+        self.input_queue.clear()
+        self.output_queue.clear()
+        self.inflight.clear()
+        self.mismatches.clear()
         self.pipeline_stalls = 0
+        self.next_tag = 0
+        self.cycles = 0
+        self._driving = None
 
     def push_input(self, dividend, divisor, sew=2, sign=0):
+        """将操作放入输入队列，返回分配的tag"""
+        tag = self.next_tag
+        self.next_tag += 1
         self.input_queue.append({
+            'tag': tag,
             'dividend': dividend,
             'divisor': divisor,
             'sew': sew,
             'sign': sign
         })
+        return tag
 
     def pop_output(self):
+        """按完成顺序弹出一个结果，队列为空时返回None"""
         if not self.output_queue:
             return None
-        return self.output_queue.pop(0)
+        return self.output_queue.popleft()
+
+    def idle(self):
+        """输入队列、输入引脚与在途操作均为空"""
+        return not self.input_queue and self._driving is None and not self.inflight
+
+    def _drive(self):
+        """驱动器：输入引脚空闲时挂上队首操作"""
+        env = self.env
+        if self._driving is None and self.input_queue:
+            op = self.input_queue.popleft()
+            env.basic.sew.value = op['sew']
+            env.basic.sign.value = op['sign']
+            env.input.dividend_v.value = op['dividend']
+            env.input.divisor_v.value = op['divisor']
+            self._driving = op
+        env.div_control.div_in_valid.value = 1 if self._driving is not None else 0
+
+    def step(self):
+        """推进一个时钟周期，在时钟沿前采样两侧握手"""
+        env = self.env
+        self._drive()
+        env.div_control.div_out_ready.value = 1
+
+        in_fire = self._driving is not None and env.div_control.div_in_ready.value == 1
+        out_fire = env.div_control.div_out_valid.value == 1
+        if self._driving is not None and not in_fire:
+            self.pipeline_stalls += 1
+        if out_fire:
+            raw = (env.output.div_out_q_v.value, env.output.div_out_rem_v.value, env.basic.d_zero.value)
+
+        env.Step(1)
+        self.cycles += 1
+
+        if in_fire:
+            op = self._driving
+            op['accept_cycle'] = self.cycles
+            self.inflight.append(op)
+            self._driving = None
+        if out_fire:
+            self._score(*raw)
+        # 握手完成的同一周期挂上下一个操作，ready再次拉高时即可被接收
+        self._drive()
+
+    def _score(self, raw_q, raw_r, d_zero):
+        """记分板：按FIFO顺序匹配输出与在途操作"""
+        if not self.inflight:
+            raise RuntimeError(f"第{self.cycles}周期出现无对应输入的输出: q=0x{raw_q:x}")
+        record = self.inflight.popleft()
+        record.update({
+            'quotient': raw_q,
+            'remainder': raw_r,
+            'd_zero': d_zero,
+            'complete_cycle': self.cycles,
+            'latency': self.cycles - record['accept_cycle'],
+        })
+        if self.checker is not None:
+            expect = self.checker(record)
+            if expect is not None and tuple(expect) != (raw_q, raw_r, d_zero):
+                self.mismatches.append((record, tuple(expect)))
+        self.output_queue.append(record)
 
-    def reset(self):
-        self.input_queue.clear()
+    def _progress(self):
+        """(未被接收的操作数, 在途操作数)，任一侧握手都会使其变化"""
+        return (len(self.input_queue) + (self._driving is not None), len(self.inflight))
+
+    def run(self, timeout=1000):
+        """运行直至全部操作完成，返回按tag排序的结果记录
+
+        Args:
+            timeout (int): 连续无进展（无握手）的最大周期数
+
+        Raises:
+            TimeoutError: 超过timeout个周期没有任何握手时抛出
+        """
+        idle_cycles = 0
+        progress = self._progress()
+        while not self.idle():
+            self.step()
+            current = self._progress()
+            if current != progress:
+                progress, idle_cycles = current, 0
+            else:
+                idle_cycles += 1
+                if idle_cycles >= timeout:
+                    self.env.div_control.div_in_valid.value = 0
+                    raise TimeoutError(f"事务引擎{timeout}个周期无握手进展，剩余{len(self.input_queue)}个待发送、{len(self.inflight)}个在途")
+        self.env.div_control.div_in_valid.value = 0
+        results = list(self.output_queue)
         self.output_queue.clear()
-        self.pipeline_stalls = 0
+        return sorted(results, key=lambda rec: rec['tag'])
+
+    def throughput(self, results):
+        """按SEW统计吞吐率
+
+        Args:
+            results (list): run()返回的结果记录
+
+        Returns:
+            dict: {sew: {'ops', 'cycles', 'ops_per_cycle', 'avg_latency'}}
+        """
+        stats = {}
+        for sew in sorted({rec['sew'] for rec in results}):
+            recs = [rec for rec in results if rec['sew'] == sew]
+            # 从首个操作被接收到最后一个完成所占用的周期
+            span = max(rec['complete_cycle'] for rec in recs) - min(rec['accept_cycle'] for rec in recs) + 1
+            stats[sew] = {
+                'ops': len(recs),
+                'cycles': span,
+                'ops_per_cycle': len(recs) / span,
+                'avg_latency': sum(rec['latency'] for rec in recs) / len(recs),
+            }
+        return stats
 
 
 # 定义VectorIdivEnv类，封装DUT的引脚和常用操作
@@ -158,8 +359,10 @@ class VectorIdivEnv:
     def __init__(self, dut):
         self.dut = dut
         self._cycle = 0  # 跟踪当前仿真周期，便于计算耗时
+        self.probes = []  # 内部信号探针，由Step逐周期采样
         self.d_zero_mask = 0
-        self.mock = _MockComponent()
+        self.engine = VectorIdivTransactionEngine(self)
+        self.mock = self.engine  # 兼容原有以mock访问队列的用例
         
         # 使用from_dict方法进行分组引脚映射
         self.basic = VectorIdivBasicBundle.from_dict({
@@ -311,9 +514,32 @@ class VectorIdivEnv:
 
     # 根据需要添加清空Env注册的回调函数
     def clear_cbs(self):
-        """清空所有注册的回调函数"""
-        # 如果有注册的回调函数，在这里清除
-        pass
+        """清空所有注册的回调函数（含内部信号探针）"""
+        self.probes.clear()
+
+    def probe(self, signals, depth=PROBE_DEPTH, strict=False):
+        """按层次名绑定内部信号，之后Step每推进一个周期采样一次
+
+        Args:
+            signals (list | dict): 相对DUT顶层的层次名列表，或{别名: 层次名}，见VectorIdiv_probe
+            depth (int, optional): 环形缓冲区保留的采样数，默认为PROBE_DEPTH
+            strict (bool, optional): 为True时有信号未绑定即抛出KeyError，默认为False
+
+        Returns:
+            VectorIdivSignalProbe: 探针，按名字读取按时间顺序的NumPy取值数组
+
+        Example:
+            >>> probe = env.probe(["_64bit_divide_0.stateReg", "_64bit_divide_0.qds_cons.io_d_trunc_3"])
+            >>> api_VectorIdiv_divide(env, dividend=1000, divisor=7, sew=3)
+            >>> probe["_64bit_divide_0.stateReg"]
+        """
+        probe = VectorIdivSignalProbe(self.dut, signals, depth, strict)
+        self.probes.append(probe)
+        return probe
+
+    def remove_probe(self, probe):
+        """停止探针采样"""
+        self.probes.remove(probe)
 
     def reset(self):
         """执行VectorIdiv的复位操作"""
@@ -341,13 +567,21 @@ class VectorIdivEnv:
         self._current_dividend = 0
         self._current_divisor = 0
 
-        # 清空轻量Mock状态
-        self.mock.reset()
+        # 清空事务引擎队列
+        self.engine.reset()
 
     # 直接导出DUT的通用操作Step
     def Step(self, i:int = 1):
         self._cycle += i
-        return self.dut.Step(i)
+        if not self.probes:
+            return self.dut.Step(i)
+        # 有探针时逐周期推进并采样
+        ret = None
+        for _ in range(i):
+            ret = self.dut.Step(1)
+            for probe in self.probes:
+                probe.sample()
+        return ret
     
     def _drain_pending_output(self):
         """如果上一次运算仍有未握手的输出，先完成握手避免阻塞。"""
@@ -700,8 +934,8 @@ def api_VectorIdiv_get_status(env):
                 - d_zero (int): 除零标志，非零表示检测到除零
                 - flush_active (int): 流水线清空标志
             - pipeline (dict): 流水线状态
-                - input_queue_size (int): Mock组件输入队列大小
-                - output_queue_size (int): Mock组件输出队列大小
+                - input_queue_size (int): 事务引擎输入队列大小
+                - output_queue_size (int): 事务引擎输出队列大小
                 - pipeline_stalls (int): 流水线停顿计数
 
     Example:
@@ -715,7 +949,7 @@ def api_VectorIdiv_get_status(env):
     Note:
         - 该API提供只读状态信息，不会修改硬件状态
         - 状态信息实时反映硬件当前状态
-        - 包含Mock组件的内部状态，便于调试和验证
+        - 包含事务引擎的队列状态，便于调试和验证
     """
     # 基本硬件状态
     basic_status = {
@@ -733,11 +967,11 @@ def api_VectorIdiv_get_status(env):
         }
     }
 
-    # 无Mock时保持流水线信息为0
+    # 事务引擎队列状态
     basic_status['pipeline'] = {
-        'input_queue_size': 0,
-        'output_queue_size': 0,
-        'pipeline_stalls': 0,
+        'input_queue_size': len(env.engine.input_queue),
+        'output_queue_size': len(env.engine.output_queue),
+        'pipeline_stalls': env.engine.pipeline_stalls,
     }
 
     return basic_status
@@ -819,4 +1053,88 @@ def api_VectorIdiv_reset_and_init(env, sew: int = 2, sign: int = 0):
         raise RuntimeError(f"初始化失败: {e}")
 
 
+def api_VectorIdiv_stream_divisions(env, operations, sew: int = 2, sign: int = 0, timeout: int = 1000, checker=None):
+    """VectorIdiv流式除法API，通过事务引擎连续发送多个操作
+
+    驱动器在div_in_ready拉高的周期立即接收下一个操作，监视器在div_out_valid时取回结果，
+    记分板按接收顺序匹配。相比逐个调用api_VectorIdiv_divide，省去了每次操作的握手等待周期。
+
+    Args:
+        env: VectorIdivEnv实例，必须是已初始化的Env实例
+        operations (list): 操作列表，每项为(dividend, divisor)或(dividend, divisor, sew, sign)
+        sew (int, optional): 未显式给出时使用的元素宽度，默认为2（32位）
+        sign (int, optional): 未显式给出时使用的符号模式，默认为0（无符号）
+        timeout (int, optional): 连续无握手进展的最大周期数，默认为1000
+        checker (callable, optional): checker(record)返回期望的(quotient, remainder, d_zero)，不一致项记录到env.engine.mismatches
+
+    Returns:
+        list: 按tag排序的结果记录，每项包含tag/dividend/divisor/sew/sign/quotient/remainder/
+              d_zero/accept_cycle/complete_cycle/latency，其中quotient/remainder为原始128位输出
+
+    Raises:
+        ValueError: 当操作格式或参数无效时抛出
+        TimeoutError: 当握手长时间无进展时抛出
+
+    Example:
+        >>> ops = [(100, 5), (200, 7, 0, 1)]
+        >>> records = api_VectorIdiv_stream_divisions(env, ops)
+        >>> print(records[0]['quotient'], records[0]['latency'])
+    """
+    if timeout <= 0:
+        raise ValueError(f"超时时间必须为正数: {timeout}")
+
+    engine = env.engine
+    engine.reset()
+    engine.checker = checker
+    for op in operations:
+        if len(op) == 2:
+            dividend, divisor = op
+            op_sew, op_sign = sew, sign
+        elif len(op) == 4:
+            dividend, divisor, op_sew, op_sign = op
+        else:
+            raise ValueError(f"无效的操作格式: {op}，应为(dividend, divisor)或(dividend, divisor, sew, sign)")
+        if op_sew not in [0, 1, 2, 3]:
+            raise ValueError(f"无效的SEW值: {op_sew}")
+        if op_sign not in [0, 1]:
+            raise ValueError(f"无效的SIGN值: {op_sign}")
+        engine.push_input(dividend, divisor, sew=op_sew, sign=op_sign)
+
+    # 流式运行后不再沿用单次运算的d_zero强制清零
+    env._d_zero_forced_clear = False
+    return engine.run(timeout=timeout)
+
+
+def api_VectorIdiv_measure_throughput(env, sews=(0, 1, 2, 3), count: int = 32, sign: int = 0, seed: int = 0):
+    """VectorIdiv吞吐率测量API，按SEW分别连续发送随机操作并统计
+
+    Args:
+        env: VectorIdivEnv实例，必须是已初始化的Env实例
+        sews (tuple, optional): 需要测量的SEW列表，默认为全部4种
+        count (int, optional): 每种SEW发送的操作数，默认为32
+        sign (int, optional): 符号模式，默认为0（无符号）
+        seed (int, optional): 随机数种子，默认为0
+
+    Returns:
+        dict: {sew: {'ops', 'cycles', 'ops_per_cycle', 'avg_latency'}}
+
+    Example:
+        >>> stats = api_VectorIdiv_measure_throughput(env, count=16)
+        >>> print(f"SEW=8位: {stats[0]['ops_per_cycle']:.3f} 操作/周期")
+    """
+    rng = random.Random(seed)
+    stats = {}
+    for sew in sews:
+        width = 8 << sew
+        lanes = 128 // width
+        ops = []
+        for _ in range(count):
+            # 除数各元素非零，避免除零快速路径影响测量
+            divisor = env._pack_elements([rng.randrange(1, 1 << width) for _ in range(lanes)], sew)
+            ops.append((rng.getrandbits(128), divisor, sew, sign))
+        records = api_VectorIdiv_stream_divisions(env, ops)
+        stats.update(env.engine.throughput(records))
+    return stats
+
+
 # 本文件为模板，请根据需要修改，删除不需要的代码和注释
\ No newline at end of file
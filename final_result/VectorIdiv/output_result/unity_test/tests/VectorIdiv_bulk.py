@@ -0,0 +1,147 @@
+#coding=utf-8
+"""
+VectorIdiv批量NumPy接口
+
+以NumPy数组为输入输出：按元素给出被除数、除数和sew/sign列，自动打包为128位向量
+（16×8位、8×16位、4×32位或2×64位），经VectorIdivTransactionEngine连续发送后，
+再拆回逐元素的商、余数和d_zero标志。
+"""
+
+import numpy as np
+
+from VectorIdiv_api import api_VectorIdiv_stream_divisions
+
+
+_MASK64 = (1 << 64) - 1
+
+
+def lane_count(sew):
+    """128位向量在给定SEW下的元素个数"""
+    return 128 // (8 << sew)
+
+
+def pack_lanes(elems, sew):
+    """按SEW将元素打包为128位向量，返回Python整数列表（元素0位于最低位）
+
+    Args:
+        elems (array_like): 整型元素数组，负数按补码截断到元素位宽
+        sew (int): 0=8位, 1=16位, 2=32位, 3=64位
+
+    Returns:
+        list: 128位向量列表，末尾不足一个向量时补0
+    """
+    width = 8 << sew
+    lanes = lane_count(sew)
+    half = lanes // 2
+    elems = np.asarray(elems).astype(np.uint64) & np.uint64((1 << width) - 1)
+    pad = (-len(elems)) % lanes
+    if pad:
+        elems = np.concatenate([elems, np.zeros(pad, dtype=np.uint64)])
+    # 分别在高低64位内向量化拼接，最后再合成128位
+    shifts = np.arange(half, dtype=np.uint64) * np.uint64(width)
+    rows = elems.reshape(-1, 2, half) << shifts
+    lo = np.bitwise_or.reduce(rows[:, 0, :], axis=1).tolist()
+    hi = np.bitwise_or.reduce(rows[:, 1, :], axis=1).tolist()
+    return [(h << 64) | l for l, h in zip(lo, hi)]
+
+
+def unpack_lanes(words, sew, count=None):
+    """pack_lanes的逆运算，返回uint64元素数组（零扩展）"""
+    width = 8 << sew
+    half = lane_count(sew) // 2
+    lo = np.fromiter((w & _MASK64 for w in words), dtype=np.uint64, count=len(words))
+    hi = np.fromiter((w >> 64 for w in words), dtype=np.uint64, count=len(words))
+    shifts = np.arange(half, dtype=np.uint64) * np.uint64(width)
+    mask = np.uint64((1 << width) - 1)
+    elems = (np.stack([lo, hi], axis=1)[:, :, None] >> shifts) & mask
+    elems = elems.reshape(-1)
+    return elems if count is None else elems[:count]
+
+
+def unpack_d_zero(d_zero, sew, count=None):
+    """将每个向量的16位d_zero拆为逐元素布尔数组（bit i对应元素i）"""
+    lanes = lane_count(sew)
+    bits = (np.asarray(d_zero, dtype=np.uint64)[:, None] >> np.arange(lanes, dtype=np.uint64)) & np.uint64(1)
+    bits = bits.astype(bool).reshape(-1)
+    return bits if count is None else bits[:count]
+
+
+def sign_extend(elems, sew):
+    """将零扩展的uint64元素按SEW符号扩展为int64"""
+    width = 8 << sew
+    elems = np.asarray(elems, dtype=np.uint64)
+    if width == 64:
+        return elems.view(np.int64)
+    sign_bit = np.uint64(1 << (width - 1))
+    return ((elems ^ sign_bit).astype(np.int64) - np.int64(1 << (width - 1)))
+
+
+def api_VectorIdiv_bulk_divisions(env, dividend, divisor, sew=2, sign=0, timeout: int = 1000):
+    """VectorIdiv批量除法API，数组进、数组出
+
+    sew、sign可以是标量或与操作数等长的逐元素列。sew/sign相同的元素按原顺序打包进同一组
+    128位向量，所有向量依次经事务引擎送入DUT，结果再散回原位置。
+
+    Args:
+        env: VectorIdivEnv实例，必须是已初始化的Env实例
+        dividend (array_like): 被除数元素数组
+        divisor (array_like): 除数元素数组，长度与dividend一致
+        sew (int | array_like, optional): 元素宽度或逐元素列，默认为2（32位）
+        sign (int | array_like, optional): 符号模式或逐元素列，默认为0（无符号）
+        timeout (int, optional): 连续无握手进展的最大周期数，默认为1000
+
+    Returns:
+        dict: 逐元素结果
+            - quotient (np.ndarray): uint64商（按元素位宽零扩展，有符号时可用sign_extend还原）
+            - remainder (np.ndarray): uint64余数（同上）
+            - d_zero (np.ndarray): bool除零标志
+
+    Raises:
+        ValueError: 操作数长度不一致或sew/sign无效时抛出
+        TimeoutError: 握手长时间无进展时抛出
+
+    Example:
+        >>> a = np.arange(1, 1 << 16, dtype=np.int64)
+        >>> res = api_VectorIdiv_bulk_divisions(env, a, np.full_like(a, 7), sew=3, sign=1)
+        >>> sign_extend(res['quotient'], 3)[:4]
+    """
+    dividend = np.asarray(dividend).reshape(-1)
+    divisor = np.asarray(divisor).reshape(-1)
+    count = dividend.size
+    if divisor.size != count:
+        raise ValueError(f"操作数长度不一致: {dividend.size} vs {divisor.size}")
+    sews = np.broadcast_to(np.asarray(sew, dtype=np.int64), (count,))
+    signs = np.broadcast_to(np.asarray(sign, dtype=np.int64), (count,))
+    if not np.isin(sews, [0, 1, 2, 3]).all():
+        raise ValueError(f"无效的SEW值: {np.unique(sews[~np.isin(sews, [0, 1, 2, 3])]).tolist()}")
+    if not np.isin(signs, [0, 1]).all():
+        raise ValueError(f"无效的SIGN值: {np.unique(signs[~np.isin(signs, [0, 1])]).tolist()}")
+
+    # 按(sew, sign)分组，组内保持原顺序打包
+    keys = np.stack([sews, signs], axis=1)
+    groups, inverse = np.unique(keys, axis=0, return_inverse=True)
+    inverse = inverse.reshape(-1)
+    plan = []
+    operations = []
+    for gid, (group_sew, group_sign) in enumerate(groups.tolist()):
+        index = np.flatnonzero(inverse == gid)
+        words_a = pack_lanes(dividend[index], group_sew)
+        words_b = pack_lanes(divisor[index], group_sew)
+        plan.append((group_sew, index, len(operations), len(words_a)))
+        operations.extend((a, b, group_sew, group_sign) for a, b in zip(words_a, words_b))
+
+    records = api_VectorIdiv_stream_divisions(env, operations, timeout=timeout)
+
+    quotient = np.zeros(count, dtype=np.uint64)
+    remainder = np.zeros(count, dtype=np.uint64)
+    d_zero = np.zeros(count, dtype=bool)
+    for group_sew, index, start, length in plan:
+        chunk = records[start:start + length]
+        quotient[index] = unpack_lanes([rec['quotient'] for rec in chunk], group_sew, len(index))
+        remainder[index] = unpack_lanes([rec['remainder'] for rec in chunk], group_sew, len(index))
+        d_zero[index] = unpack_d_zero([rec['d_zero'] for rec in chunk], group_sew, len(index))
+    return {
+        'quotient': quotient,
+        'remainder': remainder,
+        'd_zero': d_zero,
+    }
@@ -0,0 +1,427 @@
+#coding=utf-8
+"""
+VectorIdiv覆盖率引导的模糊测试
+
+随机回归（如复现bug_2的5万次循环）不看DUT的反馈，SRT4商选择常数表的某一行这类稀有路径只能靠
+概率撞上。VectorIdivFuzzer以“事务序列”为一个输入，每轮从语料中挑一个输入做按字段的变异，
+执行后读回本轮的覆盖，产生新覆盖的输入加入语料并写入磁盘，下次运行继续使用：
+
+    make fuzz DUT=VectorIdiv FUZZ_ITERS=5000     # 语料保存在reports/VectorIdiv_corpus
+
+    result = api_VectorIdiv_fuzz(env, iterations=2000, corpus_dir="reports/VectorIdiv_corpus")
+    assert not result['mismatches']
+
+- 输入：操作列表，每个操作包含dividend/divisor/sew/sign以及握手时序gap（挂上输入引脚前的
+  空闲周期）和stall（结果有效后div_out_ready保持为0的周期）
+- 变异：按字段进行，sew/sign重新选取，dividend/divisor按当前SEW选一个通道改为边界值、规格化数
+  （随机前导零与高位模式，对应SRT商选择表的行）、翻转一位或加减小数，整向量复制同一通道，gap/stall
+  重新选取，以及插入（由VectorIdivStimulus生成）、删除、复制、交换操作和与另一语料拼接
+- 反馈：Verilator的行/翻转覆盖计数只在Finish时写出，无法逐个输入读回，因此每个周期直接读回
+  观测信号：输出引脚与握手引脚的逐位翻转（0->1、1->0）、窄信号（状态寄存器、QDS常数表索引
+  io_d_trunc_3）的取值，以及功能覆盖组中新命中的bin。内部信号按层次名经GetInternalSignal绑定
+  （picker以--rw导出，build_cache默认如此），当前构建中不存在的信号（如未用--incremental构建的
+  bug版本中被重命名的实例）自动跳过。整个模糊测试的行覆盖仍写入该DUT的.dat，可用line_cov_index查看
+- 每个输入执行前恢复复位后快照（VectorIdiv_snapshot），不支持快照时退化为env.reset()
+- 每个输入的结果都与参考模型比对，不一致的输入写入语料目录下的crashes/
+"""
+
+import glob
+import hashlib
+import json
+import os
+import random
+
+from VectorIdiv_api import VectorIdivTransactionEngine
+from VectorIdiv_bulk import lane_count
+from VectorIdiv_probe import bind_signal
+from VectorIdiv_ref import ref_VectorIdiv_check
+from VectorIdiv_snapshot import VectorIdivResetSnapshot
+from VectorIdiv_stimulus import VectorIdivStimulus
+
+
+FUZZ_CORPUS_DIR = os.environ.get("DUT_FUZZ_CORPUS") or None
+FUZZ_ITERATIONS = int(os.environ.get("DUT_FUZZ_ITERS", "200"))
+
+# 逐位统计翻转的引脚
+TOGGLE_PINS = ["io_div_out_q_v", "io_div_out_rem_v", "io_d_zero"]
+
+# 按取值统计的引脚，合成一个握手状态
+HANDSHAKE_PINS = ["io_div_in_valid", "io_div_in_ready", "io_div_out_valid", "io_div_out_ready"]
+
+# 按取值统计的内部信号分组（层次名相对DUT顶层，由VectorIdiv_probe.bind_signal绑定），
+# 每组各信号的取值合成一个特征
+INTERNAL_SIGNALS = {
+    inst: [f"{inst}.stateReg", f"{inst}.qds_cons.io_d_trunc_3"]
+    for inst in ("_16bit_divide_0", "_16bit_divide_1", "_32bit_divide_0", "_32bit_divide_1",
+                 "_64bit_divide_0", "_64bit_divide_1")
+}
+INTERNAL_SIGNALS.update({"_8bit_divide_0": ["_8bit_divide_0.stateReg"], "top": ["stateReg"]})
+
+# 单个输入的操作数上限与握手时序的取值范围
+MAX_OPS = 16
+MAX_GAP = 6
+MAX_STALL = 6
+
+
+class VectorIdivFuzzEngine(VectorIdivTransactionEngine):
+    """带握手时序的事务引擎
+
+    在VectorIdivTransactionEngine之上，每个操作可带gap（前一操作被接收后等待多少个周期才挂上
+    输入引脚）与stall（结果有效后div_out_ready保持为0的周期数），每个周期结束时调用observer。
+    """
+
+    def __init__(self, env, checker=None, observer=None):
+        super().__init__(env, checker)
+        self.observer = observer
+        self._waited = 0
+        self._held = 0
+
+    def reset(self):
+        super().reset()
+        self._waited = 0
+        self._held = 0
+
+    def step(self):
+        env = self.env
+        if self._driving is None and self.input_queue and self._waited >= self.input_queue[0].get('gap', 0):
+            op = self.input_queue.popleft()
+            env.basic.sew.value = op['sew']
+            env.basic.sign.value = op['sign']
+            env.input.dividend_v.value = op['dividend']
+            env.input.divisor_v.value = op['divisor']
+            self._driving = op
+            self._waited = 0
+        env.div_control.div_in_valid.value = 1 if self._driving is not None else 0
+
+        out_valid = env.div_control.div_out_valid.value == 1
+        stall = self.inflight[0].get('stall', 0) if self.inflight else 0
+        ready = not (out_valid and self._held < stall)
+        env.div_control.div_out_ready.value = 1 if ready else 0
+
+        in_fire = self._driving is not None and env.div_control.div_in_ready.value == 1
+        out_fire = out_valid and ready
+        if self._driving is not None and not in_fire:
+            self.pipeline_stalls += 1
+        if out_fire:
+            raw = (env.output.div_out_q_v.value, env.output.div_out_rem_v.value, env.basic.d_zero.value)
+
+        env.Step(1)
+        self.cycles += 1
+        if self.observer is not None:
+            self.observer()
+
+        if self._driving is None and self.input_queue:
+            self._waited += 1
+        if out_valid and not ready:
+            self._held += 1
+        if in_fire:
+            op = self._driving
+            op['accept_cycle'] = self.cycles
+            self.inflight.append(op)
+            self._driving = None
+        if out_fire:
+            self._held = 0
+            self._score(*raw)
+
+
+class VectorIdivCoverageObserver:
+    """逐周期读回观测信号，汇总为一个输入的覆盖特征
+
+    Attributes:
+        internal (dict): 成功绑定的内部信号{分组: [(名字, XData)]}
+    """
+
+    def __init__(self, env, internal_signals=None):
+        self.env = env
+        dut = env.dut
+        self.toggle = {name: getattr(dut, name) for name in TOGGLE_PINS}
+        self.handshake = [getattr(dut, name) for name in HANDSHAKE_PINS]
+        self.internal = {}
+        for group, names in (INTERNAL_SIGNALS if internal_signals is None else internal_signals).items():
+            bound = [(name, bind_signal(dut, name)) for name in names]
+            bound = [(name, signal) for name, signal in bound if signal is not None]
+            if bound:
+                self.internal[group] = bound
+        self.groups = getattr(dut, "fc_cover", {})
+        self.begin()
+
+    def begin(self):
+        """开始记录一个新输入"""
+        self.prev = {name: pin.value for name, pin in self.toggle.items()}
+        self.rise = dict.fromkeys(self.toggle, 0)
+        self.fall = dict.fromkeys(self.toggle, 0)
+        self.values = set()
+        self.hints = self._hints()
+
+    def _hints(self):
+        return {(group_name, point_name, b): hints
+                for group_name, group in self.groups.items()
+                for point_name, point in group.cov_points.items()
+                for b, hints in point["hints"].items()}
+
+    def __call__(self):
+        """采样一个周期"""
+        for name, pin in self.toggle.items():
+            value, prev = pin.value, self.prev[name]
+            self.rise[name] |= value & ~prev
+            self.fall[name] |= prev & ~value
+            self.prev[name] = value
+        self.values.add(("H",) + tuple(pin.value for pin in self.handshake))
+        for group, signals in self.internal.items():
+            self.values.add(("V", group) + tuple(signal.value for _, signal in signals))
+
+    def features(self):
+        """本输入的覆盖特征集合，功能覆盖组中本输入期间命中次数增加的bin也计入"""
+        result = set(self.values)
+        for name in self.toggle:
+            result.update(("T", name, bit, 1) for bit in _set_bits(self.rise[name]))
+            result.update(("T", name, bit, 0) for bit in _set_bits(self.fall[name]))
+        result.update(("F",) + key for key, hints in self._hints().items() if hints > self.hints.get(key, 0))
+        return result
+
+
+def _set_bits(value):
+    bit = 0
+    while value:
+        if value & 1:
+            yield bit
+        value >>= 1
+        bit += 1
+
+
+class VectorIdivMutator:
+    """按字段变异事务序列
+
+    Args:
+        seed (int, optional): 随机种子，默认为0
+    """
+
+    def __init__(self, seed=0):
+        self.rng = random.Random(seed)
+        self.stimulus = VectorIdivStimulus(seed=seed)
+
+    def fresh_ops(self, count):
+        """由激励库生成count个操作（默认分布，握手时序为0）"""
+        return [{'dividend': a, 'divisor': b, 'sew': sew, 'sign': sign, 'gap': 0, 'stall': 0}
+                for a, b, sew, sign in self.stimulus.generate(count)]
+
+    def lane_value(self, width, old):
+        """width位通道的变异值"""
+        rng = self.rng
+        mask = (1 << width) - 1
+        kind = rng.randrange(8)
+        if kind == 0:
+            return rng.choice([0, 1, mask, 1 << (width - 1), (1 << (width - 1)) - 1, 2, mask - 1])
+        if kind == 1:
+            return old ^ (1 << rng.randrange(width))
+        if kind == 2:
+            return (old + rng.randint(-4, 4)) & mask
+        if kind == 3:
+            return rng.randint(1, 1 << (width // 2))
+        # 规格化数：随机前导零，紧跟1和3位QDS表索引，其余低位随机
+        avail = width - rng.randrange(width)
+        top = min(avail, 4)
+        value = (0b1000 | rng.randrange(8)) >> (4 - top)
+        low = avail - top
+        return (value << low) | rng.getrandbits(low) if low else value
+
+    def mutate_lane(self, op, field):
+        width = 8 << op['sew']
+        lane = self.rng.randrange(lane_count(op['sew']))
+        shift = lane * width
+        old = (op[field] >> shift) & ((1 << width) - 1)
+        new = self.lane_value(width, old)
+        op[field] = (op[field] & ~(((1 << width) - 1) << shift)) | (new << shift)
+
+    def splat_lane(self, op, field):
+        width = 8 << op['sew']
+        lanes = lane_count(op['sew'])
+        value = (op[field] >> (self.rng.randrange(lanes) * width)) & ((1 << width) - 1)
+        op[field] = sum(value << (i * width) for i in range(lanes))
+
+    def mutate(self, ops, corpus=()):
+        """对ops做1~4次随机变异，返回新的操作列表（不修改ops）
+
+        Args:
+            ops (list): 事务序列
+            corpus (list, optional): 供拼接的其他语料
+
+        Returns:
+            list: 变异后的事务序列
+        """
+        rng = self.rng
+        ops = [dict(op) for op in ops] or self.fresh_ops(1)
+        for _ in range(rng.randint(1, 4)):
+            op = rng.choice(ops)
+            kind = rng.randrange(10)
+            if kind == 0:
+                op['sew'] = rng.randrange(4)
+            elif kind == 1:
+                op['sign'] ^= 1
+            elif kind in (2, 3):
+                self.mutate_lane(op, 'divisor')
+            elif kind == 4:
+                self.mutate_lane(op, 'dividend')
+            elif kind == 5:
+                self.splat_lane(op, rng.choice(['dividend', 'divisor']))
+            elif kind == 6:
+                if rng.random() < 0.5:
+                    op['gap'] = rng.randint(0, MAX_GAP)
+                else:
+                    op['stall'] = rng.randint(0, MAX_STALL)
+            elif kind == 7 and len(ops) < MAX_OPS:
+                ops.insert(rng.randrange(len(ops) + 1), rng.choice([self.fresh_ops(1)[0], dict(op)]))
+            elif kind == 8 and len(ops) > 1:
+                i, j = rng.randrange(len(ops)), rng.randrange(len(ops))
+                if rng.random() < 0.5:
+                    del ops[i]
+                else:
+                    ops[i], ops[j] = ops[j], ops[i]
+            elif kind == 9 and corpus:
+                other = rng.choice(corpus)
+                ops = ops[:rng.randint(1, len(ops))] + [dict(o) for o in other[rng.randrange(len(other)):]]
+        return ops[:MAX_OPS]
+
+
+class VectorIdivFuzzer:
+    """覆盖率引导的模糊测试
+
+    Args:
+        env: VectorIdivEnv实例
+        corpus_dir (str, optional): 语料目录，已有语料在构造时载入并重新执行，默认只保存在内存中
+        seed (int, optional): 随机种子，默认为0
+
+    Attributes:
+        corpus (list): 语料中的事务序列
+        seen (set): 已覆盖的特征
+        mismatches (list): 与参考模型不一致的记录
+        executions (int): 已执行的输入数
+    """
+
+    def __init__(self, env, corpus_dir=None, seed=0):
+        self.env = env
+        self.corpus_dir = corpus_dir
+        self.mutator = VectorIdivMutator(seed)
+        self.snapshot = VectorIdivResetSnapshot(env)
+        self.observer = VectorIdivCoverageObserver(env)
+        self.engine = VectorIdivFuzzEngine(env, observer=self.observer)
+        self.corpus = []
+        self.favored = {}   # 特征 -> 覆盖它的最短语料下标
+        self.seen = set()
+        self.mismatches = []
+        self.executions = 0
+        if corpus_dir:
+            os.makedirs(os.path.join(corpus_dir, "crashes"), exist_ok=True)
+            for path in sorted(glob.glob(os.path.join(corpus_dir, "*.json"))):
+                with open(path, encoding="utf-8") as f:
+                    self.add(json.load(f)["ops"], save=False)
+
+    def execute(self, ops):
+        """从快照开始执行一个输入
+
+        Returns:
+            tuple: (覆盖特征集合, 不一致记录列表)
+        """
+        self.snapshot.restore()
+        self.engine.reset()
+        self.observer.begin()
+        for op in ops:
+            self.engine.input_queue.append(dict(op, tag=len(self.engine.input_queue)))
+        records = self.engine.run(timeout=200)
+        self.executions += 1
+        return self.observer.features(), ref_VectorIdiv_check(records)
+
+    def add(self, ops, save=True):
+        """执行ops，产生新覆盖时加入语料
+
+        Returns:
+            int: 新覆盖的特征数
+        """
+        features, mismatches = self.execute(ops)
+        if mismatches:
+            self.mismatches.extend(mismatches)
+            self._save(ops, os.path.join("crashes", _digest(ops)), len(mismatches))
+        new = features - self.seen
+        if not new:
+            return 0
+        self.seen |= new
+        index = len(self.corpus)
+        self.corpus.append(ops)
+        for feature in features:
+            best = self.favored.get(feature)
+            if best is None or len(ops) < len(self.corpus[best]):
+                self.favored[feature] = index
+        if save:
+            self._save(ops, _digest(ops), len(new))
+        return len(new)
+
+    def _save(self, ops, name, count):
+        if not self.corpus_dir:
+            return
+        with open(os.path.join(self.corpus_dir, name + ".json"), "w", encoding="utf-8") as f:
+            json.dump({"ops": ops, "new": count}, f)
+
+    def pick(self):
+        """挑选待变异的语料：九成取某个特征的最短覆盖输入"""
+        rng = self.mutator.rng
+        if self.favored and rng.random() < 0.9:
+            return self.corpus[rng.choice(sorted(set(self.favored.values())))]
+        return rng.choice(self.corpus)
+
+    def fuzz(self, iterations):
+        """运行iterations轮变异
+
+        Returns:
+            list: 每轮结束时的特征总数
+        """
+        if not self.corpus:
+            self.add(self.mutator.fresh_ops(4))
+        history = []
+        for _ in range(iterations):
+            self.add(self.mutator.mutate(self.pick(), self.corpus))
+            history.append(len(self.seen))
+        return history
+
+    def close(self):
+        self.snapshot.close()
+
+
+def _digest(ops):
+    return hashlib.sha1(json.dumps(ops, sort_keys=True).encode()).hexdigest()[:16]
+
+
+def api_VectorIdiv_fuzz(env, iterations=FUZZ_ITERATIONS, corpus_dir=FUZZ_CORPUS_DIR, seed=0):
+    """运行一次覆盖率引导的模糊测试
+
+    Args:
+        env: VectorIdivEnv实例，必须是已初始化的Env实例
+        iterations (int, optional): 变异轮数，默认取环境变量DUT_FUZZ_ITERS（200）
+        corpus_dir (str, optional): 语料目录，默认取环境变量DUT_FUZZ_CORPUS，未设置时不落盘
+        seed (int, optional): 随机种子，默认为0
+
+    Returns:
+        dict: 模糊测试结果
+            - executions (int): 执行的输入数（含载入语料时的重新执行）
+            - corpus (int): 语料大小
+            - features (int): 覆盖的特征数
+            - internal (list): 成功绑定的内部信号
+            - history (list): 每轮结束时的特征总数
+            - mismatches (list): 与参考模型不一致的记录
+
+    Example:
+        >>> res = api_VectorIdiv_fuzz(env, iterations=500, corpus_dir="reports/VectorIdiv_corpus")
+        >>> print(res['corpus'], res['features'])
+    """
+    fuzzer = VectorIdivFuzzer(env, corpus_dir, seed)
+    try:
+        history = fuzzer.fuzz(iterations)
+    finally:
+        fuzzer.close()
+    return {
+        'executions': fuzzer.executions,
+        'corpus': len(fuzzer.corpus),
+        'features': len(fuzzer.seen),
+        'internal': [name for signals in fuzzer.observer.internal.values() for name, _ in signals],
+        'history': history,
+        'mismatches': fuzzer.mismatches,
+    }
@@ -0,0 +1,169 @@
+#coding=utf-8
+"""
+VectorIdiv内部信号探针
+
+Env只通过Bundle绑定io_*端口，查看SRT16Divint的迭代寄存器、SRT4qdsCons的商选择常数这类内部状态
+原先只能生成完整的FST波形再做后处理。picker以--rw导出（build_cache默认如此）的DUT可以按层次名读取
+内部信号：探针按名字绑定选定的信号，env.Step每推进一个周期采样一次，写入NumPy环形缓冲区，调试和
+定向检查只需读内存：
+
+    probe = env.probe(srt_probe_names("_64bit_divide_0"), depth=4096)
+    api_VectorIdiv_divide(env, dividend=1000, divisor=7, sew=3, sign=0)
+    states = probe["_64bit_divide_0.stateReg"]     # 按时间顺序的取值数组
+    probe.cycles                                    # 对应的采样周期（探针挂上后的第几个周期）
+    env.remove_probe(probe)
+
+- 名字相对DUT顶层（如"_64bit_divide_0.qds_cons.io_d_trunc_3"），依次尝试PROBE_PREFIXES中的前缀绑定；
+  也可以传{别名: 层次名}，之后按别名读取
+- 不超过64位的信号存为uint64列，更宽的信号存为object列（Python整数）
+- 当前构建中不存在的信号记入missing，strict=True时抛出KeyError。bug文件中的内部名被随机重命名，
+  以--incremental构建（make build_dut_cache INCREMENTAL=1）时内部信号使用origin的名字，同一组探针
+  可用于全部变体
+- 有探针时env.Step(i)逐周期推进以便逐周期采样。探针不注册StepRis回调（回调只能追加、无法移除），
+  因此同样适用于实例池（DUT_POOL=1）中复用的实例
+"""
+
+import os
+
+import numpy as np
+
+
+PROBE_DEPTH = int(os.environ.get("DUT_PROBE_DEPTH", "4096"))
+
+# 内部信号层次名的前缀，依次尝试
+PROBE_PREFIXES = ["VectorIdiv_top.VectorIdiv.", "VectorIdiv.", ""]
+
+# SRT16Divint的迭代寄存器
+SRT_ITER_REGS = ("stateReg", "iter_num_reg", "iter_q_A_reg", "iter_q_B_reg", "iterB_reg_0", "iterB_reg_1",
+                 "lzc_d_reg", "zero_d_reg", "early_finish_q")
+
+# SRT4qdsCons的表索引与商选择常数
+QDS_PORTS = ("io_d_trunc_3", "io_m_neg_1", "io_m_neg_0", "io_m_pos_1", "io_m_pos_2")
+
+
+def srt_probe_names(inst="_64bit_divide_0"):
+    """SRT16Divint实例（_16bit/_32bit/_64bit_divide_*）的迭代寄存器与商选择常数的层次名"""
+    return [f"{inst}.{reg}" for reg in SRT_ITER_REGS] + [f"{inst}.qds_cons.{port}" for port in QDS_PORTS]
+
+
+def bind_signal(dut, name, prefixes=None):
+    """按层次名绑定内部信号
+
+    Args:
+        dut: DUT实例
+        name (str): 相对DUT顶层的层次名
+        prefixes (list, optional): 依次尝试的前缀，默认为PROBE_PREFIXES
+
+    Returns:
+        XData: 绑定的信号；DUT未以--rw导出或信号不存在时返回None
+    """
+    getter = getattr(dut, "GetInternalSignal", None)
+    if getter is None:
+        return None
+    for prefix in PROBE_PREFIXES if prefixes is None else prefixes:
+        try:
+            signal = getter(prefix + name)
+        except Exception:
+            signal = None
+        if signal is not None:
+            return signal
+    return None
+
+
+def signal_width(signal):
+    """信号位宽，无法获取时返回None"""
+    try:
+        return int(signal.W())
+    except Exception:
+        return None
+
+
+class VectorIdivSignalProbe:
+    """按层次名绑定的内部信号探针，每次sample()采样一次写入环形缓冲区
+
+    Args:
+        dut: DUT实例
+        signals (list | dict): 层次名列表，或{别名: 层次名}
+        depth (int, optional): 保留的采样数，默认为PROBE_DEPTH
+        strict (bool, optional): 为True时有信号未绑定即抛出KeyError，默认为False
+
+    Attributes:
+        names (list): 成功绑定的信号名（别名）
+        missing (list): 当前构建中不存在的层次名
+        widths (dict): {名字: 位宽}，无法获取时为None
+        enabled (bool): 为False时暂停记录（周期计数照常推进）
+
+    Example:
+        >>> probe = VectorIdivSignalProbe(dut, ["_64bit_divide_0.stateReg"], depth=16)
+        >>> dut.Step(1); probe.sample()
+        >>> probe["_64bit_divide_0.stateReg"], probe.cycles
+        (array([1], dtype=uint64), array([1]))
+    """
+
+    def __init__(self, dut, signals, depth=PROBE_DEPTH, strict=False):
+        items = signals.items() if isinstance(signals, dict) else [(name, name) for name in signals]
+        self.names, self.missing, self.widths = [], [], {}
+        self._bound = []
+        for alias, name in items:
+            signal = bind_signal(dut, name)
+            if signal is None:
+                self.missing.append(name)
+                continue
+            self.names.append(alias)
+            self.widths[alias] = signal_width(signal)
+            self._bound.append(signal)
+        if strict and self.missing:
+            raise KeyError(f"当前构建中不存在内部信号{self.missing}，请确认DUT以--rw导出")
+        self.depth = depth
+        self.enabled = True
+        self.cycle = 0      # 已推进的周期数
+        self.count = 0      # 已记录的采样数
+        self._cycles = np.zeros(depth, dtype=np.int64)
+        self._data = [np.zeros(depth, dtype=np.uint64 if width is not None and width <= 64 else object)
+                      for width in self.widths.values()]
+
+    def sample(self):
+        """推进一个周期并记录各信号的当前取值"""
+        self.cycle += 1
+        if not self.enabled:
+            return
+        i = self.count % self.depth
+        self._cycles[i] = self.cycle
+        for column, signal in zip(self._data, self._bound):
+            column[i] = signal.value
+        self.count += 1
+
+    def __len__(self):
+        return min(self.count, self.depth)
+
+    def _order(self):
+        if self.count <= self.depth:
+            return slice(0, self.count)
+        start = self.count % self.depth
+        return np.r_[start:self.depth, 0:start]
+
+    @property
+    def cycles(self):
+        """各采样的周期号（按时间顺序）"""
+        return self._cycles[self._order()]
+
+    def __getitem__(self, name):
+        """信号name按时间顺序的取值数组"""
+        return self._data[self.names.index(name)][self._order()]
+
+    def last(self, name):
+        """信号name最近一次采样的取值，没有采样时返回None"""
+        if not self.count:
+            return None
+        return self._data[self.names.index(name)][(self.count - 1) % self.depth]
+
+    def to_dict(self):
+        """{"cycle": 周期号数组, 名字: 取值数组}"""
+        order = self._order()
+        result = {"cycle": self._cycles[order]}
+        result.update({name: column[order] for name, column in zip(self.names, self._data)})
+        return result
+
+    def clear(self):
+        """清空已记录的采样（周期计数不变）"""
+        self.count = 0
@@ -0,0 +1,182 @@
+#coding=utf-8
+"""
+VectorIdiv逐通道NumPy参考模型
+
+以128位向量为单位复现VectorIdiv的io_div_out_q_v、io_div_out_rem_v和io_d_zero：每个向量按
+SEW拆为16×8位、8×16位、4×32位或2×64位通道（通道i位于[w*i+w-1 : w*i]，io_d_zero的bit i
+对应通道i），逐通道按RISC-V整数除法语义计算：
+    - 商向零截断，余数与被除数同号
+    - 除数为0：商为全1，余数等于被除数，对应d_zero位置1
+    - 有符号INT_MIN/-1溢出：商为INT_MIN，余数为0，不置任何标志
+
+128位向量在内部拆成高低两个uint64列，全部通道和事务一起做一次NumPy整除，
+有符号除法先取补码绝对值再按符号还原，因此64位INT_MIN也不会溢出int64。
+"""
+
+import numpy as np
+
+
+_MASK64 = (1 << 64) - 1
+_ALL_ONES = np.uint64(_MASK64)
+
+
+def _lane_mask(width):
+    """width位全1掩码，width可为标量或数组（取值8/16/32/64）"""
+    return _ALL_ONES >> (np.uint64(64) - np.asarray(width, dtype=np.uint64))
+
+
+def _negate(values):
+    """uint64按位取补（模2^64的相反数）"""
+    return ~values + np.uint64(1)
+
+
+def ref_VectorIdiv_lanes(dividend, divisor, sew=2, sign=0):
+    """逐通道计算期望的商、余数和除零标志
+
+    Args:
+        dividend (array_like): 被除数通道值，按元素位宽零扩展的无符号整数
+        divisor (array_like): 除数通道值，长度与dividend一致
+        sew (int | array_like, optional): 元素宽度或逐通道列，0=8位, 1=16位, 2=32位, 3=64位，默认为2
+        sign (int | array_like, optional): 符号模式或逐通道列，0=无符号, 1=有符号，默认为0
+
+    Returns:
+        tuple: (quotient, remainder, d_zero)，前两者为按元素位宽截断的uint64数组，d_zero为bool数组
+
+    Raises:
+        ValueError: 操作数长度不一致或sew/sign无效时抛出
+
+    Example:
+        >>> q, r, dz = ref_VectorIdiv_lanes([0xF6, 7], [0x02, 0], sew=0, sign=1)
+        >>> hex(q[0]), hex(r[1]), dz.tolist()
+        ('0xfb', '0x7', [False, True])
+    """
+    dividend = np.asarray(dividend, dtype=np.uint64).reshape(-1)
+    divisor = np.asarray(divisor, dtype=np.uint64).reshape(-1)
+    if dividend.size != divisor.size:
+        raise ValueError(f"操作数长度不一致: {dividend.size} vs {divisor.size}")
+    sews = np.broadcast_to(np.asarray(sew, dtype=np.int64), dividend.shape)
+    signs = np.broadcast_to(np.asarray(sign, dtype=np.int64), dividend.shape).astype(bool)
+    if not np.isin(sews, [0, 1, 2, 3]).all():
+        raise ValueError(f"无效的SEW值: {np.unique(sews[~np.isin(sews, [0, 1, 2, 3])]).tolist()}")
+    if not np.isin(np.asarray(sign), [0, 1]).all():
+        raise ValueError(f"无效的SIGN值: {np.unique(np.asarray(sign)).tolist()}")
+
+    width = np.uint64(8) << sews.astype(np.uint64)
+    mask = _lane_mask(width)
+    a = dividend & mask
+    b = divisor & mask
+    d_zero = b == 0
+
+    # 有符号时先取绝对值做无符号整除，INT_MIN的绝对值2^(w-1)仍可用uint64表示
+    sign_shift = width - np.uint64(1)
+    a_neg = signs & ((a >> sign_shift) & np.uint64(1)).astype(bool)
+    b_neg = signs & ((b >> sign_shift) & np.uint64(1)).astype(bool)
+    a_mag = np.where(a_neg, _negate(a) & mask, a)
+    b_mag = np.where(b_neg, _negate(b) & mask, b)
+    b_mag[d_zero] = 1
+
+    q_mag = a_mag // b_mag
+    r_mag = a_mag % b_mag
+    # INT_MIN/-1时|商|=2^(w-1)，截断回w位后恰好是INT_MIN，余数为0，无需单独处理
+    quotient = np.where(a_neg ^ b_neg, _negate(q_mag), q_mag) & mask
+    remainder = np.where(a_neg, _negate(r_mag), r_mag) & mask
+
+    quotient[d_zero] = mask[d_zero]
+    remainder[d_zero] = a[d_zero]
+    return quotient, remainder, d_zero
+
+
+def _split_words(words):
+    """128位整数序列 -> (N, 2)的uint64数组，列0为低64位"""
+    words = list(words)
+    lo = np.fromiter((w & _MASK64 for w in words), dtype=np.uint64, count=len(words))
+    hi = np.fromiter(((w >> 64) & _MASK64 for w in words), dtype=np.uint64, count=len(words))
+    return np.stack([lo, hi], axis=1)
+
+
+def _join_words(halves):
+    """_split_words的逆运算，返回Python整数列表"""
+    return [(hi << 64) | lo for lo, hi in halves.tolist()]
+
+
+def ref_VectorIdiv_operations(dividend, divisor, sew=2, sign=0):
+    """按128位向量计算期望的DUT输出
+
+    相同SEW的向量一起拆通道，单次调用内所有事务的全部通道合并为一次数组运算。
+
+    Args:
+        dividend (list): 128位被除数向量序列（Python整数）
+        divisor (list): 128位除数向量序列，长度与dividend一致
+        sew (int | array_like, optional): 元素宽度或逐向量列，默认为2（32位）
+        sign (int | array_like, optional): 符号模式或逐向量列，默认为0（无符号）
+
+    Returns:
+        dict: 逐向量结果
+            - quotient (list): 期望的128位商
+            - remainder (list): 期望的128位余数
+            - d_zero (np.ndarray): 期望的16位io_d_zero（bit i对应通道i）
+
+    Raises:
+        ValueError: 操作数长度不一致或sew/sign无效时抛出
+
+    Example:
+        >>> res = ref_VectorIdiv_operations([0xAD426E03D65E3658], [(1 << 64) | 0x990D], sew=3)
+        >>> hex(res['quotient'][0]), hex(res['remainder'][0])
+        ('0x121cd52f8ad93', '0x8ae1')
+    """
+    a_words = _split_words(dividend)
+    b_words = _split_words(divisor)
+    count = len(a_words)
+    if len(b_words) != count:
+        raise ValueError(f"操作数长度不一致: {count} vs {len(b_words)}")
+    sews = np.broadcast_to(np.asarray(sew, dtype=np.int64), (count,))
+    signs = np.broadcast_to(np.asarray(sign, dtype=np.int64), (count,))
+    if not np.isin(sews, [0, 1, 2, 3]).all():
+        raise ValueError(f"无效的SEW值: {np.unique(sews[~np.isin(sews, [0, 1, 2, 3])]).tolist()}")
+
+    quotient = np.zeros((count, 2), dtype=np.uint64)
+    remainder = np.zeros((count, 2), dtype=np.uint64)
+    d_zero = np.zeros(count, dtype=np.uint64)
+    for group_sew in np.unique(sews).tolist():
+        index = np.flatnonzero(sews == group_sew)
+        width = 8 << group_sew
+        half = 64 // width
+        shifts = np.arange(half, dtype=np.uint64) * np.uint64(width)
+        mask = np.uint64(_MASK64 >> (64 - width))
+        # (n, 2, half)：每个64位半字内的通道，展平后通道顺序与DUT一致
+        a = (a_words[index][:, :, None] >> shifts) & mask
+        b = (b_words[index][:, :, None] >> shifts) & mask
+        q, r, dz = ref_VectorIdiv_lanes(a.reshape(-1), b.reshape(-1), group_sew,
+                                        np.repeat(signs[index], 2 * half))
+        quotient[index] = np.bitwise_or.reduce(q.reshape(-1, 2, half) << shifts, axis=2)
+        remainder[index] = np.bitwise_or.reduce(r.reshape(-1, 2, half) << shifts, axis=2)
+        lane_bits = np.uint64(1) << np.arange(2 * half, dtype=np.uint64)
+        d_zero[index] = np.bitwise_or.reduce(np.where(dz.reshape(-1, 2 * half), lane_bits, np.uint64(0)), axis=1)
+    return {
+        'quotient': _join_words(quotient),
+        'remainder': _join_words(remainder),
+        'd_zero': d_zero,
+    }
+
+
+def ref_VectorIdiv_check(records):
+    """用参考模型批量比对api_VectorIdiv_stream_divisions的结果
+
+    Args:
+        records (list): 结果记录列表，每项至少包含dividend/divisor/sew/sign/quotient/remainder/d_zero
+
+    Returns:
+        list: 不一致记录列表，每项在原记录上附加expect_quotient、expect_remainder和expect_d_zero
+    """
+    if not records:
+        return []
+    expect = ref_VectorIdiv_operations([rec['dividend'] for rec in records], [rec['divisor'] for rec in records],
+                                       [rec['sew'] for rec in records], [rec['sign'] for rec in records])
+    got_q = _split_words(rec['quotient'] for rec in records)
+    got_r = _split_words(rec['remainder'] for rec in records)
+    got_dz = np.array([rec['d_zero'] for rec in records], dtype=np.uint64)
+    bad = np.flatnonzero((got_q != _split_words(expect['quotient'])).any(axis=1) |
+                         (got_r != _split_words(expect['remainder'])).any(axis=1) |
+                         (got_dz != expect['d_zero']))
+    return [dict(records[i], expect_quotient=expect['quotient'][i], expect_remainder=expect['remainder'][i],
+                 expect_d_zero=int(expect['d_zero'][i])) for i in bad.tolist()]
@@ -0,0 +1,105 @@
+#coding=utf-8
+"""
+VectorIdiv复位后状态快照
+
+VectorIdivEnv.reset保持复位5个周期再等待5个周期，Env的__init__与每个用例都要执行，模糊测试每轮
+输入也需要一个干净的初始状态。VectorIdivResetSnapshot在复位完成后把完整的仿真状态保存一次，之后
+每次restore()直接恢复（Verilator VerilatedRestore），不推进复位周期，也不重建DUT：
+
+    make build_dut_cache SAVABLE=1    # 以Verilator --savable编译，DUT才支持CheckPoint/Restore
+
+    snapshot = VectorIdivResetSnapshot(env)
+    for ops in corpus:
+        snapshot.restore()
+        api_VectorIdiv_stream_divisions(env, ops)
+    snapshot.close()
+
+构造时先CheckPoint再Restore一次，由DUT自身的返回码判断是否支持快照：picker导出的CheckPoint/Restore
+成功时返回0，未以--savable编译时返回非0。DUT没有这两个方法、任一返回非0或抛出异常时supported为False，
+restore()退化为把输入引脚恢复为快照时的取值后执行env.reset()。恢复的是RTL状态：输入引脚重写为快照时的取值，
+Env中由reset()维护的Python侧状态一并还原；功能覆盖率计数、波形与StepRis回调不受影响。
+快照文件默认放在/dev/shm（不存在时为系统临时目录），可用环境变量DUT_SNAPSHOT_DIR覆盖。
+
+DUT_POOL=1时实例池同样使用快照：实例新建并复位后保存一次，之后每次取出时恢复快照而不是重新复位。
+"""
+
+import os
+import tempfile
+
+
+SNAPSHOT_DIR = os.environ.get("DUT_SNAPSHOT_DIR", "/dev/shm" if os.path.isdir("/dev/shm") else None)
+
+# 恢复后重写的输入引脚
+INPUT_PINS = ["reset", "io_sew", "io_sign", "io_dividend_v", "io_divisor_v", "io_flush",
+              "io_div_in_valid", "io_div_out_ready"]
+
+# VectorIdivEnv.reset()维护的Python侧状态，随快照保存与还原
+ENV_ATTRS = ["_cycle", "d_zero_mask", "_d_zero_forced_clear", "_current_sew", "_current_sign",
+             "_current_dividend", "_current_divisor"]
+
+
+class VectorIdivResetSnapshot:
+    """复位后的仿真状态快照
+
+    Args:
+        env: 已复位的VectorIdivEnv，或任何带dut属性与reset()方法的对象（如实例池中的PooledDUT）
+        directory (str, optional): 快照文件目录，默认为SNAPSHOT_DIR
+
+    Attributes:
+        supported (bool): DUT是否支持快照，False时restore()执行env.reset()
+        restores (int): 通过快照恢复的次数
+
+    Example:
+        >>> snapshot = VectorIdivResetSnapshot(env)
+        >>> snapshot.restore()
+        True
+    """
+
+    def __init__(self, env, directory=None):
+        self.env = env
+        self.dut = env.dut
+        fd, self.path = tempfile.mkstemp(prefix="VectorIdiv-", suffix=".snapshot", dir=directory or SNAPSHOT_DIR)
+        os.close(fd)
+        self.inputs = {name: getattr(self.dut, name).value for name in INPUT_PINS}
+        self.env_state = {name: getattr(env, name) for name in ENV_ATTRS if hasattr(env, name)}
+        self.restores = 0
+        self.supported = self._checkpoint()
+
+    def _checkpoint(self):
+        """保存快照并立即恢复一次，CheckPoint与Restore都返回0时DUT支持快照"""
+        checkpoint, restore = getattr(self.dut, "CheckPoint", None), getattr(self.dut, "Restore", None)
+        if checkpoint is None or restore is None:
+            return False
+        try:
+            return checkpoint(self.path) == 0 and restore(self.path) == 0
+        except Exception:
+            return False
+
+    def restore(self):
+        """恢复到快照时的状态
+
+        Returns:
+            bool: True表示从快照恢复，False表示DUT不支持快照、已执行env.reset()
+        """
+        if self.supported:
+            try:
+                self.supported = self.dut.Restore(self.path) == 0
+            except Exception:
+                self.supported = False
+        for name, value in self.inputs.items():
+            getattr(self.dut, name).value = value
+        if not self.supported:
+            self.env.reset()  # 先撤销输入，避免复位释放后接收残留的有效请求
+            return False
+        for name, value in self.env_state.items():
+            setattr(self.env, name, value)
+        engine = getattr(self.env, "engine", None)
+        if engine is not None:
+            engine.reset()
+        self.restores += 1
+        return True
+
+    def close(self):
+        """删除快照文件"""
+        if os.path.exists(self.path):
+            os.remove(self.path)
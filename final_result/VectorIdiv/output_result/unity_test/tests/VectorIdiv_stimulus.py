@@ -0,0 +1,231 @@
+#coding=utf-8
+"""
+VectorIdiv加权约束随机激励库
+
+随机回归以“数据”声明：每个字段给出{取值: 权重}分布，由VectorIdivStimulus按种子向量化
+生成(dividend, divisor, sew, sign)四元组，可一次生成，也可按批次流式产出，直接交给
+api_VectorIdiv_stream_divisions事务引擎连续发送。
+
+支持的字段（未给出的字段使用DEFAULT_SPEC）：
+    - sew / sign: {取值: 权重}
+    - dividend / divisor: 逐通道数值类别分布，类别见VALUE_CLASSES
+    - dividend_lzc / divisor_lzc: {前导零个数: 权重}，作用于'normalized'类别
+    - dividend_top / divisor_top: {(模式, 位数): 权重}，'normalized'类别在前导零之后紧跟的高位模式，
+      模式最高位应为1，例如{(0b1110, 4): 1}表示规格化后最高4位为1110（SRT商选择表的某一行）
+    - lane_pattern: {'independent': 各通道独立, 'splat': 各通道相同, 'single': 只有一个通道
+      按分布取值、其余通道为'random'}
+
+Example:
+    >>> # bug_2的复现条件：64位无符号，规格化后除数最高4位为1110
+    >>> spec = {'sew': {3: 1}, 'sign': {0: 1}, 'divisor': {'normalized': 5, 'random': 3, 'small': 2},
+    ...         'divisor_lzc': {0: 1}, 'divisor_top': {(0b1110, 4): 1}}
+    >>> result = api_VectorIdiv_run_campaign(env, spec, count=50000, seed=2)
+    >>> assert not result['mismatches']
+"""
+
+import numpy as np
+
+from VectorIdiv_api import api_VectorIdiv_stream_divisions
+from VectorIdiv_bulk import lane_count, pack_lanes
+from VectorIdiv_ref import ref_VectorIdiv_check
+
+
+# 逐通道数值类别（均为按元素位宽的原始位模式，有/无符号解释由sign决定）
+VALUE_CLASSES = ('zero', 'one', 'minus_one', 'int_min', 'int_max', 'small', 'random', 'normalized')
+
+DEFAULT_SPEC = {
+    'sew': {0: 1, 1: 1, 2: 1, 3: 1},
+    'sign': {0: 1, 1: 1},
+    'dividend': {'random': 6, 'normalized': 2, 'small': 1, 'zero': 0.5, 'int_min': 0.5, 'int_max': 0.5},
+    'divisor': {'random': 4, 'normalized': 3, 'small': 2, 'one': 0.5, 'minus_one': 0.5, 'zero': 0.5},
+    'dividend_lzc': None,
+    'divisor_lzc': None,
+    'dividend_top': None,
+    'divisor_top': None,
+    'lane_pattern': {'independent': 8, 'splat': 1, 'single': 1},
+}
+
+_ALL_ONES = np.uint64((1 << 64) - 1)
+
+
+def weighted_choice(rng, weights, size):
+    """按{取值: 权重}独立抽样
+
+    Args:
+        rng (np.random.Generator): 随机数发生器
+        weights (dict): {取值: 权重}，权重非负且和大于0
+        size (int): 抽样个数
+
+    Returns:
+        np.ndarray: 取值数组
+
+    Raises:
+        ValueError: 权重无效时抛出
+    """
+    keys = list(weights)
+    p = np.array([weights[k] for k in keys], dtype=float)
+    if not keys or (p < 0).any() or p.sum() <= 0:
+        raise ValueError(f"无效的权重分布: {weights}")
+    index = rng.choice(len(keys), size=size, p=p / p.sum())
+    if isinstance(keys[0], tuple):
+        return [keys[i] for i in index.tolist()]
+    return np.asarray(keys)[index]
+
+
+def _low_bits(rng, bits):
+    """逐元素生成bits位（0~64）的随机数"""
+    bits = np.asarray(bits, dtype=np.uint64)
+    raw = rng.integers(0, 1 << 64, bits.shape, dtype=np.uint64)
+    mask = np.where(bits == 0, np.uint64(0), _ALL_ONES >> (np.uint64(64) - np.maximum(bits, np.uint64(1))))
+    return raw & mask
+
+
+def int_lanes(rng, classes, count, width, lzc=None, top=None):
+    """按数值类别分布生成整数通道位模式
+
+    Args:
+        rng (np.random.Generator): 随机数发生器
+        classes (dict): {类别: 权重}，类别见VALUE_CLASSES
+        count (int): 通道个数
+        width (int): 元素位宽（8/16/32/64）
+        lzc (dict, optional): 'normalized'类别的{前导零个数: 权重}，默认在0~width-1中均匀选取
+        top (dict, optional): 'normalized'类别的{(模式, 位数): 权重}，默认不约束高位
+
+    Returns:
+        np.ndarray: uint64通道值（按元素位宽零扩展）
+    """
+    unknown = set(classes) - set(VALUE_CLASSES)
+    if unknown:
+        raise ValueError(f"未知的数值类别: {sorted(unknown)}，可选: {VALUE_CLASSES}")
+    mask = np.uint64((1 << width) - 1)
+    kind = weighted_choice(rng, classes, count)
+    values = rng.integers(0, 1 << 64, count, dtype=np.uint64) & mask
+
+    # 规格化数：lz个前导零、一个或多个指定高位，其余低位随机
+    leading = (weighted_choice(rng, lzc, count).astype(np.int64) if lzc
+               else rng.integers(0, width, count))
+    leading = np.clip(leading, 0, width - 1)
+    avail = width - leading
+    if top:
+        chosen = weighted_choice(rng, top, count)
+        pattern = np.array([p for p, _ in chosen], dtype=np.uint64)
+        bits = np.array([k for _, k in chosen], dtype=np.int64)
+    else:
+        pattern = np.ones(count, dtype=np.uint64)
+        bits = np.ones(count, dtype=np.int64)
+    keep = np.minimum(bits, avail)
+    pattern = pattern >> (bits - keep).astype(np.uint64)
+    low = (avail - keep).astype(np.uint64)
+    normalized = (pattern << low) | _low_bits(rng, low) | (np.uint64(1) << (avail - 1).astype(np.uint64))
+
+    small = rng.integers(1, (1 << (width // 2)) + 1, count).astype(np.uint64)
+    return np.select(
+        [kind == 'zero', kind == 'one', kind == 'minus_one', kind == 'int_min', kind == 'int_max',
+         kind == 'small', kind == 'normalized'],
+        [np.uint64(0), np.uint64(1), mask, np.uint64(1 << (width - 1)), np.uint64((1 << (width - 1)) - 1),
+         small, normalized & mask],
+        values,
+    ).astype(np.uint64)
+
+
+class VectorIdivStimulus:
+    """可设定种子的加权约束随机激励发生器
+
+    Attributes:
+        spec (dict): 合并默认值后的分布声明
+        rng (np.random.Generator): 随机数发生器，连续调用generate/stream会继续同一随机序列
+    """
+
+    def __init__(self, spec=None, seed=0):
+        """
+        Args:
+            spec (dict, optional): 分布声明，未给出的字段取DEFAULT_SPEC
+            seed (int, optional): 随机种子，默认为0
+        """
+        unknown = set(spec or {}) - set(DEFAULT_SPEC)
+        if unknown:
+            raise ValueError(f"未知的激励字段: {sorted(unknown)}")
+        self.spec = dict(DEFAULT_SPEC, **(spec or {}))
+        self.rng = np.random.default_rng(seed)
+
+    def _operand(self, name, count, sew, pattern, keep):
+        """为同一SEW的count个向量生成一个操作数的128位向量"""
+        spec, rng = self.spec, self.rng
+        width = 8 << sew
+        lanes = lane_count(sew)
+        grid = int_lanes(rng, spec[name], count * lanes, width,
+                         spec[f'{name}_lzc'], spec[f'{name}_top']).reshape(-1, lanes)
+        splat = pattern == 'splat'
+        grid[splat] = grid[splat, :1]
+        single = np.flatnonzero(pattern == 'single')
+        if single.size:
+            background = int_lanes(rng, {'random': 1}, single.size * lanes, width).reshape(-1, lanes)
+            background[np.arange(single.size), keep[single]] = grid[single, keep[single]]
+            grid[single] = background
+        return pack_lanes(grid.reshape(-1), sew)
+
+    def generate(self, count):
+        """生成count个操作
+
+        Returns:
+            list: (dividend, divisor, sew, sign)四元组列表，操作数为128位Python整数
+        """
+        spec, rng = self.spec, self.rng
+        sews = weighted_choice(rng, spec['sew'], count).astype(np.int64)
+        signs = weighted_choice(rng, spec['sign'], count).astype(np.int64)
+        dividends = [0] * count
+        divisors = [0] * count
+        for sew in np.unique(sews).tolist():
+            index = np.flatnonzero(sews == sew)
+            pattern = weighted_choice(rng, spec['lane_pattern'], len(index))
+            keep = rng.integers(0, lane_count(sew), len(index))
+            words_a = self._operand('dividend', len(index), sew, pattern, keep)
+            words_b = self._operand('divisor', len(index), sew, pattern, keep)
+            for i, a, b in zip(index.tolist(), words_a, words_b):
+                dividends[i], divisors[i] = a, b
+        return list(zip(dividends, divisors, sews.tolist(), signs.tolist()))
+
+    def stream(self, count, batch=1024):
+        """按批次流式产出共count个操作，每批为generate(batch)的结果
+
+        相同的种子和批大小产生相同的操作序列。
+        """
+        while count > 0:
+            size = min(batch, count)
+            count -= size
+            yield self.generate(size)
+
+
+def api_VectorIdiv_run_campaign(env, spec=None, count=10000, seed=0, batch=1024, timeout: int = 1000):
+    """按分布声明运行一次定向随机回归，并用参考模型逐批比对
+
+    Args:
+        env: VectorIdivEnv实例，必须是已初始化的Env实例
+        spec (dict, optional): 分布声明，见模块说明
+        count (int, optional): 操作总数，默认为10000
+        seed (int, optional): 随机种子，默认为0
+        batch (int, optional): 每批发送的操作数，默认为1024
+        timeout (int, optional): 连续无握手进展的最大周期数，默认为1000
+
+    Returns:
+        dict: 回归结果
+            - count (int): 已发送的操作数
+            - mismatches (list): 与参考模型不一致的记录，index为全局序号
+
+    Example:
+        >>> res = api_VectorIdiv_run_campaign(env, {'sew': {0: 1}, 'sign': {1: 1}}, count=4096)
+        >>> res['mismatches'][:1]
+    """
+    stimulus = VectorIdivStimulus(spec, seed)
+    issued = 0
+    mismatches = []
+    for operations in stimulus.stream(count, batch):
+        records = api_VectorIdiv_stream_divisions(env, operations, timeout=timeout)
+        for offset, rec in enumerate(records):
+            rec['index'] = issued + offset
+        mismatches.extend(ref_VectorIdiv_check(records))
+        issued += len(operations)
+    return {
+        'count': issued,
+        'mismatches': mismatches,
+    }
@@ -1,6 +1,58 @@
+import os
+import sys
+
 import pytest
 
+# 仓库的scripts目录（line_cov_index等），make unity_test已将其加入PYTHONPATH，直接运行pytest时在此补上
+SCRIPTS_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "..", "..", "..", "scripts"))
+if SCRIPTS_DIR not in sys.path:
+    sys.path.append(SCRIPTS_DIR)
+
+from VectorIdiv_waveform import WAVEFORM_MODE, WAVEFORM_RERUN_PASS, seed_test
+
 # Autouse fixture – now only used to keep a consistent hook point without forcing failures
 @pytest.fixture(autouse=True)
 def template_not_implemented(request):
     yield
+
+
+@pytest.fixture(scope="session")
+def dut_pool(request):
+    """DUT实例池：DUT_POOL=1时每个进程（xdist worker）一个，未开启时为None，dut fixture每次新建DUT"""
+    from VectorIdiv_pool import POOL_ENABLED, VectorIdivDUTPool
+    if not POOL_ENABLED:
+        yield None
+        return
+    pool = VectorIdivDUTPool()
+    yield pool
+    pool.close()
+    reporter = request.config.pluginmanager.get_plugin("terminalreporter")
+    if reporter is not None:
+        reporter.write_line(f"VectorIdiv DUT实例池: {pool.stats}")
+
+
+@pytest.fixture(autouse=True)
+def waveform_rerun_seed(request):
+    """DUT_WAVEFORM=rerun时按nodeid固定随机种子，使失败重跑与首次运行的激励一致"""
+    if WAVEFORM_MODE == "rerun":
+        seed_test(request.node.nodeid)
+    yield
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    # 把各阶段报告挂到用例上（rep_setup/rep_call/rep_teardown），dut fixture据此判断用例是否失败
+    outcome = yield
+    report = outcome.get_result()
+    setattr(item, "rep_" + report.when, report)
+
+
+def pytest_terminal_summary(terminalreporter):
+    """DUT_WAVEFORM=rerun的第二遍：列出带波形重跑后通过（未复现失败）的用例，这些用例的激励不由种子决定"""
+    if WAVEFORM_MODE != "rerun" or not WAVEFORM_RERUN_PASS:
+        return
+    passed = [report.nodeid for report in terminalreporter.stats.get("passed", []) if report.when == "call"]
+    if passed:
+        terminalreporter.section("带波形重跑未复现失败")
+        for nodeid in passed:
+            terminalreporter.write_line(nodeid)
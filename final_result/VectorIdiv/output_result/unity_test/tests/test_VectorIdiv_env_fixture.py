@@ -274,4 +274,18 @@ def test_api_VectorIdiv_env_io_interface_consistency(env):
     
     # 验证一致性
     assert env.div_control.div_in_valid.value == io_in_valid, "div_control.div_in_valid和io.div_in_valid应该一致"
-    assert env.div_control.div_out_ready.value == io_out_ready, "div_control.div_out_ready和io.div_out_ready应该一致"
\ No newline at end of file
+    assert env.div_control.div_out_ready.value == io_out_ready, "div_control.div_out_ready和io.div_out_ready应该一致"
+
+def test_api_VectorIdiv_env_coverage_sampler(env):
+    """测试边沿触发采样器：仅在握手及控制信号翻转的周期评估检查点"""
+    env.dut.fc_cover["FG-PIPELINE-CONTROL"].mark_function("FC-HANDSHAKE-PROTOCOL", test_api_VectorIdiv_env_coverage_sampler,
+                                                        ["CK-INPUT-HANDSHAKE", "CK-OUTPUT-HANDSHAKE"])
+
+    sampler = env.dut.fc_sampler
+    idle_start = sampler.sampled_cycles
+    env.Step(100)
+    assert sampler.sampled_cycles == idle_start, "空闲时不应评估检查点"
+
+    res = api_VectorIdiv_divide(env, dividend=100, divisor=25, sew=2, sign=0)
+    assert res["quotient"] == 4
+    assert sampler.sampled_cycles < sampler.cycles, "除法期间只在握手与状态翻转周期采样"
@@ -0,0 +1,80 @@
+#coding=utf-8
+"""
+VectorIdiv DUT实例池测试：复用前的复位与状态卫生检查
+
+池中的实例以request=None新建，覆盖率/波形文件使用默认文件名，不影响env fixture自身DUT的文件登记
+"""
+
+from VectorIdiv_api import *
+from VectorIdiv_pool import VectorIdivDUTPool, hygiene_signature
+
+
+def test_api_VectorIdiv_pool_reuse_after_reset(env):
+    """测试实例归还时留有在途运算，再次取出时已复位干净且运算结果正确"""
+    env.dut.fc_cover["FG-PIPELINE-CONTROL"].mark_function("FC-STATE-CONTROL", test_api_VectorIdiv_pool_reuse_after_reset,
+                                                        ["CK-RESET-RECOVERY"])
+
+    pool = VectorIdivDUTPool(max_uses=3, line_cov="summary")
+    try:
+        slot = pool.acquire(None)
+        first = slot.dut
+        # 握手后不取结果就归还，模拟用例中途失败留下的在途运算
+        first.io_sew.value = 2
+        first.io_dividend_v.value = 1000
+        first.io_divisor_v.value = 7
+        first.io_div_in_valid.value = 1
+        first.Step(3)
+        pool.release(slot)
+
+        slot = pool.acquire(None)
+        assert slot.dut is first, "空闲实例应被复用"
+        assert pool.stats == {"created": 1, "reused": 1, "dirty": 0, "recycled": 0, "rotated": 0}, pool.stats
+        assert hygiene_signature(slot.dut) == slot.signature
+        assert slot.dut.io_div_out_valid.value == 0, "复位后不应残留输出"
+
+        result = api_VectorIdiv_divide(VectorIdivEnv(slot.dut), dividend=100, divisor=7, sew=2, sign=0)
+        assert result["quotient"] == 14 and result["remainder"] == 2, f"复用实例的结果错误: {result}"
+        pool.release(slot)
+    finally:
+        pool.close()
+
+
+def test_api_VectorIdiv_pool_dirty_and_recycled_instances(env):
+    """测试卫生检查失败的实例与服务满max_uses的实例都会退役"""
+    env.dut.fc_cover["FG-PIPELINE-CONTROL"].mark_function("FC-STATE-CONTROL", test_api_VectorIdiv_pool_dirty_and_recycled_instances,
+                                                        ["CK-RESET-RECOVERY"])
+
+    pool = VectorIdivDUTPool(max_uses=2, line_cov="summary")
+    try:
+        slot = pool.acquire(None)
+        dirty = slot.dut
+        pool.release(slot)
+        slot.signature = tuple(1 - v for v in slot.signature)  # 使复位后的状态与记录不一致
+        slot = pool.acquire(None)
+        assert slot.dut is not dirty, "未通过卫生检查的实例不应被复用"
+        assert pool.stats["dirty"] == 1 and pool.stats["created"] == 2, pool.stats
+
+        pool.release(slot)
+        slot = pool.acquire(None)
+        pool.release(slot)
+        assert pool.stats["recycled"] == 1 and not pool.idle, f"服务满max_uses的实例应退役: {pool.stats}"
+    finally:
+        pool.close()
+
+
+def test_api_VectorIdiv_pool_rotates_line_coverage(env):
+    """测试DUT_POOL_LINE_COV=test时实例归还即退役，每个用例的代码行覆盖率写入各自的.dat"""
+    env.dut.fc_cover["FG-PIPELINE-CONTROL"].mark_function("FC-STATE-CONTROL", test_api_VectorIdiv_pool_rotates_line_coverage,
+                                                        ["CK-RESET-RECOVERY"])
+
+    pool = VectorIdivDUTPool(line_cov="test")
+    try:
+        slot = pool.acquire(None)
+        first = slot.dut
+        pool.release(slot)
+        assert pool.stats["rotated"] == 1 and not pool.idle, f"归还的实例应退役并写出.dat: {pool.stats}"
+        slot = pool.acquire(None)
+        assert slot.dut is not first and pool.stats["created"] == 2, "下一个用例应取得新建的实例"
+        pool.release(slot)
+    finally:
+        pool.close()
@@ -0,0 +1,66 @@
+#coding=utf-8
+"""
+VectorIdiv内部信号探针测试：按层次名绑定SRT16Divint内部信号并逐周期采样
+"""
+
+import numpy as np
+
+from VectorIdiv_api import *
+from VectorIdiv_probe import SRT_ITER_REGS, srt_probe_names
+
+
+def _srt_probe(env, depth=PROBE_DEPTH):
+    probe = env.probe(srt_probe_names("_64bit_divide_0"), depth=depth)
+    if probe.missing:
+        env.remove_probe(probe)
+        pytest.skip(f"DUT未以--rw导出内部信号: {probe.missing[0]}")
+    return probe
+
+
+def test_api_VectorIdiv_probe_ring_buffer(env):
+    """测试每次Step采样一次，环形缓冲区只保留最近depth个周期，移除后停止采样
+
+    Args:
+        env: Env fixture实例，由pytest自动注入
+    """
+    env.dut.fc_cover["FG-PIPELINE-CONTROL"].mark_function("FC-HANDSHAKE-PROTOCOL", test_api_VectorIdiv_probe_ring_buffer,
+                                                        ["CK-INPUT-HANDSHAKE"])
+
+    probe = _srt_probe(env, depth=8)
+    assert probe.widths["_64bit_divide_0.stateReg"], "应能读取信号位宽"
+    env.Step(5)
+    env.Step(15)
+    assert probe.count == 20 and len(probe) == 8, "每个周期应采样一次，缓冲区只保留最近8个"
+    assert probe.cycles.tolist() == list(range(13, 21)), "应按时间顺序返回最近8个周期"
+    assert probe["_64bit_divide_0.stateReg"].dtype == np.uint64
+    assert set(probe.to_dict()) == {"cycle"} | set(probe.names)
+
+    env.remove_probe(probe)
+    env.Step(3)
+    assert probe.count == 20, "移除后不应再采样"
+
+    alias = env.probe({"state": "_64bit_divide_0.stateReg"}, strict=True)
+    env.Step(1)
+    assert alias.names == ["state"] and alias.last("state") == alias["state"][-1], "应按别名读取"
+    with pytest.raises(KeyError):
+        env.probe(["_64bit_divide_0.no_such_reg"], strict=True)
+
+
+def test_api_VectorIdiv_probe_srt_iteration(env):
+    """测试64位除法期间SRT16Divint状态机推进，商选择表索引在合法范围内
+
+    Args:
+        env: Env fixture实例，由pytest自动注入
+    """
+    env.dut.fc_cover["FG-CONFIGURATION-CONTROL"].mark_function("FC-PRECISION-CONFIG", test_api_VectorIdiv_probe_srt_iteration,
+                                                             ["CK-SEW-11"])
+
+    probe = _srt_probe(env)
+    start = env._cycle
+    result = api_VectorIdiv_divide(env, dividend=1000, divisor=7, sew=3, sign=0)
+    assert result['quotient'] & ((1 << 64) - 1) == 142, f"预期元素0的商为142，实际为{result['quotient']:#x}"
+    assert probe.count == env._cycle - start, "除法期间每个周期应采样一次"
+    for reg in SRT_ITER_REGS:
+        assert f"_64bit_divide_0.{reg}" in probe.names
+    assert len(np.unique(probe["_64bit_divide_0.stateReg"])) > 1, "除法期间stateReg应发生变化"
+    assert probe["_64bit_divide_0.qds_cons.io_d_trunc_3"].max() <= 7, "d_trunc_3为3位表索引"
@@ -0,0 +1,127 @@
+#coding=utf-8
+"""
+VectorIdiv逐通道参考模型测试
+
+用ref_VectorIdiv_check批量比对流式/批量接口的全部输出，包括除零和INT_MIN/-1溢出通道。
+"""
+
+import pytest
+import numpy as np
+
+from VectorIdiv_api import *
+from VectorIdiv_bulk import *
+from VectorIdiv_ref import *
+
+
+def _biased_lanes(rng, count, width):
+    """随机通道值，约一半取0、1、-1、INT_MIN、INT_MAX等边界值"""
+    mask = (1 << width) - 1
+    edges = np.array([0, 1, mask, 1 << (width - 1), (1 << (width - 1)) - 1], dtype=np.uint64)
+    lanes = rng.integers(0, mask, count, dtype=np.uint64, endpoint=True)
+    pick = rng.random(count) < 0.5
+    lanes[pick] = rng.choice(edges, int(pick.sum()))
+    return lanes
+
+
+def _random_ops(rng, count):
+    ops = []
+    for sew in (0, 1, 2, 3):
+        width = 8 << sew
+        lanes = lane_count(sew)
+        for sign in (0, 1):
+            dividends = pack_lanes(_biased_lanes(rng, count * lanes, width), sew)
+            divisors = pack_lanes(_biased_lanes(rng, count * lanes, width), sew)
+            ops.extend((a, b, sew, sign) for a, b in zip(dividends, divisors))
+    order = rng.permutation(len(ops))
+    return [ops[i] for i in order]
+
+
+def _describe(mismatch):
+    return (f"tag={mismatch['tag']} sew={mismatch['sew']} sign={mismatch['sign']} "
+            f"a=0x{mismatch['dividend']:x} b=0x{mismatch['divisor']:x} "
+            f"DUT=(0x{mismatch['quotient']:x}, 0x{mismatch['remainder']:x}, 0x{mismatch['d_zero']:x}) "
+            f"参考=(0x{mismatch['expect_quotient']:x}, 0x{mismatch['expect_remainder']:x}, 0x{mismatch['expect_d_zero']:x})")
+
+
+def test_api_VectorIdiv_ref_random_campaign(env):
+    """测试各SEW×符号模式的随机向量流与参考模型逐通道一致
+
+    Args:
+        env: Env fixture实例，由pytest自动注入
+    """
+    env.dut.fc_cover["FG-API"].mark_function("FC-VECTOR-DIVISION", test_api_VectorIdiv_ref_random_campaign,
+                                             ["CK-UNSIGNED-8", "CK-SIGNED-8", "CK-UNSIGNED-16", "CK-SIGNED-16",
+                                              "CK-UNSIGNED-32", "CK-SIGNED-32", "CK-UNSIGNED-64", "CK-SIGNED-64",
+                                              "CK-QUOTIENT", "CK-REMAINDER", "CK-IDENTITY"])
+
+    ops = _random_ops(np.random.default_rng(2512), 40)
+    records = api_VectorIdiv_stream_divisions(env, ops)
+    mismatches = ref_VectorIdiv_check(records)
+    assert not mismatches, f"{len(mismatches)}个向量与参考模型不一致，首个: {_describe(mismatches[0])}"
+
+
+def test_api_VectorIdiv_ref_divide_by_zero_and_overflow(env):
+    """测试除零与INT_MIN/-1溢出通道的商、余数和io_d_zero与参考模型一致
+
+    Args:
+        env: Env fixture实例，由pytest自动注入
+    """
+    env.dut.fc_cover["FG-BOUNDARY-HANDLING"].mark_function("FC-DIVIDE-BY-ZERO", test_api_VectorIdiv_ref_divide_by_zero_and_overflow,
+                                                           ["CK-DZERO-FLAGS", "CK-QUOTIENT-ONES", "CK-REMAINDER-DIVIDEND",
+                                                            "CK-PARTIAL-ZERO", "CK-ALL-ZERO", "CK-MIXED-ZERO"])
+    env.dut.fc_cover["FG-BOUNDARY-HANDLING"].mark_function("FC-OVERFLOW-HANDLING", test_api_VectorIdiv_ref_divide_by_zero_and_overflow,
+                                                           ["CK-OVERFLOW-DETECTION", "CK-MIN-NEG-DIV-MINUS1",
+                                                            "CK-QUOTIENT-DIVIDEND", "CK-REMAINDER-ZERO", "CK-NO-UNSIGNED-OVERFLOW",
+                                                            "CK-PRECISION-8", "CK-PRECISION-16", "CK-PRECISION-32",
+                                                            "CK-PRECISION-64"])
+
+    ops = []
+    for sew in (0, 1, 2, 3):
+        width = 8 << sew
+        lanes = lane_count(sew)
+        int_min = np.full(lanes, 1 << (width - 1), dtype=np.uint64)
+        minus_one = np.full(lanes, (1 << width) - 1, dtype=np.uint64)
+        # 偶数通道除0、奇数通道为INT_MIN/-1
+        mixed = minus_one.copy()
+        mixed[::2] = 0
+        for sign in (0, 1):
+            ops.append((pack_lanes(int_min, sew)[0], 0, sew, sign))
+            ops.append((pack_lanes(int_min, sew)[0], pack_lanes(minus_one, sew)[0], sew, sign))
+            ops.append((pack_lanes(int_min, sew)[0], pack_lanes(mixed, sew)[0], sew, sign))
+
+    records = api_VectorIdiv_stream_divisions(env, ops)
+    mismatches = ref_VectorIdiv_check(records)
+    assert not mismatches, f"{len(mismatches)}个边界向量与参考模型不一致，首个: {_describe(mismatches[0])}"
+
+    for rec in records[::3]:
+        assert rec['d_zero'] == (1 << lane_count(rec['sew'])) - 1, "全部除数为0时d_zero应覆盖所有通道"
+        assert rec['quotient'] == (1 << 128) - 1 and rec['remainder'] == rec['dividend'], "除零时商应为全1、余数为被除数"
+    for rec in records[1::3]:
+        if rec['sign']:
+            assert rec['quotient'] == rec['dividend'] and rec['remainder'] == 0, "INT_MIN/-1时商应为INT_MIN、余数为0"
+        assert rec['d_zero'] == 0, "溢出不应置d_zero"
+
+
+def test_api_VectorIdiv_ref_bulk_lanes(env):
+    """测试批量接口拆回的逐元素结果与ref_VectorIdiv_lanes一致
+
+    Args:
+        env: Env fixture实例，由pytest自动注入
+    """
+    env.dut.fc_cover["FG-VECTORIZATION"].mark_function("FC-VECTOR-DATA-MANAGEMENT", test_api_VectorIdiv_ref_bulk_lanes,
+                                                       ["CK-DATA-PACKING", "CK-DATA-UNPACKING", "CK-ELEMENT-ALIGNMENT"])
+
+    rng = np.random.default_rng(2512)
+    count = 256
+    sews = rng.integers(0, 4, count)
+    signs = rng.integers(0, 2, count)
+    widths = 8 << sews
+    a = np.array([_biased_lanes(rng, 1, w)[0] for w in widths.tolist()], dtype=np.uint64)
+    b = np.array([_biased_lanes(rng, 1, w)[0] for w in widths.tolist()], dtype=np.uint64)
+
+    res = api_VectorIdiv_bulk_divisions(env, a, b, sew=sews, sign=signs)
+    expect_q, expect_r, expect_dz = ref_VectorIdiv_lanes(a, b, sews, signs)
+
+    assert np.array_equal(res['quotient'], expect_q), f"商不一致的元素: {np.flatnonzero(res['quotient'] != expect_q)[:8].tolist()}"
+    assert np.array_equal(res['remainder'], expect_r), f"余数不一致的元素: {np.flatnonzero(res['remainder'] != expect_r)[:8].tolist()}"
+    assert np.array_equal(res['d_zero'], expect_dz), "d_zero应恰好标记除数为0的元素"
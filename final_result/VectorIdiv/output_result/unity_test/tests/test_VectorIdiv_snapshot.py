@@ -0,0 +1,75 @@
+#coding=utf-8
+"""
+VectorIdiv复位后状态快照测试
+
+DUT未以--savable编译时快照不可用，restore()退化为env.reset()，以下用例在两种构建下都应通过
+"""
+
+from VectorIdiv_api import *
+from VectorIdiv_snapshot import VectorIdivResetSnapshot
+
+
+def _coverage_hits(dut):
+    """全部功能覆盖组中各bin的累计命中次数之和"""
+    return sum(bin_["hints"] for group in dut.fc_cover.values()
+               for point in group.as_dict()["points"] for bin_ in point["bins"])
+
+
+def test_api_VectorIdiv_snapshot_restore_clears_inflight(env):
+    """测试留有在途运算时恢复快照，DUT回到复位后的空闲状态且之后的运算结果正确"""
+    env.dut.fc_cover["FG-PIPELINE-CONTROL"].mark_function("FC-STATE-CONTROL", test_api_VectorIdiv_snapshot_restore_clears_inflight,
+                                                        ["CK-RESET-RECOVERY"])
+
+    snapshot = VectorIdivResetSnapshot(env)
+    try:
+        idle = (env.dut.io_div_in_ready.value, env.dut.io_div_out_valid.value)
+        env.dut.io_sew.value = 2
+        env.dut.io_dividend_v.value = 1000
+        env.dut.io_divisor_v.value = 7
+        env.dut.io_div_in_valid.value = 1
+        env.Step(3)
+
+        assert snapshot.restore() == snapshot.supported
+        assert (env.dut.io_div_in_ready.value, env.dut.io_div_out_valid.value) == idle, "恢复后应回到空闲状态"
+        assert env.dut.io_div_in_valid.value == 0 and env.dut.io_sew.value == 0, "输入引脚应恢复为快照时的取值"
+
+        result = api_VectorIdiv_divide(env, dividend=100, divisor=7, sew=2, sign=0)
+        assert result["quotient"] == 14 and result["remainder"] == 2, f"恢复后的结果错误: {result}"
+    finally:
+        snapshot.close()
+
+
+def test_api_VectorIdiv_snapshot_repeated_restore(env):
+    """测试多次恢复快照后同一输入得到相同结果，Env的事务队列也被清空"""
+    env.dut.fc_cover["FG-PIPELINE-CONTROL"].mark_function("FC-STATE-CONTROL", test_api_VectorIdiv_snapshot_repeated_restore,
+                                                        ["CK-RESET-RECOVERY"])
+
+    snapshot = VectorIdivResetSnapshot(env)
+    try:
+        results = []
+        for _ in range(3):
+            snapshot.restore()
+            assert not env.engine.input_queue and not env.engine.inflight, "恢复后事务队列应为空"
+            results.append(api_VectorIdiv_divide(env, dividend=1000, divisor=7, sew=2, sign=0))
+        assert all(r["quotient"] == 142 and r["remainder"] == 6 for r in results), f"多次恢复后结果不一致: {results}"
+        assert snapshot.restores == (3 if snapshot.supported else 0)
+    finally:
+        snapshot.close()
+
+
+def test_api_VectorIdiv_snapshot_coverage_accumulates(env):
+    """测试恢复快照不回退功能覆盖率计数，每次恢复后的运算继续累加命中次数"""
+    env.dut.fc_cover["FG-PIPELINE-CONTROL"].mark_function("FC-STATE-CONTROL", test_api_VectorIdiv_snapshot_coverage_accumulates,
+                                                        ["CK-RESET-RECOVERY"])
+
+    snapshot = VectorIdivResetSnapshot(env)
+    try:
+        counts = [_coverage_hits(env.dut)]
+        for _ in range(3):
+            api_VectorIdiv_divide(env, dividend=1000, divisor=7, sew=2, sign=0)
+            counts.append(_coverage_hits(env.dut))
+            snapshot.restore()
+            assert _coverage_hits(env.dut) >= counts[-1], "恢复快照不应回退功能覆盖率计数"
+        assert all(a < b for a, b in zip(counts, counts[1:])), f"每次恢复后的运算都应继续累加命中次数: {counts}"
+    finally:
+        snapshot.close()
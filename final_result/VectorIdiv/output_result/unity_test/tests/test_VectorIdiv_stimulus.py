@@ -0,0 +1,67 @@
+#coding=utf-8
+"""
+VectorIdiv加权约束随机激励库测试
+"""
+
+import pytest
+import numpy as np
+
+from VectorIdiv_api import *
+from VectorIdiv_stimulus import *
+from VectorIdiv_function_coverage_def import extract_vector_elements
+
+
+# bug_2的复现条件以数据声明：64位无符号，除数规格化后最高4位为1110
+SRT_TABLE_SPEC = {
+    'sew': {3: 1},
+    'sign': {0: 1},
+    'divisor': {'normalized': 5, 'random': 3, 'small': 2},
+    'divisor_lzc': {0: 3, 1: 1, 17: 1, 40: 1},
+    'divisor_top': {(0b1110, 4): 1},
+}
+
+
+def test_api_VectorIdiv_stimulus_constraints():
+    """测试激励按种子可复现，且规格化除数满足前导零和高位模式约束"""
+    assert VectorIdivStimulus(SRT_TABLE_SPEC, seed=7).generate(64) == VectorIdivStimulus(SRT_TABLE_SPEC, seed=7).generate(64), \
+        "相同种子应生成相同的激励"
+    streamed = [op for batch in VectorIdivStimulus(SRT_TABLE_SPEC, seed=7).stream(100, batch=30) for op in batch]
+    assert len(streamed) == 100, "流式产出的操作总数应等于count"
+
+    spec = dict(SRT_TABLE_SPEC, divisor={'normalized': 1}, lane_pattern={'independent': 1})
+    for dividend, divisor, sew, sign in VectorIdivStimulus(spec, seed=1).generate(200):
+        assert (sew, sign) == (3, 0), "sew/sign应只取分布中的值"
+        for lane in extract_vector_elements(divisor, sew):
+            lzc = 64 - lane.bit_length()
+            assert lzc in (0, 1, 17, 40), f"前导零个数{lzc}不在分布中"
+            assert lane >> (lane.bit_length() - 4) == 0b1110, f"除数0x{lane:x}规格化后的高4位应为1110"
+
+
+def test_api_VectorIdiv_stimulus_srt_table_campaign(env):
+    """测试以数据声明的SRT商选择定向随机回归与参考模型一致
+
+    Args:
+        env: Env fixture实例，由pytest自动注入
+    """
+    env.dut.fc_cover["FG-BASIC-DIVISION"].mark_function("FC-UNSIGNED-DIV", test_api_VectorIdiv_stimulus_srt_table_campaign,
+                                                      ["CK-BASIC", "CK-LARGE-NUMBERS", "CK-PRECISION-64"])
+
+    result = api_VectorIdiv_run_campaign(env, SRT_TABLE_SPEC, count=2000, seed=2, batch=500)
+    assert result['count'] == 2000, "应发送全部操作"
+    assert not result['mismatches'], \
+        f"{len(result['mismatches'])}个向量与参考模型不一致，首个: index={result['mismatches'][0]['index']} " \
+        f"a=0x{result['mismatches'][0]['dividend']:x} b=0x{result['mismatches'][0]['divisor']:x}"
+
+
+def test_api_VectorIdiv_stimulus_default_campaign(env):
+    """测试默认分布（全部SEW×符号、边界值和通道模式混合）的回归与参考模型一致
+
+    Args:
+        env: Env fixture实例，由pytest自动注入
+    """
+    env.dut.fc_cover["FG-VECTORIZATION"].mark_function("FC-PARALLEL-OPERATION", test_api_VectorIdiv_stimulus_default_campaign,
+                                                       ["CK-MIXED-OPERATIONS", "CK-ELEMENT-INDEPENDENCE"])
+
+    result = api_VectorIdiv_run_campaign(env, count=2000, seed=3, batch=500)
+    assert not result['mismatches'], \
+        f"{len(result['mismatches'])}个向量与参考模型不一致，首个: index={result['mismatches'][0]['index']}"
@@ -0,0 +1,96 @@
+#coding=utf-8
+"""
+VectorIdiv多变体广播测试（需要先以--tname导出origin与bug版本，未导出时跳过）
+"""
+
+import pytest
+
+from VectorIdiv_api import *
+from VectorIdiv_ref import ref_VectorIdiv_check
+from VectorIdiv_stimulus import VectorIdivStimulus
+from VectorIdiv_variants import *
+
+
+@pytest.fixture(scope="function")
+def runner():
+    try:
+        runner = VectorIdivVariantRunner()
+    except FileNotFoundError as e:
+        pytest.skip(str(e))
+    yield runner
+    runner.finish()
+
+
+# 各bug版本的定向触发操作(dividend, divisor, sew, sign)，取自test_VectorIdiv_bug.py，
+# 保证随机激励之外每个bug都有确定的分歧点；Bug 4与flush相关，由_flush_then_divide触发
+BUG_TRIGGERS = [
+    (int.from_bytes(bytes([1] * 16), "big"), 0, 3, 0),      # Bug 1: 除零
+    (0xAD426E03D65E3658, 0x990D, 3, 0),                     # Bug 2: 64位大数
+    (0xF6, 0x02, 0, 1),                                     # Bug 3: 8位有符号 -10 / 2
+    (5, int.from_bytes(bytes([1] * 15 + [10]), "big"), 0, 0),  # Bug 5: lane0为5 / 10
+]
+
+
+def _pack_u32(lanes):
+    return sum((lane & 0xFFFFFFFF) << (32 * i) for i, lane in enumerate(lanes))
+
+
+def _flush_then_divide(env):
+    """除法进行中flush，随后执行一次32位除法并返回其结果（Bug 4的触发序列，同test_Bug_4）"""
+    api_VectorIdiv_reset_and_init(env, sew=2, sign=0)
+    env.start_division(_pack_u32([0xCAFEBABE, 0x10203040, 0x0F1E2D3C, 0x89ABCDEF]),
+                       _pack_u32([0x0000FF11, 0x00010003, 0x00F0F0F1, 0x01020304]), sew=2, sign=0, timeout=50)
+    env.Step(5)
+    env.io.flush.value = 1
+    env.Step(2)
+    env.io.flush.value = 0
+    for _ in range(50):
+        env.Step(1)
+        if env.io.div_in_ready.value:
+            break
+    return api_VectorIdiv_basic_operation(env, _pack_u32([0x13572468, 0x5555AAA0, 0xFEEDC0DE, 0x12348765]),
+                                          _pack_u32([0x00000007, 0x0000AAAA, 0x00010001, 0x00C00003]),
+                                          sew=2, sign=0, start_cycle=0, timeout=200)
+
+
+def test_api_VectorIdiv_variants_namespaced_classes(env, runner):
+    """测试各变体以独立的命名空间类加载，并各自拥有DUT实例
+
+    Args:
+        env: Env fixture实例，由pytest自动注入
+        runner: 多变体广播器fixture
+    """
+    env.dut.fc_cover["FG-API"].mark_function("FC-VECTOR-DIVISION", test_api_VectorIdiv_variants_namespaced_classes, ["CK-PARALLEL"])
+
+    classes = [type(e.dut).__name__ for e in runner.envs.values()]
+    assert classes == ["DUTVectorIdiv_origin"] + [f"DUTVectorIdiv_bug_{b}" for b in range(1, 6)], \
+        f"变体类名应带命名空间: {classes}"
+    assert len({id(e.dut) for e in runner.envs.values()}) == len(classes), "每个变体应有独立的DUT实例"
+
+
+def test_api_VectorIdiv_variants_broadcast_screen(env, runner):
+    """测试同一份激励广播到全部变体：origin与参考模型一致且重复运行结果不变，每个bug版本都与origin分歧
+
+    Args:
+        env: Env fixture实例，由pytest自动注入
+        runner: 多变体广播器fixture
+    """
+    env.dut.fc_cover["FG-VECTORIZATION"].mark_function("FC-PARALLEL-OPERATION", test_api_VectorIdiv_variants_broadcast_screen,
+                                                       ["CK-MIXED-OPERATIONS"])
+
+    ops = VectorIdivStimulus(seed=11).generate(1000) + BUG_TRIGGERS
+    results = runner.broadcast(api_VectorIdiv_stream_divisions, ops)
+    assert set(results) == set(runner.envs), "每个变体都应返回结果"
+    origin = results[runner.reference]
+    assert not isinstance(origin, Exception), f"origin版本执行失败: {origin!r}"
+    assert not ref_VectorIdiv_check(origin), "origin版本应与参考模型一致"
+
+    # origin与自身比较：同一份激励再运行一次，结果不变
+    again = api_VectorIdiv_stream_divisions(runner.envs[runner.reference], ops)
+    assert result_key(again) == result_key(origin), "origin版本重复运行的结果应不变"
+
+    diverged = runner.screen(api_VectorIdiv_stream_divisions, ops)
+    diverged.update({name: index for name, index in runner.screen(_flush_then_divide).items() if name not in diverged})
+    assert runner.reference not in diverged, "参考变体不应出现在分歧列表中"
+    missing = [name for name in runner.variants if name not in diverged]
+    assert not missing, f"以下bug版本未与origin分歧: {missing}"
@@ -0,0 +1,30 @@
+#coding=utf-8
+"""
+VectorIdiv波形策略测试：滚动窗口引脚记录与VCD写出
+"""
+
+from VectorIdiv_api import *
+from VectorIdiv_waveform import PIN_WIDTHS, PinWindowRecorder
+
+
+def test_api_VectorIdiv_waveform_window_recorder(env, tmp_path):
+    """测试窗口只保留最近N个周期，并写出包含全部顶层引脚的VCD"""
+    env.dut.fc_cover["FG-PIPELINE-CONTROL"].mark_function("FC-HANDSHAKE-PROTOCOL", test_api_VectorIdiv_waveform_window_recorder,
+                                                        ["CK-OUTPUT-HANDSHAKE"])
+
+    recorder = PinWindowRecorder(env.dut, window=8)
+    env.input.dividend_v.value = 100
+    env.input.divisor_v.value = 7
+    env.basic.sew.value = 2
+    env.div_control.div_in_valid.value = 1
+    for _ in range(20):
+        env.Step(1)
+        recorder()
+    assert recorder.cycles == 20 and len(recorder.window) == 8, "窗口应只保留最近8个周期"
+    assert [c for c, _ in recorder.window] == list(range(13, 21))
+
+    path = recorder.dump_vcd(str(tmp_path / "window.vcd"))
+    text = open(path).read()
+    for name, width in PIN_WIDTHS.items():
+        assert f"$var wire {width} " in text and f" {name} $end" in text, f"VCD缺少引脚{name}"
+    assert "#26\n" in text and "#41\n" in text and "#24\n" not in text, "VCD时间应对应窗口内的周期"
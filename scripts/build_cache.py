@@ -0,0 +1,345 @@
+#coding=utf-8
+"""
+内容寻址的Picker DUT构建缓存
+
+缓存键为以下内容的SHA-256：Verilog源文件名与内容、影响产物的picker参数（--rw、--sname、--tname、
+-c、是否带-w）以及picker/verilator的版本号。构建产物存放在 <dutdir>/objects/<键>/ 下，
+每个变体的发布路径 <dutdir>/<变体名> 是指向对应对象目录的符号链接，因此原有的
+<dutdir>/<变体名>/<DUT名> 路径保持不变：
+
+    dutcache/objects/3f2a.../VectorIdiv/        # 构建产物
+    dutcache/VectorIdiv_bug_1 -> objects/3f2a...
+
+修改.v文件或升级工具后键随之变化，下一次构建会重新导出；未变化的变体直接复用。
+构建先导出到临时目录，成功后用rename原子地放入objects，再用符号链接替换原子地发布，
+并发的构建进程或正在使用旧产物的回归都不会看到半成品。多个变体由有界线程池并行构建：
+
+    python3 scripts/build_cache.py bug_file/*.v origin_file/*.v --jobs 4
+    python3 scripts/build_cache.py bug_file/VectorIdiv_bug_*.v --dutdir dutcache/diff --tname {base}
+
+-w的波形路径只是默认值（fixture中会用SetWaveform覆盖），不计入缓存键，以便不同PORT共享缓存。
+
+增量模式（--incremental）：bug版本与origin版本在逻辑上只差几行，但bug文件中几乎所有内部
+wire/reg/实例名都被随机重命名，按文本比较每个模块都不同。该模式先按Verilog模块切分设计，
+把bug模块中的局部名按声明顺序映射回origin模块的名字（声明个数不同的模块保持原样），规范化
+后的源文件以变体自己的文件名写入构建目录（<dutdir>/objects/<键>/VectorIdiv_bug_2.v）并用于导出，
+代码行覆盖率和.ignore中的文件名与普通构建相同。未改动的模块因此与origin逐字相同，再以
+-fno-inline和--output-split让Verilator为每个模块生成独立的C++文件，经ccache（缓存目录
+<dutdir>/ccache）编译时直接命中，一个bug变体的构建代价约为重新编译其改动的模块。origin版本
+先构建以预热缓存。只有重命名的bug版本规范化后与origin相同，但文件名不同，仍单独导出，其C++全部
+命中ccache。重命名只涉及模块内部信号，端口和行号不变，波形和内部信号使用origin的名字。
+
+可保存模式（--savable）：以Verilator --savable编译，DUT支持CheckPoint/Restore保存与恢复完整仿真
+状态，单元测试据此在复位后做一次快照、每个用例或每轮模糊测试开始时直接恢复（见各DUT的<DUT>_snapshot.py）。
+该参数计入缓存键，与普通构建的产物分开缓存。
+"""
+
+import argparse
+import hashlib
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_TOOL_VERSIONS = {}
+
+_MODULE_RE = re.compile(r"^module\s+(\w+).*?^endmodule\b", re.M | re.S)
+_DECL_RE = re.compile(r"^\s*(?:wire|reg|logic|localparam|integer)\b(?:\s*(?:signed|\[[^\]]*\]))*\s+(\w+)")
+_INST_RE = re.compile(r"^\s*(\w+)\s+(?:#\(.*?\)\s*)?(\w+)\s*\(\s*(?://.*)?$")
+_IDENT_RE = re.compile(r"\b[A-Za-z_]\w*\b")
+
+# 增量模式的Verilator参数：不内联子模块，并按模块拆分输出文件
+INCREMENTAL_VFLAGS = "-fno-inline --output-split 20000 --output-split-cfuncs 20000"
+
+# 可保存模式的Verilator参数：生成VerilatedSave/VerilatedRestore序列化代码
+SAVABLE_VFLAGS = "--savable"
+
+
+def tool_version(tool):
+    """获取工具版本字符串（进程内缓存）
+
+    Raises:
+        FileNotFoundError: 工具不存在时抛出
+    """
+    if tool not in _TOOL_VERSIONS:
+        out = subprocess.run([tool, "--version"], stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                             check=False)
+        _TOOL_VERSIONS[tool] = out.stdout.decode("utf-8", "replace").strip()
+    return _TOOL_VERSIONS[tool]
+
+
+def variant_names(verilog_file):
+    """由文件名得到(DUT名, 变体名)，例如 VectorIdiv_bug_1.v -> (VectorIdiv, VectorIdiv_bug_1)"""
+    base = os.path.splitext(os.path.basename(verilog_file))[0]
+    return base.split("_")[0], base
+
+
+def split_modules(verilog_file):
+    """按module ... endmodule切分Verilog源文件
+
+    Returns:
+        dict: {模块名: 模块文本}，保持源文件中的顺序
+    """
+    with open(verilog_file) as f:
+        text = f.read()
+    return {m.group(1): m.group(0) for m in _MODULE_RE.finditer(text)}
+
+
+def local_names(module_text, module_names):
+    """按声明顺序列出模块内部的局部名（wire/reg等声明和子模块实例名，不含端口）
+
+    Args:
+        module_text (str): 模块文本
+        module_names (set): 设计中的全部模块名，用于识别实例化语句
+
+    Returns:
+        list: 局部名列表
+    """
+    names = []
+    for line in module_text.splitlines():
+        m = _DECL_RE.match(line)
+        if m:
+            names.append(m.group(1))
+            continue
+        m = _INST_RE.match(line)
+        if m and m.group(1) in module_names:
+            names.append(m.group(2))
+    return names
+
+
+def canonicalize(verilog_file, origin_file):
+    """把变体中各模块的局部名按声明顺序映射为origin中对应模块的名字
+
+    Args:
+        verilog_file (str): 变体源文件
+        origin_file (str): origin源文件
+
+    Returns:
+        tuple: (规范化后的源文本, 与origin不同的模块名列表)
+
+    Example:
+        >>> text, changed = canonicalize("bug_file/VectorIdiv_bug_2.v", "origin_file/VectorIdiv_origin.v")
+        >>> changed
+        ['SRT4qdsCons']
+    """
+    origin = split_modules(origin_file)
+    with open(verilog_file) as f:
+        text = f.read()
+    changed = []
+
+    def rename(match):
+        name, body = match.group(1), match.group(0)
+        base = origin.get(name)
+        if base is not None:
+            ours, theirs = local_names(body, set(origin)), local_names(base, set(origin))
+            if len(ours) == len(theirs):
+                mapping = dict(zip(ours, theirs))
+                body = _IDENT_RE.sub(lambda m: mapping.get(m.group(0), m.group(0)), body)
+        if body != base:
+            changed.append(name)
+        return body
+
+    return _MODULE_RE.sub(rename, text), changed
+
+
+def origin_of(verilog_file):
+    """bug版本对应的origin源文件，找不到或本身即origin时返回None"""
+    dut_name, base = variant_names(verilog_file)
+    origin = os.path.join(ROOT, "origin_file", f"{dut_name}_origin.v")
+    if base.endswith("_origin") or not os.path.exists(origin):
+        return None
+    return origin
+
+
+def picker_flags(dut_name, tname=None, waveform=None, incremental=False, savable=False):
+    """构造picker export的参数（不含源文件和--tdir）"""
+    flags = ["--rw", "1", "--sname", dut_name]
+    if tname:
+        flags += ["--tname", tname]
+    flags.append("-c")
+    if waveform:
+        flags += ["-w", waveform]
+    vflags = []
+    if incremental:
+        vflags.append(INCREMENTAL_VFLAGS)
+    if savable:
+        vflags.append(SAVABLE_VFLAGS)
+    if vflags:
+        flags += ["-V", " ".join(vflags)]
+    return flags
+
+
+def _incremental_env(dutdir):
+    """增量模式下picker/CMake编译的环境变量：经ccache编译，路径相对dutdir以便不同临时目录共享命中"""
+    env = dict(os.environ)
+    env.update({
+        "CCACHE_DIR": os.path.abspath(os.path.join(dutdir, "ccache")),
+        "CCACHE_BASEDIR": os.path.abspath(dutdir),
+        "CCACHE_NOHASHDIR": "1",
+        "CMAKE_C_COMPILER_LAUNCHER": "ccache",
+        "CMAKE_CXX_COMPILER_LAUNCHER": "ccache",
+        "OBJCACHE": "ccache",
+    })
+    return env
+
+
+def cache_key(source, flags, filename):
+    """计算缓存键
+
+    Args:
+        source (bytes): 实际导出的Verilog源文本
+        flags (list): picker参数，-w的路径不参与计算
+        filename (str): 导出的源文件名，会写入Verilator的覆盖点和.dat
+
+    Returns:
+        str: 十六进制SHA-256
+    """
+    h = hashlib.sha256()
+    h.update(filename.encode() + b"\0")
+    h.update(source)
+    keyed = [("-w" if prev == "-w" else flag) for prev, flag in zip([None] + flags, flags)]
+    h.update("\0".join(keyed).encode())
+    for tool in ("picker", "verilator"):
+        h.update(b"\0" + tool_version(tool).encode())
+    return h.hexdigest()
+
+
+def _publish(link, target):
+    """把link原子地指向target（同目录下的相对路径）"""
+    if os.path.isdir(link) and not os.path.islink(link):
+        # 旧版缓存留下的实体目录，无法原子替换，只在首次迁移时删除
+        shutil.rmtree(link)
+    tmp_link = f"{link}.{os.getpid()}.tmp"
+    os.symlink(target, tmp_link)
+    os.replace(tmp_link, link)
+
+
+def build(verilog_file, dutdir, tname=None, waveform=None, force=False, incremental=False, savable=False):
+    """构建一个变体（已缓存则直接发布）
+
+    Args:
+        verilog_file (str): Verilog源文件
+        dutdir (str): 缓存根目录
+        tname (str, optional): --tname，支持{base}占位符（变体名）
+        waveform (str, optional): -w的默认波形路径，支持{base}占位符
+        force (bool, optional): 忽略已有缓存重新构建
+        incremental (bool, optional): 按模块增量编译，见模块说明
+        savable (bool, optional): 以Verilator --savable编译，支持CheckPoint/Restore
+
+    Returns:
+        tuple: (变体名, 缓存键, 状态)，状态为'cached'或'built'
+
+    Raises:
+        RuntimeError: picker导出失败时抛出，附带日志路径
+    """
+    dut_name, base = variant_names(verilog_file)
+    flags = picker_flags(dut_name, tname and tname.format(base=base), waveform and waveform.format(base=base),
+                         incremental, savable)
+    origin = origin_of(verilog_file) if incremental else None
+    if origin is not None:
+        source = canonicalize(verilog_file, origin)[0].encode()
+    else:
+        with open(verilog_file, "rb") as f:
+            source = f.read()
+    filename = os.path.basename(verilog_file)
+    key = cache_key(source, flags, filename)
+    objects = os.path.join(dutdir, "objects")
+    obj = os.path.join(objects, key)
+    link = os.path.join(dutdir, base)
+    os.makedirs(objects, exist_ok=True)
+
+    status = "cached"
+    if force or not os.path.isdir(obj):
+        tmp = tempfile.mkdtemp(prefix=f".{base}-", dir=objects)
+        log = os.path.join(dutdir, f"{base}.build.log")
+        if origin is not None:
+            # 规范化后的源文件沿用变体的文件名，随产物一起放入objects/<键>/
+            verilog_file = os.path.join(tmp, filename)
+            with open(verilog_file, "wb") as f:
+                f.write(source)
+        with open(log, "w") as f:
+            result = subprocess.run(["picker", "export", verilog_file] + flags + ["--tdir", tmp + "/"],
+                                    stdout=f, stderr=subprocess.STDOUT, cwd=ROOT,
+                                    env=_incremental_env(dutdir) if incremental else None)
+        if result.returncode != 0:
+            shutil.rmtree(tmp, ignore_errors=True)
+            raise RuntimeError(f"{base}构建失败(返回码{result.returncode})，日志: {log}")
+        if force and os.path.isdir(obj):
+            stale = tempfile.mkdtemp(prefix=f".{base}-stale-", dir=objects)
+            os.rename(obj, os.path.join(stale, key))
+            shutil.rmtree(stale, ignore_errors=True)
+        try:
+            os.rename(tmp, obj)
+            status = "built"
+        except OSError:
+            # 另一个进程已抢先发布了相同键的产物，内容等价，丢弃自己的
+            shutil.rmtree(tmp, ignore_errors=True)
+    _publish(link, os.path.relpath(obj, dutdir))
+    return base, key, status
+
+
+def build_all(verilog_files, dutdir, jobs=4, **kwargs):
+    """用有界线程池并行构建多个变体
+
+    增量模式下先并行构建各origin版本预热ccache，再并行构建bug版本。
+
+    Returns:
+        list: 各变体的(变体名, 缓存键, 状态或异常)，顺序与verilog_files一致
+    """
+    def run(verilog_file):
+        try:
+            return build(verilog_file, dutdir, **kwargs)
+        except Exception as e:
+            return variant_names(verilog_file)[1], None, e
+
+    stages = [verilog_files]
+    if kwargs.get("incremental"):
+        stages = [[f for f in verilog_files if origin_of(f) is None],
+                  [f for f in verilog_files if origin_of(f) is not None]]
+    results = {}
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as pool:
+        for stage in stages:
+            results.update(zip(stage, pool.map(run, stage)))
+    return [results[f] for f in verilog_files]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="内容寻址的Picker DUT并行构建缓存")
+    parser.add_argument("files", nargs="+", help="Verilog源文件")
+    parser.add_argument("--dutdir", default=os.path.join(ROOT, "dutcache"), help="缓存根目录，默认为dutcache")
+    parser.add_argument("--jobs", type=int, default=4, help="并行构建数，默认为4")
+    parser.add_argument("--tname", default=None, help="picker --tname，支持{base}占位符")
+    parser.add_argument("--waveform", default=None, help="picker -w默认波形路径，支持{base}占位符")
+    parser.add_argument("--force", action="store_true", help="忽略缓存强制重新构建")
+    parser.add_argument("--incremental", action="store_true", help="按模块增量编译（-fno-inline + ccache）")
+    parser.add_argument("--savable", action="store_true", help="以Verilator --savable编译，支持状态快照与恢复")
+    args = parser.parse_args(argv)
+
+    results = build_all(args.files, args.dutdir, args.jobs, tname=args.tname,
+                        waveform=args.waveform, force=args.force, incremental=args.incremental,
+                        savable=args.savable)
+    failed = 0
+    for base, key, status in results:
+        if isinstance(status, Exception):
+            failed += 1
+            print(f"[FAIL]   {base}: {status}")
+        else:
+            print(f"[{status:<6}] {base} {key[:12]}")
+    if args.incremental:
+        for verilog_file in args.files:
+            origin = origin_of(verilog_file)
+            if origin is not None:
+                changed = canonicalize(verilog_file, origin)[1]
+                print(f"  {variant_names(verilog_file)[1]}: {len(changed)}/{len(split_modules(origin))}个模块有改动 "
+                      f"{', '.join(changed)}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,147 @@
+#coding=utf-8
+"""
+边沿触发的功能覆盖率采样器（各DUT的<DUT>_api.py共用）
+
+dut fixture原先在StepRis中每周期对每个覆盖组调用g.sample()，每次都要评估全部检查点，每个检查点
+都通过x.io_*.value重新读取引脚。多数周期DUT处于空闲或等待状态，检查点结果与上一次评估时相同。
+CoverageSampler只在可能产生新命中的周期采样：
+
+    sampler = CoverageSampler(dut, groups, trigger=lambda s: s.io_fire.value == 1, edge_pins=["io_fire"])
+    dut.StepRis(sampler)
+
+- trigger(snapshot)为真（有事务被接收/输出）或edge_pins中任一引脚相对上次采样周期变化时才采样
+- 每周期刷新一次引脚快照，trigger、edge_pins以及以DUT为目标的检查点都从快照取值，
+  同一周期内每个引脚只读取一次
+- 与引脚无关的常量检查点（如 lambda x: True）命中一次后不再评估
+- 全部覆盖组都已停止采样（CovGroup.sample_stoped()）时不再读取引脚
+
+命中统计仍由toffee的CovGroup.sample()完成。检查点只在采样器采样期间改为读取快照，
+用例中手动调用g.sample()时照常读取DUT引脚。
+"""
+
+import dis
+from types import SimpleNamespace
+
+
+_CONSTANT_OPS = {"RESUME", "NOP", "LOAD_CONST", "RETURN_CONST", "RETURN_VALUE"}
+
+
+def is_constant_bin(bin_func):
+    """判断检查点是否与引脚无关（如 lambda x: True），这类检查点只需命中一次"""
+    code = getattr(bin_func, "__code__", None)
+    if code is None:
+        return False
+    return all(ins.opname in _CONSTANT_OPS for ins in dis.get_instructions(code))
+
+
+class PinSnapshot:
+    """每周期的引脚快照：同一周期内每个引脚只读取一次.value
+
+    首次访问某个属性时从DUT读取并缓存，refresh()后在下一次访问时重新读取。
+    非引脚属性（无value）原样返回，以兼容 hasattr(x, 'io_xxx') 之类的检查。
+    """
+
+    def __init__(self, dut):
+        self.__dict__["_dut"] = dut
+        self.__dict__["_names"] = []
+
+    def refresh(self):
+        """使缓存失效，下一次访问重新读取引脚"""
+        for name in self._names:
+            del self.__dict__[name]
+        self._names.clear()
+
+    def __getattr__(self, name):
+        attr = getattr(self._dut, name)
+        try:
+            attr = SimpleNamespace(value=attr.value)
+        except AttributeError:
+            pass
+        self.__dict__[name] = attr
+        self._names.append(name)
+        return attr
+
+
+class CoverageSampler:
+    """边沿触发的覆盖率采样器，用于替代StepRis中逐周期的 g.sample()
+
+    构造时把各覆盖组中以DUT为目标的检查点替换为包装函数：采样器采样期间从引脚快照取值，
+    常量检查点命中一次后直接返回False（不再累加命中次数）。
+
+    Args:
+        dut: DUT实例
+        groups (list): get_coverage_groups返回的覆盖组
+        trigger (callable, optional): trigger(snapshot) -> bool，为None时每周期都采样
+        edge_pins (iterable, optional): 发生变化时也需要采样的引脚名，如复位、flush
+
+    Attributes:
+        cycles (int): 回调被调用的周期数
+        sampled_cycles (int): 实际调用CovGroup.sample()的周期数
+
+    Example:
+        >>> sampler = CoverageSampler(dut, groups, trigger=lambda s: s.io_fire.value == 1, edge_pins=["io_fire"])
+        >>> dut.StepRis(sampler)
+    """
+
+    def __init__(self, dut, groups, trigger=None, edge_pins=()):
+        self.dut = dut
+        self.groups = list(groups)
+        self.trigger = trigger
+        self.edge_pins = list(edge_pins)
+        self.snapshot = PinSnapshot(dut)
+        self.cycles = 0
+        self.sampled_cycles = 0
+        self._last_edges = None
+        self._sampling = False
+        for group in self.groups:
+            for key in group.cover_points():
+                point = group.cover_point(key)
+                if point["taget"] is not dut:
+                    continue
+                bins = point["bins"]
+                for name, check in bins.items():
+                    if isinstance(check, (list, tuple)):
+                        bins[name] = [self._from_snapshot(c) for c in check]
+                    elif is_constant_bin(check):
+                        bins[name] = self._retire_after_hit(check)
+                    else:
+                        bins[name] = self._from_snapshot(check)
+
+    def _from_snapshot(self, check):
+        """采样器采样期间以快照代替DUT作为检查点的参数"""
+        def from_snapshot(target):
+            return check(self.snapshot if self._sampling else target)
+        return from_snapshot
+
+    @staticmethod
+    def _retire_after_hit(check):
+        """常量检查点命中一次后不再评估"""
+        hit = False
+
+        def retire_after_hit(target):
+            nonlocal hit
+            if hit:
+                return False
+            hit = bool(check(target))
+            return hit
+        return retire_after_hit
+
+    def __call__(self, _cycle=None):
+        self.cycles += 1
+        if all(group.sample_stoped() for group in self.groups):
+            # 所有覆盖组已停止采样，连引脚也无需读取
+            return
+        snapshot = self.snapshot
+        snapshot.refresh()
+        edges = tuple(getattr(snapshot, name).value for name in self.edge_pins)
+        changed = edges != self._last_edges
+        self._last_edges = edges
+        if self.trigger is not None and not changed and not self.trigger(snapshot):
+            return
+        self.sampled_cycles += 1
+        self._sampling = True
+        try:
+            for group in self.groups:
+                group.sample()
+        finally:
+            self._sampling = False
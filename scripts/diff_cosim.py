@@ -0,0 +1,288 @@
+#coding=utf-8
+"""
+Origin/Bug版本锁步差分协同仿真
+
+在同一进程中同时加载origin_file版本和一个或多个bug_file版本的Picker DUT，每个周期向所有
+实例驱动完全相同的输入，时钟沿后逐端口比较输出，记录每个Bug版本第一次与Origin版本出现
+分歧的周期和端口。一条随机激励流即可同时筛查一个模块的全部变体。
+
+同名的Picker包无法在同一进程中共存（Python模块名和动态库符号都会冲突），因此各变体需用
+`--tname <变体名>`单独导出，例如 dutcache/diff/VectorIdiv_bug_2/ 下的 DUTVectorIdiv_bug_2。
+可直接使用：
+
+    make diff_cosim DUT=VectorIdiv CYCLES=20000 DIFFARGS="--fix io_flush=0"
+
+或在Python中自定义激励：
+
+    >>> harness = LockstepHarness("VectorIdiv", bugs=[1, 2, 3, 4, 5])
+    >>> harness.run(my_stimulus, cycles=20000)
+    >>> print(harness.report())
+"""
+
+import argparse
+import importlib
+import os
+import random
+import re
+import sys
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_PORT_RE = re.compile(r"^\s*(input|output)\s+(?:wire\s+)?(?:\[(\d+):(\d+)\]\s*)?(\w+)\s*,?\s*$")
+
+
+def parse_ports(verilog_file, module):
+    """从Verilog顶层模块声明中解析端口
+
+    Args:
+        verilog_file (str): Verilog文件路径
+        module (str): 顶层模块名
+
+    Returns:
+        tuple: (inputs, outputs)，均为按声明顺序排列的{端口名: 位宽}字典
+
+    Raises:
+        ValueError: 文件中找不到该模块时抛出
+    """
+    inputs, outputs = {}, {}
+    in_header = False
+    with open(verilog_file, encoding="utf-8") as f:
+        for line in f:
+            if not in_header:
+                in_header = re.match(rf"^\s*module\s+{module}\s*\(", line) is not None
+                continue
+            if line.strip().startswith(");"):
+                return inputs, outputs
+            m = _PORT_RE.match(line)
+            if m:
+                direction, msb, lsb, name = m.groups()
+                width = int(msb) - int(lsb) + 1 if msb is not None else 1
+                (inputs if direction == "input" else outputs)[name] = width
+    raise ValueError(f"{verilog_file}中找不到模块{module}")
+
+
+def load_variant_class(variant, diff_dir):
+    """导入以--tname <variant>导出的Picker包，返回带命名空间的DUT类
+
+    Args:
+        variant (str): 变体名，例如VectorIdiv_origin、VectorIdiv_bug_2
+        diff_dir (str): 各变体Picker包的父目录
+
+    Returns:
+        type: DUT<variant>类
+
+    Raises:
+        FileNotFoundError: 变体未导出时抛出
+    """
+    package_dir = os.path.join(diff_dir, variant)
+    if not os.path.isdir(os.path.join(package_dir, variant)):
+        raise FileNotFoundError(f"未找到变体{variant}的DUT包: {package_dir}/{variant}，"
+                                f"请先执行 make build_variants DUT={variant.split('_')[0]}")
+    if package_dir not in sys.path:
+        sys.path.insert(0, package_dir)
+    module = importlib.import_module(variant)
+    return getattr(module, f"DUT{variant}")
+
+
+class LockstepHarness:
+    """锁步差分仿真器：Origin版本作为参考，逐周期比较所有Bug版本的输出端口
+
+    Attributes:
+        dut_name (str): 模块名
+        inputs (dict): 输入端口{名称: 位宽}，不含时钟
+        outputs (dict): 输出端口{名称: 位宽}
+        duts (dict): {变体名: DUT实例}，第一个为Origin版本
+        cycle (int): 已仿真的周期数
+        divergences (dict): {变体名: 首次分歧记录}，记录包含cycle/port/expect/actual/inputs
+    """
+
+    def __init__(self, dut_name, bugs=(1, 2, 3, 4, 5), diff_dir=None, clock="clock"):
+        """
+        Args:
+            dut_name (str): 模块名，例如VectorIdiv
+            bugs (list, optional): 参与比较的Bug编号，默认为1~5
+            diff_dir (str, optional): 变体Picker包目录，默认为<仓库>/dutcache/diff
+            clock (str, optional): 时钟端口名，默认为clock
+        """
+        self.dut_name = dut_name
+        self.clock = clock
+        diff_dir = diff_dir or os.path.join(ROOT, "dutcache", "diff")
+        inputs, self.outputs = parse_ports(os.path.join(ROOT, "origin_file", f"{dut_name}_origin.v"), dut_name)
+        self.inputs = {name: width for name, width in inputs.items() if name != clock}
+
+        self.origin = f"{dut_name}_origin"
+        self.duts = {}
+        for variant in [self.origin] + [f"{dut_name}_bug_{i}" for i in bugs]:
+            dut = load_variant_class(variant, diff_dir)()
+            dut.InitClock(clock)
+            self.duts[variant] = dut
+        self.cycle = 0
+        self.divergences = {}
+
+    @property
+    def variants(self):
+        """参与比较的Bug版本名"""
+        return [name for name in self.duts if name != self.origin]
+
+    def drive(self, values):
+        """向所有实例写入相同的输入值，未给出的端口保持上一周期的值"""
+        for name, value in values.items():
+            if name not in self.inputs:
+                raise KeyError(f"{self.dut_name}没有输入端口{name}")
+            value &= (1 << self.inputs[name]) - 1
+            for dut in self.duts.values():
+                getattr(dut, name).value = value
+
+    def step(self, values=None):
+        """驱动一个周期并比较输出
+
+        Args:
+            values (dict, optional): 本周期的输入{端口名: 值}
+
+        Returns:
+            list: 本周期新出现首次分歧的变体记录
+        """
+        if values:
+            self.drive(values)
+        for dut in self.duts.values():
+            dut.Step(1)
+        self.cycle += 1
+
+        ref = self.duts[self.origin]
+        expect = {name: getattr(ref, name).value for name in self.outputs}
+        found = []
+        for variant in self.variants:
+            if variant in self.divergences:
+                continue
+            dut = self.duts[variant]
+            for name in self.outputs:
+                actual = getattr(dut, name).value
+                if actual != expect[name]:
+                    record = {
+                        'variant': variant,
+                        'cycle': self.cycle,
+                        'port': name,
+                        'expect': expect[name],
+                        'actual': actual,
+                        'inputs': {port: getattr(ref, port).value for port in self.inputs},
+                    }
+                    self.divergences[variant] = record
+                    found.append(record)
+                    break
+        return found
+
+    def reset(self, cycles=10, port="reset"):
+        """拉高复位若干周期后释放，复位期间不比较输出"""
+        if port not in self.inputs:
+            return
+        self.drive({port: 1})
+        for dut in self.duts.values():
+            dut.Step(cycles)
+        self.drive({port: 0})
+        for dut in self.duts.values():
+            dut.Step(1)
+
+    def run(self, stimulus, cycles, stop_when_all_diverged=True):
+        """运行激励直至指定周期数
+
+        Args:
+            stimulus (callable | iterable): stimulus(cycle, origin_dut)返回本周期输入字典，
+                或每周期产出一个输入字典的可迭代对象；可根据Origin的输出实现握手等闭环激励
+            cycles (int): 最大周期数
+            stop_when_all_diverged (bool, optional): 所有Bug版本都已分歧时提前结束，默认为True
+
+        Returns:
+            dict: {变体名: 首次分歧记录}
+        """
+        source = iter(stimulus) if not callable(stimulus) else None
+        for _ in range(cycles):
+            if source is None:
+                values = stimulus(self.cycle, self.duts[self.origin])
+            else:
+                values = next(source, None)
+                if values is None:
+                    break
+            self.step(values)
+            if stop_when_all_diverged and len(self.divergences) == len(self.variants):
+                break
+        return self.divergences
+
+    def report(self):
+        """生成分歧汇总表"""
+        lines = [f"{self.dut_name}: 锁步仿真{self.cycle}周期，{len(self.divergences)}/{len(self.variants)}个Bug版本出现分歧"]
+        for variant in self.variants:
+            rec = self.divergences.get(variant)
+            if rec is None:
+                lines.append(f"  {variant:<24} 未分歧")
+            else:
+                lines.append(f"  {variant:<24} 周期{rec['cycle']:<8} 端口{rec['port']:<20} "
+                             f"origin=0x{rec['expect']:x} bug=0x{rec['actual']:x}")
+        return "\n".join(lines)
+
+    def finish(self):
+        """结束所有实例的仿真"""
+        for dut in self.duts.values():
+            dut.Finish()
+
+
+def random_stimulus(inputs, seed=0, fixed=None, choices=None, skip=("reset",)):
+    """按端口位宽生成均匀随机激励
+
+    Args:
+        inputs (dict): 输入端口{名称: 位宽}
+        seed (int, optional): 随机种子
+        fixed (dict, optional): 固定取值的端口{名称: 值}
+        choices (dict, optional): 从给定列表中取值的端口{名称: [值, ...]}
+        skip (tuple, optional): 不驱动的端口，默认跳过reset
+
+    Returns:
+        callable: stimulus(cycle, origin_dut) -> dict
+    """
+    rng = random.Random(seed)
+    fixed = dict(fixed or {})
+    choices = dict(choices or {})
+
+    def stimulus(cycle, origin_dut):
+        values = dict(fixed)
+        for name, width in inputs.items():
+            if name in skip or name in fixed:
+                continue
+            values[name] = rng.choice(choices[name]) if name in choices else rng.getrandbits(width)
+        return values
+    return stimulus
+
+
+def _parse_assignments(items, multi=False):
+    result = {}
+    for item in items or []:
+        name, _, value = item.partition("=")
+        values = [int(v, 0) for v in value.split(",")]
+        result[name] = values if multi else values[0]
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Origin/Bug版本锁步差分仿真")
+    parser.add_argument("dut", help="模块名，例如VectorIdiv")
+    parser.add_argument("--bugs", default="1,2,3,4,5", help="参与比较的Bug编号，逗号分隔")
+    parser.add_argument("--cycles", type=int, default=10000, help="最大仿真周期数")
+    parser.add_argument("--seed", type=int, default=0, help="随机种子")
+    parser.add_argument("--reset-cycles", type=int, default=10, help="复位周期数")
+    parser.add_argument("--fix", action="append", metavar="PORT=VALUE", help="固定端口取值，可重复")
+    parser.add_argument("--choice", action="append", metavar="PORT=V1,V2", help="端口从列表中随机取值，可重复")
+    parser.add_argument("--diff-dir", default=None, help="变体Picker包目录，默认为dutcache/diff")
+    args = parser.parse_args(argv)
+
+    harness = LockstepHarness(args.dut, [int(b) for b in args.bugs.split(",") if b], args.diff_dir)
+    harness.reset(args.reset_cycles)
+    stimulus = random_stimulus(harness.inputs, args.seed, _parse_assignments(args.fix),
+                               _parse_assignments(args.choice, multi=True))
+    harness.run(stimulus, args.cycles)
+    print(harness.report())
+    harness.finish()
+    return 0 if len(harness.divergences) == len(harness.variants) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,150 @@
+#coding=utf-8
+"""
+按RTL改动选择回归用例
+
+新的RTL变体到来时不再全量重跑：把新文件与上次测试的版本（默认origin_file/<DUT>_origin.v）
+比较，得到改动所在的源码行，再用上次回归记录的代码行覆盖找出执行过这些行的用例，先运行它们，
+其余用例（包括上次回归之后新增、没有记录的用例）以--profile-exclude在后台补跑。没有受影响的用例时
+跳过前台运行，后台补跑完整套件：
+
+    make impact_test DUT=VectorIdiv UT_RTL=bug_file/VectorIdiv_bug_2.v
+
+依赖上次回归记录的 reports/<DUT>_hits.jsonl（make unity_test HITS=...）和
+reports/<DUT>_linecov.db（make line_cov_index），也可直接调用：
+
+    python3 scripts/impact_select.py bug_file/VectorIdiv_bug_2.v \\
+        --hits reports/VectorIdiv_hits.jsonl --line-db reports/VectorIdiv_linecov.db \\
+        --output reports/VectorIdiv_impact.txt
+
+bug文件的内部信号被随机重命名、行数也不同，因此先用build_cache.canonicalize把各模块的局部名
+映射回基线的名字，再逐模块做行级diff，改动以基线的行号表示。Verilator的行覆盖点只在过程块中，
+连续赋值语句本身不是覆盖点，因此受影响的用例取“命中过改动模块中任一覆盖点”的用例，按其命中行
+到最近改动行的距离排序：直接命中改动行的用例（距离0）最先运行。
+"""
+
+import argparse
+import bisect
+import difflib
+import os
+import sys
+
+from build_cache import ROOT, _MODULE_RE, canonicalize, variant_names
+from regress_min import attach_line_hits, load_hits
+
+
+def _modules(text):
+    """{模块名: (起始行号, 行列表)}"""
+    return {m.group(1): (text.count("\n", 0, m.start()) + 1, m.group(0).splitlines())
+            for m in _MODULE_RE.finditer(text)}
+
+
+def changed_lines(verilog_file, baseline_file):
+    """新文件相对基线改动的基线行号
+
+    Args:
+        verilog_file (str): 新的RTL文件
+        baseline_file (str): 上次测试的RTL文件
+
+    Returns:
+        tuple: (改动行号集合, {改动模块名: (起始行号, 结束行号)})，均为基线中的行号；
+            新增的模块不在基线中，不出现在结果里
+    """
+    with open(baseline_file) as f:
+        base = _modules(f.read())
+    ours = _modules(canonicalize(verilog_file, baseline_file)[0])
+    lines, modules = set(), {}
+    for name, (start, base_lines) in base.items():
+        new_lines = ours.get(name, (0, []))[1]
+        if new_lines == base_lines:
+            continue
+        modules[name] = (start, start + len(base_lines) - 1)
+        opcodes = difflib.SequenceMatcher(None, base_lines, new_lines, autojunk=False).get_opcodes()
+        for tag, i1, i2, _, _ in opcodes:
+            if tag != "equal":
+                # 插入没有对应的基线行，记为插入点所在的行
+                lines.update(range(start + i1, start + max(i2, i1 + 1)))
+    return lines, modules
+
+
+def rank_tests(tests, lines, modules, cov_file):
+    """按改动影响对用例排序
+
+    Args:
+        tests (dict): load_hits/attach_line_hits得到的{用例: {"items": set, ...}}
+        lines (set): 改动的基线行号
+        modules (dict): 改动模块的行号范围
+        cov_file (str): 索引库中基线文件的路径后缀（通常为基线文件名）
+
+    Returns:
+        tuple: (受影响用例列表, {用例: 距离})，按(距离, 耗时)排序，距离为用例在改动模块中命中的
+            覆盖点到最近改动行的行数
+    """
+    changed = sorted(lines)
+    ranges = sorted(modules.values())
+    distance = {}
+    for name, test in tests.items():
+        best = None
+        for item in test["items"]:
+            if not item.startswith("L:"):
+                continue
+            file, _, line = item[2:].rpartition(":")
+            line = int(line)
+            if not (file == cov_file or file.endswith("/" + cov_file)):
+                continue
+            i = bisect.bisect_right(ranges, (line, float("inf"))) - 1
+            if i < 0 or line > ranges[i][1]:
+                continue
+            lo, hi = ranges[i]
+            inside = changed[bisect.bisect_left(changed, lo):bisect.bisect_right(changed, hi)]
+            j = bisect.bisect_left(inside, line)
+            near = inside[max(j - 1, 0):j + 1]
+            if near:
+                d = min(abs(c - line) for c in near)
+                best = d if best is None else min(best, d)
+        if best is not None:
+            distance[name] = best
+    impacted = sorted(distance, key=lambda n: (distance[n], tests[n]["duration"], n))
+    return impacted, distance
+
+
+def _write(path, header, names):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(header + "\n")
+        for name in names:
+            f.write(name + "\n")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="按RTL改动选择回归用例")
+    parser.add_argument("rtl", help="新的RTL文件")
+    parser.add_argument("--baseline", default=None, help="上次测试的RTL文件，默认为origin_file/<DUT>_origin.v")
+    parser.add_argument("--hits", required=True, help="上次回归的--coverage-hits记录")
+    parser.add_argument("--line-db", required=True, help="上次回归的line_cov_index索引库")
+    parser.add_argument("--cov-file", default=None, help="索引库中基线文件的路径后缀，默认为基线文件名")
+    parser.add_argument("--output", default=None, help="受影响用例的profile（按运行顺序）")
+    args = parser.parse_args(argv)
+
+    baseline = args.baseline or os.path.join(ROOT, "origin_file", f"{variant_names(args.rtl)[0]}_origin.v")
+    lines, modules = changed_lines(args.rtl, baseline)
+    tests = load_hits(args.hits)
+    attach_line_hits(tests, args.line_db)
+    impacted, distance = rank_tests(tests, lines, modules, args.cov_file or os.path.basename(baseline))
+    print(f"改动模块: {', '.join(modules) or '无'}，改动{len(lines)}行")
+    if not any(item.startswith("L:") for test in tests.values() for item in test["items"]):
+        print("警告: 索引库中没有与--hits记录对应的代码行覆盖，全部用例按耗时排序")
+    direct = sum(1 for n in impacted if distance[n] == 0)
+    if impacted:
+        print(f"受影响用例{len(impacted)}/{len(tests)}个（直接命中改动行{direct}个），其余用例后台补跑")
+    else:
+        print(f"没有受影响的用例（{len(tests)}个有记录），全部用例后台补跑")
+    source = f"{os.path.basename(args.rtl)} vs {os.path.basename(baseline)}"
+    if args.output:
+        _write(args.output, f"# 受影响用例：{source}，改动模块 {', '.join(modules)}", impacted)
+    else:
+        print("\n".join(f"{distance[n]:>6} {n}" for n in impacted))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
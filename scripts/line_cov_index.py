@@ -0,0 +1,371 @@
+#coding=utf-8
+"""
+代码行覆盖率索引库：按用例归属的行命中位图
+
+set_line_coverage为每个用例登记一个Verilator覆盖率文件（.dat），报告生成时再逐个经
+verilator_coverage/lcov转换合并，只能得到汇总的命中情况。本工具把.dat一次性导入SQLite索引库：
+每个.dat是一次运行（run），每个源码行保存一个位图，第i位表示第i次运行命中了该行。之后查询
+"哪些用例命中了VectorIdiv_origin.v第N行"、"哪些行没有任何用例命中"只读索引，不再解析原始文件：
+
+    # 导入（已导入且未变化的.dat自动跳过，可反复执行增量导入）
+    python3 scripts/line_cov_index.py ingest reports/VectorIdiv_linecov.db \\
+        final_result/VectorIdiv/output_result/unity_test/tests/data \\
+        --ignore final_result/VectorIdiv/output_result/unity_test/tests/VectorIdiv.ignore
+    # 命中某行的用例
+    python3 scripts/line_cov_index.py hits reports/VectorIdiv_linecov.db VectorIdiv_origin.v 120
+    # 未命中的行（附源码文本，可用于填写<DUT>_line_coverage_analysis.md）
+    python3 scripts/line_cov_index.py unhit reports/VectorIdiv_linecov.db VectorIdiv_origin.v
+
+或 make line_cov_index DUT=VectorIdiv。
+
+只统计行与分支覆盖点（page为v_line/v_branch），翻转覆盖点不计入；同一行在多个实例中的
+覆盖点合并为一行。导入时按.ignore文件（与toffee_test相同的`路径通配符[:行号范围]`格式）过滤。
+
+运行以用例的pytest nodeid标识：dut fixture在.dat旁写出<.dat>.owner.json（write_owner），记录写出该
+文件的用例。没有归属文件的.dat可用--hits从regress_min的--coverage-hits记录按.dat路径查找用例，
+仍找不到时跳过该文件。DUT_POOL_LINE_COV=summary的池模式下一个.dat累计了池中实例服务的全部用例，
+无法按用例归属，导入时报错。
+"""
+
+import argparse
+import fnmatch
+import functools
+import json
+import os
+import re
+import sqlite3
+import sys
+
+
+# 计入行覆盖的覆盖点类型（page字段前缀）
+LINE_PAGES = ("v_line", "v_branch")
+
+_DAT_RE = re.compile(r"^C '(.*)' (\d+)\s*$")
+
+# .dat归属文件的后缀
+OWNER_SUFFIX = ".owner.json"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    test TEXT NOT NULL,
+    datfile TEXT NOT NULL,
+    mtime REAL NOT NULL,
+    size INTEGER NOT NULL,
+    UNIQUE (datfile, mtime, size)
+);
+CREATE TABLE IF NOT EXISTS lines (
+    file TEXT NOT NULL,
+    line INTEGER NOT NULL,
+    hits BLOB NOT NULL,
+    PRIMARY KEY (file, line)
+) WITHOUT ROWID;
+"""
+
+
+def _parse_ranges(text):
+    """解析"12-15,17"形式的行号范围"""
+    lines = set()
+    for part in text.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        lo, _, hi = part.partition("-")
+        lines.update(range(int(lo), int(hi or lo) + 1))
+    return lines
+
+
+def parse_dat(datfile):
+    """解析Verilator覆盖率文件中的行/分支覆盖点
+
+    Args:
+        datfile (str): .dat文件路径
+
+    Returns:
+        dict: {(源文件, 行号): 命中次数}，同一行的多个覆盖点累加
+    """
+    points = {}
+    with open(datfile, encoding="utf-8", errors="replace") as f:
+        for text in f:
+            m = _DAT_RE.match(text)
+            if not m:
+                continue
+            fields = dict(kv.partition("\x02")[::2] for kv in m.group(1).split("\x01") if kv)
+            if not fields.get("page", "").startswith(LINE_PAGES) or "f" not in fields:
+                continue
+            lines = _parse_ranges(fields["S"]) if fields.get("S") else {int(fields.get("l", 0))}
+            count = int(m.group(2))
+            for line in lines:
+                key = (fields["f"], line)
+                points[key] = points.get(key, 0) + count
+    return points
+
+
+def write_owner(datfile, tests):
+    """在datfile旁写出归属文件，记录写出该.dat的用例
+
+    Args:
+        datfile (str): .dat文件路径
+        tests (list): 用例的pytest nodeid
+    """
+    with open(datfile + OWNER_SUFFIX, "w", encoding="utf-8") as f:
+        json.dump({"datfile": os.path.basename(datfile), "tests": list(tests)}, f, ensure_ascii=False)
+
+
+def read_owner(datfile):
+    """读取datfile的归属文件
+
+    Returns:
+        list: 用例的pytest nodeid，没有归属文件时返回None
+    """
+    try:
+        with open(datfile + OWNER_SUFFIX, encoding="utf-8") as f:
+            return json.load(f)["tests"]
+    except FileNotFoundError:
+        return None
+
+
+def load_hits_owners(hits_file):
+    """从--coverage-hits记录中读取{.dat绝对路径: 用例}"""
+    owners = {}
+    with open(hits_file, encoding="utf-8") as f:
+        for text in f:
+            if text.strip():
+                record = json.loads(text)
+                if record.get("datfile"):
+                    owners[os.path.abspath(record["datfile"])] = record["test"]
+    return owners
+
+
+def load_ignore(ignore_files):
+    """读取.ignore文件
+
+    Returns:
+        list: [(路径通配符, 行号集合或None)]，None表示忽略整个文件
+    """
+    rules = []
+    for ignore_file in ignore_files or []:
+        with open(ignore_file, encoding="utf-8") as f:
+            for text in f:
+                text = text.strip()
+                if not text or text.startswith("#"):
+                    continue
+                pattern, _, ranges = text.partition(":")
+                rules.append((pattern, _parse_ranges(ranges) if ranges else None))
+    return rules
+
+
+def is_ignored(rules, file, line):
+    """(file, line)是否被.ignore规则忽略"""
+    return any(fnmatch.fnmatch(file, pattern) and (lines is None or line in lines) for pattern, lines in rules)
+
+
+def _find_dats(paths):
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, files in os.walk(path):
+                yield from (os.path.join(root, name) for name in sorted(files) if name.endswith(".dat"))
+        else:
+            yield path
+
+
+def _bits(blob):
+    """位图中置位的序号"""
+    value = int.from_bytes(blob, "little")
+    index = 0
+    while value:
+        if value & 1:
+            yield index
+        value >>= 1
+        index += 1
+
+
+class LineCoverageIndex:
+    """代码行覆盖率索引库
+
+    Attributes:
+        conn (sqlite3.Connection): 索引库连接
+
+    Example:
+        >>> index = LineCoverageIndex("reports/VectorIdiv_linecov.db")
+        >>> index.ingest(["tests/data"], ignore_files=["tests/VectorIdiv.ignore"])
+        (12, 0, [])
+        >>> index.tests_hitting("VectorIdiv_origin.v", 120)
+        ['test_VectorIdiv_bug.py::test_Bug_1', ...]
+        >>> index.close()
+    """
+
+    def __init__(self, path):
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(_SCHEMA)
+
+    def ingest(self, paths, ignore_files=None, hits_file=None):
+        """导入.dat文件或目录（递归查找*.dat）
+
+        路径、修改时间和大小都相同的.dat视为已导入并跳过；同一路径被新一轮运行覆盖后作为新的运行导入。
+        运行的用例取自.dat的归属文件，其次为hits_file中该.dat路径的记录。
+
+        Args:
+            paths (list): .dat文件或目录
+            ignore_files (list, optional): .ignore文件
+            hits_file (str, optional): regress_min的--coverage-hits记录
+
+        Returns:
+            tuple: (新导入的运行数, 跳过的已导入文件数, 找不到用例而跳过的.dat列表)
+
+        Raises:
+            ValueError: .dat由池中实例写出（归属于多个用例）时抛出，本次已导入的文件全部回滚
+        """
+        rules = load_ignore(ignore_files)
+        hits_owners = load_hits_owners(hits_file) if hits_file else {}
+        bitmaps = {}
+        added = skipped = 0
+        unowned = []
+        cur = self.conn.cursor()
+        next_id = cur.execute("SELECT COALESCE(MAX(id) + 1, 0) FROM runs").fetchone()[0]
+        for datfile in _find_dats(paths):
+            datfile = os.path.abspath(datfile)
+            stat = os.stat(datfile)
+            if cur.execute("SELECT 1 FROM runs WHERE datfile = ? AND mtime = ? AND size = ?",
+                           (datfile, stat.st_mtime, stat.st_size)).fetchone():
+                skipped += 1
+                continue
+            owner = read_owner(datfile)
+            if owner and len(owner) > 1:
+                self.conn.rollback()
+                raise ValueError(f"{datfile}由DUT_POOL_LINE_COV=summary的池中实例写出，累计了{len(owner)}个用例的命中，"
+                                 f"无法按用例归属，请以POOL_LINE_COV=test或POOL=0重新运行后再导入")
+            test = owner[0] if owner else hits_owners.get(datfile)
+            if test is None:
+                unowned.append(datfile)
+                continue
+            points = parse_dat(datfile)
+            run_id = next_id
+            next_id += 1
+            cur.execute("INSERT INTO runs (id, test, datfile, mtime, size) VALUES (?, ?, ?, ?, ?)",
+                        (run_id, test, datfile, stat.st_mtime, stat.st_size))
+            for key, count in points.items():
+                if is_ignored(rules, *key):
+                    continue
+                if key not in bitmaps:
+                    row = cur.execute("SELECT hits FROM lines WHERE file = ? AND line = ?", key).fetchone()
+                    bitmaps[key] = int.from_bytes(row[0], "little") if row else 0
+                if count:
+                    bitmaps[key] |= 1 << run_id
+            added += 1
+        cur.executemany("INSERT OR REPLACE INTO lines (file, line, hits) VALUES (?, ?, ?)",
+                        [(f, l, v.to_bytes((v.bit_length() + 7) // 8, "little")) for (f, l), v in bitmaps.items()])
+        self.conn.commit()
+        return added, skipped, unowned
+
+    def files(self, name=None):
+        """索引中的源文件，name给出时只返回路径等于name、以/name结尾或匹配通配符name的文件"""
+        files = [row[0] for row in self.conn.execute("SELECT DISTINCT file FROM lines ORDER BY file")]
+        if name is None:
+            return files
+        return [f for f in files if f == name or f.endswith("/" + name) or fnmatch.fnmatch(f, name)]
+
+    def runs(self, ids=None):
+        """{运行序号: 用例名}，ids给出时只查询这些序号"""
+        rows = self.conn.execute("SELECT id, test FROM runs")
+        return {i: test for i, test in rows if ids is None or i in ids}
+
+    def tests_hitting(self, file, line):
+        """命中file第line行的用例名（同名用例多次运行只列一次）
+
+        Raises:
+            KeyError: 索引中没有匹配file的源文件，或该行不是覆盖点
+        """
+        files = self.files(file)
+        if not files:
+            raise KeyError(f"索引中没有源文件{file}")
+        ids = set()
+        found = False
+        for f in files:
+            row = self.conn.execute("SELECT hits FROM lines WHERE file = ? AND line = ?", (f, line)).fetchone()
+            if row:
+                found = True
+                ids.update(_bits(row[0]))
+        if not found:
+            raise KeyError(f"{file}:{line}不是行覆盖点")
+        return sorted(set(self.runs(ids).values()))
+
+    def unhit_lines(self, file=None):
+        """没有任何运行命中的覆盖点[(源文件, 行号)]"""
+        files = self.files(file)
+        return [(f, l) for f in files
+                for (l,) in self.conn.execute("SELECT line FROM lines WHERE file = ? AND hits = X'' ORDER BY line", (f,))]
+
+    def summary(self):
+        """各源文件的(覆盖点行数, 命中行数)"""
+        return {f: (total, hit) for f, total, hit in self.conn.execute(
+            "SELECT file, COUNT(*), SUM(hits != X'') FROM lines GROUP BY file ORDER BY file")}
+
+    def close(self):
+        self.conn.close()
+
+
+@functools.lru_cache(maxsize=None)
+def _read_source(file):
+    try:
+        with open(file, encoding="utf-8", errors="replace") as f:
+            return f.read().splitlines()
+    except OSError:
+        return []
+
+
+def _source_line(file, line):
+    lines = _read_source(file)
+    return lines[line - 1].strip() if 0 < line <= len(lines) else ""
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="代码行覆盖率索引库：按用例归属的行命中位图")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("ingest", help="导入.dat文件或目录")
+    p.add_argument("db", help="索引库路径")
+    p.add_argument("paths", nargs="+", help=".dat文件或目录（递归查找*.dat）")
+    p.add_argument("--ignore", action="append", default=[], help=".ignore文件，可重复")
+    p.add_argument("--hits", default=None, help="--coverage-hits记录，为没有归属文件的.dat查找用例")
+    p = sub.add_parser("hits", help="命中某行的用例")
+    p.add_argument("db", help="索引库路径")
+    p.add_argument("file", help="源文件名、路径后缀或通配符，例如VectorIdiv_origin.v")
+    p.add_argument("line", type=int, help="行号")
+    p = sub.add_parser("unhit", help="没有任何用例命中的行")
+    p.add_argument("db", help="索引库路径")
+    p.add_argument("file", nargs="?", default=None, help="只列出该源文件，默认为全部")
+    p = sub.add_parser("summary", help="各源文件的命中行数")
+    p.add_argument("db", help="索引库路径")
+    args = parser.parse_args(argv)
+
+    index = LineCoverageIndex(args.db)
+    try:
+        if args.command == "ingest":
+            try:
+                added, skipped, unowned = index.ingest(args.paths, args.ignore, args.hits)
+            except ValueError as e:
+                print(e.args[0])
+                return 1
+            for datfile in unowned:
+                print(f"跳过{datfile}：没有归属文件（{OWNER_SUFFIX}），--hits中也没有它的记录")
+            print(f"导入{added}次运行，跳过{skipped}个已导入的文件，共{len(index.runs())}次运行")
+        elif args.command == "hits":
+            try:
+                tests = index.tests_hitting(args.file, args.line)
+            except KeyError as e:
+                print(e.args[0])
+                return 1
+            print("\n".join(tests) if tests else f"没有用例命中{args.file}:{args.line}")
+        elif args.command == "unhit":
+            for file, line in index.unhit_lines(args.file):
+                print(f"{file}:{line}: {_source_line(file, line)}")
+        else:
+            for file, (total, hit) in index.summary().items():
+                print(f"{file}: {hit}/{total} ({100.0 * hit / total:.1f}%)")
+    finally:
+        index.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
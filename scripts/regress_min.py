@@ -0,0 +1,257 @@
+#coding=utf-8
+"""
+保持覆盖率的回归用例精简
+
+VectorIdiv有近200次用例执行，VectorFloatAdder的定向用例大量重叠。本工具根据每个用例实际命中的
+功能覆盖点（bin）、mark_function登记的检查点和代码行，求出覆盖同样内容的用例子集，写成冒烟
+profile：每次RTL改动只跑profile中的用例，完整套件留给夜间回归。
+
+1. 记录：作为pytest插件加载，--coverage-hits把每个用例的功能覆盖命中、检查点登记、.dat路径和
+   耗时追加到JSONL文件（xdist下由主进程写入）。池模式下需按用例轮换代码行覆盖率（DUT_POOL_LINE_COV=test，默认）：
+
+       make unity_test DUT=VectorIdiv HITS=reports/VectorIdiv_hits.jsonl
+       make line_cov_index DUT=VectorIdiv          # 代码行命中由line_cov_index索引库提供
+
+2. 精简：先选出唯一覆盖某项的必需用例，再按“新增覆盖项数/耗时”贪心选择，最后逆序剔除被其余
+   已选用例完全覆盖的冗余用例：
+
+       python3 scripts/regress_min.py reports/VectorIdiv_hits.jsonl \\
+           --line-db reports/VectorIdiv_linecov.db --output reports/VectorIdiv_smoke.txt
+
+3. 冒烟运行：--profile只保留profile中的用例并按profile中的顺序运行；profile不存在时给出警告并运行完整套件：
+
+       make smoke_test DUT=VectorIdiv
+
+   --profile-exclude反过来跳过profile中的用例、运行其余全部用例（包括没有记录的新用例），
+   impact_select用它在后台补跑受影响用例之外的部分。
+
+没有任何覆盖项的用例（例如纯Python参考模型测试）不会进入profile。或使用 make regress_min DUT=VectorIdiv。
+"""
+
+import argparse
+import json
+import os
+import sys
+import warnings
+
+import pytest
+
+
+def item_key(nodeid):
+    """用例标识：nodeid中的路径只保留文件名，使不同rootdir下记录的profile可以互用"""
+    path, sep, rest = nodeid.partition("::")
+    return os.path.basename(path) + sep + rest
+
+
+def coverage_items(groups):
+    """从toffee_test报告的覆盖组中提取覆盖项
+
+    Args:
+        groups (list): report.__coverage_group__，每项的data为覆盖组JSON
+
+    Returns:
+        set: "F:组/点/bin"（bin被命中）与"M:组/点/bin"（用例以mark_function登记了该检查点）
+    """
+    items = set()
+    for group in groups:
+        data = json.loads(group["data"]) if isinstance(group["data"], str) else group["data"]
+        for point in data["points"]:
+            prefix = f"{data['name']}/{point['name']}"
+            items.update(f"F:{prefix}/{b['name']}" for b in point["bins"] if b["hints"] > 0)
+            items.update(f"M:{prefix}/{name}" for name, funcs in point["functions"].items() if funcs)
+    return items
+
+
+# ---------------------------------------------------------------- pytest插件
+
+def pytest_addoption(parser):
+    group = parser.getgroup("regress_min", "回归用例精简")
+    group.addoption("--coverage-hits", default=None, help="把每个用例的覆盖命中追加到该JSONL文件")
+    group.addoption("--profile", default=None, help="只运行冒烟profile中的用例")
+    group.addoption("--profile-exclude", default=None, help="跳过profile中的用例，运行其余用例")
+
+
+class CoverageHitsRecorder:
+    """把每个用例的覆盖命中追加到JSONL文件（串行运行或xdist主进程中注册）"""
+
+    def __init__(self, path):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.file = open(path, "a", encoding="utf-8")
+        self.durations = {}
+        self.outcomes = {}
+
+    @pytest.hookimpl(trylast=True)
+    def pytest_runtest_logreport(self, report):
+        self.durations[report.nodeid] = self.durations.get(report.nodeid, 0.0) + report.duration
+        if report.when == "call":
+            self.outcomes[report.nodeid] = report.outcome
+        if report.when != "teardown":
+            return
+        line = getattr(report, "__line_coverage__", None)
+        record = {
+            "test": item_key(report.nodeid),
+            "outcome": self.outcomes.pop(report.nodeid, report.outcome),
+            "duration": round(self.durations.pop(report.nodeid), 4),
+            "datfile": os.path.abspath(line["data"]) if line else None,
+            "items": sorted(coverage_items(getattr(report, "__coverage_group__", []))),
+        }
+        self.file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self.file.flush()
+
+    def pytest_unconfigure(self, config):
+        self.file.close()
+
+
+def pytest_configure(config):
+    # xdist worker不写文件，由主进程统一写入
+    path = config.getoption("coverage_hits")
+    if path and os.environ.get("DUT_POOL", "0") not in ("", "0") and os.environ.get("DUT_POOL_LINE_COV") == "summary":
+        # summary模式下池中实例的.dat累计了多个用例的代码行命中，记录的datfile无法归属到单个用例
+        raise pytest.UsageError("--coverage-hits不能与DUT_POOL_LINE_COV=summary同时使用：池中实例的代码行覆盖率无法按用例归属")
+    if path and not hasattr(config, "workerinput"):
+        config.pluginmanager.register(CoverageHitsRecorder(path), "regress_min_hits")
+
+
+def pytest_collection_modifyitems(config, items):
+    exclude = config.getoption("profile_exclude")
+    if exclude and os.path.exists(exclude):
+        skip = set(load_profile(exclude))
+        config.hook.pytest_deselected(items=[item for item in items if item_key(item.nodeid) in skip])
+        items[:] = [item for item in items if item_key(item.nodeid) not in skip]
+    path = config.getoption("profile")
+    if not path:
+        return
+    if not os.path.exists(path):
+        warnings.warn(f"冒烟profile {path}不存在，运行完整套件")
+        return
+    # 按profile中的顺序运行（impact_select按影响程度排序）
+    order = {name: i for i, name in enumerate(load_profile(path))}
+    keep = sorted((item for item in items if item_key(item.nodeid) in order), key=lambda item: order[item_key(item.nodeid)])
+    config.hook.pytest_deselected(items=[item for item in items if item_key(item.nodeid) not in order])
+    items[:] = keep
+
+
+# ---------------------------------------------------------------- 精简
+
+def load_hits(path):
+    """读取--coverage-hits记录，同一用例多次记录时合并覆盖项、耗时取最后一次
+
+    Returns:
+        dict: {用例: {"items": set, "duration": float, "datfiles": list}}
+    """
+    tests = {}
+    with open(path, encoding="utf-8") as f:
+        for text in f:
+            if not text.strip():
+                continue
+            record = json.loads(text)
+            test = tests.setdefault(record["test"], {"items": set(), "duration": 0.0, "datfiles": []})
+            test["items"].update(record["items"])
+            test["duration"] = record["duration"]
+            if record.get("datfile"):
+                test["datfiles"].append(record["datfile"])
+    return tests
+
+
+def attach_line_hits(tests, db):
+    """从line_cov_index索引库为各用例加入"L:文件:行"覆盖项（按.dat路径对应，取该路径最近一次导入）"""
+    from line_cov_index import LineCoverageIndex, _bits
+
+    index = LineCoverageIndex(db)
+    try:
+        latest = dict(index.conn.execute("SELECT datfile, MAX(id) FROM runs GROUP BY datfile"))
+        owner = {}
+        for name, test in tests.items():
+            for datfile in test["datfiles"]:
+                if datfile in latest:
+                    owner[latest[datfile]] = name
+        for file, line, hits in index.conn.execute("SELECT file, line, hits FROM lines"):
+            for run in _bits(hits):
+                if run in owner:
+                    tests[owner[run]]["items"].add(f"L:{file}:{line}")
+    finally:
+        index.close()
+    return len(owner)
+
+
+def minimize(tests):
+    """求覆盖全部覆盖项的用例子集
+
+    Args:
+        tests (dict): {用例: {"items": set, "duration": float}}
+
+    Returns:
+        list: 选中的用例，必需用例在前，其余按贪心选择的顺序
+    """
+    owners = {}
+    for name, test in tests.items():
+        for item in test["items"]:
+            owners.setdefault(item, []).append(name)
+    cost = {name: max(test["duration"], 1e-3) for name, test in tests.items()}
+
+    selected = sorted({names[0] for names in owners.values() if len(names) == 1})
+    covered = set().union(*(tests[name]["items"] for name in selected))
+    remaining = set(owners) - covered
+    while remaining:
+        best = max((name for name in tests if name not in selected),
+                   key=lambda name: (len(tests[name]["items"] & remaining) / cost[name], name))
+        selected.append(best)
+        remaining -= tests[best]["items"]
+
+    # 逆序剔除冗余：由其余已选用例完全覆盖的用例，耗时长的优先剔除
+    count = {}
+    for name in selected:
+        for item in tests[name]["items"]:
+            count[item] = count.get(item, 0) + 1
+    for name in sorted(selected, key=lambda n: -cost[n]):
+        if all(count[item] > 1 for item in tests[name]["items"]):
+            selected.remove(name)
+            for item in tests[name]["items"]:
+                count[item] -= 1
+    return selected
+
+
+def load_profile(path):
+    """读取冒烟profile中的用例（忽略#注释行）"""
+    with open(path, encoding="utf-8") as f:
+        return [text.strip() for text in f if text.strip() and not text.startswith("#")]
+
+
+def write_profile(path, selected, tests):
+    """写出冒烟profile，注释行记录覆盖项与耗时统计"""
+    items = set().union(*(test["items"] for test in tests.values())) if tests else set()
+    total = sum(test["duration"] for test in tests.values())
+    chosen = sum(tests[name]["duration"] for name in selected)
+    kinds = {k: sum(1 for item in items if item.startswith(k + ":")) for k in "FML"}
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(f"# 冒烟profile：{len(selected)}/{len(tests)}个用例，耗时{chosen:.1f}s/{total:.1f}s\n")
+        f.write(f"# 保持覆盖：功能bin {kinds['F']}，检查点登记 {kinds['M']}，代码行 {kinds['L']}\n")
+        for name in selected:
+            f.write(name + "\n")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="保持覆盖率的回归用例精简")
+    parser.add_argument("hits", help="--coverage-hits记录的JSONL文件")
+    parser.add_argument("--line-db", default=None, help="line_cov_index索引库，给出时同时保持代码行覆盖")
+    parser.add_argument("--output", default=None, help="冒烟profile输出路径，默认只打印")
+    args = parser.parse_args(argv)
+
+    tests = load_hits(args.hits)
+    if args.line_db:
+        matched = attach_line_hits(tests, args.line_db)
+        print(f"代码行覆盖：{matched}个用例在索引库中找到.dat")
+    selected = minimize(tests)
+    if args.output:
+        write_profile(args.output, selected, tests)
+    total = sum(test["duration"] for test in tests.values())
+    chosen = sum(tests[name]["duration"] for name in selected)
+    print(f"选中{len(selected)}/{len(tests)}个用例，耗时{chosen:.1f}s/{total:.1f}s")
+    if not args.output:
+        print("\n".join(selected))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
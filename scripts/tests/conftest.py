@@ -0,0 +1,12 @@
+#coding=utf-8
+"""
+scripts/下工具的单元测试，不需要构建DUT：make test_scripts
+"""
+
+import os
+import sys
+
+# 被测工具以脚本形式放在scripts/下，不是包，直接加入导入路径
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if SCRIPTS_DIR not in sys.path:
+    sys.path.append(SCRIPTS_DIR)
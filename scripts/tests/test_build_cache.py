@@ -0,0 +1,182 @@
+#coding=utf-8
+"""
+build_cache测试：缓存键、原子发布与并行构建
+
+picker用写到临时目录的假脚本代替（把参数写入导出目录），工具版本直接预置，不需要picker/verilator。
+设置了CCACHE_DIR时假picker按模块模拟ccache：以模块文本为键在缓存目录中查找编译产物，命中情况写入ccache.txt
+"""
+
+import os
+import stat
+import sys
+
+import pytest
+
+import build_cache
+from build_cache import (build, build_all, cache_key, canonicalize, local_names, origin_of, picker_flags,
+                         split_modules)
+from toy_rtl import TOY_BUG, TOY_ORIGIN, toy_variant
+
+
+FAKE_PICKER = """\
+#!{python}
+import hashlib, os, re, sys
+args = sys.argv[1:]
+if os.environ.get("FAKE_PICKER_FAIL"):
+    sys.exit(3)
+tdir = args[args.index("--tdir") + 1]
+dut = args[args.index("--sname") + 1]
+os.makedirs(os.path.join(tdir, dut))
+with open(os.path.join(tdir, dut, "args.txt"), "w") as f:
+    f.write(" ".join(args))
+ccache = os.environ.get("CCACHE_DIR")
+if ccache:
+    os.makedirs(ccache, exist_ok=True)
+    with open(args[1]) as f:
+        modules = re.finditer(r"^module\\s+(\\w+).*?^endmodule\\b", f.read(), re.M | re.S)
+    with open(os.path.join(tdir, dut, "ccache.txt"), "w") as log:
+        for m in modules:
+            obj = os.path.join(ccache, hashlib.sha256(m.group(0).encode()).hexdigest())
+            log.write(("hit " if os.path.exists(obj) else "miss ") + m.group(1) + "\\n")
+            open(obj, "w").close()
+"""
+
+
+@pytest.fixture
+def dutdir(tmp_path, monkeypatch):
+    """假picker在PATH最前面，返回缓存根目录"""
+    bindir = tmp_path / "bin"
+    bindir.mkdir()
+    picker = bindir / "picker"
+    picker.write_text(FAKE_PICKER.format(python=sys.executable))
+    picker.chmod(picker.stat().st_mode | stat.S_IXUSR)
+    monkeypatch.setenv("PATH", f"{bindir}{os.pathsep}{os.environ['PATH']}")
+    monkeypatch.setattr(build_cache, "_TOOL_VERSIONS", {"picker": "picker 0.9", "verilator": "Verilator 5.0"})
+    return tmp_path / "dutcache"
+
+
+def _verilog(tmp_path, name, body="assign y = a;"):
+    path = tmp_path / name
+    path.write_text(f"module Toy(input a, output y);\n  {body}\nendmodule\n")
+    return str(path)
+
+
+def test_cache_key_inputs(monkeypatch):
+    """测试缓存键随源文件名与文本、参数和工具版本变化，-w的波形路径不参与计算"""
+    monkeypatch.setattr(build_cache, "_TOOL_VERSIONS", {"picker": "picker 0.9", "verilator": "Verilator 5.0"})
+    flags = picker_flags("Toy", waveform="/tmp/Toy_5000.fst")
+    key = cache_key(b"module Toy;", flags, "Toy_origin.v")
+    assert key == cache_key(b"module Toy;", picker_flags("Toy", waveform="/tmp/Toy_6000.fst"), "Toy_origin.v")
+    assert key != cache_key(b"module Toy; ", flags, "Toy_origin.v")
+    assert key != cache_key(b"module Toy;", flags, "Toy_bug_1.v"), "文件名写入覆盖点，影响产物"
+    assert key != cache_key(b"module Toy;", picker_flags("Toy"), "Toy_origin.v"), "是否带-w影响产物"
+    assert key != cache_key(b"module Toy;", picker_flags("Toy", waveform="/tmp/a.fst", savable=True), "Toy_origin.v")
+    monkeypatch.setitem(build_cache._TOOL_VERSIONS, "verilator", "Verilator 5.1")
+    assert key != cache_key(b"module Toy;", flags, "Toy_origin.v")
+
+
+def test_build_cached_and_published(dutdir, tmp_path):
+    """测试首次构建后命中缓存，发布路径是指向objects/<键>的相对符号链接"""
+    src = _verilog(tmp_path, "Toy_origin.v")
+    base, key, status = build(src, str(dutdir), waveform="/tmp/{base}.fst")
+    assert (base, status) == ("Toy_origin", "built")
+    link = dutdir / "Toy_origin"
+    assert os.readlink(link) == os.path.join("objects", key)
+    assert "-w /tmp/Toy_origin.fst" in (link / "Toy" / "args.txt").read_text(), "{base}应替换为变体名"
+
+    assert build(src, str(dutdir), waveform="/tmp/{base}.fst") == (base, key, "cached")
+    assert build(src, str(dutdir), waveform="/tmp/{base}.fst", force=True) == (base, key, "built")
+
+    _verilog(tmp_path, "Toy_origin.v", body="assign y = ~a;")
+    new_key = build(src, str(dutdir))[1]
+    assert new_key != key and os.readlink(link) == os.path.join("objects", new_key)
+    assert (dutdir / "objects" / key).is_dir(), "旧产物保留给仍在使用的回归"
+    assert not [name for name in os.listdir(dutdir / "objects") if name.startswith(".")], "不应残留临时目录"
+
+
+def test_build_failure(dutdir, tmp_path, monkeypatch):
+    """测试导出失败时抛出RuntimeError并附日志路径，不发布也不残留临时目录；build_all收集异常"""
+    monkeypatch.setenv("FAKE_PICKER_FAIL", "1")
+    src = _verilog(tmp_path, "Toy_bug_1.v", body="assign y = a | 1'b0;")
+    with pytest.raises(RuntimeError, match="Toy_bug_1.build.log"):
+        build(src, str(dutdir))
+    assert not (dutdir / "Toy_bug_1").exists()
+    assert os.listdir(dutdir / "objects") == []
+
+    monkeypatch.delenv("FAKE_PICKER_FAIL")
+    ok = _verilog(tmp_path, "Toy_origin.v")
+    results = build_all([ok, src], str(dutdir), jobs=2)
+    assert [r[:1] for r in results] == [("Toy_origin",), ("Toy_bug_1",)], "结果顺序与输入一致"
+    assert all(status == "built" for _, _, status in results)
+    monkeypatch.setenv("FAKE_PICKER_FAIL", "1")
+    base, key, error = build_all([_verilog(tmp_path, "Toy_bug_2.v", body="assign y = 1'b0;")], str(dutdir))[0]
+    assert base == "Toy_bug_2" and key is None and isinstance(error, RuntimeError)
+
+
+@pytest.fixture
+def toy_repo(tmp_path, monkeypatch):
+    """origin_file/Toy_origin.v与两个bug版本：bug_1只有重命名，bug_2还改动了Inc模块"""
+    monkeypatch.setattr(build_cache, "ROOT", str(tmp_path))
+    (tmp_path / "origin_file").mkdir()
+    (tmp_path / "bug_file").mkdir()
+    (tmp_path / "origin_file" / "Toy_origin.v").write_text(TOY_ORIGIN)
+    (tmp_path / "bug_file" / "Toy_bug_1.v").write_text(toy_variant())
+    (tmp_path / "bug_file" / "Toy_bug_2.v").write_text(toy_variant(*TOY_BUG))
+    return tmp_path
+
+
+def test_picker_flags():
+    """测试增量与可保存模式的Verilator参数合并到同一个-V"""
+    assert picker_flags("Toy") == ["--rw", "1", "--sname", "Toy", "-c"]
+    flags = picker_flags("Toy", tname="Toy_bug_1", incremental=True, savable=True)
+    assert flags[flags.index("--tname") + 1] == "Toy_bug_1"
+    assert flags[-2:] == ["-V", f"{build_cache.INCREMENTAL_VFLAGS} {build_cache.SAVABLE_VFLAGS}"]
+
+
+def test_canonicalize(toy_repo):
+    """测试局部名按声明顺序映射回origin，只有真正改动的模块被报告"""
+    origin = str(toy_repo / "origin_file" / "Toy_origin.v")
+    assert list(split_modules(origin)) == ["Toy", "Inc"]
+    assert local_names(split_modules(origin)["Toy"], {"Toy", "Inc"}) == ["sum", "acc", "inc"]
+
+    text, changed = canonicalize(str(toy_repo / "bug_file" / "Toy_bug_1.v"), origin)
+    assert (text, changed) == (TOY_ORIGIN, [])
+    text, changed = canonicalize(str(toy_repo / "bug_file" / "Toy_bug_2.v"), origin)
+    assert changed == ["Inc"]
+    assert text == TOY_ORIGIN.replace(*TOY_BUG)
+
+    assert origin_of(str(toy_repo / "bug_file" / "Toy_bug_2.v")) == origin
+    assert origin_of(origin) is None
+
+
+def test_canonicalize_repo_variant():
+    """测试仓库中VectorIdiv_bug_2只有SRT4qdsCons模块与origin不同"""
+    text, changed = canonicalize(os.path.join(build_cache.ROOT, "bug_file", "VectorIdiv_bug_2.v"),
+                                 os.path.join(build_cache.ROOT, "origin_file", "VectorIdiv_origin.v"))
+    assert changed == ["SRT4qdsCons"]
+
+
+def test_build_incremental(dutdir, toy_repo):
+    """测试增量模式以变体自己的文件名导出规范化后的源文件，每个变体有各自的缓存对象"""
+    files = [str(toy_repo / "bug_file" / f"Toy_bug_{i}.v") for i in (1, 2)] + \
+            [str(toy_repo / "origin_file" / "Toy_origin.v")]
+    results = build_all(files, str(dutdir), jobs=2, incremental=True)
+    (bug_1, key_1, status_1), (bug_2, key_2, status_2), (_, key_origin, status_origin) = results
+    assert (status_1, status_2, status_origin) == ("built", "built", "built")
+    assert len({key_1, key_2, key_origin}) == 3, "文件名不同的变体不共用缓存对象"
+    assert (dutdir / "objects" / key_1 / "Toy_bug_1.v").read_text() == TOY_ORIGIN
+    assert (dutdir / "objects" / key_2 / "Toy_bug_2.v").read_text() == TOY_ORIGIN.replace(*TOY_BUG)
+    args = (dutdir / bug_2 / "Toy" / "args.txt").read_text().split()
+    assert os.path.basename(args[1]) == "Toy_bug_2.v", "覆盖点和.dat中的文件名与变体一致"
+    assert build(files[1], str(dutdir), incremental=True) == (bug_2, key_2, "cached")
+
+
+def test_build_incremental_shares_ccache(dutdir, toy_repo):
+    """测试bug版本中未改动的模块命中origin预热的ccache，只有改动的模块重新编译"""
+    files = [str(toy_repo / "origin_file" / "Toy_origin.v")] + \
+            [str(toy_repo / "bug_file" / f"Toy_bug_{i}.v") for i in (1, 2)]
+    build_all(files, str(dutdir), jobs=1, incremental=True)
+    assert (dutdir / "ccache").is_dir(), "各变体共用<dutdir>/ccache"
+    hits = [(dutdir / name / "Toy" / "ccache.txt").read_text().splitlines()
+            for name in ("Toy_origin", "Toy_bug_1", "Toy_bug_2")]
+    assert hits == [["miss Toy", "miss Inc"], ["hit Toy", "hit Inc"], ["hit Toy", "miss Inc"]]
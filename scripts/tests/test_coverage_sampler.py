@@ -0,0 +1,94 @@
+#coding=utf-8
+"""
+coverage_sampler测试：触发条件、引脚快照与常量检查点的提前退出
+
+DUT用只有引脚的假对象代替，记录每个引脚被读取的次数；覆盖组使用toffee的CovGroup
+"""
+
+import toffee.funcov as fc
+
+from coverage_sampler import CoverageSampler, is_constant_bin
+
+
+class FakePin:
+    def __init__(self, value=0):
+        self._value = value
+        self.reads = 0
+
+    @property
+    def value(self):
+        self.reads += 1
+        return self._value
+
+    @value.setter
+    def value(self, value):
+        self._value = value
+
+
+class FakeDUT:
+    def __init__(self):
+        self.io_fire = FakePin()
+        self.io_op = FakePin()
+        self.reset = FakePin()
+
+
+def _groups(dut):
+    g = fc.CovGroup("FG-TOY")
+    g.add_watch_point(dut, {
+        "CK-ADD": lambda x: x.io_fire.value == 1 and x.io_op.value == 0,
+        "CK-SUB": lambda x: x.io_fire.value == 1 and x.io_op.value == 1,
+    }, name="FC-OP")
+    g.add_watch_point(dut, {"CK-DUMMY": lambda x: True}, name="FC-DUMMY")
+    g.add_watch_point(dut, {"CK-OP-1": [lambda x: x.io_fire.value == 1, lambda x: x.io_op.value == 1]}, name="FC-COND")
+    return [g]
+
+
+def test_is_constant_bin():
+    assert is_constant_bin(lambda x: True)
+    assert not is_constant_bin(lambda x: x.io_fire.value == 1)
+    assert not is_constant_bin(fc.Eq(1))
+
+
+def test_sampler_trigger_and_snapshot():
+    """测试只在trigger为真或edge_pins变化的周期采样，同一周期内每个引脚只读一次"""
+    dut = FakeDUT()
+    groups = _groups(dut)
+    sampler = CoverageSampler(dut, groups, trigger=lambda s: s.io_fire.value == 1, edge_pins=["reset"])
+    point = groups[0].cover_point("FC-OP")
+
+    sampler()
+    assert sampler.sampled_cycles == 1, "首个周期edge_pins从无到有，视为变化"
+    for _ in range(10):
+        sampler()
+    assert (sampler.cycles, sampler.sampled_cycles) == (11, 1), "空闲周期不采样"
+
+    dut.io_fire.value = 1
+    dut.io_op.value = 1
+    reads = dut.io_fire.reads, dut.io_op.reads
+    sampler()
+    assert point["hints"] == {"CK-ADD": 0, "CK-SUB": 1}
+    assert groups[0].cover_point("FC-COND")["hints"] == {"CK-OP-1": 1}
+    assert (dut.io_fire.reads - reads[0], dut.io_op.reads - reads[1]) == (1, 1), "trigger与各检查点共用一次读取"
+
+    dut.io_fire.value = 0
+    dut.reset.value = 1
+    sampler()
+    assert sampler.sampled_cycles == 3, "reset翻转的周期也采样"
+
+
+def test_sampler_retires_constant_bins():
+    """测试常量检查点命中一次后不再计数，手动g.sample()照常读取DUT引脚"""
+    dut = FakeDUT()
+    groups = _groups(dut)
+    sampler = CoverageSampler(dut, groups)
+    for _ in range(5):
+        sampler()
+    g = groups[0]
+    assert g.cover_point("FC-DUMMY")["hints"] == {"CK-DUMMY": 1}
+    assert g.is_point_covered("FC-DUMMY")
+    assert g.cover_point("FC-OP")["hints"] == {"CK-ADD": 0, "CK-SUB": 0}
+
+    dut.io_fire.value = 1
+    g.sample()
+    assert g.cover_point("FC-OP")["hints"]["CK-ADD"] == 1, "采样器之外的sample()不使用过期的快照"
+    assert g.as_dict()["__sample_calln__"] == 6
@@ -0,0 +1,155 @@
+#coding=utf-8
+"""
+diff_cosim测试：端口解析、随机激励与锁步比较
+
+LockstepHarness用写到临时目录的假Picker包（Toy_origin/Toy_bug_<n>）驱动，不需要导出真实变体
+"""
+
+import os
+import textwrap
+
+import pytest
+
+import diff_cosim
+from diff_cosim import LockstepHarness, load_variant_class, parse_ports, random_stimulus
+
+
+TOY_VERILOG = """\
+module Toy(
+  input        clock,
+  input        reset,
+  input  [7:0] io_a,
+  input  [7:0] io_b,
+  output [8:0] io_sum
+);
+  assign io_sum = io_a + io_b;
+endmodule
+"""
+
+# 假Picker包：每次Step把io_a+io_b锁存到io_sum，bug版本的表达式不同
+TOY_PACKAGE = """\
+class _Pin:
+    def __init__(self):
+        self.value = 0
+
+
+class DUT{variant}:
+    def __init__(self):
+        for name in ("clock", "reset", "io_a", "io_b", "io_sum"):
+            setattr(self, name, _Pin())
+        self.finished = False
+
+    def InitClock(self, name):
+        self.clock_name = name
+
+    def Step(self, cycles=1):
+        a, b = self.io_a.value, self.io_b.value
+        self.io_sum.value = 0 if self.reset.value else ({expr}) & 0x1FF
+
+    def Finish(self):
+        self.finished = True
+"""
+
+TOY_VARIANTS = {
+    "Toy_origin": "a + b",
+    "Toy_bug_1": "a + b + (a == 0xFF)",   # 只在io_a全1时出错
+    "Toy_bug_2": "b + a",                 # 与origin等价，不应分歧
+}
+
+
+@pytest.fixture(scope="module")
+def toy_root(tmp_path_factory):
+    """含origin_file/Toy_origin.v与diff/<变体>/<变体>/假Picker包的临时仓库根目录"""
+    root = tmp_path_factory.mktemp("toy")
+    (root / "origin_file").mkdir()
+    (root / "origin_file" / "Toy_origin.v").write_text(TOY_VERILOG, encoding="utf-8")
+    for variant, expr in TOY_VARIANTS.items():
+        package = root / "diff" / variant / variant
+        package.mkdir(parents=True)
+        (package / "__init__.py").write_text(TOY_PACKAGE.format(variant=variant, expr=expr))
+    return root
+
+
+@pytest.fixture
+def harness(toy_root, monkeypatch):
+    monkeypatch.setattr(diff_cosim, "ROOT", str(toy_root))
+    return LockstepHarness("Toy", bugs=[1, 2], diff_dir=str(toy_root / "diff"))
+
+
+def test_parse_ports(tmp_path):
+    """测试按声明顺序解析端口位宽，找不到模块时抛出ValueError"""
+    path = tmp_path / "toy.v"
+    path.write_text(textwrap.dedent("""\
+        module Other(
+          input  [3:0] x
+        );
+        endmodule
+        """) + TOY_VERILOG, encoding="utf-8")
+    inputs, outputs = parse_ports(str(path), "Toy")
+    assert list(inputs.items()) == [("clock", 1), ("reset", 1), ("io_a", 8), ("io_b", 8)]
+    assert outputs == {"io_sum": 9}
+    assert parse_ports(str(path), "Other") == ({"x": 4}, {})
+    with pytest.raises(ValueError):
+        parse_ports(str(path), "Missing")
+
+
+def test_random_stimulus():
+    """测试随机激励按种子可复现，取值在位宽内，fixed/choices/skip生效"""
+    inputs = {"reset": 1, "io_a": 8, "io_b": 8, "io_flush": 1}
+
+    def values(seed):
+        stimulus = random_stimulus(inputs, seed, fixed={"io_flush": 0}, choices={"io_b": [3, 5]})
+        return [stimulus(cycle, None) for cycle in range(200)]
+
+    first = values(7)
+    assert first == values(7), "相同种子应产生相同激励"
+    assert first != values(8)
+    for cycle in first:
+        assert "reset" not in cycle, "reset默认不驱动"
+        assert cycle["io_flush"] == 0 and cycle["io_b"] in (3, 5)
+        assert 0 <= cycle["io_a"] < 256
+    assert len({cycle["io_a"] for cycle in first}) > 100
+
+
+def test_load_variant_class_missing(tmp_path):
+    """测试变体未导出时给出构建提示"""
+    with pytest.raises(FileNotFoundError, match="make build_variants DUT=Toy"):
+        load_variant_class("Toy_bug_9", str(tmp_path))
+
+
+def test_lockstep_first_divergence(harness):
+    """测试只记录bug版本的首次分歧，等价的变体不分歧"""
+    assert harness.variants == ["Toy_bug_1", "Toy_bug_2"]
+    assert harness.inputs == {"reset": 1, "io_a": 8, "io_b": 8}, "时钟不应作为输入驱动"
+
+    stimulus = [{"io_a": 1, "io_b": 2}, {"io_a": 0x1FF, "io_b": 1}, {"io_a": 0xFF, "io_b": 0}, {"io_a": 0xFF, "io_b": 1}]
+    divergences = harness.run(stimulus, cycles=10)
+    assert harness.cycle == len(stimulus), "可迭代激励耗尽时结束"
+    assert list(divergences) == ["Toy_bug_1"]
+    record = divergences["Toy_bug_1"]
+    assert (record["cycle"], record["port"], record["expect"], record["actual"]) == (2, "io_sum", 0x100, 0x101), \
+        "写入时应按位宽截断，首次分歧在第2周期"
+    assert record["inputs"] == {"reset": 0, "io_a": 0xFF, "io_b": 1}
+
+    report = harness.report()
+    assert "1/2个Bug版本出现分歧" in report and "Toy_bug_2" in report and "未分歧" in report
+    with pytest.raises(KeyError):
+        harness.drive({"io_sum": 1})
+    harness.finish()
+    assert all(dut.finished for dut in harness.duts.values())
+
+
+def test_lockstep_stops_when_all_diverged(toy_root, monkeypatch):
+    """测试全部bug版本分歧后提前结束，闭环激励可读取origin的输出"""
+    monkeypatch.setattr(diff_cosim, "ROOT", str(toy_root))
+    harness = LockstepHarness("Toy", bugs=[1], diff_dir=str(toy_root / "diff"))
+    harness.reset(cycles=3)
+    seen = []
+
+    def stimulus(cycle, origin):
+        seen.append(origin.io_sum.value)
+        return {"io_a": 0xFF if cycle >= 5 else cycle, "io_b": 0}
+
+    harness.run(stimulus, cycles=100)
+    assert harness.cycle == 6 and harness.divergences["Toy_bug_1"]["cycle"] == 6
+    assert seen[1:] == [0, 1, 2, 3, 4], "激励应看到origin上一周期的输出"
@@ -0,0 +1,95 @@
+#coding=utf-8
+"""
+impact_select测试：改动行定位（忽略局部名重命名）与受影响用例排序
+"""
+
+import json
+import os
+
+import pytest
+
+from build_cache import ROOT
+from impact_select import changed_lines, main, rank_tests
+from line_cov_index import LineCoverageIndex
+from toy_rtl import TOY_BUG, TOY_ORIGIN, toy_variant
+
+
+def _variant(path, old=None, new=None):
+    path.write_text(toy_variant(old, new))
+    return str(path)
+
+
+@pytest.fixture
+def origin(tmp_path):
+    path = tmp_path / "Toy_origin.v"
+    path.write_text(TOY_ORIGIN)
+    return str(path)
+
+
+def test_changed_lines(origin, tmp_path):
+    """测试只有局部名重命名时没有改动，改动和插入以基线行号表示"""
+    assert changed_lines(_variant(tmp_path / "Toy_bug_1.v"), origin) == (set(), {})
+
+    bug = _variant(tmp_path / "Toy_bug_2.v", *TOY_BUG)
+    assert changed_lines(bug, origin) == ({22}, {"Inc": (16, 23)})
+
+    bug = _variant(tmp_path / "Toy_bug_3.v", "  assign one = 8'h1;\n", "  // spare\n  assign one = 8'h1;\n")
+    lines, modules = changed_lines(bug, origin)
+    assert lines == {21} and modules == {"Inc": (16, 23)}, "插入记为插入点所在的基线行"
+
+
+def test_changed_lines_repo_variant():
+    """测试仓库中VectorIdiv_bug_2的改动只落在SRT4qdsCons模块内"""
+    lines, modules = changed_lines(os.path.join(ROOT, "bug_file", "VectorIdiv_bug_2.v"),
+                                   os.path.join(ROOT, "origin_file", "VectorIdiv_origin.v"))
+    assert list(modules) == ["SRT4qdsCons"]
+    lo, hi = modules["SRT4qdsCons"]
+    assert lines and all(lo <= line <= hi for line in lines)
+
+
+def _hits(items, duration=1.0):
+    return {"items": set(items), "duration": duration, "datfiles": []}
+
+
+def test_rank_tests():
+    """测试按命中覆盖点到改动行的距离、再按耗时排序，改动模块外和其他文件的命中不计入"""
+    tests = {
+        "direct": _hits(["L:src/Toy_origin.v:22", "L:src/Toy_origin.v:13"], 5.0),
+        "near_slow": _hits(["L:src/Toy_origin.v:21"], 3.0),
+        "near_fast": _hits(["L:src/Toy_origin.v:23", "F:g/p/b"], 1.0),
+        "far": _hits(["L:src/Toy_origin.v:17"], 0.5),
+        "other_module": _hits(["L:src/Toy_origin.v:13"]),
+        "other_file": _hits(["L:src/Other_origin.v:22"]),
+        "functional_only": _hits(["F:g/p/b"]),
+    }
+    impacted, distance = rank_tests(tests, {22}, {"Inc": (16, 23)}, "Toy_origin.v")
+    assert impacted == ["direct", "near_fast", "near_slow", "far"]
+    assert distance == {"direct": 0, "near_fast": 1, "near_slow": 1, "far": 5}
+    assert rank_tests(tests, set(), {}, "Toy_origin.v") == ([], {})
+
+
+def test_main(origin, tmp_path, capsys):
+    """测试命令行由--hits与索引库写出受影响用例的profile，没有受影响的用例时写出空profile"""
+    bug = _variant(tmp_path / "Toy_bug_2.v", *TOY_BUG)
+    hits = tmp_path / "hits.jsonl"
+    hits.write_text("".join(json.dumps({"test": name, "duration": 1.0, "datfile": f"/d/{name}.dat", "items": []}) + "\n"
+                            for name in ("t_inc", "t_toy")))
+    db = str(tmp_path / "cov.db")
+    index = LineCoverageIndex(db)
+    index.conn.executemany("INSERT INTO runs (id, test, datfile, mtime, size) VALUES (?, ?, ?, 0, 0)",
+                           [(0, "t_inc", "/d/t_inc.dat"), (1, "t_toy", "/d/t_toy.dat")])
+    index.conn.executemany("INSERT INTO lines (file, line, hits) VALUES (?, ?, ?)",
+                           [("src/Toy_origin.v", 21, bytes([0b01])), ("src/Toy_origin.v", 13, bytes([0b10]))])
+    index.conn.commit()
+    index.close()
+
+    output = tmp_path / "impact.txt"
+    assert main([bug, "--baseline", origin, "--hits", str(hits), "--line-db", db, "--output", str(output)]) == 0
+    assert "改动模块: Inc，改动1行" in capsys.readouterr().out
+    assert output.read_text().splitlines() == ["# 受影响用例：Toy_bug_2.v vs Toy_origin.v，改动模块 Inc", "t_inc"]
+
+    renamed = _variant(tmp_path / "Toy_bug_1.v")
+    assert main([renamed, "--baseline", origin, "--hits", str(hits), "--line-db", db, "--output", str(output)]) == 0
+    assert "没有受影响的用例（2个有记录），全部用例后台补跑" in capsys.readouterr().out
+    assert [text for text in output.read_text().splitlines() if not text.startswith("#")] == [], \
+        "空profile由impact_test跳过前台运行"
@@ -0,0 +1,121 @@
+#coding=utf-8
+"""
+line_cov_index测试：.dat导入与按用例查询的往返、归属文件与池模式报错
+"""
+
+import json
+
+import pytest
+
+from line_cov_index import LineCoverageIndex, main, parse_dat, read_owner, write_owner
+
+
+def _write_dat(path, points):
+    """写出Verilator覆盖率文件，points为[(page, 源文件, 行号或"S"范围, 命中次数)]"""
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("# SystemC::Coverage-3\n")
+        for page, file, line, count in points:
+            fields = [("f", file), ("page", f"{page}/Toy"), ("o", "")]
+            fields.append(("S", line) if isinstance(line, str) else ("l", str(line)))
+            key = "".join(f"\x01{k}\x02{v}" for k, v in fields)
+            f.write(f"C '{key}' {count}\n")
+    return str(path)
+
+
+# 三个用例命中的行：test_a命中10、12-13，test_b命中10、20，test_c一行都没有命中
+RUNS = {
+    "a": [("v_line", "src/Toy.v", 10, 3), ("v_branch", "src/Toy.v", "12-13", 1), ("v_line", "src/Toy.v", 20, 0),
+          ("v_toggle", "src/Toy.v", 30, 5), ("v_line", "src/Skip.v", 1, 1)],
+    "b": [("v_line", "src/Toy.v", 10, 1), ("v_line", "src/Toy.v", 20, 2), ("v_line", "src/Toy.v", 21, 0)],
+    "c": [("v_line", "src/Toy.v", 10, 0), ("v_line", "src/Toy.v", 21, 0)],
+}
+
+
+@pytest.fixture
+def data(tmp_path):
+    """a.dat有归属文件，b.dat只在hits记录中，c.dat没有归属"""
+    data = tmp_path / "data"
+    data.mkdir()
+    dats = {name: _write_dat(data / f"{name}.dat", points) for name, points in RUNS.items()}
+    write_owner(dats["a"], ["tests/test_toy.py::test_a"])
+    with open(tmp_path / "hits.jsonl", "w", encoding="utf-8") as f:
+        f.write(json.dumps({"test": "tests/test_toy.py::test_b", "datfile": dats["b"]}) + "\n\n")
+    (tmp_path / "Toy.ignore").write_text("# 示例\n*/Skip.v\n")
+    return dats
+
+
+def test_parse_dat(data):
+    """测试只统计行/分支覆盖点，S范围展开为多行"""
+    assert parse_dat(data["a"]) == {("src/Toy.v", 10): 3, ("src/Toy.v", 12): 1, ("src/Toy.v", 13): 1,
+                                    ("src/Toy.v", 20): 0, ("src/Skip.v", 1): 1}
+
+
+def test_owner_round_trip(tmp_path):
+    """测试归属文件的写出与读取，没有归属文件时为None"""
+    datfile = str(tmp_path / "x.dat")
+    assert read_owner(datfile) is None
+    write_owner(datfile, ("t::a", "t::b"))
+    assert read_owner(datfile) == ["t::a", "t::b"]
+    assert json.loads((tmp_path / "x.dat.owner.json").read_text())["datfile"] == "x.dat"
+
+
+def test_ingest_and_query(data, tmp_path):
+    """测试导入后按行查询用例、未命中行与汇总，未变化的.dat再次导入时跳过"""
+    index = LineCoverageIndex(str(tmp_path / "cov.db"))
+    try:
+        added, skipped, unowned = index.ingest([str(tmp_path / "data")], [str(tmp_path / "Toy.ignore")],
+                                               str(tmp_path / "hits.jsonl"))
+        assert (added, skipped, unowned) == (2, 0, [data["c"]]), "没有归属的c.dat应被跳过并报告"
+        assert sorted(index.runs().values()) == ["tests/test_toy.py::test_a", "tests/test_toy.py::test_b"]
+
+        assert index.files() == ["src/Toy.v"], ".ignore中的文件不应入库"
+        assert index.tests_hitting("Toy.v", 10) == ["tests/test_toy.py::test_a", "tests/test_toy.py::test_b"]
+        assert index.tests_hitting("src/Toy.v", 13) == ["tests/test_toy.py::test_a"]
+        assert index.tests_hitting("*.v", 20) == ["tests/test_toy.py::test_b"]
+        assert index.unhit_lines() == [("src/Toy.v", 21)]
+        assert index.summary() == {"src/Toy.v": (5, 4)}
+        with pytest.raises(KeyError):
+            index.tests_hitting("Other.v", 10)
+        with pytest.raises(KeyError):
+            index.tests_hitting("Toy.v", 30)  # 翻转覆盖点不计入
+
+        assert index.ingest([str(tmp_path / "data")], hits_file=str(tmp_path / "hits.jsonl")) == (0, 2, [data["c"]])
+
+        # 补上归属文件后c.dat可以导入；同一路径被新一轮运行覆盖后作为新的运行导入
+        write_owner(data["c"], ["tests/test_toy.py::test_c"])
+        _write_dat(data["a"], RUNS["a"] + [("v_line", "src/Toy.v", 21, 1), ("v_line", "src/Toy.v", 22, 0)])
+        assert index.ingest([data["a"], data["c"]]) == (2, 0, [])
+        assert len(index.runs()) == 4
+        assert index.tests_hitting("Toy.v", 21) == ["tests/test_toy.py::test_a"]
+        assert index.tests_hitting("Toy.v", 12) == ["tests/test_toy.py::test_a"], "同名用例多次运行只列一次"
+        assert index.unhit_lines("Toy.v") == [("src/Toy.v", 22)]
+    finally:
+        index.close()
+
+
+def test_ingest_pooled_rolls_back(data, tmp_path):
+    """测试池中实例写出的.dat（归属多个用例）使导入报错，本次已导入的文件全部回滚"""
+    write_owner(data["b"], ["tests/test_toy.py::test_b", "tests/test_toy.py::test_c"])
+    db = str(tmp_path / "cov.db")
+    index = LineCoverageIndex(db)
+    try:
+        with pytest.raises(ValueError, match="POOL=0"):
+            index.ingest([str(tmp_path / "data")])
+        assert index.runs() == {} and index.files() == []
+    finally:
+        index.close()
+    assert main(["ingest", db, str(tmp_path / "data")]) == 1
+
+
+def test_cli(data, tmp_path, capsys):
+    """测试命令行的导入、查询与未命中行输出"""
+    db = str(tmp_path / "cov.db")
+    assert main(["ingest", db, str(tmp_path / "data"), "--hits", str(tmp_path / "hits.jsonl")]) == 0
+    out = capsys.readouterr().out
+    assert f"跳过{data['c']}" in out and "导入2次运行" in out
+    assert main(["hits", db, "Toy.v", "20"]) == 0
+    assert capsys.readouterr().out.split() == ["tests/test_toy.py::test_b"]
+    assert main(["hits", db, "Toy.v", "99"]) == 1
+    capsys.readouterr()
+    assert main(["unhit", db]) == 0
+    assert capsys.readouterr().out.startswith("src/Toy.v:21:")
@@ -0,0 +1,140 @@
+#coding=utf-8
+"""
+regress_min测试：贪心覆盖精简、记录/profile读写与pytest插件
+"""
+
+import json
+
+import pytest
+
+from line_cov_index import LineCoverageIndex
+from regress_min import (attach_line_hits, coverage_items, item_key, load_hits, load_profile, minimize,
+                         write_profile)
+
+
+pytest_plugins = ["pytester"]
+
+
+def _tests(spec):
+    return {name: {"items": set(items), "duration": duration, "datfiles": []} for name, (items, duration) in spec.items()}
+
+
+@pytest.fixture
+def greedy_cover():
+    """A按“新增覆盖项/耗时”最先被选中，之后B/C/D覆盖其余各项时A变得冗余；E覆盖同样的项但耗时长"""
+    return _tests({
+        "A": ({1, 2, 3}, 1.0),
+        "B": ({1, 4}, 1.0),
+        "C": ({2, 5}, 1.0),
+        "D": ({3, 6}, 1.0),
+        "E": ({4, 5, 6}, 10.0),
+        "U": ({7}, 5.0),        # 唯一覆盖7的必需用例
+        "Z": (set(), 0.1),      # 没有覆盖项
+    })
+
+
+def test_minimize_greedy_cover(greedy_cover):
+    """测试必需用例在前、按单位耗时贪心选择，并剔除被其余已选用例完全覆盖的用例"""
+    selected = minimize(greedy_cover)
+    assert selected == ["U", "D", "C", "B"]
+    assert set().union(*(greedy_cover[name]["items"] for name in selected)) == set(range(1, 8))
+    for name in selected:
+        rest = set().union(*(greedy_cover[other]["items"] for other in selected if other != name))
+        assert greedy_cover[name]["items"] - rest, f"{name}是冗余用例"
+
+
+def test_minimize_prefers_cheap_cover():
+    """测试耗时短的组合优先于覆盖更多但耗时长的单个用例，同分时按用例名确定"""
+    tests = _tests({"big": ({"b", "c", "d", "e"}, 10.0), "b_c": ({"b", "c"}, 1.0), "d_e": ({"d", "e"}, 1.0)})
+    assert minimize(tests) == ["d_e", "b_c"]
+    assert minimize({}) == []
+
+
+def test_hits_and_profile_round_trip(tmp_path):
+    """测试同一用例多次记录时合并覆盖项，profile写出后按顺序读回"""
+    hits = tmp_path / "hits.jsonl"
+    records = [
+        {"test": "test_a.py::test_x", "duration": 1.0, "datfile": "/d/x1.dat", "items": ["F:g/p/b1"]},
+        {"test": "test_a.py::test_y", "duration": 2.0, "datfile": None, "items": ["F:g/p/b2", "M:g/p/c"]},
+        {"test": "test_a.py::test_x", "duration": 3.0, "datfile": "/d/x2.dat", "items": ["L:f.v:3"]},
+    ]
+    hits.write_text("".join(json.dumps(r) + "\n" for r in records) + "\n")
+    tests = load_hits(str(hits))
+    assert tests["test_a.py::test_x"] == {"items": {"F:g/p/b1", "L:f.v:3"}, "duration": 3.0,
+                                          "datfiles": ["/d/x1.dat", "/d/x2.dat"]}
+
+    profile = tmp_path / "smoke" / "profile.txt"
+    write_profile(str(profile), ["test_a.py::test_y", "test_a.py::test_x"], tests)
+    text = profile.read_text()
+    assert text.startswith("# 冒烟profile：2/2个用例") and "功能bin 2，检查点登记 1，代码行 1" in text
+    assert load_profile(str(profile)) == ["test_a.py::test_y", "test_a.py::test_x"]
+
+
+def test_coverage_items_and_item_key():
+    """测试从覆盖组JSON提取命中的bin与登记的检查点，nodeid只保留文件名"""
+    group = {"name": "FG-API", "points": [
+        {"name": "FC-ADD", "bins": [{"name": "CK-HIT", "hints": 2}, {"name": "CK-MISS", "hints": 0}],
+         "functions": {"CK-HIT": ["test_a"], "CK-MISS": []}},
+    ]}
+    assert coverage_items([{"data": json.dumps(group)}, {"data": group}]) == {"F:FG-API/FC-ADD/CK-HIT",
+                                                                             "M:FG-API/FC-ADD/CK-HIT"}
+    assert item_key("final_result/X/tests/test_x.py::test_a[1]") == "test_x.py::test_a[1]"
+
+
+def test_attach_line_hits(tmp_path):
+    """测试按.dat路径从索引库加入代码行覆盖项，同一路径取最近一次导入"""
+    db = str(tmp_path / "cov.db")
+    index = LineCoverageIndex(db)
+    index.conn.executemany("INSERT INTO runs (id, test, datfile, mtime, size) VALUES (?, ?, ?, 0, ?)",
+                           [(0, "t::a", "/d/a.dat", 1), (1, "t::b", "/d/b.dat", 1), (2, "t::a", "/d/a.dat", 2)])
+    index.conn.executemany("INSERT INTO lines (file, line, hits) VALUES (?, ?, ?)",
+                           [("f.v", 1, bytes([0b001])), ("f.v", 2, bytes([0b110])), ("f.v", 3, b"")])
+    index.conn.commit()
+    index.close()
+
+    tests = _tests({"t::a": (set(), 1.0), "t::b": ({"F:x"}, 1.0), "t::c": (set(), 1.0)})
+    tests["t::a"]["datfiles"] = ["/d/a.dat"]
+    tests["t::b"]["datfiles"] = ["/d/b.dat"]
+    assert attach_line_hits(tests, db) == 2
+    assert tests["t::a"]["items"] == {"L:f.v:2"}, "只计入该路径最近一次导入的运行"
+    assert tests["t::b"]["items"] == {"F:x", "L:f.v:2"}
+    assert tests["t::c"]["items"] == set()
+
+
+def test_plugin_profile_and_hits(pytester, monkeypatch):
+    """测试--profile按profile顺序运行其中的用例，--profile-exclude运行其余用例，--coverage-hits为每个用例追加一条记录，池模式只拒绝summary"""
+    monkeypatch.delenv("DUT_POOL", raising=False)
+    monkeypatch.delenv("DUT_POOL_LINE_COV", raising=False)
+    pytester.makepyfile(test_toy="""
+        def test_a():
+            pass
+
+        def test_b():
+            pass
+
+        def test_c():
+            pass
+        """)
+    pytester.path.joinpath("profile.txt").write_text("# 注释\ntest_toy.py::test_c\ntest_toy.py::test_a\n")
+    result = pytester.runpytest("-p", "regress_min", "-v", "--profile", "profile.txt", "--coverage-hits", "hits.jsonl")
+    result.assert_outcomes(passed=2, deselected=1)
+    result.stdout.fnmatch_lines(["*test_c PASSED*", "*test_a PASSED*"])
+    records = [json.loads(text) for text in pytester.path.joinpath("hits.jsonl").read_text().splitlines()]
+    assert [(r["test"], r["outcome"], r["datfile"], r["items"]) for r in records] == \
+        [("test_toy.py::test_c", "passed", None, []), ("test_toy.py::test_a", "passed", None, [])]
+
+    result = pytester.runpytest("-p", "regress_min", "--profile", "missing.txt")
+    result.assert_outcomes(passed=3)
+    result.stdout.fnmatch_lines(["*冒烟profile missing.txt不存在，运行完整套件*"])
+
+    result = pytester.runpytest("-p", "regress_min", "-v", "--profile-exclude", "profile.txt")
+    result.assert_outcomes(passed=1, deselected=2)
+    result.stdout.fnmatch_lines(["*test_b PASSED*"])
+
+    monkeypatch.setenv("DUT_POOL", "1")
+    result = pytester.runpytest("-p", "regress_min", "--coverage-hits", "hits.jsonl")
+    result.assert_outcomes(passed=3)
+    monkeypatch.setenv("DUT_POOL_LINE_COV", "summary")
+    result = pytester.runpytest("-p", "regress_min", "--coverage-hits", "hits.jsonl")
+    assert result.ret == pytest.ExitCode.USAGE_ERROR
+    result.stderr.fnmatch_lines(["*不能与DUT_POOL_LINE_COV=summary同时使用*"])
@@ -0,0 +1,62 @@
+#coding=utf-8
+"""
+toffee_shard测试：去重键加入用例nodeid，worker中设置的报告信息在主进程重放
+
+worker到主进程的传输用pytest报告的序列化/反序列化（与xdist相同）代替
+"""
+
+import pytest
+from _pytest.reports import TestReport
+from toffee_test import reporter
+
+from toffee_shard import pytest_runtest_logreport
+
+
+@pytest.fixture
+def report_info(monkeypatch):
+    """每个测试使用独立的toffee_test报告信息"""
+    info = {"user": None, "title": None, "meta": {}}
+    monkeypatch.setattr(reporter, "__report_info__", info)
+    return info
+
+
+def _report(nodeid, when="teardown", datfile=None):
+    report = TestReport(nodeid, ("test_toy.py", 0, nodeid.rpartition("::")[2]), {}, "passed", None, when)
+    report.__coverage_group__ = [{"hash": "1", "id": "H0-P7", "data": "{}"}]
+    if datfile is not None:
+        report.__line_coverage__ = {"hash": "2", "id": "H0-P7", "data": datfile, "ignore": []}
+    return report
+
+
+def test_dedup_key_includes_nodeid(report_info):
+    """测试teardown报告的覆盖组和代码行覆盖率去重键加上nodeid，内容相同的两个用例不再被合并"""
+    a, b = _report("test_toy.py::test_a", datfile="a.dat"), _report("test_toy.py::test_b")
+    for report in (a, b):
+        pytest_runtest_logreport(report)
+    assert a.__coverage_group__[0]["id"] == "H0-P7-test_toy.py::test_a"
+    assert a.__line_coverage__["id"] == "H0-P7-test_toy.py::test_a"
+    assert b.__coverage_group__[0]["id"] == "H0-P7-test_toy.py::test_b"
+
+    call = _report("test_toy.py::test_c", when="call")
+    pytest_runtest_logreport(call)
+    assert call.__coverage_group__[0]["id"] == "H0-P7", "只处理teardown报告"
+    assert not hasattr(call, "toffee_report_info")
+
+
+def test_report_info_replayed_on_controller(report_info, monkeypatch):
+    """测试worker中的用户/标题/元信息随报告带回，主进程收到后重放，去重键不再重复追加"""
+    reporter.set_user_info("worker", "w@example.com")
+    reporter.set_title_info("VectorIdiv")
+    reporter.set_meta_info("RTL", "VectorIdiv_bug_2")
+    report = _report("test_toy.py::test_a", datfile="a.dat")
+    pytest_runtest_logreport(report)
+    data = report._to_json()
+
+    controller = {"user": None, "title": None, "meta": {}}
+    monkeypatch.setattr(reporter, "__report_info__", controller)
+    received = TestReport._from_json(data)
+    pytest_runtest_logreport(received)
+    assert controller == {"user": {"name": "worker", "email": "w@example.com"}, "title": "VectorIdiv",
+                          "meta": {"RTL": "VectorIdiv_bug_2"}}
+    assert received.__coverage_group__[0]["id"] == "H0-P7-test_toy.py::test_a"
+    assert received.__line_coverage__["id"] == "H0-P7-test_toy.py::test_a"
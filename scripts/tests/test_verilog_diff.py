@@ -0,0 +1,76 @@
+#coding=utf-8
+"""
+verilog_diff测试：重命名后的结构配对与改动信号的定位
+"""
+
+import os
+
+import pytest
+
+from toy_rtl import TOY_BUG, TOY_ORIGIN, toy_variant
+from verilog_diff import ROOT, diff_files, main, parse_file, report
+
+
+@pytest.fixture
+def origin(tmp_path):
+    path = tmp_path / "Toy_origin.v"
+    path.write_text(TOY_ORIGIN)
+    return str(path)
+
+
+def _variant(path, old=None, new=None):
+    path.write_text(toy_variant(old, new))
+    return str(path)
+
+
+def test_parse_file(origin):
+    """测试模块、端口与内部信号的解析，实例的位宽字段为模块类型"""
+    modules = parse_file(origin)
+    assert list(modules) == ["Toy", "Inc"]
+    toy = modules["Toy"]
+    assert {name: sig.kind for name, sig in toy.signals.items() if sig.kind not in ("input", "output")} == \
+        {"sum": "wire", "acc": "reg", "inc": "inst"}
+    assert toy.signals["inc"].width == "Inc"
+    assert modules["Inc"].signals["out"].line == 22
+
+
+def test_diff_renames_only(origin, tmp_path):
+    """测试只有局部名重命名时没有语义差异，改名映射完整还原"""
+    results, removed, added = diff_files(_variant(tmp_path / "Toy_bug_1.v"), origin)
+    assert (removed, added) == ([], [])
+    assert results["Toy"]["renames"] == {"_GEN_3": "sum", "_r_17": "acc", "u_Inc_2": "inc"}
+    assert results["Inc"]["renames"] == {"_T_5": "one"}
+    assert all(not (r["changed"] or r["removed"] or r["added"]) for r in results.values())
+    assert report(results, removed, added).splitlines() == ["无语义差异"]
+
+
+def test_diff_known_change(origin, tmp_path):
+    """测试注入的改动只报告在被改动的信号上，操作数映射回origin的名字"""
+    results, removed, added = diff_files(_variant(tmp_path / "Toy_bug_2.v", *TOY_BUG), origin)
+    assert not (results["Toy"]["changed"] or results["Toy"]["removed"] or results["Toy"]["added"])
+    (o_sig, b_sig, o_tokens, b_tokens), = results["Inc"]["changed"]
+    assert (o_sig.name, b_sig.name, o_sig.line, b_sig.line) == ("out", "out", 22, 22)
+    assert (o_tokens, b_tokens) == (["in", "+", "one"], ["in", "-", "one"])
+    assert report(results, removed, added).splitlines() == [
+        "module Inc", "  ~ output out  origin:22 bug:22", "      - in + one", "      + in - one"]
+
+
+def test_diff_added_signal(origin, tmp_path):
+    """测试声明个数变化（canonicalize无法处理）时仍能配对，新增信号单独报告"""
+    bug = _variant(tmp_path / "Toy_bug_3.v", "  assign out = in + one;\n",
+                   "  wire [7:0] two;\n  assign two = one + one;\n  assign out = in + two;\n")
+    results, _, _ = diff_files(bug, origin)
+    assert results["Inc"]["renames"] == {"_T_5": "one"}
+    (o_sig, b_sig, _, b_tokens), = results["Inc"]["changed"]
+    assert (o_sig.name, b_sig.line, b_tokens) == ("out", 24, ["in", "+", "?two"])
+    assert [(sig.name, sig.line) for sig in results["Inc"]["added"]] == [("two", 23)]
+    assert results["Inc"]["removed"] == []
+
+
+def test_diff_repo_variant(capsys):
+    """测试仓库中VectorIdiv_bug_2只有SRT4qdsCons中的一个常量表被改动，默认按文件名找到origin"""
+    assert main([os.path.join(ROOT, "bug_file", "VectorIdiv_bug_2.v")]) == 0
+    out = capsys.readouterr().out.splitlines()
+    assert out[0] == "# VectorIdiv_bug_2.v vs VectorIdiv_origin.v"
+    assert out[1:] == ["module SRT4qdsCons", "  ~ wire _GEN (bug: dQTN)  origin:162 bug:162",
+                       "      - 9'h1BC , 9'h1C4 , 9'h1C8 , 9'h1D0 }", "      + 9'h1BC , 9'h1C4 , 9'h1D0 , 9'h1D0 }"]
@@ -0,0 +1,86 @@
+#coding=utf-8
+"""
+wait_for测试：条件解析、inotify唤醒、超时与轮询退化
+"""
+
+import os
+import threading
+import time
+
+import pytest
+
+import wait_for
+from wait_for import main, parse_groups, satisfied, wait_for as wait
+
+
+def _later(delay, action, *args):
+    timer = threading.Timer(delay, action, args)
+    timer.start()
+    return timer
+
+
+def _touch(path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    open(path, "w").close()
+
+
+def test_parse_groups(tmp_path):
+    """测试!表示等待消失，--or分隔的组之间为或关系，空组报错"""
+    a, b, c = (str(tmp_path / name) for name in "abc")
+    assert parse_groups([a, "!" + b, "--or", c]) == [[(a, True), (b, False)], [(c, True)]]
+    with pytest.raises(ValueError):
+        parse_groups([a, "--or"])
+
+    groups = parse_groups([a, "!" + b, "--or", c])
+    assert satisfied(groups) is None
+    _touch(a)
+    assert satisfied(groups) == 0
+    _touch(b)
+    _touch(c)
+    assert satisfied(groups) == 1
+
+
+def test_wait_for_created_file(tmp_path):
+    """测试尚不存在的多级目录中的文件被创建后立即返回"""
+    target = str(tmp_path / "output" / "5000" / "dut_complete.txt")
+    timer = _later(0.2, _touch, target)
+    start = time.monotonic()
+    try:
+        assert wait(parse_groups([target]), timeout=10) == 0
+    finally:
+        timer.join()
+    assert time.monotonic() - start < 5, "文件出现后应被事件唤醒，而不是等到超时"
+
+
+def test_wait_for_removed_file(tmp_path):
+    """测试等待文件消失，以及第二组先满足时返回其序号"""
+    flag = tmp_path / "dut_complete.txt"
+    flag.touch()
+    timer = _later(0.2, os.remove, str(flag))
+    try:
+        assert wait(parse_groups(["!" + str(flag), "--or", str(tmp_path / "never")]), timeout=10) == 0
+    finally:
+        timer.join()
+
+
+def test_wait_for_timeout(tmp_path):
+    """测试超时返回None，命令行返回码为1"""
+    target = str(tmp_path / "never")
+    start = time.monotonic()
+    assert wait(parse_groups([target]), timeout=0.3) is None
+    assert 0.3 <= time.monotonic() - start < 5
+    assert main(["--timeout", "0.1", target]) == 1
+
+
+def test_wait_for_polling_fallback(tmp_path, monkeypatch, capsys):
+    """测试无inotify时退化为轮询，命令行打印满足的组序号"""
+    def no_inotify():
+        raise OSError("inotify不可用")
+    monkeypatch.setattr(wait_for, "Inotify", no_inotify)
+    target = str(tmp_path / "all_complete.txt")
+    timer = _later(0.2, _touch, target)
+    try:
+        assert main(["--timeout", "10", str(tmp_path / "never"), "--or", target]) == 0
+    finally:
+        timer.join()
+    assert capsys.readouterr().out.strip() == "1"
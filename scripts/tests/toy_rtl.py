@@ -0,0 +1,49 @@
+#coding=utf-8
+"""
+build_cache/impact_select/verilog_diff测试共用的两模块小设计，以及模拟bug文件的局部名重命名
+
+行号：Toy为1-14，Inc为16-23
+"""
+
+import re
+
+
+TOY_ORIGIN = """\
+module Toy(
+  input        clock,
+  input  [7:0] io_a,
+  output [7:0] io_y
+);
+  wire [7:0] sum;
+  reg  [7:0] acc;
+  Inc inc (
+    .in(sum),
+    .out(io_y)
+  );
+  assign sum = io_a + acc;
+  always @(posedge clock) acc <= sum;
+endmodule
+
+module Inc(
+  input  [7:0] in,
+  output [7:0] out
+);
+  wire [7:0] one;
+  assign one = 8'h1;
+  assign out = in + one;
+endmodule
+"""
+
+# bug文件中的局部名被随机重命名
+TOY_RENAMES = {"sum": "_GEN_3", "acc": "_r_17", "inc": "u_Inc_2", "one": "_T_5"}
+
+# Inc模块第22行的改动
+TOY_BUG = ("assign out = in + one;", "assign out = in - one;")
+
+
+def toy_variant(old=None, new=None):
+    """把TOY_ORIGIN中的old替换为new后重命名局部名，得到bug文件的文本"""
+    text = TOY_ORIGIN.replace(old, new) if old else TOY_ORIGIN
+    for name, renamed in TOY_RENAMES.items():
+        text = re.sub(rf"\b{name}\b", renamed, text)
+    return text
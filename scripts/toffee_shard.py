@@ -0,0 +1,52 @@
+#coding=utf-8
+"""
+toffee_test分片并行执行插件
+
+配合pytest-xdist把一个DUT的测试套件分散到N个worker进程运行，每个worker各自创建DUT实例，
+最终由主进程合并出一份功能覆盖率和代码行覆盖率报告：
+
+    cd final_result/VectorIdiv/output_result/unity_test/tests
+    PYTHONPATH=<仓库>/scripts pytest -p toffee_shard -n 8 --toffee-report
+
+或直接使用 make unity_test DUT=VectorIdiv JOBS=8。
+
+toffee_test把每个用例的覆盖组JSON和.dat路径挂在teardown报告上，xdist会把报告原样序列化
+回主进程，主进程再按“内容hash-进程号”去重后累加各组的命中次数。串行运行时所有报告的进程号相同，
+内容相同的覆盖组只计一次；分片后只有落在同一worker的相同报告才被去重，命中次数随JOBS和分片方式变化。
+本插件：
+    - 在去重键中加入用例nodeid，每个用例的报告各自计入，合并结果与JOBS和分片方式无关。
+      这同样改变了串行运行的去重：内容相同的覆盖组（或同一.dat）按用例各计一次，
+      因此应与加载本插件的串行运行（-p toffee_shard -n 0）比较，而不是与未加载本插件的结果比较
+    - 把worker中fixture设置的报告用户/标题/元信息随报告带回主进程
+"""
+
+import pytest
+from toffee_test import reporter
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_runtest_logreport(report):
+    # tryfirst：在worker中先于xdist把报告发回主进程之前执行
+    if report.when != "teardown":
+        return
+    info = getattr(report, "toffee_report_info", None)
+    if info is None:
+        # 产生报告的进程（串行运行或worker）：给去重键加上nodeid，并附带报告信息
+        for group in getattr(report, "__coverage_group__", []):
+            group["id"] = "%s-%s" % (group["id"], report.nodeid)
+        line = getattr(report, "__line_coverage__", None)
+        if line is not None:
+            line["id"] = "%s-%s" % (line["id"], report.nodeid)
+        report.toffee_report_info = {
+            "user": reporter.__report_info__["user"],
+            "title": reporter.__report_info__["title"],
+            "meta": dict(reporter.__report_info__["meta"]),
+        }
+        return
+    # 主进程收到worker的报告：worker中的set_user_info/set_title_info不会影响主进程，在此重放
+    if info["user"] is not None:
+        reporter.set_user_info(info["user"]["name"], info["user"]["email"])
+    if info["title"] is not None:
+        reporter.set_title_info(info["title"])
+    for key, value in info["meta"].items():
+        reporter.set_meta_info(key, value)
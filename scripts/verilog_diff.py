@@ -0,0 +1,470 @@
+#coding=utf-8
+"""
+不依赖信号名的Verilog结构差分
+
+bug_file中的内部信号被随机重命名（例如origin的`_GEN`在VectorIdiv_bug_2.v中变为`dQTN`），
+声明个数与行数也会变化，按文本比较几千行都不同，build_cache.canonicalize按声明顺序映射名字
+也只对声明个数一致的模块有效。本工具按结构对齐两个版本：
+
+- 模块和端口名未被混淆，按名字对齐，作为锚点
+- 每个内部信号（wire/reg/子模块实例）抽象为其驱动表达式的模板（运算符、常量、位选）加操作数，
+  按扇入（操作数的标签）和扇出（使用者的标签与操作数位置）分别迭代计算结构哈希，两侧唯一的
+  哈希即配对；新配对的信号作为锚点再次迭代，直到不再产生新的配对
+- 注入的改动只影响改动点附近几层的扇入哈希，改动点本身仍可由扇出哈希配对，因此配对后逐个比较
+  驱动表达式（操作数映射回origin的名字），只报告表达式不同的信号和无法配对的信号
+
+    python3 scripts/verilog_diff.py bug_file/VectorIdiv_bug_2.v
+    python3 scripts/verilog_diff.py bug_file/VectorFloatFMA_bug_1.v origin_file/VectorFloatFMA_origin.v --renames
+    make rtl_diff DUT=VectorIdiv
+
+输出中的行号分别为origin与bug文件中该信号驱动语句的行号；--renames同时打印改名映射（bug名 -> origin名）。
+"""
+
+import argparse
+import difflib
+import os
+import re
+import sys
+from collections import defaultdict
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 结构哈希每轮迭代的最大深度
+MAX_DEPTH = 4
+
+_COMMENT_RE = re.compile(r"//[^\n]*|/\*.*?\*/", re.S)
+_TOKEN_RE = re.compile(r"\d+'[sS]?[bBoOdDhH][0-9a-fA-FxXzZ_?]+|'\{|\d+|[A-Za-z_$][\w$]*"
+                       r"|<<<|>>>|===|!==|<=|>=|==|!=|&&|\|\||<<|>>|~&|~\||~\^|\^~|\S")
+_DECL_KEYWORDS = ("wire", "reg", "logic")
+
+
+class Signal:
+    """模块中的一个信号或子模块实例
+
+    Attributes:
+        name (str): 名字
+        kind (str): input/output/wire/reg/inst
+        width (str): 位宽声明（实例为模块类型）
+        template (tuple): 驱动表达式模板，操作数位置为None
+        operands (list): 模板中各操作数对应的信号名
+        line (int): 驱动语句（或声明）的行号
+    """
+
+    def __init__(self, name, kind, width, line):
+        self.name = name
+        self.kind = kind
+        self.width = width
+        self.line = line
+        self.tokens = []
+
+    def finish(self, names):
+        self.template = tuple(None if t in names else t for t in self.tokens)
+        self.operands = [t for t in self.tokens if t in names]
+
+
+class Module:
+    """解析后的Verilog模块：端口与内部信号"""
+
+    def __init__(self, name, line):
+        self.name = name
+        self.line = line
+        self.signals = {}
+        self.ports = []
+
+    def add(self, name, kind, width, line):
+        if name not in self.signals:
+            self.signals[name] = Signal(name, kind, width, line)
+        return self.signals[name]
+
+
+def _tokenize(text, first_line):
+    """切分为(token, 行号)列表，注释替换为等量的换行以保持行号"""
+    text = _COMMENT_RE.sub(lambda m: "\n" * m.group(0).count("\n"), text)
+    tokens = []
+    line = first_line
+    pos = 0
+    for m in _TOKEN_RE.finditer(text):
+        line += text.count("\n", pos, m.start())
+        pos = m.start()
+        tokens.append((m.group(0), line))
+    return tokens
+
+
+class _Parser:
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.pos = 0
+
+    def peek(self, offset=0):
+        i = self.pos + offset
+        return self.tokens[i][0] if i < len(self.tokens) else None
+
+    def line(self):
+        return self.tokens[min(self.pos, len(self.tokens) - 1)][1]
+
+    def take(self, expect=None):
+        token = self.tokens[self.pos][0]
+        if expect is not None and token != expect:
+            raise ValueError(f"第{self.tokens[self.pos][1]}行: 期望{expect}，实际为{token}")
+        self.pos += 1
+        return token
+
+    def until(self, *ends):
+        """读取到深度0处的结束符（不含）"""
+        out, depth = [], 0
+        while True:
+            token = self.peek()
+            if token is None:
+                raise ValueError("意外的文件结尾")
+            if depth == 0 and token in ends:
+                return out
+            if token in ("(", "[", "{", "'{"):
+                depth += 1
+            elif token in (")", "]", "}"):
+                depth -= 1
+            out.append(self.take())
+
+    def width(self):
+        out = []
+        while self.peek() in ("[", "signed"):
+            if self.peek() == "signed":
+                out.append(self.take())
+                continue
+            out += [self.take("[")] + self.until("]") + [self.take("]")]
+        return " ".join(out)
+
+
+def parse_file(verilog_file):
+    """解析Verilog文件
+
+    Returns:
+        dict: {模块名: Module}，保持源文件中的顺序
+    """
+    with open(verilog_file) as f:
+        text = f.read()
+    modules = {}
+    for m in re.finditer(r"^module\s+(\w+).*?^endmodule\b", text, re.M | re.S):
+        module = Module(m.group(1), text.count("\n", 0, m.start()) + 1)
+        modules[module.name] = (module, _tokenize(m.group(0), module.line))
+    directions = {name: {} for name in modules}
+    for name, (module, tokens) in modules.items():
+        _parse_module(module, tokens, directions[name])
+    for name, (module, tokens) in modules.items():
+        _parse_body(module, tokens, directions)
+    return {name: module for name, (module, _) in modules.items()}
+
+
+def _parse_module(module, tokens, directions):
+    p = _Parser(tokens)
+    p.take("module")
+    p.take()
+    p.take("(")
+    while p.peek() != ")":
+        if p.peek() == ",":
+            p.take()
+            continue
+        kind = p.take()
+        width = p.width()
+        name = p.take()
+        module.add(name, kind, width, p.line())
+        module.ports.append(name)
+        directions[name] = kind
+    p.take(")")
+    p.take(";")
+    module.body = p.pos
+
+
+def _parse_body(module, tokens, directions):
+    p = _Parser(tokens)
+    p.pos = module.body
+    while p.peek() not in (None, "endmodule"):
+        token = p.peek()
+        line = p.line()
+        if token in _DECL_KEYWORDS:
+            kind = "reg" if p.take() == "reg" else "wire"
+            width = p.width()
+            signal = module.add(p.take(), kind, width, line)
+            if p.peek() == "=":
+                p.take()
+                signal.tokens = p.until(";")
+            p.take(";")
+        elif token == "assign":
+            p.take()
+            lhs = p.until("=")
+            p.take("=")
+            signal = module.signals.get(lhs[0]) or module.add(lhs[0], "wire", "", line)
+            signal.tokens += lhs[1:] + ["="] + p.until(";") if len(lhs) > 1 else p.until(";")
+            signal.line = line
+            p.take(";")
+        elif token == "always":
+            p.take()
+            p.take("@")
+            p.take("(")
+            p.until(")")
+            p.take(")")
+            _parse_statement(p, module, [])
+        elif p.peek(2) == "(" and token in directions:
+            _parse_instance(p, module, directions[token])
+        else:
+            raise ValueError(f"{module.name}第{line}行: 无法解析的语句{token}")
+    names = set(module.signals)
+    for signal in module.signals.values():
+        signal.finish(names)
+
+
+def _parse_statement(p, module, conds):
+    """解析always块中的语句，把每个非阻塞赋值连同其条件路径追加到被赋值reg的驱动表达式"""
+    token = p.peek()
+    if token == "begin":
+        p.take()
+        while p.peek() != "end":
+            _parse_statement(p, module, conds)
+        p.take("end")
+    elif token == "if":
+        p.take()
+        p.take("(")
+        cond = p.until(")")
+        p.take(")")
+        _parse_statement(p, module, conds + [["if", "("] + cond + [")"]])
+        if p.peek() == "else":
+            p.take()
+            _parse_statement(p, module, conds + [["if", "!", "("] + cond + [")"]])
+    else:
+        line = p.line()
+        lhs = p.until("<=")
+        p.take("<=")
+        rhs = p.until(";")
+        p.take(";")
+        signal = module.signals.get(lhs[0]) or module.add(lhs[0], "reg", "", line)
+        if not signal.tokens:
+            signal.line = line
+        signal.tokens += [t for cond in conds for t in cond] + lhs[1:] + ["<="] + rhs + [";"]
+
+
+def _parse_instance(p, module, directions):
+    line = p.line()
+    kind = p.take()
+    inst = module.add(p.take(), "inst", kind, line)
+    p.take("(")
+    connections = []
+    while p.peek() != ")":
+        if p.peek() == ",":
+            p.take()
+            continue
+        p.take(".")
+        port = p.take()
+        p.take("(")
+        expr = p.until(")")
+        p.take(")")
+        if directions.get(port) == "output":
+            if expr:
+                signal = module.signals.get(expr[0]) or module.add(expr[0], "wire", "", line)
+                signal.tokens = ["inst", inst.name, ".", port] + expr[1:]
+                signal.line = line
+        else:
+            connections.append([".", port, "("] + expr + [")"])
+    p.take(")")
+    p.take(";")
+    inst.tokens = [kind] + [t for c in sorted(connections) for t in c]
+
+
+# ---------------------------------------------------------------- 结构对齐
+
+def _uses(module):
+    """{信号名: [(使用者, 操作数序号)]}"""
+    uses = defaultdict(list)
+    for signal in module.signals.values():
+        for k, operand in enumerate(signal.operands):
+            uses[operand].append((signal.name, k))
+    return uses
+
+
+def _refine(module, uses, labels, anchors):
+    fanin = {name: hash((labels[name], s.template, tuple(labels[o] for o in s.operands)))
+             for name, s in module.signals.items()}
+    fanout = {name: hash((labels[name], tuple(sorted((labels[c], k) for c, k in uses.get(name, ())))))
+              for name in module.signals}
+    for name in anchors:
+        fanin[name] = fanout[name] = labels[name]
+    return fanin, fanout
+
+
+def match_signals(origin, bug, max_depth=MAX_DEPTH):
+    """对齐两个版本同名模块中的信号
+
+    Args:
+        origin (Module): origin版本模块
+        bug (Module): 变体模块
+        max_depth (int, optional): 每轮结构哈希迭代的最大深度
+
+    Returns:
+        dict: {origin信号名: bug信号名}
+    """
+    pairs = {name: name for name in origin.ports if name in bug.signals}
+    uses_o, uses_b = _uses(origin), _uses(bug)
+    while True:
+        reverse = {b: o for o, b in pairs.items()}
+        base_o = {n: hash(("A", n) if n in pairs else (s.kind, s.width)) for n, s in origin.signals.items()}
+        base_b = {n: hash(("A", reverse[n]) if n in reverse else (s.kind, s.width)) for n, s in bug.signals.items()}
+        added = 0
+        for direction in (0, 1):
+            lo, lb = base_o, base_b
+            for _ in range(max_depth):
+                lo = _refine(origin, uses_o, lo, pairs)[direction]
+                lb = _refine(bug, uses_b, lb, reverse)[direction]
+                buckets = defaultdict(lambda: ([], []))
+                for n, label in lo.items():
+                    if n not in pairs:
+                        buckets[label][0].append(n)
+                for n, label in lb.items():
+                    if n not in reverse:
+                        buckets[label][1].append(n)
+                for o_names, b_names in buckets.values():
+                    if len(o_names) == 1 and len(b_names) == 1 and origin.signals[o_names[0]].kind == bug.signals[b_names[0]].kind:
+                        pairs[o_names[0]] = b_names[0]
+                        reverse[b_names[0]] = o_names[0]
+                        added += 1
+        if not added and not _vote(origin, bug, pairs, reverse):
+            return pairs
+
+
+def _vote(origin, bug, pairs, reverse):
+    """按使用者投票配对：已配对且模板相同的两个信号，同一位置上未配对的操作数互为候选
+
+    驱动表达式被改动的信号扇入、扇出哈希都会变化，其使用者配对后仍可由此找回。
+
+    Returns:
+        int: 新增的配对数
+    """
+    votes = defaultdict(int)
+    for o_name, b_name in pairs.items():
+        o_sig, b_sig = origin.signals[o_name], bug.signals[b_name]
+        if o_sig.template != b_sig.template:
+            continue
+        for o_op, b_op in zip(o_sig.operands, b_sig.operands):
+            if o_op not in pairs and b_op not in reverse and origin.signals[o_op].kind == bug.signals[b_op].kind:
+                votes[o_op, b_op] += 1
+    best_o, best_b = {}, {}
+    for (o_op, b_op), n in votes.items():
+        if n > best_o.get(o_op, (0, None))[0]:
+            best_o[o_op] = (n, b_op)
+        if n > best_b.get(b_op, (0, None))[0]:
+            best_b[b_op] = (n, o_op)
+    added = 0
+    for o_op, (_, b_op) in best_o.items():
+        if best_b[b_op][1] == o_op:
+            pairs[o_op] = b_op
+            reverse[b_op] = o_op
+            added += 1
+    return added
+
+
+def _render(tokens):
+    return " ".join(tokens).replace("( ", "(").replace(" )", ")").replace("[ ", "[").replace(" ]", "]")
+
+
+def _mapped_tokens(signal, mapping):
+    """驱动表达式的token，操作数经mapping映射（无映射的保留原名并加?前缀）"""
+    it = iter(signal.operands)
+    return [t if t is not None else mapping.get(o, "?" + o) for t, o in
+            ((t, next(it) if t is None else None) for t in signal.template)]
+
+
+def diff_module(origin, bug):
+    """比较两个版本的同名模块
+
+    Returns:
+        dict: {"renames": {bug名: origin名}, "changed": [(origin信号, bug信号, origin表达式, bug表达式)],
+               "removed": [origin信号], "added": [bug信号]}
+    """
+    pairs = match_signals(origin, bug)
+    reverse = {b: o for o, b in pairs.items()}
+    changed = []
+    for o_name, b_name in pairs.items():
+        o_sig, b_sig = origin.signals[o_name], bug.signals[b_name]
+        o_tokens = list(o_sig.tokens)
+        b_tokens = _mapped_tokens(b_sig, reverse)
+        if o_tokens != b_tokens or o_sig.width != b_sig.width:
+            changed.append((o_sig, b_sig, o_tokens, b_tokens))
+    changed.sort(key=lambda c: c[0].line)
+    return {
+        "renames": {b: o for o, b in pairs.items() if o != b},
+        "changed": changed,
+        "removed": sorted((s for n, s in origin.signals.items() if n not in pairs), key=lambda s: s.line),
+        "added": sorted((s for n, s in bug.signals.items() if n not in reverse), key=lambda s: s.line),
+    }
+
+
+def _hunks(a, b, context=4):
+    """token级差异片段[(origin片段, bug片段)]"""
+    out = []
+    for group in difflib.SequenceMatcher(None, a, b, autojunk=False).get_grouped_opcodes(context):
+        i1, i2, j1, j2 = group[0][1], group[-1][2], group[0][3], group[-1][4]
+        out.append((_render(a[i1:i2]), _render(b[j1:j2])))
+    return out
+
+
+def diff_files(bug_file, origin_file):
+    """比较两个Verilog文件
+
+    Returns:
+        tuple: ({模块名: diff_module结果}, 仅origin有的模块, 仅bug有的模块)
+    """
+    origin, bug = parse_file(origin_file), parse_file(bug_file)
+    results = {name: diff_module(origin[name], bug[name]) for name in origin if name in bug}
+    return results, [n for n in origin if n not in bug], [n for n in bug if n not in origin]
+
+
+def report(results, removed_modules, added_modules, renames=False):
+    """格式化diff_files的结果"""
+    lines = []
+    for name in removed_modules:
+        lines.append(f"- module {name}")
+    for name in added_modules:
+        lines.append(f"+ module {name}")
+    total_renames = 0
+    for name, result in results.items():
+        total_renames += len(result["renames"])
+        if not (result["changed"] or result["removed"] or result["added"]):
+            continue
+        lines.append(f"module {name}")
+        for o_sig, b_sig, o_tokens, b_tokens in result["changed"]:
+            alias = "" if o_sig.name == b_sig.name else f" (bug: {b_sig.name})"
+            lines.append(f"  ~ {o_sig.kind} {o_sig.name}{alias}  origin:{o_sig.line} bug:{b_sig.line}")
+            if o_sig.width != b_sig.width:
+                lines.append(f"      位宽 {o_sig.width or '1'} -> {b_sig.width or '1'}")
+            for a, b in _hunks(o_tokens, b_tokens):
+                lines.append(f"      - {a}")
+                lines.append(f"      + {b}")
+        for sig in result["removed"]:
+            lines.append(f"  - {sig.kind} {sig.name}  origin:{sig.line}  {_render(sig.tokens)[:160]}")
+        for sig in result["added"]:
+            lines.append(f"  + {sig.kind} {sig.name}  bug:{sig.line}  {_render(sig.tokens)[:160]}")
+    if renames:
+        lines.append(f"改名映射（bug -> origin），共{total_renames}个")
+        for name, result in results.items():
+            for b, o in sorted(result["renames"].items(), key=lambda kv: kv[1]):
+                lines.append(f"  {name}.{b} -> {o}")
+    if not lines or lines[0].startswith("改名映射"):
+        lines.insert(0, "无语义差异")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="不依赖信号名的Verilog结构差分")
+    parser.add_argument("bug", help="变体Verilog文件")
+    parser.add_argument("origin", nargs="?", default=None, help="origin文件，默认为origin_file/<DUT>_origin.v")
+    parser.add_argument("--renames", action="store_true", help="同时打印改名映射")
+    args = parser.parse_args(argv)
+
+    origin = args.origin or os.path.join(ROOT, "origin_file",
+                                         os.path.basename(args.bug).split("_")[0] + "_origin.v")
+    results, removed, added = diff_files(args.bug, origin)
+    print(f"# {os.path.basename(args.bug)} vs {os.path.basename(origin)}")
+    print(report(results, removed, added, args.renames))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,177 @@
+#coding=utf-8
+"""
+基于inotify的文件条件等待
+
+Makefile中UCAgent侧与Code Agent侧通过完成标志文件交接（dut_complete.txt、all_complete.txt、
+Guide_Doc/dut_fixture.md）。原先用`sleep 5`轮询，每次交接最多白等5秒。本工具在条件涉及的
+目录上注册inotify监听，文件出现/消失时立即返回：
+
+    # 等待文件出现
+    python3 scripts/wait_for.py output/5000/dut_complete.txt
+    # 以!表示等待文件不存在；同一组内的条件同时满足，--or分隔的任意一组满足即返回
+    python3 scripts/wait_for.py output/5000/Guide_Doc/dut_fixture.md '!output/5000/dut_complete.txt' \\
+        --or output/5000/all_complete.txt
+
+尚不存在的目录会监听其最近的已存在祖先目录，目录被创建后自动改为监听新目录。
+非Linux平台（无inotify）退化为0.2秒间隔轮询。
+
+返回码：0表示条件满足，1表示超时。满足的组序号（从0开始）打印到标准输出。
+"""
+
+import argparse
+import ctypes
+import ctypes.util
+import os
+import select
+import sys
+import time
+
+
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = (IN_CREATE | IN_MOVED_TO | IN_DELETE | IN_MOVED_FROM | IN_DELETE_SELF | IN_MOVE_SELF
+              | IN_ATTRIB | IN_MODIFY)
+
+POLL_INTERVAL = 0.2
+
+
+class Inotify:
+    """最小的inotify封装（ctypes调用libc），只用于“有事件发生”的唤醒"""
+
+    def __init__(self):
+        """
+        Raises:
+            OSError: 当前平台不支持inotify时抛出
+        """
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        if not hasattr(self._libc, "inotify_init1"):
+            raise OSError("inotify不可用")
+        self.fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1失败")
+        self._watched = set()
+
+    def watch(self, directory):
+        """监听目录（重复调用无副作用，目录消失时忽略）"""
+        if directory in self._watched:
+            return
+        if self._libc.inotify_add_watch(self.fd, os.fsencode(directory), WATCH_MASK) >= 0:
+            self._watched.add(directory)
+
+    def forget(self):
+        """事件可能意味着目录被删除或替换，下一轮重新注册全部监听"""
+        self._watched.clear()
+
+    def wait(self, timeout=None):
+        """阻塞到有事件或超时，并读空事件队列"""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if ready:
+            try:
+                while os.read(self.fd, 65536):
+                    pass
+            except BlockingIOError:
+                pass
+
+    def close(self):
+        os.close(self.fd)
+
+
+def parse_groups(conditions):
+    """把命令行条件解析为[[(路径, 是否应存在), ...], ...]，组之间为“或”关系"""
+    groups = [[]]
+    for cond in conditions:
+        if cond == "--or":
+            groups.append([])
+        elif cond.startswith("!"):
+            groups[-1].append((os.path.abspath(cond[1:]), False))
+        else:
+            groups[-1].append((os.path.abspath(cond), True))
+    if not all(groups):
+        raise ValueError("每个--or分组至少需要一个条件")
+    return groups
+
+
+def satisfied(groups):
+    """返回第一个满足的组序号，全都不满足返回None"""
+    for i, group in enumerate(groups):
+        if all(os.path.exists(path) == present for path, present in group):
+            return i
+    return None
+
+
+def _watch_dir(path):
+    """路径的父目录中最近的已存在目录"""
+    directory = os.path.dirname(path)
+    while not os.path.isdir(directory):
+        parent = os.path.dirname(directory)
+        if parent == directory:
+            break
+        directory = parent
+    return directory
+
+
+def wait_for(groups, timeout=None):
+    """等待任意一组条件满足
+
+    Args:
+        groups (list): parse_groups的结果
+        timeout (float, optional): 超时秒数，默认一直等待
+
+    Returns:
+        int: 满足的组序号；超时返回None
+    """
+    deadline = None if timeout is None else time.monotonic() + timeout
+    try:
+        notify = Inotify()
+    except OSError:
+        notify = None
+    try:
+        while True:
+            # 先注册监听再检查条件，检查之后发生的变化一定会产生事件，不会丢失唤醒
+            if notify is not None:
+                for group in groups:
+                    for path, _ in group:
+                        notify.watch(_watch_dir(path))
+            index = satisfied(groups)
+            if index is not None:
+                return index
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return None
+            if notify is None:
+                time.sleep(POLL_INTERVAL if remaining is None else min(POLL_INTERVAL, remaining))
+            else:
+                notify.wait(remaining)
+                notify.forget()
+    finally:
+        if notify is not None:
+            notify.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="基于inotify等待文件出现/消失")
+    parser.add_argument("--timeout", type=float, default=None, help="超时秒数，默认一直等待")
+    parser.add_argument("conditions", nargs=argparse.REMAINDER,
+                        help="路径（等待出现）或!路径（等待消失），用--or分隔多组")
+    args = parser.parse_args(argv)
+    if not args.conditions:
+        parser.error("至少需要一个条件")
+
+    index = wait_for(parse_groups(args.conditions), args.timeout)
+    if index is None:
+        return 1
+    print(index)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())